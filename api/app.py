@@ -0,0 +1,341 @@
+"""
+Read-only HTTP query service for the org graph.
+
+A plain ASGI application; serve it with any ASGI server, e.g.
+``uv run uvicorn api.app:app``. Chain and subtree queries are answered from
+the cached CompactOrgGraph and name searches from the cached NameSearchIndex
+(see utilities.graph_builder), both reached through AsyncConnection so no
+request ties up a thread. Every response carries the org version as its ETag,
+so clients that revalidate with If-None-Match get a 304 until the data changes.
+
+Endpoints (GET or HEAD; chain and subtree also accept a POST JSON body):
+    /health                         {"status": "ok", "version": 12}
+    /metrics                        this process's database metrics in Prometheus text format
+    /chain?ids=a,b                  management chain of each ID, from the person up
+    /subtree?ids=a&depth=2&limit=50 everyone reporting to each ID, breadth first
+    /search?q=jim+hal&k=10          top k name matches, with position/department/tier filters
+"""
+
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+from urllib.parse import parse_qs
+from handler.async_cursor import AsyncConnection
+from handler.cursor import MAX_HIERARCHY_DEPTH
+from utilities.compact_graph import CompactOrgGraph
+from utilities.search_index import DEFAULT_TOP_K, NameSearchIndex
+from utilities.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Most IDs accepted by one chain/subtree request
+MAX_BATCH_IDS = 1000
+
+# People returned per subtree unless the request sets limit, and the most it may ask for
+DEFAULT_SUBTREE_LIMIT = 1000
+MAX_SUBTREE_LIMIT = 10000
+
+# Most search results per request
+MAX_SEARCH_K = 100
+
+# Largest POST body accepted
+MAX_BODY_BYTES = 1 << 20
+
+# Seconds a version read is reused before asking the database again
+VERSION_TTL = 0.25
+
+PROMETHEUS_CONTENT_TYPE = b"text/plain; version=0.0.4; charset=utf-8"
+
+
+class HTTPError(Exception):
+    """Error reported to the client with the given status code"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+@dataclass
+class Request:
+    """One parsed request, as passed to the endpoint handlers"""
+    params: dict[str, list[str]]
+    body: Optional[dict]
+    version: int
+
+    def get(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        if self.body is not None and name in self.body:
+            return str(self.body[name])
+        values = self.params.get(name)
+        return values[-1] if values else default
+
+    def get_int(self, name: str, default: int, low: int, high: int) -> int:
+        value = self.get(name)
+        if value is None:
+            return default
+        try:
+            number = int(value)
+        except ValueError:
+            raise HTTPError(400, f"{name} must be an integer")
+        if not low <= number <= high:
+            raise HTTPError(400, f"{name} must be between {low} and {high}")
+        return number
+
+    def ids(self) -> list[str]:
+        """IDs from ?ids=a,b (repeatable) and a JSON body's "ids" list, deduplicated in order"""
+        ids = [part for value in self.params.get("ids", []) for part in value.split(",") if part]
+        if self.body is not None:
+            body_ids = self.body.get("ids", [])
+            if not isinstance(body_ids, list) or not all(isinstance(emp_id, str) for emp_id in body_ids):
+                raise HTTPError(400, "ids must be a list of strings")
+            ids += body_ids
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            raise HTTPError(400, "ids is required")
+        if len(ids) > MAX_BATCH_IDS:
+            raise HTTPError(400, f"At most {MAX_BATCH_IDS} ids per request")
+        return ids
+
+
+def _person(graph: CompactOrgGraph, index: int, depth: int) -> dict:
+    return {"emp_id": graph.emp_id(index), "name": graph.label(index),
+            "position": graph.position(index), "depth": depth}
+
+
+def chain_of(graph: CompactOrgGraph, emp_id: str, max_depth: int = MAX_HIERARCHY_DEPTH) -> Optional[list[dict]]:
+    """
+    Walk from a person up to the top of the org.
+
+    :param graph: Compact org graph
+    :type graph: CompactOrgGraph
+    :param emp_id: Starting employee ID
+    :type emp_id: str
+    :param max_depth: Most supervisors to follow; also stops supervisor cycles
+    :type max_depth: int
+    :return: The person (depth 0) followed by each supervisor, or None if unknown
+    :rtype: Optional[list[dict]]
+    """
+    index = graph.index_of(emp_id)
+    if index is None:
+        return None
+    chain = []
+    while index >= 0 and len(chain) <= max_depth:
+        chain.append(_person(graph, index, len(chain)))
+        index = int(graph.parent[index])
+    return chain
+
+
+def subtree_of(graph: CompactOrgGraph, emp_id: str, max_depth: int = MAX_HIERARCHY_DEPTH,
+               limit: int = DEFAULT_SUBTREE_LIMIT) -> Optional[dict]:
+    """
+    Collect a person and their direct and indirect reports, breadth first.
+
+    :param graph: Compact org graph
+    :type graph: CompactOrgGraph
+    :param emp_id: Root of the subtree
+    :type emp_id: str
+    :param max_depth: Levels below the root to include
+    :type max_depth: int
+    :param limit: Most people to return, root included
+    :type limit: int
+    :return: {"people": [...], "truncated": bool}, or None if the ID is unknown
+    :rtype: Optional[dict]
+    """
+    index = graph.index_of(emp_id)
+    if index is None:
+        return None
+    people = [_person(graph, index, 0)]
+    frontier = [index]
+    depth = 0
+    while frontier and depth < max_depth:
+        depth += 1
+        next_frontier = []
+        for parent in frontier:
+            start, end = graph.child_offsets[parent], graph.child_offsets[parent + 1]
+            for child in graph.child_index[start:end].tolist():
+                if len(people) >= limit:
+                    return {"people": people, "truncated": True}
+                people.append(_person(graph, child, depth))
+                next_frontier.append(child)
+        frontier = next_frontier
+    return {"people": people, "truncated": False}
+
+
+def _matches(etag: str, if_none_match: str) -> bool:
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+class OrgService:
+    """
+    ASGI application answering read-only org queries.
+
+    :param client_factory: Creates the AsyncConnection on first use
+    :type client_factory: Callable[[], AsyncConnection]
+    :param version_ttl: Seconds a version read is reused
+    :type version_ttl: float
+    """
+
+    def __init__(self, client_factory: Callable[[], AsyncConnection] = AsyncConnection,
+                 version_ttl: float = VERSION_TTL):
+        self._client_factory = client_factory
+        self._client: Optional[AsyncConnection] = None
+        self.version_ttl = version_ttl
+        self._version = (float("-inf"), 0)
+        self._graph: Optional[tuple[int, CompactOrgGraph]] = None
+        self._search: Optional[tuple[int, NameSearchIndex]] = None
+        self.routes: dict[str, Callable[[Request], Awaitable[Any]]] = {
+            "/health": self.health,
+            "/chain": self.chain,
+            "/subtree": self.subtree,
+            "/search": self.search,
+        }
+
+    @property
+    def client(self) -> AsyncConnection:
+        # created lazily so importing the app does not need a database driver
+        if self._client is None:
+            self._client = self._client_factory()
+        return self._client
+
+    async def current_version(self) -> int:
+        """
+        Get the org version, read at most once per version_ttl.
+
+        :return: Current org version
+        :rtype: int
+        """
+        checked_at, version = self._version
+        now = time.monotonic()
+        if now - checked_at >= self.version_ttl:
+            version = await self.client.getOrgVersion()
+            self._version = (now, version)
+        return version
+
+    async def graph(self, version: int) -> CompactOrgGraph:
+        if self._graph is None or self._graph[0] != version:
+            self._graph = (version, await self.client.getCompactOrgGraph())
+        return self._graph[1]
+
+    async def search_index(self, version: int) -> NameSearchIndex:
+        if self._search is None or self._search[0] != version:
+            self._search = (version, await self.client.getSearchIndex())
+        return self._search[1]
+
+    # ---- endpoints ----
+
+    async def health(self, request: Request) -> dict:
+        return {"status": "ok", "version": request.version}
+
+    async def chain(self, request: Request) -> dict:
+        ids = request.ids()
+        graph = await self.graph(request.version)
+        return {"version": request.version, "results": {emp_id: chain_of(graph, emp_id) for emp_id in ids}}
+
+    async def subtree(self, request: Request) -> dict:
+        ids = request.ids()
+        depth = request.get_int("depth", MAX_HIERARCHY_DEPTH, 0, MAX_HIERARCHY_DEPTH)
+        limit = request.get_int("limit", DEFAULT_SUBTREE_LIMIT, 1, MAX_SUBTREE_LIMIT)
+        graph = await self.graph(request.version)
+        return {"version": request.version,
+                "results": {emp_id: subtree_of(graph, emp_id, depth, limit) for emp_id in ids}}
+
+    async def search(self, request: Request) -> dict:
+        k = request.get_int("k", DEFAULT_TOP_K, 0, MAX_SEARCH_K)
+        fuzzy = (request.get("fuzzy") or "true").lower() not in ("0", "false", "no", "off")
+        index = await self.search_index(request.version)
+        results = index.search(request.get("q", ""), k, position=request.get("position"),
+                               department=request.get("department"), tier=request.get("tier"), fuzzy=fuzzy)
+        return {"version": request.version, "results": [result._asdict() for result in results]}
+
+    # ---- ASGI ----
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        method = scope["method"]
+        handler = self.routes.get(scope["path"].rstrip("/"))
+        headers = {name.decode("latin-1"): value.decode("latin-1") for name, value in scope.get("headers", [])}
+        try:
+            if scope["path"].rstrip("/") == "/metrics" and method in ("GET", "HEAD"):
+                # scraped on every interval, so no version lookup or ETag
+                await self._send(send, 200, metrics.to_prometheus(), head=method == "HEAD")
+                return
+            if handler is None:
+                raise HTTPError(404, f"Unknown path: {scope['path']}")
+            if method not in ("GET", "HEAD", "POST"):
+                raise HTTPError(405, f"Method not allowed: {method}")
+
+            body = await self._read_json(receive) if method == "POST" else None
+            params = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+            version = await self.current_version()
+            etag = f'"{version}"'
+
+            if method != "POST" and _matches(etag, headers.get("if-none-match", "")):
+                await self._send(send, 304, None, etag, head=True)
+                return
+            payload = await handler(Request(params, body, version))
+            await self._send(send, 200, payload, etag, head=method == "HEAD")
+
+        except HTTPError as e:
+            await self._send(send, e.status, {"error": e.message}, head=method == "HEAD")
+        except Exception as e:
+            logger.error(f"Error serving {method} {scope['path']}: {repr(e)}")
+            await self._send(send, 500, {"error": "Internal server error"}, head=method == "HEAD")
+
+    async def _read_json(self, receive: Callable) -> dict:
+        chunks, size = [], 0
+        while True:
+            message = await receive()
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > MAX_BODY_BYTES:
+                raise HTTPError(413, f"Request body larger than {MAX_BODY_BYTES} bytes")
+            chunks.append(chunk)
+            if not message.get("more_body"):
+                break
+        if not size:
+            return {}
+        try:
+            body = json.loads(b"".join(chunks))
+        except ValueError:
+            raise HTTPError(400, "Request body is not valid JSON")
+        if not isinstance(body, dict):
+            raise HTTPError(400, "Request body must be a JSON object")
+        return body
+
+    async def _send(self, send: Callable, status: int, payload: Any, etag: Optional[str] = None,
+                    head: bool = False):
+        if isinstance(payload, str):
+            body, content_type = payload.encode(), PROMETHEUS_CONTENT_TYPE
+        else:
+            body = json.dumps(payload, separators=(",", ":")).encode() if payload is not None else b""
+            content_type = b"application/json"
+        headers = [(b"content-type", content_type), (b"content-length", str(len(body)).encode())]
+        if etag is not None:
+            # clients may reuse a response but must revalidate it with If-None-Match
+            headers += [(b"etag", etag.encode()), (b"cache-control", b"no-cache")]
+        if status == 405:
+            headers.append((b"allow", b"GET, HEAD, POST"))
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": b"" if head else body})
+
+    async def _lifespan(self, receive: Callable, send: Callable):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if self._client is not None:
+                    await self._client.dispose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+app = OrgService()
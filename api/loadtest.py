@@ -0,0 +1,220 @@
+"""
+Load test for the org query service.
+
+Opens a number of keep-alive HTTP/1.1 connections and sends a mix of chain,
+subtree and search requests for a fixed duration, then reports throughput,
+status codes and latency percentiles. Uses only the standard library.
+
+    uv run uvicorn api.app:app --port 8000 &
+    uv run python -m api.loadtest --url http://127.0.0.1:8000 --concurrency 32 --duration 10
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import string
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from urllib.parse import urlencode, urlsplit
+
+# Relative weights of each request kind
+DEFAULT_MIX = "chain=6,subtree=1,search=3"
+# Seconds a worker waits after a connection error, doubled per consecutive error
+RECONNECT_BACKOFF = 0.05
+MAX_RECONNECT_BACKOFF = 1.0
+
+
+@dataclass
+class LoadStats:
+    """Results of a load test run"""
+    elapsed: float = 0.0
+    latencies: list[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    errors: int = 0
+
+    def percentile(self, fraction: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def report(self) -> str:
+        total = len(self.latencies)
+        rate = total / self.elapsed if self.elapsed else 0.0
+        lines = [
+            f"requests: {total} in {self.elapsed:.1f}s ({rate:,.0f} req/s), connection errors: {self.errors}",
+            "statuses: " + ", ".join(f"{status}={count}" for status, count in sorted(self.statuses.items())),
+            "latency ms: " + ", ".join(f"p{int(p * 100)}={self.percentile(p) * 1000:.2f}"
+                                       for p in (0.5, 0.95, 0.99)) +
+            f", max={max(self.latencies, default=0) * 1000:.2f}",
+        ]
+        return "\n".join(lines)
+
+
+class HTTPConnection:
+    """Minimal keep-alive HTTP/1.1 client connection for the service's JSON responses"""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+
+    async def request(self, method: str, target: str, body: bytes = b"",
+                      headers: dict | None = None) -> tuple[int, dict, bytes]:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {self.host}:{self.port}",
+                 f"Content-Length: {len(body)}"]
+        if body:
+            lines.append("Content-Type: application/json")
+        lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        response_headers = {}
+        while (line := await self.reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+        length = int(response_headers.get("content-length", 0))
+        payload = await self.reader.readexactly(length) if length and method != "HEAD" else b""
+        return status, response_headers, payload
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except ConnectionError:
+                pass
+            self.reader = self.writer = None
+
+
+async def sample_ids(host: str, port: int, count: int) -> list[str]:
+    """Collect up to count employee IDs through the search endpoint"""
+    connection = HTTPConnection(host, port)
+    ids = set()
+    try:
+        for letter in string.ascii_lowercase:
+            _, _, body = await connection.request("GET", "/search?" + urlencode({"q": letter, "k": 100,
+                                                                                  "fuzzy": "false"}))
+            ids.update(result["emp_id"] for result in json.loads(body)["results"])
+            if len(ids) >= count:
+                break
+    finally:
+        await connection.close()
+    return sorted(ids)[:count]
+
+
+def parse_mix(mix: str) -> dict[str, int]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        weights[name.strip()] = int(weight or 1)
+    return weights
+
+
+def make_request(kind: str, ids: list[str], batch: int, rng: random.Random) -> str:
+    if kind == "chain":
+        return "/chain?" + urlencode({"ids": ",".join(rng.sample(ids, min(batch, len(ids))))})
+    if kind == "subtree":
+        return "/subtree?" + urlencode({"ids": rng.choice(ids), "depth": 2, "limit": 100})
+    if kind == "search":
+        return "/search?" + urlencode({"q": "".join(rng.choices(string.ascii_lowercase, k=2))})
+    raise ValueError(f"Unknown request kind: {kind}")
+
+
+async def worker(host: str, port: int, targets: list[str], deadline: float, revalidate: bool,
+                 stats: LoadStats, seed: int):
+    rng = random.Random(seed)
+    connection = HTTPConnection(host, port)
+    etags = {}
+    backoff = RECONNECT_BACKOFF
+    try:
+        while time.perf_counter() < deadline:
+            target = rng.choice(targets)
+            headers = {"If-None-Match": etags[target]} if revalidate and target in etags else None
+            start = time.perf_counter()
+            try:
+                status, response_headers, _ = await connection.request("GET", target, headers=headers)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                stats.errors += 1
+                await connection.close()
+                # don't spin reconnecting to a server that is down or refusing connections
+                await asyncio.sleep(max(0.0, min(backoff, deadline - time.perf_counter())))
+                backoff = min(backoff * 2, MAX_RECONNECT_BACKOFF)
+                continue
+            backoff = RECONNECT_BACKOFF
+            stats.latencies.append(time.perf_counter() - start)
+            stats.statuses[status] += 1
+            if "etag" in response_headers:
+                etags[target] = response_headers["etag"]
+    finally:
+        await connection.close()
+
+
+async def run_load_test(url: str, concurrency: int = 16, duration: float = 10.0, batch: int = 10,
+                        mix: str = DEFAULT_MIX, revalidate: bool = False, distinct_requests: int = 5000,
+                        seed: int = 0) -> LoadStats:
+    """
+    Drive the service with concurrent keep-alive connections.
+
+    :param url: Base URL of the service
+    :type url: str
+    :param concurrency: Open connections, each sending one request at a time
+    :type concurrency: int
+    :param duration: Seconds to run
+    :type duration: float
+    :param batch: IDs per chain request
+    :type batch: int
+    :param mix: Relative weights, e.g. "chain=6,subtree=1,search=3"
+    :type mix: str
+    :param revalidate: Send If-None-Match with the last ETag seen for each request
+    :type revalidate: bool
+    :param distinct_requests: Size of the pool of request targets to draw from
+    :type distinct_requests: int
+    :param seed: Random seed for request generation
+    :type seed: int
+    :return: Throughput, statuses and latencies
+    :rtype: LoadStats
+    """
+    parts = urlsplit(url)
+    host, port = parts.hostname or "127.0.0.1", parts.port or 80
+    ids = await sample_ids(host, port, 2000)
+    if not ids:
+        raise RuntimeError("The service returned no employees to query")
+
+    rng = random.Random(seed)
+    weights = parse_mix(mix)
+    kinds = rng.choices(list(weights), weights=list(weights.values()), k=distinct_requests)
+    targets = [make_request(kind, ids, batch, rng) for kind in kinds]
+
+    stats = LoadStats()
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(worker(host, port, targets, deadline, revalidate, stats, seed + i)
+                           for i in range(concurrency)))
+    stats.elapsed = time.perf_counter() - start
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the org query service")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Base URL of the service")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent keep-alive connections")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run")
+    parser.add_argument("--batch", type=int, default=10, help="IDs per chain request")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Request weights, e.g. chain=6,subtree=1,search=3")
+    parser.add_argument("--revalidate", action="store_true", help="Send If-None-Match to exercise 304s")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+
+    stats = asyncio.run(run_load_test(args.url, args.concurrency, args.duration, args.batch, args.mix,
+                                      args.revalidate, seed=args.seed))
+    print(stats.report())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,16 @@
 import streamlit as st
 from dotenv import load_dotenv
+from utilities.metrics import metrics_server_from_env
 
 load_dotenv()
+metrics_server_from_env()
 
 # Create pages as a flat list for dropdown behavior
 pages = {
     "Navigation": [
         st.Page("./pages/Home.py", title="Home", default=True),
-        st.Page("./pages/ChainOfCommand.py", title="Chain of Command")]
+        st.Page("./pages/ChainOfCommand.py", title="Chain of Command"),
+        st.Page("./pages/Diagnostics.py", title="Diagnostics")]
     }
     
 pg = st.navigation(pages, position="top")
@@ -1,10 +1,19 @@
 from dotenv import load_dotenv
-from handler.cursor import Connection
+from handler.cursor import Connection, MAX_HIERARCHY_DEPTH
 from models.orgchart import SQLEmployee, SQLManager, SQLExecutive
 from sqlalchemy.orm import Session
-from utilities.id_generator import generate_employee_id
+from utilities.id_generator import generate_employee_ids, ID_SCHEMES
+from utilities.org_version import bump_org_version
+from utilities.bulk_loader import load_file, load_rows, write_rows, COPY_CHUNK_SIZE
+from utilities.org_generator import generate_org, plan_org
+from utilities.snapshot import write_snapshot, restore_snapshot, SNAPSHOT_BATCH_SIZE
+from utilities.migrations import MIGRATIONS, migrate, applied_migrations
+from utilities.engine_registry import get_engine, build_db_url
+from utilities.person_store import convert_to_person_layout
+from utilities.rekey import rekey_legacy_ids
 from collections import defaultdict
-import sys
+import argparse
+import os
 
 def clear_database(client: Connection):
     """Clear all employees from database in proper order (respecting foreign keys)"""
@@ -18,6 +27,7 @@ def clear_database(client: Connection):
         print("Clearing executives...")
         session.query(SQLExecutive).delete()
 
+        bump_org_version(session)
         session.commit()
         print("Database cleared successfully!")
 
@@ -46,13 +56,11 @@ def run_build(client: Connection):
     ]
 
     # Build supervisor ID map and prepare insert data
-    id_map = {}
+    emp_ids = generate_employee_ids((emp['first'], emp['last']) for emp in employees)
+    id_map = {emp['id']: emp_id for emp, emp_id in zip(employees, emp_ids)}
     data_by_table = defaultdict(list)
 
-    for emp in employees:
-        emp_id = generate_employee_id(emp['first'], emp['last'])
-        id_map[emp['id']] = emp_id
-
+    for emp, emp_id in zip(employees, emp_ids):
         data_by_table[emp['type']].append({
             'emp_id': emp_id,
             'first_name': emp['first'],
@@ -68,22 +76,149 @@ def run_build(client: Connection):
             session.bulk_insert_mappings(table, data)
             print(f"Added {len(data)} {table.__name__}(s)")
 
+        bump_org_version(session)
         session.commit()
 
     print("Successfully initialized the DB")
 
 
+def print_load_stats(stats):
+    """Print per-table row counts and throughput for a bulk load"""
+    for table_name, count in stats.rows_by_table.items():
+        print(f"Added {count} {table_name} row(s)")
+    if stats.rejected:
+        print(f"Rejected {stats.rejected} invalid row(s)")
+    print(f"Loaded {stats.total_rows} rows in {stats.elapsed:.2f}s ({stats.rows_per_sec:,.0f} rows/sec)")
+
+
+def run_load(client: Connection, path: str, chunk_size: int = COPY_CHUNK_SIZE):
+    """Stream a CSV/JSONL file into the database in foreign-key order"""
+    print(f"Loading {path}...")
+    print_load_stats(load_file(client.connection, path, chunk_size))
+
+
+def run_generate(client: Connection, size: int, fanout: int, depth: int, seed: int,
+                 out: str | None = None, chunk_size: int = COPY_CHUNK_SIZE):
+    """Generate a synthetic org and stream it into the database or a file"""
+    levels = plan_org(size, fanout, depth)
+    print(f"Generating {size} people (seed={seed}): "
+          f"{sum(levels[:-2])} executives over {depth} level(s), {levels[-2]} managers, {levels[-1]} employees")
+
+    rows = generate_org(size, fanout, depth, seed)
+    if out:
+        count = write_rows(rows, out)
+        print(f"Wrote {count} rows to {out}")
+    else:
+        print_load_stats(load_rows(client.connection, rows, chunk_size))
+
+
+def run_snapshot(client: Connection, path: str, batch_size: int = SNAPSHOT_BATCH_SIZE):
+    """Write all three tier tables to a Parquet/Arrow snapshot"""
+    print(f"Writing snapshot to {path}...")
+    stats = write_snapshot(client.connection, path, batch_size)
+    for table_name, count in stats.rows_by_table.items():
+        print(f"Wrote {count} {table_name} row(s)")
+    print(f"Wrote {stats.total_rows} rows in {stats.elapsed:.2f}s ({stats.rows_per_sec:,.0f} rows/sec)")
+
+
+def run_restore(client: Connection, path: str, batch_size: int = SNAPSHOT_BATCH_SIZE):
+    """Load a Parquet/Arrow snapshot into the tier tables"""
+    print(f"Restoring {path}...")
+    print_load_stats(restore_snapshot(client.connection, path, batch_size))
+
+
+def run_migrate(target: int | None = None, list_only: bool = False):
+    """Apply pending schema migrations as the table owner (PG_USER)"""
+    engine = get_engine(build_db_url(admin=True))
+    if list_only:
+        applied = applied_migrations(engine)
+        for migration in MIGRATIONS:
+            row = applied.get(migration.version)
+            status = f"applied {row.applied_at:%Y-%m-%d %H:%M:%S} ({row.duration_ms} ms)" if row else "pending"
+            print(f"{migration.version:>4}  {migration.name:<32} {status}")
+        return
+
+    results = migrate(engine, target, grant_to=os.getenv("DB_USER"))
+    for result in results:
+        note = " (not applicable to this database)" if result.skipped else ""
+        print(f"Applied migration {result.version}: {result.name} in {result.elapsed:.2f}s{note}")
+    print(f"Applied {len(results)} migration(s)" if results else "Database schema is up to date")
+
+
+def run_convert_layout():
+    """Move the three tier tables into the single person table (one-way; snapshot first)"""
+    engine = get_engine(build_db_url(admin=True))
+    moved = convert_to_person_layout(engine, MAX_HIERARCHY_DEPTH, grant_to=os.getenv("DB_USER"))
+    print(f"Moved {moved} people into the person table; the tier tables are now views "
+          f"and the old tables are kept as <tier>_legacy")
+
+
+def run_rekey(client: Connection, scheme: str | None = None, dry_run: bool = False):
+    """Replace name-derived MD5 employee IDs with IDs from the current scheme"""
+    count = rekey_legacy_ids(client.connection, scheme, dry_run)
+    print(f"{count} legacy ID(s) would be rekeyed" if dry_run else f"Rekeyed {count} legacy ID(s)")
+
+
 if __name__ == "__main__":
     load_dotenv()
     client = Connection()
 
-    command = sys.argv[1] if len(sys.argv) > 1 else "rebuild"
+    parser = argparse.ArgumentParser(description="Build and load the org chart database")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.add_parser("clear", help="Delete all employees")
+    subparsers.add_parser("rebuild", help="Clear and reload the Scranton roster (default)")
+    load_parser = subparsers.add_parser("load", help="Stream a CSV/JSONL file into the database")
+    load_parser.add_argument("file", help="Input file (.csv, .jsonl or .ndjson, optionally .gz)")
+    load_parser.add_argument("--replace", action="store_true", help="Clear the database before loading")
+    load_parser.add_argument("--chunk-size", type=int, default=COPY_CHUNK_SIZE, help="Rows per COPY batch")
+    generate_parser = subparsers.add_parser("generate", help="Generate a synthetic org for scale testing")
+    generate_parser.add_argument("--size", type=int, required=True, help="Total number of people")
+    generate_parser.add_argument("--fanout", type=int, default=8, help="Average direct reports per supervisor")
+    generate_parser.add_argument("--depth", type=int, default=1, help="Number of executive levels")
+    generate_parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    generate_parser.add_argument("--out", help="Write to a CSV/JSONL file instead of the database")
+    generate_parser.add_argument("--replace", action="store_true", help="Clear the database before loading")
+    generate_parser.add_argument("--chunk-size", type=int, default=COPY_CHUNK_SIZE, help="Rows per COPY batch")
+    snapshot_parser = subparsers.add_parser("snapshot", help="Write the org to a Parquet/Arrow snapshot")
+    snapshot_parser.add_argument("file", help="Output file (.parquet, or .arrow for Arrow IPC)")
+    snapshot_parser.add_argument("--batch-size", type=int, default=SNAPSHOT_BATCH_SIZE, help="Rows per record batch")
+    restore_parser = subparsers.add_parser("restore", help="Load a Parquet/Arrow snapshot into the database")
+    restore_parser.add_argument("file", help="Snapshot file written by the snapshot command")
+    restore_parser.add_argument("--replace", action="store_true", help="Clear the database before restoring")
+    restore_parser.add_argument("--batch-size", type=int, default=SNAPSHOT_BATCH_SIZE, help="Rows per write")
+    migrate_parser = subparsers.add_parser("migrate", help="Apply pending schema migrations (runs as PG_USER)")
+    migrate_parser.add_argument("--target", type=int, help="Highest migration version to apply")
+    migrate_parser.add_argument("--list", action="store_true", help="Show applied and pending migrations")
+    subparsers.add_parser("convert-layout", help="Switch to the single-table person layout (runs as PG_USER)")
+    rekey_parser = subparsers.add_parser("rekey", help="Replace MD5 employee IDs with IDs from the current scheme")
+    rekey_parser.add_argument("--scheme", choices=ID_SCHEMES, help="ID scheme (defaults to EMP_ID_SCHEME)")
+    rekey_parser.add_argument("--dry-run", action="store_true", help="Only count the IDs that would change")
+    args = parser.parse_args()
+
+    command = args.command or "rebuild"
 
     if command == "clear":
         clear_database(client)
     elif command == "rebuild":
         clear_database(client)
         run_build(client)
-    else:
-        print(f"Unknown command: {command}")
-        print("Usage: python build.py [clear|rebuild]")
\ No newline at end of file
+    elif command == "load":
+        if args.replace:
+            clear_database(client)
+        run_load(client, args.file, args.chunk_size)
+    elif command == "generate":
+        if args.replace and not args.out:
+            clear_database(client)
+        run_generate(client, args.size, args.fanout, args.depth, args.seed, args.out, args.chunk_size)
+    elif command == "snapshot":
+        run_snapshot(client, args.file, args.batch_size)
+    elif command == "restore":
+        if args.replace:
+            clear_database(client)
+        run_restore(client, args.file, args.batch_size)
+    elif command == "migrate":
+        run_migrate(args.target, args.list)
+    elif command == "convert-layout":
+        run_convert_layout()
+    elif command == "rekey":
+        run_rekey(client, args.scheme, args.dry_run)
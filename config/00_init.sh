@@ -7,4 +7,5 @@ psql -v ON_ERROR_STOP=1 --username "$POSTGRES_USER" --dbname "$POSTGRES_DB" <<-E
     GRANT SELECT, INSERT, DELETE, UPDATE ON TABLE executive TO ${DB_USER};
     GRANT SELECT, INSERT, DELETE, UPDATE ON TABLE manager TO ${DB_USER};
     GRANT SELECT, INSERT, DELETE, UPDATE ON TABLE employee TO ${DB_USER};
+    GRANT SELECT, UPDATE ON TABLE org_version TO ${DB_USER};
 EOSQL
@@ -23,4 +23,12 @@ CREATE TABLE IF NOT EXISTS employee (
     position VARCHAR,
     department VARCHAR,
     supervisor_id VARCHAR REFERENCES manager(emp_id) ON DELETE SET NULL DEFAULT NULL
-);
\ No newline at end of file
+);
+
+-- Single-row counter bumped by every application write; caches key on it
+CREATE TABLE IF NOT EXISTS org_version (
+    id INTEGER PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT INTO org_version (id, version) VALUES (1, 0) ON CONFLICT (id) DO NOTHING;
\ No newline at end of file
@@ -0,0 +1,196 @@
+"""
+Asyncio counterpart of handler.cursor.Connection on a SQLAlchemy AsyncEngine.
+
+Each method runs the same code as the matching Connection method, including
+validation, version bumps and change events, against the async engine's
+sync facade inside a greenlet. Database I/O is awaited on the event loop
+rather than blocking a thread, so independent queries run concurrently.
+"""
+
+import asyncio
+import weakref
+import networkx as nx
+from typing import AsyncIterator, Callable, Iterable, Mapping, TypeVar
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.util import greenlet_spawn
+from handler.cursor import Connection, RowResult, SEARCH_PAGE_SIZE, BULK_CHUNK_SIZE, FETCH_CHUNK_SIZE, \
+    MAX_HIERARCHY_DEPTH, _fetch_statement
+from models.orgchart import SQLExecutive, SQLManager, SQLEmployee, Employee
+from utilities.engine_registry import get_async_engine
+from utilities.compact_graph import CompactOrgGraph
+from utilities.search_index import NameSearchIndex
+from utilities.org_version import get_org_version
+from utilities import graph_builder
+
+T = TypeVar("T")
+
+TIER_TABLES = (SQLExecutive, SQLManager, SQLEmployee)
+
+
+class AsyncConnection:
+    """
+    Async data access layer with the same surface as Connection.
+
+    Example:
+        client = AsyncConnection()
+        executives, managers, employees = (await client.fetchTiers(["emp_id", "last_name"])).values()
+    """
+
+    # engine -> event loop -> {cache entry: asyncio.Lock}
+    _build_locks = weakref.WeakKeyDictionary()
+
+    def __init__(self, engine: AsyncEngine | None = None):
+        # every AsyncConnection shares the process-wide async engine unless one is given
+        self.connection = engine if engine is not None else get_async_engine()
+        # the sync Connection drives the same pool through the engine's sync facade
+        self.sync_client = Connection(self.connection.sync_engine)
+
+    def get_db_conn_str(self):
+        return self.connection.url
+
+    async def _run(self, method: Callable[..., T], *args, **kwargs) -> T:
+        # greenlet_spawn lets the sync code await the async driver at each I/O call
+        return await greenlet_spawn(method, *args, **kwargs)
+
+    async def dispose(self):
+        """Close every pooled connection of the underlying engine"""
+        await self.connection.dispose()
+
+    # ---- writes ----
+
+    async def addEmployee(self, person: Employee, table: SQLExecutive | SQLManager | SQLEmployee) -> bool:
+        """Async Connection.addEmployee"""
+        return await self._run(self.sync_client.addEmployee, person, table)
+
+    async def addEmployees(self, people: Iterable[Employee], table: SQLExecutive | SQLManager | SQLEmployee,
+                           chunk_size: int = BULK_CHUNK_SIZE) -> list[RowResult]:
+        """Async Connection.addEmployees"""
+        return await self._run(self.sync_client.addEmployees, people, table, chunk_size)
+
+    async def updateEmployee(self, updated_employee: Employee, table: SQLExecutive | SQLManager | SQLEmployee,
+                             emp_id: str) -> bool:
+        """Async Connection.updateEmployee"""
+        return await self._run(self.sync_client.updateEmployee, updated_employee, table, emp_id)
+
+    async def updateEmployees(self, people: Iterable[Employee], table: SQLExecutive | SQLManager | SQLEmployee,
+                              chunk_size: int = BULK_CHUNK_SIZE) -> list[RowResult]:
+        """Async Connection.updateEmployees"""
+        return await self._run(self.sync_client.updateEmployees, people, table, chunk_size)
+
+    async def reassignSupervisors(self, moves: Mapping[str, str | None] | Iterable[tuple[str, str | None]],
+                                  table: SQLExecutive | SQLManager | SQLEmployee,
+                                  chunk_size: int = BULK_CHUNK_SIZE) -> list[RowResult]:
+        """Async Connection.reassignSupervisors"""
+        return await self._run(self.sync_client.reassignSupervisors, moves, table, chunk_size)
+
+    async def deleteEmployee(self, table: SQLExecutive | SQLManager | SQLEmployee, emp_id: str,
+                             reassign_to: str | None = None) -> bool:
+        """Async Connection.deleteEmployee"""
+        return await self._run(self.sync_client.deleteEmployee, table, emp_id, reassign_to)
+
+    # ---- reads ----
+
+    async def fetchEmployee(self, table: SQLExecutive | SQLManager | SQLEmployee, columns: Iterable[str] | None = None,
+                            after: str | None = None, limit: int | None = None) -> list:
+        """Async Connection.fetchEmployee"""
+        return await self._run(self.sync_client.fetchEmployee, table, columns, after, limit)
+
+    async def fetchTiers(self, columns: Iterable[str] | None = None,
+                         tables: Iterable = TIER_TABLES) -> dict[str, list]:
+        """
+        Fetch several tiers concurrently, each on its own pooled connection.
+
+        :param columns: Employee columns to return (defaults to all)
+        :type columns: Iterable[str] | None
+        :param tables: Tier tables to read (defaults to all three)
+        :type tables: Iterable
+        :return: Rows per table name, in the order the tables were given
+        :rtype: dict[str, list]
+        """
+        tables = list(tables)
+        columns = list(columns) if columns is not None else None
+        rows = await asyncio.gather(*(self.fetchEmployee(table, columns) for table in tables))
+        return {table.__tablename__: table_rows for table, table_rows in zip(tables, rows)}
+
+    def iterEmployees(self, table: SQLExecutive | SQLManager | SQLEmployee, columns: Iterable[str] | None = None,
+                      after: str | None = None, chunk_size: int = FETCH_CHUNK_SIZE) -> AsyncIterator:
+        """
+        Stream a tier in emp_id order with a server-side cursor.
+
+        :param table: Tier table to read
+        :type table: SQLExecutive | SQLManager | SQLEmployee
+        :param columns: Employee columns to return (defaults to all)
+        :type columns: Iterable[str] | None
+        :param after: Only return people whose emp_id sorts after this one
+        :type after: str | None
+        :param chunk_size: Rows buffered per round trip
+        :type chunk_size: int
+        :return: Async iterator of rows, as returned by fetchEmployee
+        :rtype: AsyncIterator
+        :raises ValueError: If a column is not an Employee field
+
+        Example:
+            async for row in client.iterEmployees(SQLEmployee, ["emp_id"]):
+                ...
+        """
+        # built eagerly so a bad column fails here, not on the first __anext__()
+        stmt = _fetch_statement(table, columns, after).execution_options(yield_per=chunk_size)
+
+        async def rows():
+            async with self.connection.connect() as conn:
+                result = await conn.stream(stmt)
+                async for row in result:
+                    yield row
+
+        return rows()
+
+    async def searchEmployees(self, table: SQLExecutive | SQLManager | SQLEmployee, query: str = "",
+                              limit: int = SEARCH_PAGE_SIZE, offset: int = 0) -> list[Employee]:
+        """Async Connection.searchEmployees"""
+        return await self._run(self.sync_client.searchEmployees, table, query, limit, offset)
+
+    async def getEmployee(self, table: SQLExecutive | SQLManager | SQLEmployee, emp_id: str) -> Employee | None:
+        """Async Connection.getEmployee"""
+        return await self._run(self.sync_client.getEmployee, table, emp_id)
+
+    async def getSubtree(self, emp_id: str, max_depth: int = MAX_HIERARCHY_DEPTH) -> list:
+        """Async Connection.getSubtree"""
+        return await self._run(self.sync_client.getSubtree, emp_id, max_depth)
+
+    async def getChainToRoot(self, emp_id: str) -> list:
+        """Async Connection.getChainToRoot"""
+        return await self._run(self.sync_client.getChainToRoot, emp_id)
+
+    async def getSpanCounts(self, emp_ids: list[str] | None = None) -> list:
+        """Async Connection.getSpanCounts"""
+        return await self._run(self.sync_client.getSpanCounts, emp_ids)
+
+    async def getOrgVersion(self) -> int:
+        """Async utilities.org_version.get_org_version for this engine"""
+        return await self._run(get_org_version, self.connection.sync_engine)
+
+    # ---- graphs ----
+
+    async def _cached(self, name: str, getter: Callable[[Connection], T]) -> T:
+        # graph_cache holds a thread lock while it builds; two builds of the same
+        # entry on one event loop would deadlock on it, so queue them here first
+        loops = self._build_locks.setdefault(self.connection.sync_engine, weakref.WeakKeyDictionary())
+        lock = loops.setdefault(asyncio.get_running_loop(), {}).setdefault(name, asyncio.Lock())
+        async with lock:
+            return await self._run(getter, self.sync_client)
+
+    async def buildOrgGraph(self) -> nx.DiGraph:
+        """Async graph_builder.build_org_graph, bypassing the cache"""
+        return await self._run(graph_builder.build_org_graph, db_client=self.sync_client)
+
+    async def getOrgGraph(self) -> nx.DiGraph:
+        """Async graph_builder.get_org_graph (shared, read-only; snapshot() it before iterating)"""
+        return await self._cached("graph", graph_builder.get_org_graph)
+
+    async def getCompactOrgGraph(self) -> CompactOrgGraph:
+        """Async graph_builder.get_compact_org_graph (shared, read-only)"""
+        return await self._cached("compact", graph_builder.get_compact_org_graph)
+
+    async def getSearchIndex(self) -> NameSearchIndex:
+        """Async graph_builder.get_search_index (shared, patched in place)"""
+        return await self._cached("search", graph_builder.get_search_index)
@@ -1,26 +1,147 @@
-import os
+import time
+import logging
+from dataclasses import dataclass
+from enum import Enum
+from itertools import islice
+from typing import Iterable, Iterator, Mapping
 from utilities.validation import EmployeeValidator
-from utilities.id_generator import generate_employee_id
+from utilities.id_generator import generate_employee_ids, existing_employee_ids
 from utilities.errors import handle_db_errors
 from utilities.session_helper import get_session, get_readonly_session
-from sqlalchemy import create_engine, insert, select, delete, exists, URL
-from models.orgchart import SQLExecutive, SQLManager, SQLEmployee, Employee
+from utilities.org_version import bump_org_version
+from utilities.engine_registry import get_engine
+from utilities.org_events import ChangeKind, OrgChange, publish
+from utilities.person_store import uses_person_layout, get_subtree, get_chain_to_root
+from sqlalchemy import insert, select, update, delete, exists, func, text, bindparam, or_, case, values, column, String
+from sqlalchemy.engine import Engine
+from models.orgchart import SQLExecutive, SQLManager, SQLEmployee, SQLPerson, Employee
 from config.employee_types import get_config_by_table
 
+logger = logging.getLogger(__name__)
+
+# Rows per INSERT/existence-check round trip in bulk operations
+BULK_CHUNK_SIZE = 1000
+
+# Default page size for name searches
+SEARCH_PAGE_SIZE = 20
+
+# Rows buffered per round trip when streaming a tier
+FETCH_CHUNK_SIZE = 1000
+
+# Columns a fetch may project, in table order
+EMPLOYEE_COLUMNS = tuple(Employee.model_fields)
+
+# Recursion limit for hierarchy queries; also stops runaway supervisor cycles
+MAX_HIERARCHY_DEPTH = 64
+
+# All three tiers as one relation. Kept as an inline subquery rather than a CTE
+# so Postgres can push the recursive join condition into each branch's index.
+ALL_EMPLOYEES_SQL = """
+    (SELECT emp_id, first_name, last_name, position, department, supervisor_id, 'executive' AS tier FROM executive
+     UNION ALL
+     SELECT emp_id, first_name, last_name, position, department, supervisor_id, 'manager' AS tier FROM manager
+     UNION ALL
+     SELECT emp_id, first_name, last_name, position, department, supervisor_id, 'employee' AS tier FROM employee)
+"""
+
+SUBTREE_SQL = f"""
+    WITH RECURSIVE subtree AS (
+        SELECT e.*, 0 AS depth FROM {ALL_EMPLOYEES_SQL} AS e WHERE e.emp_id = :emp_id
+        UNION ALL
+        SELECT e.*, s.depth + 1 FROM {ALL_EMPLOYEES_SQL} AS e
+        JOIN subtree AS s ON e.supervisor_id = s.emp_id
+        WHERE s.depth < :max_depth
+    )
+    SELECT emp_id, first_name, last_name, position, department, supervisor_id, tier, depth
+    FROM subtree
+    ORDER BY depth, emp_id
+"""
+
+CHAIN_TO_ROOT_SQL = f"""
+    WITH RECURSIVE chain AS (
+        SELECT e.*, 0 AS depth FROM {ALL_EMPLOYEES_SQL} AS e WHERE e.emp_id = :emp_id
+        UNION ALL
+        SELECT e.*, c.depth + 1 FROM {ALL_EMPLOYEES_SQL} AS e
+        JOIN chain AS c ON e.emp_id = c.supervisor_id
+        WHERE c.depth < :max_depth
+    )
+    SELECT emp_id, first_name, last_name, position, department, supervisor_id, tier, depth
+    FROM chain
+    ORDER BY depth
+"""
+
+SPAN_COUNTS_SQL = f"""
+    WITH RECURSIVE reports AS (
+        SELECT e.supervisor_id AS ancestor, e.emp_id, 1 AS depth FROM {ALL_EMPLOYEES_SQL} AS e
+        WHERE e.supervisor_id IS NOT NULL {{root_filter}}
+        UNION ALL
+        SELECT r.ancestor, e.emp_id, r.depth + 1 FROM {ALL_EMPLOYEES_SQL} AS e
+        JOIN reports AS r ON e.supervisor_id = r.emp_id
+        WHERE r.depth < :max_depth
+    )
+    SELECT ancestor AS emp_id,
+           SUM(CASE WHEN depth = 1 THEN 1 ELSE 0 END) AS direct_reports,
+           COUNT(*) AS total_reports
+    FROM reports
+    GROUP BY ancestor
+    ORDER BY ancestor
+"""
+
+
+class RowStatus(Enum):
+    """Per-row outcome of a bulk operation"""
+    INSERTED = "inserted"
+    UPDATED = "updated"
+    EXISTS = "exists"
+    NOT_FOUND = "not_found"
+    DUPLICATE = "duplicate"
+    INVALID = "invalid"
+
+
+@dataclass
+class RowResult:
+    """Result for one input row of a bulk operation"""
+    index: int
+    emp_id: str | None
+    status: RowStatus
+    error: str = ""
+
+
+def _chunked(iterable: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _fetch_statement(table, columns: Iterable[str] | None, after: str | None, limit: int | None = None):
+    """Build a column-pruned SELECT ordered by emp_id, starting after the keyset cursor"""
+    columns = tuple(columns) if columns is not None else EMPLOYEE_COLUMNS
+    unknown = [column for column in columns if column not in EMPLOYEE_COLUMNS]
+    if unknown or not columns:
+        raise ValueError(f"Unknown columns for {table.__tablename__}: {unknown or 'none given'}")
+
+    stmt = select(*[getattr(table, column) for column in columns]).order_by(table.emp_id)
+    if after is not None:
+        stmt = stmt.where(table.emp_id > after)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
+
+
+def _escape_like(value: str) -> str:
+    """Escape LIKE wildcards so user input only matches literally"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
 
 class Connection:
-    def __init__(self):
+    def __init__(self, engine: Engine | None = None):
         try:
-            self.db_conn_str = URL.create(drivername="postgresql+psycopg2",
-                                     host=os.getenv("DB_HOST"),
-                                     database=os.getenv("PG_DATABASE"),
-                                     port=os.getenv("PG_PORT"),
-                                     username=os.getenv("DB_USER"),
-                                     password=os.getenv("DB_USER_PW"))
-            self.connection = create_engine(self.db_conn_str)
-       
+            # every Connection shares the process-wide pooled engine unless one is given
+            self.connection = engine if engine is not None else get_engine()
+            self.db_conn_str = self.connection.url
+
         except Exception as e:
-            print(f"Error creating DB connection engine: {repr(e)}")
+            logger.error(f"Error creating DB connection engine: {repr(e)}")
     
     
     def get_db_conn_str(self):
@@ -34,14 +155,17 @@ class Connection:
             person.first_name, person.last_name, person.position
         )
         if not is_valid:
-            print(f"Validation failed: {error}")
+            logger.warning(f"Validation failed: {error}")
             return False
 
-        # generate employee ID
-        if not person.emp_id:
-            person.emp_id = generate_employee_id(person.first_name, person.last_name)
-
+        version = None
         with get_session(self.connection) as session:
+            # generate employee ID, skipping IDs taken by namesakes
+            if not person.emp_id:
+                person.emp_id = generate_employee_ids(
+                    [(person.first_name, person.last_name)], taken=lambda ids: existing_employee_ids(session, ids)
+                )[0]
+
             # check for existing employee
             exist_stmt = select(exists().where(table.emp_id==person.emp_id))
             result = session.scalar(exist_stmt)
@@ -50,32 +174,678 @@ class Connection:
                 # insert new employee
                 insert_stmt = insert(table).values(person.model_dump(mode="json"))
                 session.execute(insert_stmt)
+                version = bump_org_version(session)
+
+        if version is not None:
+            publish(self.connection, version, [
+                OrgChange(ChangeKind.ADD, person.emp_id, table, person.model_dump(mode="json"))
+            ])
         return True            
 
+    def _insert_new_rows(self, session, table, rows: list[dict]) -> set[str]:
+        """
+        Insert rows that passed the existence check and return the emp_ids actually inserted.
+
+        On Postgres, rows a concurrent writer inserted between the check and the
+        insert are skipped with ON CONFLICT DO NOTHING, and RETURNING reports
+        which rows made it. Elsewhere a conflict raises and rolls back the
+        whole transaction, so every row was inserted.
+        """
+        if self.connection.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as pg_insert
+            stmt = pg_insert(table).on_conflict_do_nothing(index_elements=["emp_id"]).returning(table.emp_id)
+            return set(session.scalars(stmt, rows))
+        session.execute(insert(table), rows)
+        return {row["emp_id"] for row in rows}
+
+    @handle_db_errors("add employees", default_return=[])
+    def addEmployees(self, people: Iterable[Employee], table: SQLExecutive | SQLManager | SQLEmployee,
+                     chunk_size: int = BULK_CHUNK_SIZE) -> list[RowResult]:
+        """
+        Bulk insert employees in a single transaction.
+
+        Rows are validated and given IDs in chunks, existing IDs are dropped with
+        one set-based query per chunk, and the rest are inserted with executemany.
+        Rows without an emp_id get one that no other row uses, so two people
+        with the same name are both inserted.
+
+        :param people: Employees to insert
+        :type people: Iterable[Employee]
+        :param table: Target table class
+        :type table: SQLExecutive | SQLManager | SQLEmployee
+        :param chunk_size: Rows per existence check and insert
+        :type chunk_size: int
+        :return: One result per input row, in input order
+        :rtype: list[RowResult]
+        """
+        start = time.perf_counter()
+        results = []
+        seen_ids = set()
+        inserted = 0
+        changes = []
+        version = None
+
+        with get_session(self.connection) as session:
+            for chunk in _chunked(enumerate(people), chunk_size):
+                errors = EmployeeValidator.validate_batch([person.first_name for _, person in chunk],
+                                                          [person.last_name for _, person in chunk],
+                                                          [person.position for _, person in chunk])
+                valid = []
+                for (index, person), error in zip(chunk, errors):
+                    if error:
+                        results.append(RowResult(index, person.emp_id, RowStatus.INVALID, error))
+                        continue
+                    valid.append((index, person))
+
+                # namesakes get distinct IDs, checked against every tier in one query per retry round
+                unnamed = [person for _, person in valid if not person.emp_id]
+                if unnamed:
+                    ids = generate_employee_ids(
+                        [(person.first_name, person.last_name) for person in unnamed],
+                        taken=lambda ids: (ids & seen_ids) | existing_employee_ids(session, ids)
+                    )
+                    for person, emp_id in zip(unnamed, ids):
+                        person.emp_id = emp_id
+
+                candidates = []
+                for index, person in valid:
+                    if person.emp_id in seen_ids:
+                        results.append(RowResult(index, person.emp_id, RowStatus.DUPLICATE))
+                        continue
+                    seen_ids.add(person.emp_id)
+                    candidates.append((index, person))
+
+                if not candidates:
+                    continue
+
+                # one set-based existence check per chunk
+                chunk_ids = [person.emp_id for _, person in candidates]
+                existing = set(session.scalars(select(table.emp_id).where(table.emp_id.in_(chunk_ids))))
+
+                pending = []
+                for index, person in candidates:
+                    if person.emp_id in existing:
+                        results.append(RowResult(index, person.emp_id, RowStatus.EXISTS))
+                    else:
+                        pending.append((index, person.emp_id, person.model_dump(mode="json")))
+                if not pending:
+                    continue
+
+                added = self._insert_new_rows(session, table, [row for _, _, row in pending])
+                for index, emp_id, row in pending:
+                    if emp_id in added:
+                        changes.append(OrgChange(ChangeKind.ADD, emp_id, table, row))
+                        results.append(RowResult(index, emp_id, RowStatus.INSERTED))
+                    else:
+                        # inserted by a concurrent writer after the existence check
+                        results.append(RowResult(index, emp_id, RowStatus.EXISTS))
+                inserted += len(added)
+
+            if inserted:
+                version = bump_org_version(session)
+
+        if version is not None:
+            publish(self.connection, version, changes)
+
+        elapsed = time.perf_counter() - start
+        rate = len(results) / elapsed if elapsed > 0 else float("inf")
+        logger.info(f"add employees: inserted {inserted} of {len(results)} rows into "
+                    f"{table.__tablename__} in {elapsed:.2f}s ({rate:,.0f} rows/sec)")
+        results.sort(key=lambda result: result.index)
+        return results
+
+    def fetchEmployee(self, table: SQLExecutive | SQLManager | SQLEmployee, columns: Iterable[str] | None = None,
+                      after: str | None = None, limit: int | None = None) -> list:
+        """
+        Fetch people from one tier as lightweight rows, ordered by emp_id.
+
+        Only the requested columns are selected, and rows come back as plain
+        result tuples rather than ORM objects, so nothing is tracked in an
+        identity map. Pass the last emp_id of one page as ``after`` to get the
+        next page (keyset pagination).
+
+        :param table: Tier table to read
+        :type table: SQLExecutive | SQLManager | SQLEmployee
+        :param columns: Employee columns to return (defaults to all)
+        :type columns: Iterable[str] | None
+        :param after: Only return people whose emp_id sorts after this one
+        :type after: str | None
+        :param limit: Maximum number of rows (defaults to the whole tier)
+        :type limit: int | None
+        :return: Rows with attribute access by column name, e.g. ``row.emp_id``
+        :rtype: list
+        :raises ValueError: If a column is not an Employee field
+
+        Example:
+            page = client.fetchEmployee(SQLEmployee, ["emp_id", "last_name"], limit=50)
+            next_page = client.fetchEmployee(SQLEmployee, ["emp_id", "last_name"], after=page[-1].emp_id, limit=50)
+        """
+        # built outside the error handler, so a bad column raises instead of reading as an empty tier
+        return self._fetch_rows(_fetch_statement(table, columns, after, limit))
+
     @handle_db_errors("fetch employees", default_return=[])
-    def fetchEmployee(self, table: SQLExecutive | SQLManager | SQLEmployee):
+    def _fetch_rows(self, stmt) -> list:
         with get_readonly_session(self.connection) as session:
-            result = session.query(table).all()
-        return result
+            return session.execute(stmt).all()
+
+    def iterEmployees(self, table: SQLExecutive | SQLManager | SQLEmployee, columns: Iterable[str] | None = None,
+                      after: str | None = None, chunk_size: int = FETCH_CHUNK_SIZE) -> Iterator:
+        """
+        Stream a tier in emp_id order without loading it all into memory.
+
+        Rows are fetched from the server ``chunk_size`` at a time (yield_per)
+        over one read-only session, which stays open until the iterator is
+        exhausted or closed.
+
+        :param table: Tier table to read
+        :type table: SQLExecutive | SQLManager | SQLEmployee
+        :param columns: Employee columns to return (defaults to all)
+        :type columns: Iterable[str] | None
+        :param after: Only return people whose emp_id sorts after this one
+        :type after: str | None
+        :param chunk_size: Rows buffered per round trip
+        :type chunk_size: int
+        :return: Iterator of rows, as returned by fetchEmployee
+        :rtype: Iterator
+        :raises ValueError: If a column is not an Employee field
+        """
+        # built eagerly so a bad column fails here, not on the first next()
+        stmt = _fetch_statement(table, columns, after)
+
+        def rows():
+            with get_readonly_session(self.connection) as session:
+                yield from session.execute(stmt, execution_options={"yield_per": chunk_size})
+
+        return rows()
+
+    def searchEmployees(self, table: SQLExecutive | SQLManager | SQLEmployee, query: str = "",
+                        limit: int = SEARCH_PAGE_SIZE, offset: int = 0) -> list[Employee]:
+        """
+        Find people in one tier by name, a page at a time.
+
+        Names starting with the query (first, last or full name) come first,
+        followed by names containing it anywhere. Matching is case-insensitive.
+
+        :param table: Tier table to search
+        :type table: SQLExecutive | SQLManager | SQLEmployee
+        :param query: Name or name fragment; empty matches everyone
+        :type query: str
+        :param limit: Maximum number of results
+        :type limit: int
+        :param offset: Number of results to skip
+        :type offset: int
+        :return: Matching people ordered by relevance, then last and first name; empty if the search fails
+        :rtype: list[Employee]
+        """
+        try:
+            return self._search_employees(table, query, limit, offset)
+        except Exception:
+            # logged and counted by handle_db_errors
+            return []
+
+    @handle_db_errors("search employees")
+    def _search_employees(self, table, query: str, limit: int, offset: int) -> list[Employee]:
+        """searchEmployees, raising on errors so callers that cache results can skip failures"""
+        columns = [getattr(table, field) for field in Employee.model_fields]
+        full_name = table.first_name + " " + table.last_name
+        stmt = select(*columns)
+
+        query = (query or "").strip()
+        if query:
+            pattern = _escape_like(query)
+            prefix = or_(table.first_name.ilike(f"{pattern}%", escape="\\"),
+                         table.last_name.ilike(f"{pattern}%", escape="\\"),
+                         full_name.ilike(f"{pattern}%", escape="\\"))
+            stmt = stmt.where(full_name.ilike(f"%{pattern}%", escape="\\")).order_by(case((prefix, 0), else_=1))
+
+        stmt = stmt.order_by(table.last_name, table.first_name, table.emp_id).limit(limit).offset(offset)
+        with get_readonly_session(self.connection) as session:
+            rows = session.execute(stmt).all()
+        return [Employee(**row._mapping) for row in rows]
+
+    @handle_db_errors("get employee")
+    def getEmployee(self, table: SQLExecutive | SQLManager | SQLEmployee, emp_id: str) -> Employee | None:
+        """
+        Fetch one person by ID.
+
+        :param table: Tier table to read
+        :type table: SQLExecutive | SQLManager | SQLEmployee
+        :param emp_id: Employee ID
+        :type emp_id: str
+        :return: The person, or None if not found
+        :rtype: Employee | None
+        """
+        columns = [getattr(table, field) for field in Employee.model_fields]
+        with get_readonly_session(self.connection) as session:
+            row = session.execute(select(*columns).where(table.emp_id == emp_id)).first()
+        return Employee(**row._mapping) if row else None
             
             
     @handle_db_errors("update employee", default_return=False)
     def updateEmployee(self, updated_employee:Employee, table: SQLExecutive | SQLManager | SQLEmployee, emp_id:str) -> bool:
+        update_data = updated_employee.model_dump(mode="json", exclude={'emp_id'})
         with get_session(self.connection) as session:
-            employee = session.query(table).filter_by(emp_id=emp_id).first()
-            if not employee:
+            # a Core UPDATE, not the unit of work: rowcounts through the person layout's
+            # tier views are not reliable on SQLite, so check RETURNING instead
+            updated = session.execute(
+                update(table).where(table.emp_id == emp_id).values(update_data).returning(table.emp_id)
+            ).first()
+            if updated is None:
                 return False
+            version = bump_org_version(session)
 
-            update_data = updated_employee.model_dump(mode="json", exclude={'emp_id'})
-            for field, value in update_data.items():
-                setattr(employee, field, value)
-            return True    
+        publish(self.connection, version, [OrgChange(ChangeKind.UPDATE, emp_id, table, update_data)])
+        return True
             
+    def _update_from_values(self, session, table, rows: list[dict]) -> dict[str, dict]:
+        """
+        Apply one chunk of row updates with a single UPDATE ... FROM a VALUES CTE.
+
+        Every row must have the same keys, including emp_id. Returns the new
+        values of each matched row (without emp_id), keyed by emp_id.
+        """
+        names = list(rows[0])
+        changes = values(*[column(name, String) for name in names], name="changes").data(
+            [tuple(row[name] for name in names) for row in rows]
+        ).cte("changes")
+        stmt = (
+            update(table)
+            .where(table.emp_id == changes.c.emp_id)
+            .values({name: changes.c[name] for name in names if name != "emp_id"})
+            .returning(*[getattr(table, name) for name in EMPLOYEE_COLUMNS])
+        )
+        updated = {}
+        for row in session.execute(stmt, execution_options={"synchronize_session": False}):
+            attrs = dict(row._mapping)
+            updated[attrs.pop("emp_id")] = attrs
+        return updated
+
+    def _unknown_supervisors(self, session, table, supervisor_ids: set) -> set:
+        """Supervisor IDs (ignoring None) that do not exist in the tier above table"""
+        config = get_config_by_table(table)
+        supervisor_ids = {supervisor_id for supervisor_id in supervisor_ids if supervisor_id is not None}
+        if not supervisor_ids or config is None or config.supervisor_table is None:
+            return set()
+        supervisor_table = config.supervisor_table
+        found = session.scalars(select(supervisor_table.emp_id).where(supervisor_table.emp_id.in_(supervisor_ids)))
+        return supervisor_ids - set(found)
+
+    def _apply_updates(self, operation: str, table, rows: Iterable[tuple[int, dict | RowResult]],
+                       chunk_size: int) -> list[RowResult]:
+        """
+        Shared body of updateEmployees and reassignSupervisors.
+
+        rows yields (input index, values) pairs. Values are already validated,
+        except for duplicate IDs and unknown supervisors; rows rejected earlier
+        arrive as their RowResult instead.
+        """
+        start = time.perf_counter()
+        results = []
+        seen_ids = set()
+        changes = []
+        version = None
+
+        with get_session(self.connection) as session:
+            for chunk in _chunked(rows, chunk_size):
+                candidates = []
+                for index, row in chunk:
+                    if isinstance(row, RowResult):
+                        results.append(row)
+                    elif row["emp_id"] in seen_ids:
+                        results.append(RowResult(index, row["emp_id"], RowStatus.DUPLICATE))
+                    else:
+                        seen_ids.add(row["emp_id"])
+                        candidates.append((index, row))
+
+                unknown = self._unknown_supervisors(session, table, {row.get("supervisor_id") for _, row in candidates})
+                if unknown:
+                    for index, row in candidates:
+                        if row.get("supervisor_id") in unknown:
+                            results.append(RowResult(index, row["emp_id"], RowStatus.INVALID,
+                                                     f"Unknown supervisor: {row['supervisor_id']}"))
+                    candidates = [(index, row) for index, row in candidates if row.get("supervisor_id") not in unknown]
+
+                if not candidates:
+                    continue
+
+                updated = self._update_from_values(session, table, [row for _, row in candidates])
+                for index, row in candidates:
+                    emp_id = row["emp_id"]
+                    if emp_id in updated:
+                        changes.append(OrgChange(ChangeKind.UPDATE, emp_id, table, updated[emp_id]))
+                        results.append(RowResult(index, emp_id, RowStatus.UPDATED))
+                    else:
+                        results.append(RowResult(index, emp_id, RowStatus.NOT_FOUND))
+
+            if changes:
+                version = bump_org_version(session)
+
+        if version is not None:
+            publish(self.connection, version, changes)
+
+        elapsed = time.perf_counter() - start
+        rate = len(results) / elapsed if elapsed > 0 else float("inf")
+        logger.info(f"{operation}: updated {len(changes)} of {len(results)} rows in "
+                    f"{table.__tablename__} in {elapsed:.2f}s ({rate:,.0f} rows/sec)")
+        results.sort(key=lambda result: result.index)
+        return results
+
+    @handle_db_errors("update employees", default_return=[])
+    def updateEmployees(self, people: Iterable[Employee], table: SQLExecutive | SQLManager | SQLEmployee,
+                        chunk_size: int = BULK_CHUNK_SIZE) -> list[RowResult]:
+        """
+        Update many people in one tier in a single transaction.
+
+        Each person is matched on emp_id and all of their other fields are
+        overwritten. Rows are validated like addEmployees, then applied with
+        one set-based UPDATE ... FROM (VALUES ...) per chunk. Either every
+        valid row is written or, on a database error, none are.
+
+        :param people: New field values; emp_id selects the row to update
+        :type people: Iterable[Employee]
+        :param table: Target table class
+        :type table: SQLExecutive | SQLManager | SQLEmployee
+        :param chunk_size: Rows per UPDATE statement
+        :type chunk_size: int
+        :return: One result per input row, in input order (UPDATED, NOT_FOUND,
+            DUPLICATE or INVALID)
+        :rtype: list[RowResult]
+        """
+        def rows():
+            for index, person in enumerate(people):
+                if not person.emp_id:
+                    yield index, RowResult(index, None, RowStatus.INVALID, "emp_id is required")
+                    continue
+                is_valid, error = EmployeeValidator.validate_employee_data(
+                    person.first_name, person.last_name, person.position
+                )
+                if not is_valid:
+                    yield index, RowResult(index, person.emp_id, RowStatus.INVALID, error)
+                    continue
+                yield index, person.model_dump(mode="json")
+
+        return self._apply_updates("update employees", table, rows(), chunk_size)
+
+    @handle_db_errors("reassign supervisors", default_return=[])
+    def reassignSupervisors(self, moves: Mapping[str, str | None] | Iterable[tuple[str, str | None]],
+                            table: SQLExecutive | SQLManager | SQLEmployee,
+                            chunk_size: int = BULK_CHUNK_SIZE) -> list[RowResult]:
+        """
+        Move many people in one tier to new supervisors in a single transaction.
+
+        New supervisors are checked against the tier above in one query per
+        chunk, then the moves are applied with one set-based UPDATE per chunk.
+
+        :param moves: emp_id -> new supervisor_id (None to clear), as a mapping or pairs
+        :type moves: Mapping[str, str | None] | Iterable[tuple[str, str | None]]
+        :param table: Table of the people being moved
+        :type table: SQLExecutive | SQLManager | SQLEmployee
+        :param chunk_size: Rows per UPDATE statement
+        :type chunk_size: int
+        :return: One result per move, in input order (UPDATED, NOT_FOUND,
+            DUPLICATE or INVALID)
+        :rtype: list[RowResult]
+
+        Example:
+            results = client.reassignSupervisors({"jim": "michael", "pam": "michael"}, SQLEmployee)
+        """
+        pairs = moves.items() if isinstance(moves, Mapping) else moves
+
+        def rows():
+            for index, (emp_id, supervisor_id) in enumerate(pairs):
+                if emp_id == supervisor_id:
+                    yield index, RowResult(index, emp_id, RowStatus.INVALID, "A person cannot supervise themselves")
+                    continue
+                yield index, {"emp_id": emp_id, "supervisor_id": supervisor_id}
+
+        return self._apply_updates("reassign supervisors", table, rows(), chunk_size)
+
+    def _new_supervisors(self, session, current_supervisors, new_supervisors, bosses: set,
+                         moving: set) -> dict[str, str | None]:
+        """
+        Resolve each current supervisor to the person the people they supervise should report to after a move.
+
+        That is the supervisor if they can supervise the new tier, else the
+        supervisor's supervisor, else nobody. People being moved in the same
+        call are stepped over without counting as a level, since they will
+        not be in the tier above afterwards. One round of two queries per
+        level climbed.
+        """
+        resolved = {}
+        walks = {boss: (boss, 0) for boss in bosses}
+        for _ in range(MAX_HIERARCHY_DEPTH):
+            nodes = {node for node, _ in walks.values()} - moving
+            eligible = set(session.scalars(
+                select(new_supervisors.emp_id).where(new_supervisors.emp_id.in_(nodes))
+            )) if nodes else set()
+
+            climbing = {}
+            for boss, (node, levels) in walks.items():
+                if node in eligible:
+                    resolved[boss] = node
+                elif node in moving:
+                    climbing[boss] = (node, levels)
+                elif levels == 0:
+                    climbing[boss] = (node, 1)
+                else:
+                    resolved[boss] = None
+            if not climbing:
+                return resolved
+
+            parents = dict(session.execute(
+                select(current_supervisors.emp_id, current_supervisors.supervisor_id)
+                .where(current_supervisors.emp_id.in_({node for node, _ in climbing.values()}))
+            ).all())
+            walks = {}
+            for boss, (node, levels) in climbing.items():
+                parent = parents.get(node)
+                if parent is None:
+                    resolved[boss] = None
+                else:
+                    walks[boss] = (parent, levels)
+        # a supervisor cycle among people being moved
+        resolved.update(dict.fromkeys(walks, None))
+        return resolved
+
+    def _move_rows(self, session, from_table, to_table, rows: list[dict], person_layout: bool):
+        """Move one chunk of validated rows, already carrying their new supervisor_id, to another tier"""
+        if person_layout:
+            # one row per person: the move is a tier change, and the path triggers follow the new supervisor
+            moves = values(column("emp_id", String), column("supervisor_id", String), name="moves").data(
+                [(row["emp_id"], row["supervisor_id"]) for row in rows]
+            ).cte("moves")
+            session.execute(
+                update(SQLPerson)
+                .where(SQLPerson.emp_id == moves.c.emp_id)
+                .values(tier=to_table.__tablename__, supervisor_id=moves.c.supervisor_id),
+                execution_options={"synchronize_session": False}
+            )
+            return
+        session.execute(insert(to_table), rows)
+        session.execute(delete(from_table).where(from_table.emp_id.in_([row["emp_id"] for row in rows])),
+                        execution_options={"synchronize_session": False})
+
+    def changeTier(self, emp_ids: str | Iterable[str], from_table: SQLExecutive | SQLManager | SQLEmployee,
+                   to_table: SQLExecutive | SQLManager | SQLEmployee, supervisor_id: str | None = None,
+                   reassign_to: str | Mapping[str, str] | None = None,
+                   chunk_size: int = BULK_CHUNK_SIZE) -> list[RowResult]:
+        """
+        Promote or demote people from one tier to another in a single transaction.
+
+        Each person's row moves to to_table with their other fields unchanged.
+        Their new supervisor is supervisor_id when given; otherwise their
+        current supervisor if that person can supervise the new tier, else
+        their supervisor's supervisor, else nobody. Supervisors who are moved
+        in the same call are skipped over for the next one up. Their direct reports move
+        to reassign_to, who must stay in from_table; people with reports and
+        no reassign_to are rejected rather than orphaned. Each chunk costs a
+        fixed number of set-based statements, however many people it holds.
+
+        :param emp_ids: Person or people to move
+        :type emp_ids: str | Iterable[str]
+        :param from_table: Current table class of the people
+        :type from_table: SQLExecutive | SQLManager | SQLEmployee
+        :param to_table: Table class to move them to
+        :type to_table: SQLExecutive | SQLManager | SQLEmployee
+        :param supervisor_id: New supervisor for everyone moved (must be in the tier above to_table)
+        :type supervisor_id: str | None
+        :param reassign_to: New supervisor for the direct reports of everyone moved,
+            or emp_id -> new supervisor per person
+        :type reassign_to: str | Mapping[str, str] | None
+        :param chunk_size: People per round of statements
+        :type chunk_size: int
+        :return: One result per input ID, in input order (UPDATED, NOT_FOUND,
+            DUPLICATE or INVALID)
+        :rtype: list[RowResult]
+        :raises ValueError: If from_table and to_table are not two different tiers
+
+        Example:
+            results = client.changeTier(["jim", "pam"], SQLEmployee, SQLManager, reassign_to="michael")
+        """
+        # checked outside the error handler, so a bad pair of tiers raises instead of returning []
+        from_config, to_config = get_config_by_table(from_table), get_config_by_table(to_table)
+        if from_config is None or to_config is None or from_config is to_config:
+            raise ValueError(f"Cannot move people from {from_table.__tablename__} to {to_table.__tablename__}")
+        if isinstance(emp_ids, str):
+            emp_ids = [emp_ids]
+        return self._change_tier(emp_ids, from_config, to_config, supervisor_id, reassign_to, chunk_size)
+
+    @handle_db_errors("change tier", default_return=[])
+    def _change_tier(self, emp_ids: Iterable[str], from_config, to_config, supervisor_id: str | None,
+                     reassign_to: str | Mapping[str, str] | None, chunk_size: int) -> list[RowResult]:
+        from_table, to_table = from_config.table_class, to_config.table_class
+
+        # executives report to other executives, so a tier without a supervisor tier supervises itself
+        current_supervisors = from_config.supervisor_table or from_table
+        new_supervisors = to_config.supervisor_table or to_table
+        report_tables = [table for table in (from_config.subordinate_table,
+                                             from_table if from_config.supervisor_table is None else None) if table]
+
+        # resolved before the session opens: the first lookup inspects the schema on its own connection
+        person_layout = uses_person_layout(self.connection)
+
+        start = time.perf_counter()
+        results = []
+        seen_ids = set()
+        moved_ids = set()
+        changes = []
+        moved = 0
+        version = None
+
+        with get_session(self.connection) as session:
+            invalid_supervisor = supervisor_id is not None and bool(
+                self._unknown_supervisors(session, to_table, {supervisor_id})
+            )
+
+            for chunk in _chunked(enumerate(emp_ids), chunk_size):
+                candidates = []
+                for index, emp_id in chunk:
+                    if emp_id in seen_ids:
+                        results.append(RowResult(index, emp_id, RowStatus.DUPLICATE))
+                    else:
+                        seen_ids.add(emp_id)
+                        candidates.append((index, emp_id))
+                if not candidates:
+                    continue
+                ids = [emp_id for _, emp_id in candidates]
+
+                found = {row.emp_id: dict(row._mapping) for row in
+                         session.execute(_fetch_statement(from_table, None, None).where(from_table.emp_id.in_(ids)))}
+                taken = set(session.scalars(select(to_table.emp_id).where(to_table.emp_id.in_(ids))))
+
+                # nobody moved in this call may end up supervising: a deleted tier row would null the reference
+                bosses = {row["supervisor_id"] for row in found.values()} - {None} if supervisor_id is None else set()
+                resolved = self._new_supervisors(session, current_supervisors, new_supervisors, bosses,
+                                                 set(ids) | moved_ids) if bosses else {}
+
+                report_counts = {}
+                for table in report_tables:
+                    for emp_id, count in session.execute(
+                        select(table.supervisor_id, func.count())
+                        .where(table.supervisor_id.in_(found), table.emp_id.not_in(ids))
+                        .group_by(table.supervisor_id)
+                    ):
+                        report_counts[emp_id] = report_counts.get(emp_id, 0) + count
+                targets = {(reassign_to.get(emp_id) if isinstance(reassign_to, Mapping) else reassign_to)
+                           for emp_id in report_counts} - {None}
+                known_targets = set(session.scalars(
+                    select(from_table.emp_id).where(from_table.emp_id.in_(targets))
+                )) - set(ids) if targets else set()
+
+                moves = []
+                repoint = {}
+                for index, emp_id in candidates:
+                    row = found.get(emp_id)
+                    if row is None:
+                        results.append(RowResult(index, emp_id, RowStatus.NOT_FOUND))
+                        continue
+                    if emp_id in taken:
+                        results.append(RowResult(index, emp_id, RowStatus.INVALID,
+                                                 f"Already in {to_table.__tablename__}"))
+                        continue
+                    if invalid_supervisor:
+                        results.append(RowResult(index, emp_id, RowStatus.INVALID,
+                                                 f"Unknown supervisor: {supervisor_id}"))
+                        continue
+                    if report_counts.get(emp_id):
+                        target = reassign_to.get(emp_id) if isinstance(reassign_to, Mapping) else reassign_to
+                        if target is None:
+                            results.append(RowResult(index, emp_id, RowStatus.INVALID,
+                                                     f"Has {report_counts[emp_id]} direct reports; pass reassign_to"))
+                            continue
+                        if target not in known_targets:
+                            results.append(RowResult(index, emp_id, RowStatus.INVALID,
+                                                     f"Unknown reassign_to: {target}"))
+                            continue
+                        repoint.setdefault(target, []).append(emp_id)
+
+                    row["supervisor_id"] = supervisor_id if supervisor_id is not None else \
+                        resolved.get(row["supervisor_id"])
+                    moves.append((index, row))
+
+                if not moves:
+                    continue
+
+                # re-point reports first so no foreign key ever refers to a moved row
+                for target, supervisors in repoint.items():
+                    for table in report_tables:
+                        for row in session.execute(
+                            update(table)
+                            .where(table.supervisor_id.in_(supervisors), table.emp_id.not_in(ids))
+                            .values(supervisor_id=target)
+                            .returning(*[getattr(table, name) for name in EMPLOYEE_COLUMNS]),
+                            execution_options={"synchronize_session": False}
+                        ):
+                            attrs = dict(row._mapping)
+                            changes.append(OrgChange(ChangeKind.UPDATE, attrs.pop("emp_id"), table, attrs))
+
+                self._move_rows(session, from_table, to_table, [row for _, row in moves], person_layout)
+                for index, row in moves:
+                    attrs = dict(row)
+                    emp_id = attrs.pop("emp_id")
+                    changes.append(OrgChange(ChangeKind.UPDATE, emp_id, to_table, attrs))
+                    results.append(RowResult(index, emp_id, RowStatus.UPDATED))
+                    moved_ids.add(emp_id)
+                moved += len(moves)
+
+            if changes:
+                version = bump_org_version(session)
+
+        if version is not None:
+            publish(self.connection, version, changes)
+
+        elapsed = time.perf_counter() - start
+        rate = len(results) / elapsed if elapsed > 0 else float("inf")
+        logger.info(f"change tier: moved {moved} of {len(results)} people from {from_table.__tablename__} "
+                    f"to {to_table.__tablename__} in {elapsed:.2f}s ({rate:,.0f} rows/sec)")
+        results.sort(key=lambda result: result.index)
+        return results
+
     @handle_db_errors("delete employee", default_return=False)
     def deleteEmployee(self, table: SQLExecutive | SQLManager | SQLEmployee, emp_id:str, reassign_to: str | None = None) -> bool:
+        reassigned = []
         with get_session(self.connection) as session:
-            employee = session.query(table).filter_by(emp_id=emp_id).first()
-            if not employee:
+            if not session.scalar(select(exists().where(table.emp_id == emp_id))):
                 return False
 
             # handle reassignment logic
@@ -92,14 +862,83 @@ class Connection:
                     if not target_exists:
                         return False
 
-                    # reassign subordinates
-                    session.query(subordinate_table).filter(
-                        subordinate_table.supervisor_id == emp_id
-                    ).update(
-                        {subordinate_table.supervisor_id: reassign_to},
-                        synchronize_session=False
-                    )
+                    # reassign subordinates, keeping their IDs for the change event
+                    reassigned = list(session.scalars(
+                        update(subordinate_table)
+                        .where(subordinate_table.supervisor_id == emp_id)
+                        .values(supervisor_id=reassign_to)
+                        .returning(subordinate_table.emp_id),
+                        execution_options={"synchronize_session": False}
+                    ))
 
             # Delete employee - database automatically handles subordinates if reassign_to is None
-            session.delete(employee)
-            return True
+            session.execute(delete(table).where(table.emp_id == emp_id))
+            version = bump_org_version(session)
+
+        publish(self.connection, version, [
+            OrgChange(ChangeKind.DELETE, emp_id, table,
+                      reassign_to=reassign_to if reassigned else None, reassigned=reassigned)
+        ])
+        return True
+
+    @handle_db_errors("get subtree", default_return=[])
+    def getSubtree(self, emp_id: str, max_depth: int = MAX_HIERARCHY_DEPTH) -> list:
+        """
+        Get a person and everyone reporting to them, directly or indirectly.
+
+        Runs as one recursive query across all three tiers, or as one range
+        scan on the path index with the person layout.
+
+        :param emp_id: Root of the subtree
+        :type emp_id: str
+        :param max_depth: Levels below the root to include
+        :type max_depth: int
+        :return: Rows with employee fields plus tier and depth (0 for the root),
+            ordered by depth
+        :rtype: list
+        """
+        with get_readonly_session(self.connection) as session:
+            if uses_person_layout(self.connection):
+                return get_subtree(session, emp_id, max_depth)
+            result = session.execute(text(SUBTREE_SQL), {"emp_id": emp_id, "max_depth": max_depth})
+            return result.all()
+
+    @handle_db_errors("get chain to root", default_return=[])
+    def getChainToRoot(self, emp_id: str) -> list:
+        """
+        Get the management chain from a person up to the top of the org.
+
+        :param emp_id: Starting employee ID
+        :type emp_id: str
+        :return: Rows from the person (depth 0) up to their top-level supervisor
+        :rtype: list
+        """
+        with get_readonly_session(self.connection) as session:
+            if uses_person_layout(self.connection):
+                return get_chain_to_root(session, emp_id)
+            result = session.execute(text(CHAIN_TO_ROOT_SQL), {"emp_id": emp_id, "max_depth": MAX_HIERARCHY_DEPTH})
+            return result.all()
+
+    @handle_db_errors("get span counts", default_return=[])
+    def getSpanCounts(self, emp_ids: list[str] | None = None) -> list:
+        """
+        Count direct and total (transitive) reports per supervisor.
+
+        :param emp_ids: Supervisors to count for (defaults to everyone with reports)
+        :type emp_ids: list[str] | None
+        :return: Rows of (emp_id, direct_reports, total_reports)
+        :rtype: list
+        """
+        params = {"max_depth": MAX_HIERARCHY_DEPTH}
+        if emp_ids is None:
+            stmt = text(SPAN_COUNTS_SQL.format(root_filter=""))
+        else:
+            if not emp_ids:
+                return []
+            stmt = text(SPAN_COUNTS_SQL.format(root_filter="AND e.supervisor_id IN :emp_ids")).bindparams(
+                bindparam("emp_ids", expanding=True)
+            )
+            params["emp_ids"] = list(emp_ids)
+
+        with get_readonly_session(self.connection) as session:
+            return session.execute(stmt, params).all()
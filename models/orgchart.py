@@ -1,5 +1,6 @@
 from pydantic import BaseModel
-from sqlalchemy import Column, VARCHAR, ForeignKey
+from sqlalchemy import Column, VARCHAR, ForeignKey, Integer, BigInteger, DateTime, Index, func
+from sqlalchemy.types import UserDefinedType
 from sqlalchemy.ext.declarative import declarative_base
 from enum import Enum   
 
@@ -42,6 +43,48 @@ class SQLEmployee(Base):
     department = Column(VARCHAR)
     supervisor_id = Column(VARCHAR, ForeignKey("manager.emp_id"), default=None)
     
+class Ltree(UserDefinedType):
+    """PostgreSQL ltree label path (needs the ltree extension)"""
+    cache_ok = True
+
+    def get_col_spec(self, **kw):
+        return "LTREE"
+
+
+# Materialized path of emp_ids from the top of the org, e.g. "exec.mgr.emp":
+# ltree on PostgreSQL, dotted text elsewhere
+PATH_TYPE = VARCHAR().with_variant(Ltree(), "postgresql")
+
+class SQLPerson(Base):
+    """Single-table layout: every tier in one table (see utilities/person_store.py)"""
+    __tablename__ = "person"
+    emp_id = Column(VARCHAR, primary_key=True)
+    first_name = Column(VARCHAR)
+    last_name = Column(VARCHAR)
+    position = Column(VARCHAR)
+    department = Column(VARCHAR)
+    supervisor_id = Column(VARCHAR, ForeignKey("person.emp_id", ondelete="SET NULL"), default=None)
+    tier = Column(VARCHAR, nullable=False)
+    path = Column(PATH_TYPE)
+    __table_args__ = (
+        Index("ix_person_tier_emp_id", "tier", "emp_id"),
+        Index("ix_person_supervisor_id", "supervisor_id"),
+        Index("ix_person_department", "department"),
+        Index("ix_person_path", "path", postgresql_using="gist"),
+    )
+
+class SQLOrgVersion(Base):
+    __tablename__ = "org_version"
+    id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+
+class SQLSchemaMigration(Base):
+    __tablename__ = "schema_migrations"
+    version = Column(Integer, primary_key=True)
+    name = Column(VARCHAR, nullable=False)
+    applied_at = Column(DateTime, nullable=False, server_default=func.now())
+    duration_ms = Column(Integer)
+
 class Employee(BaseModel):
     emp_id: str | None = None
     first_name: str
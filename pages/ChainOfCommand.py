@@ -1,12 +1,15 @@
 import streamlit as st
 from models.orgchart import SQLEmployee, SQLManager, SQLExecutive, Employee
-from utilities.connection_helper import get_db_connection
+from utilities.connection_helper import get_db_connection, search_employees, get_employee
+from functools import partial
 from config.employee_types import get_config_by_name, EMPLOYEE_TYPES
 from ui.styles import get_base_styles, render_page_header
-from ui.components import UIHelper, EmployeeSelector, SupervisorSelector
+from ui.components import UIHelper, EmployeeSearchSelector, SupervisorSelector
 from ui.forms import EmployeeFormBuilder
-import json
-from utilities.graph_builder import build_org_graph
+from utilities.graph_builder import get_org_graph
+from utilities.graph_export import (
+    cytoscape_preview, export_to_file, export_file_name, export_mime_type
+)
 import networkx as nx
 
 # Page Configurations
@@ -35,6 +38,9 @@ st.markdown(
 # Create tabs for different operations
 tab1, tab2, tab3, tab4 = st.tabs(["Add Employee", "Update Employee", "Delete Employee", "Build Graph"])
 
+# Labels for the graph export formats
+EXPORT_LABELS = {"cytoscape": "Cytoscape JSON", "graphml": "GraphML", "gexf": "GEXF"}
+
 # Get all employee type display names from configuration
 employee_type_options = [config.display_name for config in EMPLOYEE_TYPES.values()]
 
@@ -61,15 +67,18 @@ with tab1:
         if employee_type:
             st.markdown("### Employee Details")
 
-            # Get config and fetch potential supervisors
+            # Get config; potential supervisors are searched a page at a time
             config = get_config_by_name(employee_type)
-            supervisor = (
-                client.fetchEmployee(config.supervisor_table)
-                if config.supervisor_table
-                else None
-            )
-            
+
             with st.container(border=True):
+                # supervisor selection (outside the form so searching reruns the page)
+                supervisor_id = None
+                if config.supervisor_table:
+                    supervisor_id = SupervisorSelector.render_search(
+                        partial(search_employees, config.supervisor_table),
+                        key=f"add_supervisor_{config.supervisor_table.__tablename__}"
+                    )
+
                 with st.form("add_employee_form", clear_on_submit=True):
                     # input fields
                     fields = EmployeeFormBuilder.render_basic_fields()
@@ -78,9 +87,6 @@ with tab1:
                     position = fields['position']
                     department = fields['department']
 
-                    # supervisor selection
-                    supervisor_id = SupervisorSelector.render(supervisor)
-                        
                     st.markdown("---")
                     if st.form_submit_button("Add Employee", use_container_width=True):
                         new_employee = Employee(first_name=first_name,
@@ -112,18 +118,27 @@ with tab2:
         employee = None
         if update_employee_type:
             update_config = get_config_by_name(update_employee_type)
-            employees = client.fetchEmployee(update_config.table_class)
-            employee = EmployeeSelector.render(
-                employees,
+            employee = EmployeeSearchSelector.render(
+                partial(search_employees, update_config.table_class),
                 "Select Employee to Update",
                 "Choose employee...",
-                key="update_employee_select"
+                key=f"update_employee_{update_config.table_class.__tablename__}"
             )
     
     with col2:
         if update_employee_type and employee:
             st.markdown("### Update Details")
             with st.container(border=True):
+                # supervisor selection (outside the form so searching reruns the page)
+                supervisor_id = None
+                if update_config.supervisor_table:
+                    supervisor_id = SupervisorSelector.render_search(
+                        partial(search_employees, update_config.supervisor_table),
+                        "Supervisor",
+                        get_employee(update_config.supervisor_table, employee.supervisor_id),
+                        key=f"update_supervisor_{employee.emp_id}"
+                    )
+
                 with st.form("update_employee_form", clear_on_submit=True):
                     # input fields
                     fields = EmployeeFormBuilder.render_basic_fields(employee)
@@ -132,18 +147,6 @@ with tab2:
                     position = fields['position']
                     department = fields['department']
 
-                    # supervisor selection
-                    supervisor = (
-                        client.fetchEmployee(update_config.supervisor_table)
-                        if update_config.supervisor_table
-                        else None
-                    )
-                    supervisor_id = SupervisorSelector.render(
-                        supervisor,
-                        "Supervisor",
-                        employee.supervisor_id
-                    )
-
                     st.markdown("---")
                     if st.form_submit_button("Update Employee", use_container_width=True):
                         updated_employee = Employee(first_name=first_name,
@@ -175,12 +178,11 @@ with tab3:
         employee = None
         if delete_employee_type:
             delete_config = get_config_by_name(delete_employee_type)
-            employees = client.fetchEmployee(delete_config.table_class)
-            employee = EmployeeSelector.render(
-                employees,
+            employee = EmployeeSearchSelector.render(
+                partial(search_employees, delete_config.table_class),
                 "Select Employee to Delete",
                 "Choose employee...",
-                key="delete_employee_select"
+                key=f"delete_employee_{delete_config.table_class.__tablename__}"
             )
     
     with col2:
@@ -197,23 +199,23 @@ with tab3:
                     show_reassign = st.checkbox("Reassign Subordinates to Another Supervisor?", value=False)
 
                     if show_reassign:
-                        # Fetch potential supervisors from the same level
-                        potential_supervisors = client.fetchEmployee(delete_config.table_class)
-
-                        if potential_supervisors:
-                            reassign_to = SupervisorSelector.render(
-                                potential_supervisors,
-                                "Select New Supervisor",
-                                exclude_emp_id=employee.emp_id
+                        # Search potential supervisors from the same level
+                        reassign_to = SupervisorSelector.render_search(
+                            partial(search_employees, delete_config.table_class),
+                            "Select New Supervisor",
+                            exclude_emp_id=employee.emp_id,
+                            key=f"reassign_supervisor_{employee.emp_id}"
+                        )
+                        others = [e for e in search_employees(delete_config.table_class, "", 2)
+                                  if e.emp_id != employee.emp_id]
+                        if not reassign_to and not others:
+                            # info box when no reassignment options available
+                            employee_type_lower = delete_employee_type.lower()
+                            st.info(
+                                f"**No other {employee_type_lower}s available for reassignment.**\n\n"
+                                f"This is the only {employee_type_lower} in the system. "
+                                f"Subordinates will have their supervisor set to NULL when deleted."
                             )
-                            if not reassign_to:
-                                # info box when no reassignment options available
-                                employee_type_lower = delete_employee_type.lower()
-                                st.info(
-                                    f"**No other {employee_type_lower}s available for reassignment.**\n\n"
-                                    f"This is the only {employee_type_lower} in the system. "
-                                    f"Subordinates will have their supervisor set to NULL when deleted."
-                                )
 
                 st.markdown("---")
                 if st.button("Delete Employee", type="primary", use_container_width=True):
@@ -234,35 +236,37 @@ with tab4:
         
         if st.button("Build Graph", type="primary", use_container_width=True):
             with st.spinner("Building organizational graph..."):
-                G = build_org_graph(SQLEmployee, SQLManager, SQLExecutive)
+                # shared across sessions and patched in place by writes, so keep a private copy
+                G = get_org_graph().snapshot()
                 st.session_state.org_graph = G
         
-        # Export to Cytoscape button
+        # Export section
         if 'org_graph' in st.session_state:
             st.markdown("---")
-            if st.button("Export to Cytoscape", use_container_width=True):
-                G = st.session_state.org_graph
-                if isinstance(G, nx.Graph):
-                    cytoscape_data = nx.cytoscape_data(G)
-                   
-                    # Convert to JSON string for download
-                    json_str = json.dumps(cytoscape_data, indent=2)
-                    st.success("Cytoscape JSON generated! Ready for download.")
+            G = st.session_state.org_graph
+            if isinstance(G, nx.Graph):
+                export_format = st.selectbox(
+                    "Export Format:",
+                    options=list(EXPORT_LABELS),
+                    format_func=EXPORT_LABELS.get,
+                    key="export_format"
+                )
+                compress = st.checkbox("Compress (gzip)", value=False, key="export_gzip")
 
-                    # Optional preview
-                    with st.expander("Preview Cytoscape JSON"):
-                        st.code(json_str[:1000], language="json")  # preview first 1000 characters
+                # Optional preview of the first nodes only
+                with st.expander("Preview Cytoscape JSON"):
+                    st.code(cytoscape_preview(G, limit=10), language="json")
 
-                    # Download button
-                    st.download_button(
-                        label="Download Cytoscape JSON",
-                        data=json_str,
-                        file_name="dunder_mifflin_org_chart.json",
-                        mime="application/json",
-                        use_container_width=True
-                    )
-                else:
-                    st.error("Invalid graph format. Please check your org chart structure.")
+                # Download button; the export is streamed when it is clicked
+                st.download_button(
+                    label=f"Export to {EXPORT_LABELS[export_format]}",
+                    data=lambda: export_to_file(G, export_format, compress),
+                    file_name=export_file_name("dunder_mifflin_org_chart", export_format, compress),
+                    mime=export_mime_type(export_format, compress),
+                    use_container_width=True
+                )
+            else:
+                st.error("Invalid graph format. Please check your org chart structure.")
         
     with col2:
         if 'org_graph' in st.session_state:
@@ -0,0 +1,98 @@
+import streamlit as st
+from utilities.connection_helper import get_db_connection
+from utilities.engine_registry import get_pool_stats
+from utilities.metrics import metrics
+from utilities.sql_profiler import DEFAULT_SLOW_MS, enable_profiling, disable_profiling, get_profiler
+from ui.styles import get_base_styles, render_page_header
+
+# Page Configurations
+st.set_page_config(
+    page_title="The Office Diagnostics",
+    layout="wide"
+)
+
+client = get_db_connection()
+
+# Apply shared CSS styles
+st.markdown(get_base_styles(), unsafe_allow_html=True)
+
+# Main Header
+st.markdown(
+    render_page_header(
+        "Diagnostics",
+        "Database timings recorded by this app process since it started"
+    ),
+    unsafe_allow_html=True
+)
+
+if st.button("Refresh"):
+    st.rerun()
+
+# ====== Operations ======
+st.subheader("Database Operations")
+operations = metrics.summary("db_operation_seconds", "operation",
+                             {"rows": "db_operation_rows_total", "errors": "db_operation_errors_total"})
+if operations:
+    st.dataframe(operations, hide_index=True,
+                 column_config={column: st.column_config.NumberColumn(format="%.2f")
+                                for column in ("total_ms", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms")})
+else:
+    st.info("No database operations recorded yet.")
+
+# ====== Sessions ======
+st.subheader("Sessions")
+sessions = metrics.summary("db_session_seconds", "kind", {"rollbacks": "db_session_rollbacks_total"})
+commits = metrics.histogram("db_session_commit_seconds")
+col1, col2 = st.columns([3, 1])
+with col1:
+    st.dataframe(sessions, hide_index=True)
+with col2:
+    st.metric("Commits", commits.count if commits else 0)
+    st.metric("Mean commit (ms)", f"{commits.total / commits.count * 1000:.2f}" if commits and commits.count else "-")
+
+# ====== Connection Pool ======
+st.subheader("Connection Pool")
+st.json(get_pool_stats(client.connection))
+
+# ====== SQL Profile ======
+st.subheader("SQL Statements")
+profiler = get_profiler(client.connection)
+col1, col2 = st.columns([1, 3])
+with col1:
+    slow_ms = st.number_input("Slow threshold (ms)", min_value=0.0,
+                              value=float(profiler.slow_ms if profiler else DEFAULT_SLOW_MS))
+    analyze = st.checkbox("EXPLAIN ANALYZE", value=profiler.analyze if profiler else False,
+                          help="Re-runs each slow read once to capture actual timings")
+    if profiler is None:
+        if st.button("Start profiling"):
+            enable_profiling(client.connection, slow_ms, analyze=analyze)
+            st.rerun()
+    else:
+        profiler.slow_ms = slow_ms
+        profiler.analyze = analyze
+        if st.button("Stop profiling"):
+            disable_profiling(client.connection)
+            st.rerun()
+with col2:
+    if profiler is None:
+        st.info("SQL profiling is off. Start it here or set DB_PROFILE_SQL=1.")
+    else:
+        statements = profiler.summary()
+        st.dataframe([{key: value for key, value in row.items() if key != "plan"} for row in statements],
+                     hide_index=True,
+                     column_config={column: st.column_config.NumberColumn(format="%.2f")
+                                    for column in ("total_ms", "mean_ms", "p95_ms", "max_ms")})
+        for row in statements:
+            if row["plan"]:
+                with st.expander(f"Plan ({row['max_ms']:.1f} ms max): {row['sql'][:100]}"):
+                    st.code(row["sql"], language="sql")
+                    st.code(row["plan"], language="text")
+
+with st.expander("Prometheus metrics"):
+    st.code(metrics.to_prometheus() or "# no metrics recorded yet", language="text")
+
+if st.button("Reset metrics"):
+    metrics.reset()
+    if profiler is not None:
+        profiler.reset()
+    st.rerun()
@@ -0,0 +1,68 @@
+"""
+Fixtures for the benchmark suite: synthetic orgs loaded into SQLite stand-ins
+"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+from handler.cursor import Connection
+from models.orgchart import Base
+from utilities.bulk_loader import load_rows
+from utilities.org_generator import generate_org
+from utilities.migrations import migrate
+from utilities.person_store import convert_to_person_layout
+
+pytest.importorskip("pytest_benchmark")
+
+BENCH_SEED = 42
+
+
+def pytest_generate_tests(metafunc):
+    """Parametrize org_size from --bench-sizes"""
+    if "org_size" in metafunc.fixturenames:
+        sizes = [int(size) for size in metafunc.config.getoption("--bench-sizes").split(",") if size]
+        metafunc.parametrize("org_size", sizes, ids=[f"n={size}" for size in sizes], scope="session")
+
+
+def make_org_client(size: int) -> Connection:
+    """Connection to an in-memory database holding a generated org of the given size"""
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    load_rows(engine, generate_org(size, fanout=10, depth=1, seed=BENCH_SEED))
+    return Connection(engine)
+
+
+@pytest.fixture(scope="session")
+def org_client(org_size):
+    """Read-only Connection to a generated org, built once per size for the whole run"""
+    client = make_org_client(org_size)
+    yield client
+    client.connection.dispose()
+
+
+@pytest.fixture(scope="module")
+def writable_org_client(org_size):
+    """Connection to a generated org that write benchmarks may modify"""
+    client = make_org_client(org_size)
+    yield client
+    client.connection.dispose()
+
+
+@pytest.fixture(scope="module", params=["unindexed", "migrated"])
+def indexed_org_client(request, org_size):
+    """Writable org, with or without the schema migrations (and so the indexes) applied"""
+    client = make_org_client(org_size)
+    if request.param == "migrated":
+        migrate(client.connection)
+    yield client
+    client.connection.dispose()
+
+
+@pytest.fixture(scope="module", params=["tiers", "person"])
+def layout_org_client(request, org_size):
+    """Read-only org in the three-table layout or converted to the person layout"""
+    client = make_org_client(org_size)
+    migrate(client.connection)
+    if request.param == "person":
+        convert_to_person_layout(client.connection)
+    yield client
+    client.connection.dispose()
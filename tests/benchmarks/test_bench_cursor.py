@@ -0,0 +1,104 @@
+"""
+Benchmarks for the Connection CRUD operations
+"""
+import itertools
+import pytest
+from models.orgchart import Employee, SQLEmployee, SQLManager
+
+_counter = itertools.count()
+
+
+def new_employee(supervisor_id=None):
+    n = next(_counter)
+    return Employee(
+        emp_id=f"bench{n}",
+        first_name="Bench",
+        last_name="Mark",
+        position="Sales Representative",
+        department="Sales",
+        supervisor_id=supervisor_id
+    )
+
+
+@pytest.fixture
+def manager_id(writable_org_client):
+    return writable_org_client.fetchEmployee(SQLManager)[0].emp_id
+
+
+@pytest.mark.benchmark(group="addEmployee")
+def test_bench_add_employee(benchmark, writable_org_client, manager_id):
+    """Time inserting one new employee"""
+    assert benchmark(lambda: writable_org_client.addEmployee(new_employee(manager_id), SQLEmployee))
+
+
+@pytest.mark.benchmark(group="fetchEmployee")
+def test_bench_fetch_employee(benchmark, org_client):
+    """Time fetching the whole employee tier"""
+    assert benchmark(org_client.fetchEmployee, SQLEmployee)
+
+
+@pytest.mark.benchmark(group="fetchEmployee")
+def test_bench_fetch_employee_projection(benchmark, org_client):
+    """Time fetching only the IDs and names a dropdown needs"""
+    assert benchmark(org_client.fetchEmployee, SQLEmployee, ["emp_id", "first_name", "last_name"])
+
+
+@pytest.mark.benchmark(group="fetchEmployee")
+def test_bench_fetch_employee_keyset_page(benchmark, org_client):
+    """Time fetching one 50-row page from the middle of the tier"""
+    rows = org_client.fetchEmployee(SQLEmployee, ["emp_id"])
+    after = rows[len(rows) // 2].emp_id
+    assert benchmark(org_client.fetchEmployee, SQLEmployee, ["emp_id", "first_name", "last_name"], after, 50)
+
+
+@pytest.mark.benchmark(group="fetchEmployee")
+def test_bench_iter_employees(benchmark, org_client):
+    """Time streaming the employee tier in chunks"""
+    assert benchmark(lambda: sum(1 for _ in org_client.iterEmployees(SQLEmployee, ["emp_id", "last_name"])))
+
+
+@pytest.mark.benchmark(group="updateEmployee")
+def test_bench_update_employee(benchmark, writable_org_client, manager_id):
+    """Time updating one employee in place"""
+    person = new_employee(manager_id)
+    writable_org_client.addEmployee(person, SQLEmployee)
+    assert benchmark(writable_org_client.updateEmployee, person, SQLEmployee, emp_id=person.emp_id)
+
+
+@pytest.mark.benchmark(group="deleteEmployee")
+def test_bench_delete_employee(benchmark, writable_org_client, manager_id):
+    """Time deleting one employee"""
+    def setup():
+        person = new_employee(manager_id)
+        writable_org_client.addEmployee(person, SQLEmployee)
+        return (SQLEmployee, person.emp_id), {}
+
+    benchmark.pedantic(writable_org_client.deleteEmployee, setup=setup, rounds=50)
+
+
+@pytest.mark.benchmark(group="reassignSupervisors")
+def test_bench_reassign_supervisors(benchmark, writable_org_client):
+    """Time moving up to 1,000 employees to new managers in one transaction"""
+    managers = [row.emp_id for row in writable_org_client.fetchEmployee(SQLManager, ["emp_id"])]
+    employees = [row.emp_id for row in writable_org_client.fetchEmployee(SQLEmployee, ["emp_id"], limit=1000)]
+    rounds = itertools.count()
+
+    def moves():
+        offset = next(rounds)
+        return ({emp_id: managers[(i + offset) % len(managers)] for i, emp_id in enumerate(employees)},
+                SQLEmployee), {}
+
+    results = benchmark.pedantic(writable_org_client.reassignSupervisors, setup=moves, rounds=10)
+    assert len(results) == len(employees)
+
+
+@pytest.mark.benchmark(group="changeTier")
+def test_bench_change_tier(benchmark, writable_org_client, manager_id):
+    """Time promoting 500 employees to managers in one call"""
+    def promotions():
+        people = [new_employee(manager_id) for _ in range(500)]
+        writable_org_client.addEmployees(people, SQLEmployee)
+        return ([person.emp_id for person in people], SQLEmployee, SQLManager), {}
+
+    results = benchmark.pedantic(writable_org_client.changeTier, setup=promotions, rounds=10)
+    assert all(result.status.value == "updated" for result in results)
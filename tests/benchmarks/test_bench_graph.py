@@ -0,0 +1,52 @@
+"""
+Benchmarks for org graph construction and export
+"""
+import pytest
+import networkx as nx
+from utilities.graph_builder import build_org_graph, build_compact_org_graph
+from utilities.compact_graph import estimate_networkx_bytes
+from utilities.graph_export import write_export
+
+
+class _CountingSink:
+    """Discards written bytes, keeping only the count"""
+
+    def __init__(self):
+        self.size = 0
+
+    def write(self, chunk: bytes):
+        self.size += len(chunk)
+
+
+@pytest.mark.benchmark(group="build_org_graph")
+def test_bench_build_org_graph(benchmark, org_client, org_size):
+    """Time the UNION ALL query plus DiGraph construction"""
+    G = benchmark(build_org_graph, db_client=org_client)
+    assert G.number_of_nodes() == org_size
+
+
+@pytest.mark.benchmark(group="cytoscape_data")
+def test_bench_cytoscape_data(benchmark, org_client, org_size):
+    """Time the Cytoscape export of a built graph"""
+    G = build_org_graph(db_client=org_client)
+    data = benchmark(nx.cytoscape_data, G)
+    assert len(data["elements"]["nodes"]) == org_size
+
+
+@pytest.mark.benchmark(group="cytoscape_data")
+@pytest.mark.parametrize("fmt", ["cytoscape", "graphml", "gexf"])
+def test_bench_streamed_export(benchmark, org_client, org_size, fmt):
+    """Time the chunked export of a built graph without holding the document in memory"""
+    G = build_org_graph(db_client=org_client)
+    written = benchmark(write_export, G, _CountingSink(), fmt)
+    benchmark.extra_info["bytes"] = written
+
+
+@pytest.mark.benchmark(group="build_org_graph")
+def test_bench_build_compact_org_graph(benchmark, org_client, org_size):
+    """Time the streamed query plus array construction, and record memory against the DiGraph"""
+    compact = benchmark(build_compact_org_graph, db_client=org_client)
+    assert len(compact) == org_size
+
+    benchmark.extra_info["compact_bytes"] = compact.nbytes()
+    benchmark.extra_info["networkx_bytes"] = estimate_networkx_bytes(build_org_graph(db_client=org_client))
@@ -0,0 +1,41 @@
+"""
+Benchmarks for supervisor_id lookups before and after the index migrations
+
+    uv run pytest tests/benchmarks/test_bench_migrations.py --run-benchmarks --bench-sizes 1000000
+"""
+import itertools
+import pytest
+from sqlalchemy import select
+from models.orgchart import Employee, SQLEmployee, SQLManager
+from utilities.session_helper import get_readonly_session
+
+_counter = itertools.count()
+
+
+@pytest.fixture(scope="module")
+def manager_ids(indexed_org_client):
+    return [row.emp_id for row in indexed_org_client.fetchEmployee(SQLManager, ["emp_id"])]
+
+
+@pytest.mark.benchmark(group="deleteEmployee reassign")
+def test_bench_delete_manager_with_reassign(benchmark, indexed_org_client, manager_ids):
+    """Time deleting a manager and reassigning their reports (an UPDATE by supervisor_id)"""
+    def setup():
+        emp_id = f"benchmgr{next(_counter)}"
+        indexed_org_client.addEmployee(Employee(emp_id=emp_id, first_name="Bench", last_name="Mark",
+                                                position="Manager", department="Sales"), SQLManager)
+        return (SQLManager, emp_id, manager_ids[0]), {}
+
+    benchmark.pedantic(indexed_org_client.deleteEmployee, setup=setup, rounds=20)
+
+
+@pytest.mark.benchmark(group="direct reports")
+def test_bench_direct_reports(benchmark, indexed_org_client, manager_ids):
+    """Time listing one manager's direct reports"""
+    statement = select(SQLEmployee.emp_id).where(SQLEmployee.supervisor_id == manager_ids[len(manager_ids) // 2])
+
+    def direct_reports():
+        with get_readonly_session(indexed_org_client.connection) as session:
+            return session.scalars(statement).all()
+
+    assert benchmark(direct_reports)
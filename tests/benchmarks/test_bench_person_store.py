@@ -0,0 +1,26 @@
+"""
+Benchmarks for hierarchy queries in the three-table and single-table person layouts
+"""
+import pytest
+from models.orgchart import SQLEmployee, SQLExecutive, SQLManager
+
+
+@pytest.mark.benchmark(group="getSubtree layout")
+def test_bench_subtree_of_manager(benchmark, layout_org_client):
+    """Time fetching one manager's team"""
+    managers = layout_org_client.fetchEmployee(SQLManager, ["emp_id"])
+    assert len(benchmark(layout_org_client.getSubtree, managers[len(managers) // 2].emp_id)) > 1
+
+
+@pytest.mark.benchmark(group="getSubtree layout")
+def test_bench_subtree_of_executive(benchmark, layout_org_client):
+    """Time fetching the whole org below the top executive"""
+    executive = layout_org_client.fetchEmployee(SQLExecutive, ["emp_id"])[0].emp_id
+    assert benchmark(layout_org_client.getSubtree, executive)
+
+
+@pytest.mark.benchmark(group="getChainToRoot layout")
+def test_bench_chain_to_root(benchmark, layout_org_client):
+    """Time walking from an employee to the top of the org"""
+    employees = layout_org_client.fetchEmployee(SQLEmployee, ["emp_id"], limit=1000)
+    assert len(benchmark(layout_org_client.getChainToRoot, employees[-1].emp_id)) > 1
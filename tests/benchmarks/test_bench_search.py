@@ -0,0 +1,30 @@
+"""
+Benchmarks for the in-memory name search index
+"""
+import pytest
+from utilities.graph_builder import build_search_index
+
+
+@pytest.fixture(scope="module")
+def search_index(org_client):
+    """Name search index over the generated org"""
+    return build_search_index(db_client=org_client)
+
+
+@pytest.mark.benchmark(group="search_index")
+def test_bench_build_search_index(benchmark, org_client, org_size):
+    """Time the query plus index build"""
+    index = benchmark(build_search_index, db_client=org_client)
+    assert len(index) == org_size
+
+
+@pytest.mark.benchmark(group="search_index")
+@pytest.mark.parametrize("query, options", [
+    ("ji", {"fuzzy": False}),
+    ("jim hal", {}),
+    ("dwigt", {}),
+    ("pam", {"department": "warehouse"}),
+], ids=["prefix", "two_words", "fuzzy", "filtered"])
+def test_bench_search(benchmark, search_index, query, options):
+    """Time one top-10 query"""
+    assert benchmark(search_index.search, query, 10, **options)
@@ -0,0 +1,89 @@
+"""
+Benchmarks for validation and ID generation
+"""
+import pytest
+import regex
+from utilities.validation import EmployeeValidator
+from utilities.org_generator import generate_org
+from utilities.id_generator import generate_employee_id, generate_employee_ids, legacy_employee_id
+
+NAMES = [(f"First{i % 5000}", f"Last{i}") for i in range(10000)]
+
+
+@pytest.mark.benchmark(group="validation")
+def test_bench_validate_employee_data(benchmark):
+    """Time validating one record"""
+    is_valid, _ = benchmark(EmployeeValidator.validate_employee_data, "Michael", "Scott", "Regional Manager")
+    assert is_valid
+
+
+@pytest.fixture(scope="module")
+def columns(org_size):
+    """First name, last name and position columns of a generated org"""
+    rows = list(generate_org(org_size, seed=1))
+    return [row["first_name"] for row in rows], [row["last_name"] for row in rows], [row["position"] for row in rows]
+
+
+def validate_rows_uncompiled(first_names, last_names, positions):
+    """The per-row path before validate_batch: pattern strings looked up in the regex cache on every call"""
+    errors = []
+    for first_name, last_name, position in zip(first_names, last_names, positions):
+        if regex.search(EmployeeValidator.NAME_PATTERN, first_name + last_name):
+            errors.append("Name: Name contains invalid characters")
+        elif regex.search(EmployeeValidator.POSITION_PATTERN, position):
+            errors.append("Position: Position contains invalid characters")
+        else:
+            errors.append("")
+    return errors
+
+
+@pytest.mark.benchmark(group="validation_batch")
+def test_bench_validate_rows_uncompiled(benchmark, columns):
+    """Time the original per-row validation over every row"""
+    assert not any(benchmark.pedantic(validate_rows_uncompiled, args=columns, rounds=3))
+
+
+@pytest.mark.benchmark(group="validation_batch")
+def test_bench_validate_rows(benchmark, columns):
+    """Time validate_employee_data once per row"""
+    def validate():
+        return [EmployeeValidator.validate_employee_data(*row)[1] for row in zip(*columns)]
+
+    assert not any(benchmark.pedantic(validate, rounds=3))
+
+
+@pytest.mark.benchmark(group="validation_batch")
+def test_bench_validate_batch(benchmark, columns):
+    """Time validate_batch over the whole columns"""
+    assert not any(benchmark.pedantic(EmployeeValidator.validate_batch, args=columns, rounds=3))
+
+
+@pytest.mark.benchmark(group="validation_batch")
+def test_bench_validate_batch_pool(benchmark, columns):
+    """Time validate_batch split across four worker processes"""
+    assert not any(benchmark.pedantic(EmployeeValidator.validate_batch, args=columns,
+                                      kwargs={"processes": 4}, rounds=3))
+
+
+@pytest.mark.benchmark(group="id_generation")
+def test_bench_generate_employee_id(benchmark):
+    """Time generating one employee ID"""
+    assert benchmark(generate_employee_id, "Michael", "Scott")
+
+
+@pytest.mark.benchmark(group="id_generation")
+def test_bench_legacy_employee_id(benchmark):
+    """Time the MD5 ID the keyed BLAKE2 scheme replaced, as a baseline"""
+    assert benchmark(legacy_employee_id, "Michael", "Scott")
+
+
+@pytest.mark.benchmark(group="id_generation_batch")
+def test_bench_generate_employee_ids(benchmark):
+    """Time generating 10,000 IDs in one batch"""
+    assert len(set(benchmark(generate_employee_ids, NAMES))) == len(NAMES)
+
+
+@pytest.mark.benchmark(group="id_generation_batch")
+def test_bench_generate_employee_ids_uuid7(benchmark):
+    """Time generating 10,000 time-ordered IDs in one batch"""
+    assert len(benchmark(generate_employee_ids, NAMES, "uuid7")) == len(NAMES)
@@ -9,6 +9,26 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+BENCHMARK_DIR = Path(__file__).parent / "benchmarks"
+
+
+def pytest_addoption(parser):
+    """Options for the opt-in benchmark suite in tests/benchmarks"""
+    parser.addoption("--run-benchmarks", action="store_true", default=False,
+                     help="Run the pytest-benchmark suite in tests/benchmarks")
+    parser.addoption("--bench-sizes", default="1000,10000",
+                     help="Comma-separated org sizes for the benchmark suite")
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip benchmarks unless --run-benchmarks is given"""
+    if config.getoption("--run-benchmarks"):
+        return
+    skip_benchmark = pytest.mark.skip(reason="benchmarks run with --run-benchmarks")
+    for item in items:
+        if BENCHMARK_DIR in Path(item.fspath).parents:
+            item.add_marker(skip_benchmark)
+
 
 @pytest.fixture
 def sample_employee_data():
@@ -30,3 +50,17 @@ def invalid_employee_data():
         'position': '',               # Empty position
         'department': 'Sales'
     }
+
+
+@pytest.fixture
+def sqlite_client():
+    """Connection backed by a fresh in-memory SQLite database"""
+    from sqlalchemy import create_engine
+    from sqlalchemy.pool import StaticPool
+    from handler.cursor import Connection
+    from models.orgchart import Base
+
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    yield Connection(engine)
+    engine.dispose()
@@ -0,0 +1,108 @@
+"""
+Unit tests for the interval-label ancestry index
+"""
+import random
+import pytest
+import networkx as nx
+from models.orgchart import Employee, SQLExecutive
+from utilities.ancestry import AncestryIndex
+from utilities.compact_graph import CompactOrgGraph
+from utilities.org_generator import generate_org
+from utilities.bulk_loader import load_rows
+from utilities.graph_builder import get_ancestry_index, graph_cache
+
+ROWS = [
+    ("david", "David", "Wallace", "CFO", None),
+    ("jan", "Jan", "Levinson", "VP of Sales", "david"),
+    ("michael", "Michael", "Scott", "Regional Manager", "jan"),
+    ("josh", "Josh", "Porter", "Regional Manager", "david"),
+    ("jim", "Jim", "Halpert", "Sales Representative", "michael"),
+    ("pam", "Pam", "Beesly", "Receptionist", "michael"),
+    ("andy", "Andy", "Bernard", "Sales Representative", "josh"),
+    ("robert", "Robert", "California", "CEO", None),
+    ("loop1", "Loop", "One", "Temp", "loop2"),
+    ("loop2", "Loop", "Two", "Temp", "loop1"),
+]
+
+
+@pytest.fixture
+def index():
+    return AncestryIndex(CompactOrgGraph.from_rows(ROWS))
+
+
+class TestAncestryIndex:
+    """Test cases for AncestryIndex"""
+
+    @pytest.mark.parametrize("emp_id, manager_id, expected", [
+        ("jim", "michael", True),
+        ("jim", "jan", True),
+        ("jim", "david", True),
+        ("jim", "josh", False),
+        ("andy", "david", True),
+        ("michael", "jim", False),
+        ("jim", "jim", False),
+        ("jim", "robert", False),
+        ("loop1", "loop2", False),
+        ("jim", "nobody", False),
+    ])
+    def test_reports_to(self, index, emp_id, manager_id, expected):
+        """Test direct and indirect reporting checks"""
+        assert index.reports_to(emp_id, manager_id) is expected
+
+    @pytest.mark.parametrize("first_id, second_id, expected", [
+        ("jim", "pam", "michael"),
+        ("jim", "andy", "david"),
+        ("jim", "jan", "jan"),
+        ("david", "pam", "david"),
+        ("jim", "jim", "jim"),
+        ("jim", "robert", None),
+        ("jim", "loop1", None),
+    ])
+    def test_lowest_common_manager(self, index, first_id, second_id, expected):
+        """Test lowest common manager lookups"""
+        assert index.lowest_common_manager(first_id, second_id) == expected
+
+    def test_depth(self, index):
+        """Test depth from the top of the hierarchy"""
+        assert index.depth_of("david") == 0
+        assert index.depth_of("jim") == 3
+        assert index.depth_of("loop1") is None
+
+    def test_matches_graph_walk(self):
+        """Test the index against networkx traversal on a generated org"""
+        rows = [(r["emp_id"], r["first_name"], r["last_name"], r["position"], r["supervisor_id"])
+                for r in generate_org(3000, fanout=4, depth=4, seed=8)]
+        graph = CompactOrgGraph.from_rows(rows)
+        index = AncestryIndex(graph)
+        G = graph.to_networkx()
+
+        rng = random.Random(1)
+        ids = [row[0] for row in rows]
+        for _ in range(300):
+            a, b = rng.choice(ids), rng.choice(ids)
+            assert index.reports_to(a, b) == (b in nx.descendants(G, a))
+
+            chain_a = [a] + list(nx.dfs_preorder_nodes(G, a))[1:]
+            chain_b = set([b] + list(nx.dfs_preorder_nodes(G, b)))
+            expected = next((x for x in chain_a if x in chain_b), None)
+            assert index.lowest_common_manager(a, b) == expected
+
+
+class TestCachedAncestryIndex:
+    """Test cases for get_ancestry_index"""
+
+    def test_rebuilt_after_write(self, sqlite_client):
+        """Test that the cached index follows org changes"""
+        load_rows(sqlite_client.connection, [
+            {"tier": "executive", "emp_id": "david", "first_name": "David", "last_name": "Wallace",
+             "position": "CFO", "department": "Finance"},
+            {"tier": "executive", "emp_id": "jan", "first_name": "Jan", "last_name": "Levinson",
+             "position": "VP of Sales", "department": "Growth"},
+        ])
+        assert not get_ancestry_index(sqlite_client).reports_to("jan", "david")
+
+        sqlite_client.updateEmployee(Employee(first_name="Jan", last_name="Levinson", position="VP of Sales",
+                                              department="Growth", supervisor_id="david"),
+                                     SQLExecutive, emp_id="jan")
+        assert get_ancestry_index(sqlite_client).reports_to("jan", "david")
+        graph_cache.invalidate()
@@ -0,0 +1,176 @@
+"""
+Unit tests for the read-only ASGI query service, driven without a server
+"""
+import asyncio
+import json
+import pytest
+from sqlalchemy import create_engine
+from handler.cursor import Connection
+from models.orgchart import Base, Employee, SQLExecutive, SQLManager, SQLEmployee
+from utilities.graph_builder import graph_cache
+
+pytest.importorskip("aiosqlite")
+pytest.importorskip("greenlet")
+from sqlalchemy.ext.asyncio import create_async_engine  # noqa: E402
+from handler.async_cursor import AsyncConnection  # noqa: E402
+from api.app import OrgService, MAX_BATCH_IDS  # noqa: E402
+
+PEOPLE = [
+    (SQLExecutive, "david", "David", "Wallace", None),
+    (SQLExecutive, "jan", "Jan", "Levinson", "david"),
+    (SQLManager, "michael", "Michael", "Scott", "jan"),
+    (SQLEmployee, "jim", "Jim", "Halpert", "michael"),
+    (SQLEmployee, "pam", "Pam", "Beesly", "michael"),
+    (SQLEmployee, "dwight", "Dwight", "Schrute", "michael"),
+]
+
+
+@pytest.fixture
+def sync_client(tmp_path):
+    """Sync Connection to a SQLite file holding a small org"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'org.db'}")
+    Base.metadata.create_all(engine)
+    client = Connection(engine)
+    for table, emp_id, first_name, last_name, supervisor_id in PEOPLE:
+        client.addEmployee(Employee(emp_id=emp_id, first_name=first_name, last_name=last_name, position="Sales",
+                                    department="Sales", supervisor_id=supervisor_id), table)
+    yield client
+    engine.dispose()
+    graph_cache.invalidate()
+
+
+@pytest.fixture
+def call(sync_client):
+    """Send requests to a fresh service over the same database on one event loop"""
+    url = str(sync_client.connection.url).replace("sqlite://", "sqlite+aiosqlite://")
+    service = OrgService(lambda: AsyncConnection(create_async_engine(url)), version_ttl=0)
+    loop = asyncio.new_event_loop()
+
+    def request(method, path, query="", body=None, headers=()):
+        messages = []
+        chunks = [json.dumps(body).encode()] if body is not None else [b""]
+
+        async def receive():
+            return {"type": "http.request", "body": chunks.pop(0) if chunks else b"", "more_body": False}
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {"type": "http", "method": method, "path": path, "query_string": query.encode(),
+                 "headers": [(name.encode(), value.encode()) for name, value in headers]}
+        loop.run_until_complete(service(scope, receive, send))
+        start, body_message = messages
+        response_headers = {name.decode(): value.decode() for name, value in start["headers"]}
+        payload = body_message["body"] or None
+        if payload and response_headers["content-type"] == "application/json":
+            payload = json.loads(payload)
+        return start["status"], response_headers, payload
+
+    yield request
+    if service._client is not None:
+        loop.run_until_complete(service._client.dispose())
+    loop.close()
+
+
+class TestQueries:
+    """Test cases for the chain, subtree and search endpoints"""
+
+    def test_chain_batch(self, call):
+        """Test several chains in one request, with null for unknown IDs"""
+        status, _, payload = call("GET", "/chain", "ids=jim,toby&ids=jan")
+        assert status == 200
+        chains = payload["results"]
+        assert [person["emp_id"] for person in chains["jim"]] == ["jim", "michael", "jan", "david"]
+        assert chains["jim"][1] == {"emp_id": "michael", "name": "Michael Scott", "position": "Sales", "depth": 1}
+        assert chains["toby"] is None
+        assert list(chains) == ["jim", "toby", "jan"]
+
+    def test_chain_post_body(self, call):
+        """Test that batches can be sent as a JSON body"""
+        status, _, payload = call("POST", "/chain", body={"ids": ["pam", "david"]})
+        assert status == 200
+        assert [person["emp_id"] for person in payload["results"]["david"]] == ["david"]
+
+    def test_subtree_depth_and_limit(self, call):
+        """Test breadth-first subtrees bounded by depth and size"""
+        _, _, payload = call("GET", "/subtree", "ids=jan&depth=1")
+        assert [person["emp_id"] for person in payload["results"]["jan"]["people"]] == ["jan", "michael"]
+
+        _, _, payload = call("GET", "/subtree", "ids=david&limit=4")
+        subtree = payload["results"]["david"]
+        assert [person["depth"] for person in subtree["people"]] == [0, 1, 2, 3]
+        assert subtree["truncated"] is True
+
+    def test_search(self, call):
+        """Test name search with filters"""
+        _, _, payload = call("GET", "/search", "q=jim+hal")
+        assert [result["emp_id"] for result in payload["results"]] == ["jim"]
+        _, _, payload = call("GET", "/search", "q=&tier=executive&k=5")
+        assert {result["emp_id"] for result in payload["results"]} == {"david", "jan"}
+
+
+class TestProtocol:
+    """Test cases for ETags and error responses"""
+
+    def test_etag_revalidation(self, call, sync_client):
+        """Test 304 until a write changes the org version"""
+        status, headers, _ = call("GET", "/chain", "ids=jim")
+        etag = headers["etag"]
+        assert status == 200 and headers["cache-control"] == "no-cache"
+
+        status, _, payload = call("GET", "/chain", "ids=jim", headers=[("if-none-match", f"W/{etag}")])
+        assert (status, payload) == (304, None)
+
+        sync_client.reassignSupervisors({"jim": None}, SQLEmployee)
+        status, headers, payload = call("GET", "/chain", "ids=jim", headers=[("if-none-match", etag)])
+        assert status == 200 and headers["etag"] != etag
+        assert [person["emp_id"] for person in payload["results"]["jim"]] == ["jim"]
+
+    def test_head(self, call):
+        """Test that HEAD returns headers only"""
+        status, headers, payload = call("HEAD", "/health")
+        assert status == 200 and payload is None and int(headers["content-length"]) > 0
+
+    @pytest.mark.parametrize("method, path, query, body, status", [
+        ("GET", "/nowhere", "", None, 404),
+        ("DELETE", "/chain", "ids=jim", None, 405),
+        ("GET", "/chain", "", None, 400),
+        ("GET", "/chain", "ids=" + ",".join(f"id{i}" for i in range(MAX_BATCH_IDS + 1)), None, 400),
+        ("GET", "/subtree", "ids=jim&depth=-1", None, 400),
+        ("GET", "/search", "k=abc", None, 400),
+        ("POST", "/chain", "", {"ids": "jim"}, 400),
+    ])
+    def test_errors(self, call, method, path, query, body, status):
+        """Test that bad requests get a JSON error with the right status"""
+        response_status, _, payload = call(method, path, query, body)
+        assert response_status == status
+        assert "error" in payload
+
+    def test_metrics_endpoint(self, call):
+        """Test that database timings are served as Prometheus text without an ETag"""
+        call("GET", "/chain", "ids=jim")
+        status, headers, payload = call("GET", "/metrics")
+        assert status == 200 and "etag" not in headers
+        assert headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert b'db_operation_seconds_count{operation="get compact organizational graph"}' in payload
+
+
+class TestLoadTest:
+    """Test cases for the load test client"""
+
+    def test_refused_connections_back_off(self):
+        """Test that a worker waits between reconnects instead of spinning"""
+        import socket
+        import time
+        from api.loadtest import LoadStats, worker
+
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        # nothing listens on the port any more
+
+        stats = LoadStats()
+        asyncio.run(worker("127.0.0.1", port, ["/health"], time.perf_counter() + 0.5, False, stats, 0))
+        # 0.05 + 0.1 + 0.2 + 0.4 s of backoff fit in the half second
+        assert 1 <= stats.errors <= 5
+        assert stats.latencies == []
@@ -0,0 +1,117 @@
+"""
+Unit tests for AsyncConnection, run against a file-backed SQLite database through aiosqlite
+"""
+import asyncio
+import pytest
+from sqlalchemy import create_engine
+from models.orgchart import Base, Employee, SQLExecutive, SQLManager, SQLEmployee
+from handler.cursor import Connection, RowStatus
+from utilities.bulk_loader import load_rows
+from utilities.org_generator import generate_org
+from utilities.org_version import get_org_version
+from utilities.graph_builder import graph_cache
+
+pytest.importorskip("aiosqlite")
+pytest.importorskip("greenlet")
+from sqlalchemy.ext.asyncio import create_async_engine  # noqa: E402
+from handler.async_cursor import AsyncConnection  # noqa: E402
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """SQLite file holding a 300-person synthetic org"""
+    path = tmp_path / "org.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    load_rows(engine, generate_org(300, fanout=5, depth=1, seed=7))
+    engine.dispose()
+    return path
+
+
+def sync_client(db_path) -> Connection:
+    return Connection(create_engine(f"sqlite:///{db_path}"))
+
+
+def run(db_path, scenario):
+    """Run scenario(client) on a fresh event loop and async engine"""
+    async def main():
+        client = AsyncConnection(create_async_engine(f"sqlite+aiosqlite:///{db_path}"))
+        try:
+            return await scenario(client)
+        finally:
+            graph_cache.invalidate()
+            await client.dispose()
+    return asyncio.run(main())
+
+
+class TestAsyncReads:
+    """Test cases for concurrent async reads"""
+
+    def test_fetch_tiers_concurrently(self, db_path):
+        """Test that the three tier fetches match the sync results"""
+        async def scenario(client):
+            return await client.fetchTiers(["emp_id", "last_name"])
+
+        tiers = run(db_path, scenario)
+        expected = {table.__tablename__: sync_client(db_path).fetchEmployee(table, ["emp_id", "last_name"])
+                    for table in (SQLExecutive, SQLManager, SQLEmployee)}
+        assert list(tiers) == ["executive", "manager", "employee"]
+        assert tiers == expected
+        assert sum(len(rows) for rows in tiers.values()) == 300
+
+    def test_iter_employees(self, db_path):
+        """Test streaming a tier with an async iterator"""
+        async def scenario(client):
+            streamed = [row async for row in client.iterEmployees(SQLManager, ["emp_id"], chunk_size=7)]
+            return streamed, await client.fetchEmployee(SQLManager, ["emp_id"])
+
+        streamed, fetched = run(db_path, scenario)
+        assert streamed == fetched
+
+    def test_iter_employees_rejects_unknown_column(self, db_path):
+        """Test that bad columns fail when the iterator is created"""
+        async def scenario(client):
+            with pytest.raises(ValueError):
+                client.iterEmployees(SQLManager, ["salary"])
+
+        run(db_path, scenario)
+
+    def test_concurrent_cached_graphs(self, db_path):
+        """Test that concurrent cached builds on one loop share a single value"""
+        async def scenario(client):
+            return await asyncio.gather(client.getOrgGraph(), client.getOrgGraph(), client.getSearchIndex())
+
+        first, second, index = run(db_path, scenario)
+        assert first is second
+        assert first.number_of_nodes() == len(index) == 300
+
+
+class TestAsyncWrites:
+    """Test cases for async writes"""
+
+    def test_add_update_delete(self, db_path):
+        """Test the write surface, its version bumps and graph patching"""
+        async def scenario(client):
+            manager = (await client.fetchEmployee(SQLManager, ["emp_id"], limit=1))[0].emp_id
+            graph = await client.getOrgGraph()
+            nodes = graph.number_of_nodes()
+
+            person = Employee(emp_id="jim", first_name="Jim", last_name="Halpert", position="Sales",
+                              department="Sales", supervisor_id=manager)
+            assert await client.addEmployee(person, SQLEmployee)
+            person.last_name = "Halpert-Beesly"
+            assert await client.updateEmployee(person, SQLEmployee, "jim")
+            results = await client.reassignSupervisors({"jim": None}, SQLEmployee)
+            assert await client.getEmployee(SQLEmployee, "jim") == person.model_copy(update={"supervisor_id": None})
+            assert await client.deleteEmployee(SQLEmployee, "jim")
+
+            # writes patch the cached graph in place
+            patched = await client.getOrgGraph()
+            assert patched is graph and patched.number_of_nodes() == nodes
+            return results, patched
+
+        before = get_org_version(sync_client(db_path).connection)
+        results, graph = run(db_path, scenario)
+        assert get_org_version(sync_client(db_path).connection) == before + 4
+        assert results[0].status == RowStatus.UPDATED
+        assert "jim" not in graph
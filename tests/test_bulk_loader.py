@@ -0,0 +1,133 @@
+"""
+Unit tests for the streaming bulk loader
+"""
+import csv
+import json
+import pytest
+from unittest.mock import MagicMock
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from models.orgchart import SQLExecutive, SQLManager, SQLEmployee
+from utilities.bulk_loader import (
+    load_file,
+    load_rows,
+    resolve_tier,
+    get_chunk_writer,
+    LOAD_COLUMNS,
+)
+
+ROWS = [
+    # deliberately out of foreign-key order
+    {'tier': 'employee', 'key': 'JimHalpert', 'first_name': 'Jim', 'last_name': 'Halpert',
+     'position': 'Sales Representative', 'department': 'Sales', 'supervisor_id': 'MichaelScott'},
+    {'tier': 'Manager', 'key': 'MichaelScott', 'first_name': 'Michael', 'last_name': 'Scott',
+     'position': 'Regional Manager', 'department': 'Sales', 'supervisor_id': 'JanLevinson'},
+    {'tier': 'executive', 'key': 'JanLevinson', 'first_name': 'Jan', 'last_name': 'Levinson',
+     'position': 'VP of Sales', 'department': 'Growth', 'supervisor_id': ''},
+    {'tier': 'Regular Employee', 'key': 'KevinMalone', 'first_name': 'Kevin9', 'last_name': 'Malone',
+     'position': 'Accountant', 'department': 'Finance', 'supervisor_id': 'MichaelScott'},
+]
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = tmp_path / "org.csv"
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(ROWS[0].keys()))
+        writer.writeheader()
+        writer.writerows(ROWS)
+    return path
+
+
+@pytest.fixture
+def jsonl_file(tmp_path):
+    path = tmp_path / "org.jsonl"
+    path.write_text("\n".join(json.dumps(row) for row in ROWS) + "\n")
+    return path
+
+
+class TestResolveTier:
+    """Test cases for resolve_tier"""
+
+    @pytest.mark.parametrize("value, expected", [
+        ("executive", SQLExecutive),
+        ("Manager", SQLManager),
+        ("Regular Employee", SQLEmployee),
+        ("employee", SQLEmployee),
+        ("intern", None),
+        (None, None),
+    ])
+    def test_resolve_tier(self, value, expected):
+        """Test table and display names resolve to table classes"""
+        assert resolve_tier(value) is expected
+
+
+class TestLoadFile:
+    """Test cases for load_file against SQLite (executemany fallback)"""
+
+    @pytest.mark.parametrize("fixture_name", ["csv_file", "jsonl_file"])
+    def test_load_file_resolves_supervisors(self, sqlite_client, request, fixture_name):
+        """Test that supervisor keys resolve to generated IDs across tiers"""
+        path = request.getfixturevalue(fixture_name)
+        stats = load_file(sqlite_client.connection, path, chunk_size=1)
+
+        assert stats.rows_by_table == {"executive": 1, "manager": 1, "employee": 1}
+        assert stats.rejected == 1
+
+        with Session(sqlite_client.connection) as session:
+            jan = session.scalars(select(SQLExecutive)).one()
+            michael = session.scalars(select(SQLManager)).one()
+            jim = session.scalars(select(SQLEmployee)).one()
+        assert michael.supervisor_id == jan.emp_id
+        assert jim.supervisor_id == michael.emp_id
+        assert jan.supervisor_id is None
+
+    @pytest.mark.parametrize("chunk_size", [1, 10])
+    def test_namesakes_get_distinct_ids(self, sqlite_client, chunk_size):
+        """Test that people sharing a name are all loaded, within and across loads"""
+        dwight = {'tier': 'employee', 'first_name': 'Dwight', 'last_name': 'Schrute',
+                  'position': 'Sales Representative', 'department': 'Sales'}
+        load_rows(sqlite_client.connection, [dwight, dwight], chunk_size=chunk_size)
+        stats = load_rows(sqlite_client.connection, [dwight], chunk_size=chunk_size)
+
+        assert stats.rows_by_table == {"employee": 1}
+        assert len({row.emp_id for row in sqlite_client.fetchEmployee(SQLEmployee)}) == 3
+
+    def test_load_rows_requires_fk_order(self, sqlite_client):
+        """Test that out-of-order rows are refused and nothing is committed"""
+        with pytest.raises(ValueError):
+            load_rows(sqlite_client.connection, [ROWS[1], ROWS[2]])
+        assert sqlite_client.fetchEmployee(SQLManager) == []
+
+    def test_unsupported_format(self, sqlite_client, tmp_path):
+        """Test that unknown file types are refused"""
+        path = tmp_path / "org.xml"
+        path.write_text("<org/>")
+        with pytest.raises(ValueError):
+            load_file(sqlite_client.connection, path)
+
+
+class TestCopyWriter:
+    """Test cases for the psycopg2 COPY write path"""
+
+    def test_copy_writer_streams_csv(self):
+        """Test that chunks are sent through COPY FROM STDIN as CSV"""
+        conn = MagicMock()
+        conn.dialect.driver = "psycopg2"
+        cursor = conn.connection.cursor.return_value
+        sent = {}
+        cursor.copy_expert.side_effect = lambda sql, buf: sent.update(sql=sql, data=buf.read())
+
+        record = dict.fromkeys(LOAD_COLUMNS, "x") | {"supervisor_id": None}
+        get_chunk_writer(conn)(conn, SQLManager, [record])
+
+        assert sent["sql"].startswith("COPY manager (emp_id, first_name")
+        assert sent["data"] == "x,x,x,x,x,\r\n"
+        cursor.close.assert_called_once()
+
+    def test_non_psycopg2_uses_executemany(self):
+        """Test that other drivers fall back to executemany"""
+        conn = MagicMock()
+        conn.dialect.driver = "pysqlite"
+        get_chunk_writer(conn)(conn, SQLManager, [{"emp_id": "1"}])
+        conn.execute.assert_called_once()
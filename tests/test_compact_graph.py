@@ -0,0 +1,71 @@
+"""
+Unit tests for the array-backed CompactOrgGraph
+"""
+import pytest
+from utilities.compact_graph import CompactOrgGraph, estimate_networkx_bytes
+from utilities.graph_builder import build_org_graph, build_compact_org_graph
+from utilities.bulk_loader import load_rows
+from utilities.org_generator import generate_org
+
+ROWS = [
+    ("michael", "Michael", "Scott", "Regional Manager", "jan"),
+    ("jan", "Jan", "Levinson", "VP of Sales", None),
+    ("jim", " Jim ", "Halpert", "Sales Representative", "michael"),
+    ("pam", "Pam", "Beesly", "Receptionist", "michael"),
+    ("zoe", "Zoë", "Ünter", "Receptionist", "ghost"),
+]
+
+
+class TestCompactOrgGraph:
+    """Test cases for CompactOrgGraph"""
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 100])
+    def test_parents_and_children(self, chunk_size):
+        """Test parent and CSR child lookups"""
+        graph = CompactOrgGraph.from_rows(ROWS, chunk_size=chunk_size)
+        assert len(graph) == 5
+        assert graph.parent_of("jim") == "michael"
+        assert graph.parent_of("jan") is None
+        assert graph.parent_of("zoe") is None  # unknown supervisor
+        assert sorted(graph.children_of("michael")) == ["jim", "pam"]
+        assert graph.children_of("jim") == []
+
+    def test_labels_and_positions(self):
+        """Test columnar label and position storage"""
+        graph = CompactOrgGraph.from_rows(ROWS)
+        jim = graph.index_of("jim")
+        zoe = graph.index_of("zoe")
+        assert graph.label(jim) == "Jim Halpert"
+        assert graph.label(zoe) == "Zoë Ünter"
+        assert graph.position(zoe) == "Receptionist"
+        assert len(graph.positions) == 4
+
+    def test_unknown_id(self):
+        """Test lookups of IDs that are not in the graph"""
+        graph = CompactOrgGraph.from_rows(ROWS)
+        assert graph.index_of("dwight") is None
+        assert "dwight" not in graph
+        assert graph.children_of("dwight") == []
+
+    def test_empty(self):
+        """Test building from no rows"""
+        graph = CompactOrgGraph.from_rows([])
+        assert len(graph) == 0
+        assert graph.index_of("jim") is None
+        assert graph.to_networkx().number_of_nodes() == 0
+
+    def test_matches_build_org_graph(self, sqlite_client):
+        """Test that to_networkx reproduces the DiGraph built from the database"""
+        load_rows(sqlite_client.connection, generate_org(500, fanout=7, depth=2, seed=11))
+        expected = build_org_graph(db_client=sqlite_client)
+        G = build_compact_org_graph(db_client=sqlite_client, chunk_size=64).to_networkx()
+
+        assert dict(G.nodes(data=True)) == dict(expected.nodes(data=True))
+        assert set(G.edges()) == set(expected.edges())
+
+    def test_smaller_than_networkx(self, sqlite_client):
+        """Test that the compact form uses far less memory than the DiGraph"""
+        load_rows(sqlite_client.connection, generate_org(2000, seed=3))
+        compact = build_compact_org_graph(db_client=sqlite_client)
+        G = build_org_graph(db_client=sqlite_client)
+        assert compact.nbytes() * 5 < estimate_networkx_bytes(G)
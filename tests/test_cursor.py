@@ -0,0 +1,449 @@
+"""
+Unit tests for the Connection data access layer, run against in-memory SQLite
+"""
+import pytest
+from handler.cursor import RowStatus, MAX_HIERARCHY_DEPTH
+from models.orgchart import Employee, SQLEmployee, SQLManager, SQLExecutive
+
+
+def make_employee(first_name, last_name, emp_id=None, supervisor_id=None):
+    return Employee(
+        emp_id=emp_id,
+        first_name=first_name,
+        last_name=last_name,
+        position="Sales Representative",
+        department="Sales",
+        supervisor_id=supervisor_id
+    )
+
+
+class TestAddEmployees:
+    """Test cases for Connection.addEmployees"""
+
+    def test_add_employees_inserts_all(self, sqlite_client):
+        """Test bulk insert of new employees"""
+        people = [make_employee("Jim", "Halpert"), make_employee("Dwight", "Schrute")]
+        results = sqlite_client.addEmployees(people, SQLEmployee)
+
+        assert [r.status for r in results] == [RowStatus.INSERTED, RowStatus.INSERTED]
+        assert len(sqlite_client.fetchEmployee(SQLEmployee)) == 2
+
+    def test_add_employees_generates_ids(self, sqlite_client):
+        """Test that missing IDs are generated"""
+        results = sqlite_client.addEmployees([make_employee("Pam", "Beesly")], SQLEmployee)
+        assert results[0].emp_id
+
+    def test_add_employees_skips_existing(self, sqlite_client):
+        """Test that rows already in the table are reported, not reinserted"""
+        sqlite_client.addEmployee(make_employee("Jim", "Halpert", emp_id="jim"), SQLEmployee)
+        results = sqlite_client.addEmployees(
+            [make_employee("Jim", "Halpert", emp_id="jim"), make_employee("Pam", "Beesly")], SQLEmployee
+        )
+
+        assert [r.status for r in results] == [RowStatus.EXISTS, RowStatus.INSERTED]
+        assert len(sqlite_client.fetchEmployee(SQLEmployee)) == 2
+
+    @pytest.mark.parametrize("chunk_size", [1, 1000])
+    def test_add_employees_keeps_namesakes(self, sqlite_client, chunk_size):
+        """Test that people sharing a name get distinct generated IDs, in the batch and across calls"""
+        assert sqlite_client.addEmployee(make_employee("Jim", "Halpert"), SQLManager)
+        results = sqlite_client.addEmployees(
+            [make_employee("Jim", "Halpert"), make_employee("Jim", "Halpert")], SQLEmployee, chunk_size=chunk_size
+        )
+
+        assert [r.status for r in results] == [RowStatus.INSERTED, RowStatus.INSERTED]
+        ids = {row.emp_id for row in sqlite_client.fetchEmployee(SQLEmployee)}
+        ids |= {row.emp_id for row in sqlite_client.fetchEmployee(SQLManager)}
+        assert len(ids) == 3
+
+    def test_add_employees_concurrent_insert(self, sqlite_client, monkeypatch):
+        """Test that a row skipped on conflict is reported as existing and publishes no event"""
+        from handler.cursor import Connection
+        from utilities.org_events import subscribe, unsubscribe
+
+        insert_new_rows = Connection._insert_new_rows
+
+        def lose_race(self, session, table, rows):
+            # another writer inserted pam after the existence check; ON CONFLICT skips her row
+            return insert_new_rows(self, session, table, [row for row in rows if row["emp_id"] != "pam"])
+        monkeypatch.setattr(Connection, "_insert_new_rows", lose_race)
+
+        change_sets = []
+        subscribe(change_sets.append)
+        try:
+            results = sqlite_client.addEmployees(
+                [make_employee("Jim", "Halpert", emp_id="jim"), make_employee("Pam", "Beesly", emp_id="pam")],
+                SQLEmployee
+            )
+        finally:
+            unsubscribe(change_sets.append)
+
+        assert [r.status for r in results] == [RowStatus.INSERTED, RowStatus.EXISTS]
+        assert [change.emp_id for change in change_sets[0].changes] == ["jim"]
+
+    def test_add_employees_reports_invalid_rows(self, sqlite_client):
+        """Test that invalid rows are reported with their error"""
+        results = sqlite_client.addEmployees(
+            [make_employee("Kevin123", "Malone"), make_employee("Oscar", "Martinez")], SQLEmployee
+        )
+
+        assert results[0].status == RowStatus.INVALID
+        assert "Name" in results[0].error
+        assert results[1].status == RowStatus.INSERTED
+
+    def test_add_employees_flags_duplicates_in_input(self, sqlite_client):
+        """Test that repeated IDs within the input are inserted once"""
+        results = sqlite_client.addEmployees(
+            [make_employee("Ryan", "Howard", emp_id="r1"), make_employee("Ryan", "Howard", emp_id="r1")],
+            SQLEmployee
+        )
+
+        assert [r.status for r in results] == [RowStatus.INSERTED, RowStatus.DUPLICATE]
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 1000])
+    def test_add_employees_chunking(self, sqlite_client, chunk_size):
+        """Test that results keep input order across chunks"""
+        people = [make_employee("Creed", "Bratton", emp_id=f"c{i}") for i in range(5)]
+        results = sqlite_client.addEmployees(people, SQLManager, chunk_size=chunk_size)
+
+        assert [r.index for r in results] == list(range(5))
+        assert len(sqlite_client.fetchEmployee(SQLManager)) == 5
+
+
+@pytest.fixture
+def org_client(sqlite_client):
+    """SQLite Connection holding two executives, two managers and three employees"""
+    rows = [
+        (SQLExecutive, "david", None), (SQLExecutive, "jan", "david"),
+        (SQLManager, "michael", "jan"), (SQLManager, "josh", "david"),
+        (SQLEmployee, "jim", "michael"), (SQLEmployee, "pam", "michael"), (SQLEmployee, "andy", "josh"),
+    ]
+    for table, emp_id, supervisor_id in rows:
+        sqlite_client.addEmployee(make_employee("Dunder", "Mifflin", emp_id=emp_id, supervisor_id=supervisor_id), table)
+    return sqlite_client
+
+
+class TestHierarchyQueries:
+    """Test cases for the recursive hierarchy queries"""
+
+    def test_get_subtree(self, org_client):
+        """Test that the subtree covers every tier below the root"""
+        rows = org_client.getSubtree("jan")
+        assert [(r.emp_id, r.tier, r.depth) for r in rows] == [
+            ("jan", "executive", 0), ("michael", "manager", 1), ("jim", "employee", 2), ("pam", "employee", 2)
+        ]
+
+    def test_get_subtree_max_depth(self, org_client):
+        """Test that max_depth limits the levels returned"""
+        rows = org_client.getSubtree("david", max_depth=1)
+        assert {r.emp_id for r in rows} == {"david", "jan", "josh"}
+
+    def test_get_subtree_unknown(self, org_client):
+        """Test that an unknown root returns nothing"""
+        assert org_client.getSubtree("nobody") == []
+
+    def test_get_chain_to_root(self, org_client):
+        """Test the path from an employee to the top"""
+        rows = org_client.getChainToRoot("jim")
+        assert [r.emp_id for r in rows] == ["jim", "michael", "jan", "david"]
+        assert rows[-1].supervisor_id is None
+
+    def test_cycle_is_bounded(self, org_client):
+        """Test that a supervisor cycle among executives does not loop forever"""
+        org_client.updateEmployee(make_employee("Dunder", "Mifflin", supervisor_id="jan"), SQLExecutive, emp_id="david")
+        rows = org_client.getChainToRoot("jim")
+        assert len(rows) == MAX_HIERARCHY_DEPTH + 1
+
+    def test_get_span_counts(self, org_client):
+        """Test direct and total report counts"""
+        counts = {r.emp_id: (r.direct_reports, r.total_reports) for r in org_client.getSpanCounts()}
+        assert counts == {"david": (2, 6), "jan": (1, 3), "michael": (2, 2), "josh": (1, 1)}
+
+    def test_get_span_counts_filtered(self, org_client):
+        """Test counting for selected supervisors only"""
+        counts = {r.emp_id: (r.direct_reports, r.total_reports) for r in org_client.getSpanCounts(["jan", "josh"])}
+        assert counts == {"jan": (1, 3), "josh": (1, 1)}
+        assert org_client.getSpanCounts([]) == []
+
+
+class TestBatchUpdates:
+    """Test cases for Connection.updateEmployees and Connection.reassignSupervisors"""
+
+    def supervisors(self, client):
+        return {row.emp_id: row.supervisor_id for row in client.fetchEmployee(SQLEmployee, ["emp_id", "supervisor_id"])}
+
+    @pytest.mark.parametrize("chunk_size", [1, 1000])
+    def test_reassign_supervisors(self, org_client, chunk_size):
+        """Test moving several people in one call, with per-row outcomes"""
+        results = org_client.reassignSupervisors(
+            [("jim", "josh"), ("pam", "toby"), ("kevin", "josh"), ("andy", "michael"), ("jim", "michael")],
+            SQLEmployee, chunk_size=chunk_size
+        )
+        assert [r.status for r in results] == [RowStatus.UPDATED, RowStatus.INVALID, RowStatus.NOT_FOUND,
+                                               RowStatus.UPDATED, RowStatus.DUPLICATE]
+        assert "toby" in results[1].error
+        assert self.supervisors(org_client) == {"jim": "josh", "pam": "michael", "andy": "michael"}
+
+    def test_reassign_bumps_version_once(self, org_client):
+        """Test that a batch is one transaction, one version and one change set"""
+        from utilities.org_events import subscribe, unsubscribe
+        from utilities.org_version import get_org_version
+
+        change_sets = []
+        subscribe(change_sets.append)
+        try:
+            before = get_org_version(org_client.connection)
+            org_client.reassignSupervisors({"jim": "josh", "pam": None}, SQLEmployee)
+        finally:
+            unsubscribe(change_sets.append)
+
+        assert get_org_version(org_client.connection) == before + 1
+        assert len(change_sets) == 1
+        changes = {change.emp_id: change.attrs for change in change_sets[0].changes}
+        assert changes["jim"]["supervisor_id"] == "josh"
+        assert changes["pam"] == {"first_name": "Dunder", "last_name": "Mifflin", "position": "Sales Representative",
+                                  "department": "Sales", "supervisor_id": None}
+
+    def test_reassign_rejects_self(self, org_client):
+        """Test that nobody can be made their own supervisor"""
+        results = org_client.reassignSupervisors({"jan": "jan"}, SQLExecutive)
+        assert results[0].status == RowStatus.INVALID
+
+    def test_update_employees(self, org_client):
+        """Test overwriting several people's fields in one call"""
+        results = org_client.updateEmployees([
+            make_employee("Jim", "Halpert", emp_id="jim", supervisor_id="michael"),
+            make_employee("Pam", "Halpert", emp_id="pam", supervisor_id="josh"),
+            make_employee("Kevin123", "Malone", emp_id="andy"),
+            make_employee("Toby", "Flenderson", emp_id="toby"),
+            make_employee("Erin", "Hannon"),
+        ], SQLEmployee)
+
+        assert [r.status for r in results] == [RowStatus.UPDATED, RowStatus.UPDATED, RowStatus.INVALID,
+                                               RowStatus.NOT_FOUND, RowStatus.INVALID]
+        rows = {row.emp_id: row for row in org_client.fetchEmployee(SQLEmployee)}
+        assert (rows["pam"].first_name, rows["pam"].last_name, rows["pam"].supervisor_id) == ("Pam", "Halpert", "josh")
+        assert rows["andy"].first_name == "Dunder"
+
+    def test_no_changes_keeps_version(self, org_client):
+        """Test that a batch with nothing to apply does not bump the version"""
+        from utilities.org_version import get_org_version
+
+        before = get_org_version(org_client.connection)
+        assert org_client.reassignSupervisors({"kevin": "josh"}, SQLEmployee)[0].status == RowStatus.NOT_FOUND
+        assert get_org_version(org_client.connection) == before
+
+
+class TestChangeTier:
+    """Test cases for Connection.changeTier"""
+
+    def tiers(self, client) -> dict:
+        return {row.emp_id: (row.tier, row.supervisor_id) for row in client.getSubtree("david")}
+
+    def test_promote_to_boss_of_boss(self, org_client):
+        """Test that a promoted employee reports to their old manager's supervisor"""
+        results = org_client.changeTier("jim", SQLEmployee, SQLManager)
+        assert [r.status for r in results] == [RowStatus.UPDATED]
+        assert self.tiers(org_client)["jim"] == ("manager", "jan")
+        assert org_client.getEmployee(SQLEmployee, "jim") is None
+
+    def test_promote_with_reports_needs_reassign(self, org_client):
+        """Test that people with direct reports are rejected rather than orphaned"""
+        results = org_client.changeTier("michael", SQLManager, SQLExecutive)
+        assert results[0].status == RowStatus.INVALID
+        assert "2 direct reports" in results[0].error
+        assert self.tiers(org_client)["michael"] == ("manager", "jan")
+
+    def test_promote_with_reassign(self, org_client):
+        """Test that reports move to the reassign target and the promoted person keeps a valid boss"""
+        results = org_client.changeTier("michael", SQLManager, SQLExecutive, reassign_to="josh")
+        assert results[0].status == RowStatus.UPDATED
+        tiers = self.tiers(org_client)
+        assert tiers["michael"] == ("executive", "jan")
+        assert tiers["jim"] == tiers["pam"] == ("employee", "josh")
+
+    def test_demote_with_supervisor(self, org_client):
+        """Test an explicit new supervisor and an invalid reassign target"""
+        results = org_client.changeTier("josh", SQLManager, SQLEmployee, supervisor_id="michael", reassign_to="jim")
+        assert results[0].status == RowStatus.INVALID
+        assert "jim" in results[0].error
+
+        results = org_client.changeTier("josh", SQLManager, SQLEmployee, supervisor_id="michael",
+                                        reassign_to="michael")
+        assert results[0].status == RowStatus.UPDATED
+        tiers = self.tiers(org_client)
+        assert tiers["josh"] == ("employee", "michael")
+        assert tiers["andy"] == ("employee", "michael")
+
+    def test_unknown_supervisor(self, org_client):
+        """Test that the explicit supervisor must be in the tier above the target"""
+        results = org_client.changeTier("jim", SQLEmployee, SQLManager, supervisor_id="michael")
+        assert results[0].status == RowStatus.INVALID
+        assert self.tiers(org_client)["jim"] == ("employee", "michael")
+
+    @pytest.mark.parametrize("chunk_size", [1, 1000])
+    def test_bulk_promotion(self, org_client, chunk_size):
+        """Test moving several people in one call, with per-row outcomes"""
+        org_client.addEmployee(make_employee("Dunder", "Mifflin", emp_id="jim", supervisor_id="jan"), SQLManager)
+        results = org_client.changeTier(["pam", "kevin", "andy", "pam", "jim"], SQLEmployee, SQLManager,
+                                        chunk_size=chunk_size)
+        assert [r.status for r in results] == [RowStatus.UPDATED, RowStatus.NOT_FOUND, RowStatus.UPDATED,
+                                               RowStatus.DUPLICATE, RowStatus.INVALID]
+        managers = {row.emp_id: row.supervisor_id for row in org_client.fetchEmployee(SQLManager)}
+        assert managers == {"andy": "david", "jim": "jan", "josh": "david", "michael": "jan", "pam": "jan"}
+
+    @pytest.mark.parametrize("chunk_size", [1, 1000])
+    def test_supervisor_moved_together(self, org_client, chunk_size):
+        """Test that someone whose supervisor moves in the same call reports to the next one up"""
+        from utilities.org_events import subscribe, unsubscribe
+
+        org_client.addEmployee(make_employee("Dunder", "Mifflin", emp_id="ryan", supervisor_id="jan"), SQLExecutive)
+        change_sets = []
+        subscribe(change_sets.append)
+        try:
+            results = org_client.changeTier(["jan", "ryan"], SQLExecutive, SQLManager,
+                                            reassign_to={"jan": "david"}, chunk_size=chunk_size)
+        finally:
+            unsubscribe(change_sets.append)
+
+        assert [r.status for r in results] == [RowStatus.UPDATED, RowStatus.UPDATED]
+        managers = {row.emp_id: row.supervisor_id for row in org_client.fetchEmployee(SQLManager)}
+        assert managers["jan"] == managers["ryan"] == "david"
+        published = {change.emp_id: change.attrs["supervisor_id"]
+                     for change_set in change_sets for change in change_set.changes if change.table is SQLManager}
+        assert {emp_id: managers[emp_id] for emp_id in published} == published
+
+    def test_same_tier_fails(self, org_client):
+        """Test that moving within one tier is refused"""
+        with pytest.raises(ValueError):
+            org_client.changeTier("jim", SQLEmployee, SQLEmployee)
+
+    def test_bumps_version_once(self, org_client):
+        """Test that a move with reassignment is one transaction, one version and one change set"""
+        from utilities.org_events import subscribe, unsubscribe
+        from utilities.org_version import get_org_version
+
+        change_sets = []
+        subscribe(change_sets.append)
+        try:
+            before = get_org_version(org_client.connection)
+            org_client.changeTier(["michael", "josh"], SQLManager, SQLExecutive,
+                                  reassign_to={"michael": "josh", "josh": "michael"})
+            org_client.changeTier(["michael"], SQLManager, SQLExecutive, reassign_to={"michael": "josh"})
+        finally:
+            unsubscribe(change_sets.append)
+
+        assert get_org_version(org_client.connection) == before + 1
+        assert len(change_sets) == 1
+        changes = {change.emp_id: (change.table, change.attrs["supervisor_id"]) for change in change_sets[0].changes}
+        assert changes == {"jim": (SQLEmployee, "josh"), "pam": (SQLEmployee, "josh"),
+                           "michael": (SQLExecutive, "jan")}
+
+
+@pytest.fixture
+def search_client(sqlite_client):
+    """SQLite Connection holding a handful of employees with searchable names"""
+    names = [("Jim", "Halpert"), ("Pam", "Beesly"), ("Dwight", "Schrute"), ("Angela", "Martin"),
+             ("Oscar", "Martinez"), ("Kevin", "Malone"), ("Tim", "Jimenez")]
+    sqlite_client.addEmployees([make_employee(first, last, emp_id=first.lower()) for first, last in names],
+                               SQLEmployee)
+    return sqlite_client
+
+
+class TestSearchEmployees:
+    """Test cases for paginated name search"""
+
+    def test_prefix_matches_rank_first(self, search_client):
+        """Test that prefix matches come before substring matches"""
+        results = search_client.searchEmployees(SQLEmployee, "jim")
+        assert [e.emp_id for e in results] == ["jim", "tim"]
+        assert all(isinstance(e, Employee) for e in results)
+
+    def test_case_insensitive_full_name(self, search_client):
+        """Test matching on the full name regardless of case"""
+        assert [e.emp_id for e in search_client.searchEmployees(SQLEmployee, "ANGELA MAR")] == ["angela"]
+        assert [e.emp_id for e in search_client.searchEmployees(SQLEmployee, "mart")] == ["angela", "oscar"]
+
+    def test_paging(self, search_client):
+        """Test limit/offset paging in name order"""
+        first = search_client.searchEmployees(SQLEmployee, "", limit=3)
+        second = search_client.searchEmployees(SQLEmployee, "", limit=3, offset=3)
+        assert [e.last_name for e in first] == ["Beesly", "Halpert", "Jimenez"]
+        assert [e.last_name for e in second] == ["Malone", "Martin", "Martinez"]
+
+    def test_wildcards_are_literal(self, search_client):
+        """Test that LIKE wildcards in the query are matched literally"""
+        # unescaped, "a_t" would match the "art" in Martin
+        assert search_client.searchEmployees(SQLEmployee, "a_t") == []
+        assert search_client.searchEmployees(SQLEmployee, "%") == []
+
+    def test_failed_search_not_cached(self, search_client, monkeypatch):
+        """Test that the empty result of a failed search is returned but not cached"""
+        import utilities.connection_helper as connection_helper
+
+        def fail(*args):
+            raise RuntimeError("connection reset")
+
+        connection_helper._cached_search.clear()
+        monkeypatch.setattr(connection_helper, "get_db_connection", lambda: search_client)
+        with monkeypatch.context() as patch:
+            patch.setattr(search_client, "_search_employees", fail)
+            assert search_client.searchEmployees(SQLEmployee, "jim") == []
+            assert connection_helper.search_employees(SQLEmployee, "jim") == []
+        assert [e.emp_id for e in connection_helper.search_employees(SQLEmployee, "jim")] == ["jim", "tim"]
+        connection_helper._cached_search.clear()
+
+    def test_version_read_failure(self, search_client, monkeypatch):
+        """Test that the cached helpers fall back when the org version cannot be read"""
+        import utilities.connection_helper as connection_helper
+
+        def fail(*args, **kwargs):
+            raise RuntimeError("connection reset")
+
+        monkeypatch.setattr(connection_helper, "get_db_connection", lambda: search_client)
+        monkeypatch.setattr(connection_helper, "get_org_version", fail)
+        assert connection_helper.search_employees(SQLEmployee, "jim") == []
+        assert connection_helper.get_employee(SQLEmployee, "jim") is None
+
+    def test_get_employee(self, search_client):
+        """Test fetching one person by ID"""
+        assert search_client.getEmployee(SQLEmployee, "pam").last_name == "Beesly"
+        assert search_client.getEmployee(SQLEmployee, "toby") is None
+
+
+class TestFetchEmployee:
+    """Test cases for column-pruned fetches, keyset pagination and streaming"""
+
+    def test_projection(self, search_client):
+        """Test that only the requested columns come back, ordered by emp_id"""
+        rows = search_client.fetchEmployee(SQLEmployee, ["emp_id", "last_name"])
+        assert rows[0]._fields == ("emp_id", "last_name")
+        assert rows[0] == ("angela", "Martin")
+        assert [row.emp_id for row in rows] == sorted(row.emp_id for row in rows)
+
+    def test_default_columns(self, search_client):
+        """Test that every Employee field is returned by default"""
+        row = search_client.fetchEmployee(SQLEmployee, limit=1)[0]
+        assert Employee(**row._mapping).emp_id == "angela"
+
+    def test_keyset_pages(self, search_client):
+        """Test that pages chained on the last emp_id cover the tier once"""
+        seen, after = [], None
+        while page := search_client.fetchEmployee(SQLEmployee, ["emp_id"], after=after, limit=3):
+            seen += [row.emp_id for row in page]
+            after = page[-1].emp_id
+        assert seen == ["angela", "dwight", "jim", "kevin", "oscar", "pam", "tim"]
+
+    def test_unknown_column(self, search_client):
+        """Test that columns outside the Employee model are rejected"""
+        with pytest.raises(ValueError):
+            search_client.fetchEmployee(SQLEmployee, ["emp_id", "salary"])
+        with pytest.raises(ValueError):
+            search_client.iterEmployees(SQLEmployee, ["salary"])
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 1000])
+    def test_iter_employees(self, search_client, chunk_size):
+        """Test that streaming returns the same rows as one fetch"""
+        streamed = list(search_client.iterEmployees(SQLEmployee, ["emp_id", "first_name"], chunk_size=chunk_size))
+        assert streamed == search_client.fetchEmployee(SQLEmployee, ["emp_id", "first_name"])
+        assert [row.emp_id for row in search_client.iterEmployees(SQLEmployee, ["emp_id"], after="oscar")] == ["pam", "tim"]
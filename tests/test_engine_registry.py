@@ -0,0 +1,118 @@
+"""
+Unit tests for the process-wide engine registry
+"""
+import pytest
+from sqlalchemy import text
+from utilities.engine_registry import (
+    PoolSettings,
+    PoolWaitStats,
+    TimedQueuePool,
+    get_engine,
+    get_pool_stats,
+    get_async_engine,
+    dispose_engines,
+    dispose_async_engines,
+)
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    """Start every test with an empty registry"""
+    dispose_engines()
+    yield
+    dispose_engines()
+
+
+class TestPoolSettings:
+    """Test cases for PoolSettings"""
+
+    def test_from_env_defaults(self, monkeypatch):
+        """Test that unset variables fall back to defaults"""
+        for name in ("DB_POOL_SIZE", "DB_MAX_OVERFLOW", "DB_POOL_PRE_PING", "DB_STATEMENT_TIMEOUT_MS"):
+            monkeypatch.delenv(name, raising=False)
+        settings = PoolSettings.from_env()
+        assert settings == PoolSettings()
+
+    def test_from_env_overrides(self, monkeypatch):
+        """Test that environment variables override defaults"""
+        monkeypatch.setenv("DB_POOL_SIZE", "20")
+        monkeypatch.setenv("DB_MAX_OVERFLOW", "0")
+        monkeypatch.setenv("DB_POOL_PRE_PING", "false")
+        monkeypatch.setenv("DB_STATEMENT_TIMEOUT_MS", "5000")
+        settings = PoolSettings.from_env()
+        assert settings.pool_size == 20
+        assert settings.max_overflow == 0
+        assert settings.pool_pre_ping is False
+        assert settings.statement_timeout_ms == 5000
+
+
+class TestEngineRegistry:
+    """Test cases for get_engine and pool statistics"""
+
+    def test_same_url_returns_same_engine(self, tmp_path):
+        """Test that engines are shared per URL"""
+        url = f"sqlite:///{tmp_path / 'org.db'}"
+        assert get_engine(url) is get_engine(url)
+
+    def test_different_urls_return_different_engines(self, tmp_path):
+        """Test that each URL gets its own engine"""
+        engine_a = get_engine(f"sqlite:///{tmp_path / 'a.db'}")
+        engine_b = get_engine(f"sqlite:///{tmp_path / 'b.db'}")
+        assert engine_a is not engine_b
+
+    def test_pool_settings_applied(self, tmp_path):
+        """Test that pool settings reach the timed pool"""
+        engine = get_engine(f"sqlite:///{tmp_path / 'org.db'}", PoolSettings(pool_size=3, max_overflow=1))
+        assert isinstance(engine.pool, TimedQueuePool)
+        assert engine.pool.size() == 3
+
+    def test_checkout_waits_recorded(self, tmp_path):
+        """Test that checkouts are reported in pool stats"""
+        engine = get_engine(f"sqlite:///{tmp_path / 'org.db'}")
+        for _ in range(3):
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+
+        stats = get_pool_stats(engine)
+        assert stats["wait"]["checkouts"] == 3
+        assert sum(stats["wait"]["buckets"].values()) == 3
+
+    def test_memory_sqlite_keeps_default_pool(self):
+        """Test that in-memory SQLite is not given a QueuePool"""
+        engine = get_engine("sqlite://")
+        assert not isinstance(engine.pool, TimedQueuePool)
+
+    def test_async_engines_are_shared_separately(self, tmp_path):
+        """Test that async engines are shared per URL and apply the pool settings"""
+        import asyncio
+        pytest.importorskip("aiosqlite")
+
+        url = f"sqlite+aiosqlite:///{tmp_path / 'org.db'}"
+        engine = get_async_engine(url, PoolSettings(pool_size=3, max_overflow=1))
+        assert get_async_engine(url) is engine
+        assert engine.sync_engine.pool.size() == 3
+        assert engine.sync_engine is not get_engine(f"sqlite:///{tmp_path / 'org.db'}")
+
+        asyncio.run(dispose_async_engines())
+        assert get_async_engine(url) is not engine
+        asyncio.run(dispose_async_engines())
+
+
+class TestPoolWaitStats:
+    """Test cases for PoolWaitStats"""
+
+    def test_snapshot_empty(self):
+        """Test snapshot before any checkouts"""
+        snapshot = PoolWaitStats().snapshot()
+        assert snapshot["checkouts"] == 0
+        assert snapshot["mean_wait_ms"] == 0.0
+
+    def test_record_buckets(self):
+        """Test that waits land in the right bucket"""
+        stats = PoolWaitStats()
+        stats.record(0.0005)
+        stats.record(2.0)
+        snapshot = stats.snapshot()
+        assert snapshot["buckets"]["<=1ms"] == 1
+        assert snapshot["buckets"]["<=5000ms"] == 1
+        assert snapshot["max_wait_ms"] == pytest.approx(2000)
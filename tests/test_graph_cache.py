@@ -0,0 +1,210 @@
+"""
+Unit tests for the version-keyed org graph cache
+"""
+import pytest
+from sqlalchemy import text
+from models.orgchart import Employee, SQLExecutive, SQLManager, SQLEmployee
+from utilities.graph_builder import OrgGraph, build_org_graph, get_org_graph, graph_cache
+from utilities.org_version import get_org_version, bump_org_version
+from utilities.session_helper import get_session
+from utilities.bulk_loader import load_rows
+
+
+@pytest.fixture
+def org_client(sqlite_client):
+    """SQLite Connection holding a small org"""
+    sqlite_client.addEmployee(Employee(emp_id="jan", first_name="Jan", last_name="Levinson",
+                                       position="VP of Sales", department="Growth"), SQLExecutive)
+    sqlite_client.addEmployee(Employee(emp_id="michael", first_name="Michael", last_name="Scott",
+                                       position="Regional Manager", department="Sales",
+                                       supervisor_id="jan"), SQLManager)
+    sqlite_client.addEmployee(Employee(emp_id="jim", first_name="Jim", last_name="Halpert",
+                                       position="Sales Representative", department="Sales",
+                                       supervisor_id="michael"), SQLEmployee)
+    yield sqlite_client
+    graph_cache.invalidate()
+
+
+class TestOrgVersion:
+    """Test cases for the org version counter"""
+
+    def test_writes_bump_version(self, org_client):
+        """Test that each successful write moves the version forward"""
+        version = get_org_version(org_client.connection)
+        assert version == 3
+
+        org_client.deleteEmployee(SQLEmployee, "jim")
+        assert get_org_version(org_client.connection) == version + 1
+
+    def test_failed_write_keeps_version(self, org_client):
+        """Test that a no-op update does not bump the version"""
+        version = get_org_version(org_client.connection)
+        person = Employee(first_name="Nobody", last_name="Here", position="Temp", department="Sales")
+        assert org_client.updateEmployee(person, SQLEmployee, emp_id="missing") is False
+        assert get_org_version(org_client.connection) == version
+
+
+class TestGetOrgGraph:
+    """Test cases for get_org_graph"""
+
+    def test_graph_is_shared_until_data_changes(self, org_client):
+        """Test that repeated calls reuse the cached graph"""
+        G1 = get_org_graph(org_client)
+        G2 = get_org_graph(org_client)
+        assert G1 is G2
+        assert G1.number_of_nodes() == 3
+        assert G1.has_edge("jim", "michael")
+
+    def test_graph_rebuilt_after_bulk_load(self, org_client):
+        """Test that a write without change events invalidates the cached graph"""
+        G1 = get_org_graph(org_client)
+        load_rows(org_client.connection, [{"tier": "employee", "emp_id": "pam", "first_name": "Pam",
+                                           "last_name": "Beesly", "position": "Receptionist",
+                                           "department": "Sales", "supervisor_id": "michael"}])
+        G2 = get_org_graph(org_client)
+        assert G2 is not G1
+        assert G2.has_edge("pam", "michael")
+
+    def test_fallback_without_version_table(self, sqlite_client):
+        """Test that the in-process counter is used when org_version is missing"""
+        with sqlite_client.connection.begin() as conn:
+            conn.execute(text("DROP TABLE org_version"))
+
+        G1 = get_org_graph(sqlite_client)
+        sqlite_client.addEmployee(Employee(emp_id="jan", first_name="Jan", last_name="Levinson",
+                                           position="VP of Sales", department="Growth"), SQLExecutive)
+        G2 = get_org_graph(sqlite_client)
+        assert G2.number_of_nodes() == 1
+        assert get_org_version(sqlite_client.connection) == 1
+        graph_cache.invalidate()
+
+
+def assert_same_graph(G, expected):
+    assert dict(G.nodes(data=True)) == dict(expected.nodes(data=True))
+    assert set(G.edges()) == set(expected.edges())
+
+
+@pytest.fixture
+def cached_graph(org_client, monkeypatch):
+    """The cached graph; any later rebuild or copy fails the test, so writes must patch it in place"""
+    G = get_org_graph(org_client)
+
+    def rebuild(**kwargs):
+        raise AssertionError("graph was rebuilt instead of patched")
+
+    def copy(self, as_view=False):
+        raise AssertionError("graph was copied to apply a patch")
+    monkeypatch.setattr(build_org_graph, "__wrapped__", rebuild)
+    monkeypatch.setattr(OrgGraph, "copy", copy)
+    return G
+
+
+def patched_graph(org_client, G):
+    """The graph cached after a write, checked to be the same object patched in place"""
+    G2 = get_org_graph(org_client)
+    assert G2 is G
+    return G2
+
+
+class TestIncrementalUpdates:
+    """Test cases for patching the cached graph from change events"""
+
+    def test_add_patches_in_place(self, org_client, cached_graph):
+        """Test that adding a person patches the cached graph without copying it"""
+        org_client.addEmployee(Employee(emp_id="pam", first_name="Pam", last_name="Beesly",
+                                        position="Receptionist", department="Sales",
+                                        supervisor_id="michael"), SQLEmployee)
+        G = patched_graph(org_client, cached_graph)
+        assert G.nodes["pam"] == {"label": "Pam Beesly", "position": "Receptionist"}
+        assert_same_graph(G, build_org_graph(db_client=org_client))
+
+    def test_snapshot_iterates_during_write(self, org_client, cached_graph):
+        """Test that a session iterating a snapshot is unaffected by a write"""
+        snapshot = cached_graph.snapshot()
+        seen = []
+        for node in snapshot.nodes:
+            seen.append(node)
+            if len(seen) == 1:
+                org_client.deleteEmployee(SQLEmployee, "jim")
+        assert sorted(seen) == ["jan", "jim", "michael"]
+        assert "jim" in snapshot
+        assert "jim" not in patched_graph(org_client, cached_graph)
+
+    def test_patch_waits_for_locked_reader(self, cached_graph):
+        """Test that a patch does not change the graph while a reader holds its lock"""
+        import threading
+        from utilities.graph_builder import patch_org_graph
+        from utilities.org_events import ChangeKind, OrgChange
+
+        patch = threading.Thread(target=patch_org_graph,
+                                 args=(cached_graph, [OrgChange(ChangeKind.DELETE, "jim", SQLEmployee)]))
+        with cached_graph.lock:
+            patch.start()
+            patch.join(timeout=0.2)
+            assert patch.is_alive()
+            assert "jim" in cached_graph
+        patch.join()
+        assert "jim" not in cached_graph
+
+    def test_bulk_add_patches_once(self, org_client, cached_graph):
+        """Test that addEmployees patches once for the whole batch"""
+        version = get_org_version(org_client.connection)
+        org_client.addEmployees([
+            Employee(emp_id=f"temp{i}", first_name="Ryan", last_name="Howard", position="Temp",
+                     department="Sales", supervisor_id="michael") for i in range(3)
+        ], SQLEmployee)
+        assert get_org_version(org_client.connection) == version + 1
+        assert_same_graph(patched_graph(org_client, cached_graph), build_org_graph(db_client=org_client))
+
+    def test_update_moves_edge(self, org_client):
+        """Test that changing supervisor moves the reporting edge"""
+        org_client.addEmployee(Employee(emp_id="dwight", first_name="Dwight", last_name="Schrute",
+                                        position="Assistant Regional Manager", department="Sales",
+                                        supervisor_id="jan"), SQLManager)
+        G = get_org_graph(org_client)
+        org_client.updateEmployee(Employee(first_name="James", last_name="Halpert", position="Co-Manager",
+                                           department="Sales", supervisor_id="dwight"),
+                                  SQLEmployee, emp_id="jim")
+        G2 = patched_graph(org_client, G)
+        assert G2.has_edge("jim", "dwight") and not G2.has_edge("jim", "michael")
+        assert G2.nodes["jim"]["label"] == "James Halpert"
+        assert_same_graph(G2, build_org_graph(db_client=org_client))
+
+    def test_delete_with_reassign(self, org_client):
+        """Test that deleting a manager moves their reports to the new supervisor"""
+        org_client.addEmployee(Employee(emp_id="dwight", first_name="Dwight", last_name="Schrute",
+                                        position="Assistant Regional Manager", department="Sales",
+                                        supervisor_id="jan"), SQLManager)
+        G = get_org_graph(org_client)
+        assert org_client.deleteEmployee(SQLManager, "michael", reassign_to="dwight")
+        G2 = patched_graph(org_client, G)
+        assert "michael" not in G2
+        assert G2.has_edge("jim", "dwight")
+        assert_same_graph(G2, build_org_graph(db_client=org_client))
+
+    def test_change_tier_moves_edges(self, org_client):
+        """Test that a promotion patches the moved person and their re-pointed reports"""
+        org_client.addEmployee(Employee(emp_id="dwight", first_name="Dwight", last_name="Schrute",
+                                        position="Assistant Regional Manager", department="Sales",
+                                        supervisor_id="jan"), SQLManager)
+        G = get_org_graph(org_client)
+        results = org_client.changeTier("michael", SQLManager, SQLExecutive, reassign_to="dwight")
+        assert [result.status.value for result in results] == ["updated"]
+        G2 = patched_graph(org_client, G)
+        assert G2.has_edge("michael", "jan") and G2.has_edge("jim", "dwight")
+        assert_same_graph(G2, build_org_graph(db_client=org_client))
+
+    def test_delete_without_reassign(self, org_client, cached_graph):
+        """Test that deleting a person removes the node and its edges"""
+        assert org_client.deleteEmployee(SQLEmployee, "jim")
+        assert "jim" not in patched_graph(org_client, cached_graph)
+
+    def test_stale_entry_is_rebuilt(self, org_client):
+        """Test that a cache that missed a version is rebuilt, not patched"""
+        G = get_org_graph(org_client)
+        with get_session(org_client.connection) as session:
+            bump_org_version(session)
+        org_client.deleteEmployee(SQLEmployee, "jim")
+        G2 = get_org_graph(org_client)
+        assert G2 is not G
+        assert "jim" in G and "jim" not in G2
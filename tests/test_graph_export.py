@@ -0,0 +1,122 @@
+"""
+Unit tests for the streaming graph exporters
+"""
+import io
+import gzip
+import json
+import pytest
+import networkx as nx
+from utilities.graph_export import (
+    iter_export, write_export, export_to_file, export_file_name, export_mime_type,
+    cytoscape_preview, iter_org_rows,
+)
+from utilities.compact_graph import CompactOrgGraph
+from utilities.graph_builder import build_org_graph
+from utilities.bulk_loader import load_rows
+from utilities.org_generator import generate_org
+
+ROWS = [
+    ("jan", "Jan", "Levinson", "VP of Sales", None),
+    ("jim", " Jim ", "Halpert", "Sales Representative", "michael"),
+    ("michael", "Michael", "Scott", "Regional Manager", "jan"),
+    ("pam", "Pam", "Beesly", "Receptionist & <Front Desk>", "michael"),
+    ("zoe", "Zoë", "Ünter", "Receptionist", "ghost"),
+]
+
+
+def graph_from_rows(rows) -> nx.DiGraph:
+    """The DiGraph build_org_graph would produce for the rows"""
+    return CompactOrgGraph.from_rows(rows).to_networkx()
+
+
+def export_bytes(source, fmt, compress=False) -> bytes:
+    return b"".join(iter_export(source, fmt, compress))
+
+
+class TestCytoscapeExport:
+    """Test cases for streamed Cytoscape JSON"""
+
+    @pytest.mark.parametrize("source", ["graph", "compact", "rows"])
+    def test_matches_networkx(self, source):
+        """Test that every source type produces the nx.cytoscape_data document"""
+        G = graph_from_rows(ROWS)
+        sources = {"graph": G, "compact": CompactOrgGraph.from_rows(ROWS), "rows": iter(ROWS)}
+        assert json.loads(export_bytes(sources[source], "cytoscape")) == nx.cytoscape_data(G)
+
+    def test_empty_graph(self):
+        """Test that an empty graph still produces valid JSON"""
+        assert json.loads(export_bytes(nx.DiGraph(), "cytoscape")) == nx.cytoscape_data(nx.DiGraph())
+
+    def test_gzip_and_chunking(self):
+        """Test that small buffers yield many chunks that decompress to the full document"""
+        G = graph_from_rows(ROWS)
+        chunks = list(iter_export(G, "cytoscape", compress=True, buffer_size=64))
+        plain = export_bytes(G, "cytoscape")
+        assert len(chunks) > 1
+        assert gzip.decompress(b"".join(chunks)) == plain
+
+    def test_preview(self):
+        """Test that the preview only includes the first nodes and the edges between them"""
+        G = graph_from_rows(ROWS)
+        preview = json.loads(cytoscape_preview(G, limit=3))
+        assert [n["data"]["id"] for n in preview["elements"]["nodes"]] == ["jan", "jim", "michael"]
+        assert preview["elements"]["edges"] == [
+            {"data": {"source": "jim", "target": "michael"}},
+            {"data": {"source": "michael", "target": "jan"}},
+        ]
+
+    def test_preview_sources_agree(self):
+        """Test that graph, compact and row previews match"""
+        G = graph_from_rows(ROWS)
+        expected = cytoscape_preview(G, limit=3)
+        assert cytoscape_preview(CompactOrgGraph.from_rows(ROWS), limit=3) == expected
+        assert cytoscape_preview(iter(ROWS), limit=3) == expected
+
+
+class TestXmlExport:
+    """Test cases for streamed GraphML and GEXF"""
+
+    @pytest.mark.parametrize("fmt, reader", [("graphml", nx.read_graphml), ("gexf", nx.read_gexf)])
+    def test_round_trip(self, fmt, reader):
+        """Test that networkx reads the export back into the same graph"""
+        G = graph_from_rows(ROWS)
+        H = reader(io.BytesIO(export_bytes(iter(ROWS), fmt)))
+        assert H.is_directed()
+        assert sorted(H.edges()) == sorted(G.edges())
+        for node, attrs in G.nodes(data=True):
+            assert H.nodes[node]["label"] == attrs["label"]
+            assert H.nodes[node]["position"] == attrs["position"]
+
+    def test_unknown_format(self):
+        """Test that an unknown format is rejected"""
+        with pytest.raises(ValueError):
+            export_bytes(nx.DiGraph(), "dot")
+
+
+class TestExportFiles:
+    """Test cases for file helpers and database rows"""
+
+    def test_export_to_file(self):
+        """Test that the spooled file holds the full, rewound export"""
+        G = graph_from_rows(ROWS)
+        out = export_to_file(G, "graphml", compress=True, max_memory=16)
+        assert gzip.decompress(out.read()) == export_bytes(G, "graphml")
+
+    def test_write_export_counts_bytes(self):
+        """Test that write_export reports the bytes written"""
+        out = io.BytesIO()
+        assert write_export(graph_from_rows(ROWS), out, "gexf") == len(out.getvalue())
+
+    def test_names(self):
+        """Test file names and MIME types"""
+        assert export_file_name("org", "cytoscape") == "org.json"
+        assert export_file_name("org", "gexf", compress=True) == "org.gexf.gz"
+        assert export_mime_type("graphml") == "application/xml"
+        assert export_mime_type("graphml", compress=True) == "application/gzip"
+
+    def test_rows_from_database(self, sqlite_client):
+        """Test that exporting query rows matches exporting the built graph"""
+        load_rows(sqlite_client.connection, generate_org(300, fanout=6, depth=2, seed=5))
+        G = build_org_graph(db_client=sqlite_client)
+        streamed = export_bytes(iter_org_rows(sqlite_client, chunk_size=50), "cytoscape")
+        assert json.loads(streamed) == nx.cytoscape_data(G)
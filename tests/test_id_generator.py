@@ -2,7 +2,14 @@
 Unit tests for employee ID generation utilities
 """
 import pytest
-from utilities.id_generator import generate_employee_id
+from models.orgchart import Employee, SQLEmployee, SQLManager
+from utilities.id_generator import (
+    generate_employee_id,
+    generate_employee_ids,
+    existing_employee_ids,
+    legacy_employee_id,
+    uuid7_employee_id,
+)
 
 
 class TestIDGenerator:
@@ -12,7 +19,7 @@ class TestIDGenerator:
         """Test basic ID generation"""
         emp_id = generate_employee_id("Michael", "Scott")
         assert emp_id is not None
-        assert len(emp_id) == 32  # MD5 hash length
+        assert len(emp_id) == 32  # same width as the legacy MD5 IDs
 
     def test_generate_employee_id_consistency(self):
         """Test that same input generates same ID"""
@@ -55,3 +62,88 @@ class TestIDGenerator:
         emp_id1 = generate_employee_id("Michael", "Scott")
         emp_id2 = generate_employee_id("Scott", "Michael")
         assert emp_id1 != emp_id2
+
+    def test_generate_employee_id_name_boundary(self):
+        """Test that moving letters between first and last name changes the ID"""
+        assert generate_employee_id("Jim", "Halpert") != generate_employee_id("JimH", "alpert")
+        assert legacy_employee_id("Jim", "Halpert") == legacy_employee_id("JimH", "alpert")
+
+    def test_generate_employee_id_occurrence(self):
+        """Test that namesakes are told apart by occurrence"""
+        assert generate_employee_id("Jim", "Halpert", 1) != generate_employee_id("Jim", "Halpert")
+
+    def test_unknown_scheme(self):
+        """Test that a misspelled scheme is refused"""
+        with pytest.raises(ValueError):
+            generate_employee_id("Jim", "Halpert", scheme="md5")
+
+
+class TestUUID7:
+    """Test cases for time-ordered IDs"""
+
+    def test_uuid7_layout(self):
+        """Test the version and variant bits"""
+        emp_id = uuid7_employee_id()
+        assert len(emp_id) == 32
+        assert emp_id[12] == "7"
+        assert emp_id[16] in "89ab"
+
+    def test_uuid7_time_ordered(self):
+        """Test that later IDs sort after earlier ones across milliseconds"""
+        import time
+
+        first = uuid7_employee_id()
+        time.sleep(0.002)
+        assert uuid7_employee_id() > first
+
+
+class TestGenerateEmployeeIds:
+    """Test cases for the batch ID API"""
+
+    def test_batch_matches_single(self):
+        """Test that a batch of distinct names gives the single-call IDs"""
+        names = [("Michael", "Scott"), ("Dwight", "Schrute")]
+        assert generate_employee_ids(names) == [generate_employee_id(*name) for name in names]
+
+    def test_namesakes_numbered_in_order(self):
+        """Test that repeated names get distinct, deterministic IDs"""
+        ids = generate_employee_ids([("Jim", "Halpert"), ("Pam", "Beesly"), ("Jim", "Halpert")])
+        assert ids[0] == generate_employee_id("Jim", "Halpert")
+        assert ids[2] == generate_employee_id("Jim", "Halpert", 1)
+        assert generate_employee_ids([("Jim", "Halpert"), ("Pam", "Beesly"), ("Jim", "Halpert")]) == ids
+
+    def test_taken_ids_are_skipped(self):
+        """Test that IDs reported as taken are regenerated until free, one check per round"""
+        stored = {generate_employee_id("Jim", "Halpert"), generate_employee_id("Jim", "Halpert", 1)}
+        calls = []
+
+        def taken(ids):
+            calls.append(set(ids))
+            return ids & stored
+
+        ids = generate_employee_ids([("Jim", "Halpert"), ("Pam", "Beesly")], taken=taken)
+        assert ids == [generate_employee_id("Jim", "Halpert", 2), generate_employee_id("Pam", "Beesly")]
+        assert len(calls) == 3
+
+    def test_uuid7_batch(self):
+        """Test that the uuid7 scheme gives distinct IDs to namesakes"""
+        ids = generate_employee_ids([("Jim", "Halpert")] * 100, scheme="uuid7")
+        assert len(set(ids)) == 100
+
+    def test_gives_up(self):
+        """Test that a check reporting everything as taken fails instead of looping"""
+        with pytest.raises(RuntimeError):
+            generate_employee_ids([("Jim", "Halpert")], taken=lambda ids: set(ids))
+
+
+class TestExistingEmployeeIds:
+    """Test cases for the database collision check"""
+
+    def test_checks_every_tier(self, sqlite_client):
+        """Test that IDs in any tier count as taken"""
+        for emp_id, table in (("jim", SQLEmployee), ("michael", SQLManager)):
+            sqlite_client.addEmployee(Employee(emp_id=emp_id, first_name="Dunder", last_name="Mifflin",
+                                               position="Sales", department="Sales"), table)
+        with sqlite_client.connection.connect() as conn:
+            assert existing_employee_ids(conn, ["jim", "michael", "toby"]) == {"jim", "michael"}
+            assert existing_employee_ids(conn, []) == set()
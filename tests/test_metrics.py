@@ -0,0 +1,147 @@
+"""
+Unit tests for the metrics registry and the instrumented error/session helpers
+"""
+import pytest
+from handler.cursor import RowStatus
+from models.orgchart import Employee, SQLEmployee
+from utilities.errors import handle_db_errors
+from utilities.metrics import (
+    Histogram, MetricsRegistry, metrics, result_size, metrics_server_from_env, start_metrics_server, stop_metrics_server
+)
+from utilities.session_helper import get_session
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    """Start every test with an empty shared registry"""
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+class TestHistogram:
+    """Test cases for Histogram"""
+
+    def test_quantiles_interpolate_within_buckets(self):
+        """Test quantile estimates against known bucket contents"""
+        histogram = Histogram((1.0, 2.0, 4.0))
+        for value in (0.5, 1.5, 1.5, 3.0):
+            histogram.observe(value)
+        assert histogram.bucket_counts == [1, 2, 1, 0]
+        assert histogram.quantile(0.5) == pytest.approx(1.5)
+        assert histogram.quantile(1.0) == pytest.approx(3.0)
+        assert Histogram().quantile(0.5) == 0.0
+
+    def test_overflow_bucket_reports_max(self):
+        """Test values above the last bound"""
+        histogram = Histogram((1.0,))
+        histogram.observe(7.0)
+        assert histogram.quantile(0.99) == 7.0
+
+
+class TestMetricsRegistry:
+    """Test cases for MetricsRegistry"""
+
+    def test_prometheus_text(self):
+        """Test HELP/TYPE lines, cumulative buckets and label escaping"""
+        registry = MetricsRegistry()
+        registry.observe("db_operation_seconds", 0.002, operation='say "hi"')
+        registry.observe("db_operation_seconds", 20.0, operation='say "hi"')
+        registry.increment("db_operation_errors_total", operation="add")
+        text = registry.to_prometheus()
+
+        assert "# TYPE db_operation_seconds histogram" in text
+        assert 'db_operation_seconds_bucket{operation="say \\"hi\\"",le="0.0025"} 1' in text
+        assert 'db_operation_seconds_bucket{operation="say \\"hi\\"",le="+Inf"} 2' in text
+        assert 'db_operation_seconds_count{operation="say \\"hi\\""} 2' in text
+        assert 'db_operation_errors_total{operation="add"} 1' in text
+        assert MetricsRegistry().to_prometheus() == ""
+
+    def test_summary_rows(self):
+        """Test per-label summary rows with extra counters"""
+        registry = MetricsRegistry()
+        registry.observe("db_operation_seconds", 0.01, operation="fast")
+        registry.observe("db_operation_seconds", 1.0, operation="slow")
+        registry.increment("db_operation_rows_total", 5, operation="slow")
+        rows = registry.summary("db_operation_seconds", "operation", {"rows": "db_operation_rows_total"})
+        assert [row["operation"] for row in rows] == ["slow", "fast"]
+        assert rows[0]["rows"] == 5 and rows[1]["rows"] == 0
+        assert rows[0]["max_ms"] == pytest.approx(1000)
+
+    def test_result_size(self):
+        """Test which results count as rows"""
+        assert result_size([1, 2, 3]) == 3
+        assert result_size(True) is None
+        assert result_size("abc") is None
+        assert result_size(None) is None
+
+
+class TestInstrumentation:
+    """Test cases for metrics recorded by handle_db_errors and the session helpers"""
+
+    def test_decorator_records_latency_rows_and_errors(self):
+        """Test successful and failing calls"""
+        @handle_db_errors("list things", default_return=[])
+        def list_things(fail=False):
+            if fail:
+                raise RuntimeError("boom")
+            return ["a", "b"]
+
+        list_things()
+        assert list_things(fail=True) == []
+
+        assert metrics.histogram("db_operation_seconds", operation="list things").count == 2
+        assert metrics.counter("db_operation_rows_total", operation="list things") == 2
+        assert metrics.counter("db_operation_errors_total", operation="list things") == 1
+
+    def test_connection_operations(self, sqlite_client):
+        """Test that Connection calls and their sessions are recorded"""
+        person = Employee(emp_id="jim", first_name="Jim", last_name="Halpert", position="Sales", department="Sales")
+        assert sqlite_client.addEmployees([person], SQLEmployee)[0].status == RowStatus.INSERTED
+        sqlite_client.fetchEmployee(SQLEmployee, ["emp_id"])
+
+        assert metrics.counter("db_operation_rows_total", operation="fetch employees") == 1
+        assert metrics.histogram("db_session_seconds", kind="write").count == 1
+        assert metrics.histogram("db_session_seconds", kind="readonly").count == 1
+        assert metrics.histogram("db_session_commit_seconds").count == 1
+
+    def test_rollback_counted(self, sqlite_client):
+        """Test that a failed write session counts a rollback"""
+        with pytest.raises(RuntimeError):
+            with get_session(sqlite_client.connection):
+                raise RuntimeError("boom")
+        assert metrics.counter("db_session_rollbacks_total", kind="write") == 1
+        assert metrics.histogram("db_session_commit_seconds") is None
+
+
+class TestMetricsServer:
+    """Test cases for the per-process metrics server"""
+
+    @pytest.fixture(autouse=True)
+    def stop_server(self):
+        yield
+        stop_metrics_server()
+
+    def test_serves_registry(self):
+        """Test that the registry is served at /metrics and nothing else"""
+        from urllib.error import HTTPError
+        from urllib.request import urlopen
+
+        metrics.increment("db_operation_errors_total", operation="add employee")
+        server = start_metrics_server(0, "127.0.0.1")
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        with urlopen(f"{base}/metrics") as response:
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            assert response.read().decode() == metrics.to_prometheus()
+        with pytest.raises(HTTPError):
+            urlopen(f"{base}/health")
+
+    def test_started_once_and_only_when_configured(self, monkeypatch):
+        """Test that reruns reuse the server and that it stays off without METRICS_PORT"""
+        monkeypatch.delenv("METRICS_PORT", raising=False)
+        assert metrics_server_from_env() is None
+
+        monkeypatch.setenv("METRICS_PORT", "0")
+        monkeypatch.setenv("METRICS_HOST", "127.0.0.1")
+        server = metrics_server_from_env()
+        assert metrics_server_from_env() is server
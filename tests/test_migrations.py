@@ -0,0 +1,185 @@
+"""
+Unit tests for the versioned schema migrations, run against in-memory SQLite
+"""
+import pytest
+from sqlalchemy import inspect
+from utilities.migrations import MIGRATIONS, Migration, migrate, pending_migrations, applied_migrations, _render
+
+
+def index_names(engine, table):
+    return {index["name"] for index in inspect(engine).get_indexes(table)}
+
+
+class TestMigrations:
+    """Test cases for migrate"""
+
+    def test_migrate_applies_all_in_order(self, sqlite_client):
+        """Test that every migration is applied and recorded"""
+        engine = sqlite_client.connection
+        results = migrate(engine)
+        assert [result.version for result in results] == [migration.version for migration in MIGRATIONS]
+        assert sorted(applied_migrations(engine)) == [migration.version for migration in MIGRATIONS]
+        assert {"ix_employee_supervisor_id", "ix_employee_department"} <= index_names(engine, "employee")
+        assert "ix_manager_supervisor_id" in index_names(engine, "manager")
+
+    def test_postgres_only_migrations_recorded_as_skipped(self, sqlite_client):
+        """Test that the trigram migration is recorded without running on SQLite"""
+        results = {result.version: result for result in migrate(sqlite_client.connection)}
+        assert results[3].skipped
+        assert not results[1].skipped
+        assert not any("trgm" in name for name in index_names(sqlite_client.connection, "employee"))
+
+    def test_migrate_is_idempotent(self, sqlite_client):
+        """Test that a second run has nothing to do"""
+        engine = sqlite_client.connection
+        migrate(engine)
+        assert migrate(engine) == []
+        assert pending_migrations(engine) == []
+
+    def test_migrate_to_target(self, sqlite_client):
+        """Test stopping at a version and resuming later"""
+        engine = sqlite_client.connection
+        assert [result.version for result in migrate(engine, target=1)] == [1]
+        assert [migration.version for migration in pending_migrations(engine)] == [2, 3, 4]
+        assert [result.version for result in migrate(engine)] == [2, 3, 4]
+
+    def test_existing_index_is_kept(self, sqlite_client):
+        """Test that an index created by hand before the migration does not fail it"""
+        engine = sqlite_client.connection
+        with engine.begin() as conn:
+            conn.exec_driver_sql("CREATE INDEX ix_employee_supervisor_id ON employee (supervisor_id)")
+        assert migrate(engine, target=1)[0].version == 1
+
+    def test_adds_version_table(self, sqlite_client, monkeypatch):
+        """Test that a database missing org_version switches to the shared counter once migrated"""
+        import utilities.org_version as org_version
+        from utilities.org_version import has_version_table, get_org_version
+
+        engine = sqlite_client.connection
+        with engine.begin() as conn:
+            conn.exec_driver_sql("DROP TABLE org_version")
+        assert not has_version_table(engine)
+        migrate(engine)
+        assert not has_version_table(engine)  # not checked again until the interval passes
+
+        monkeypatch.setattr(org_version, "VERSION_TABLE_RECHECK_SECONDS", 0.0)
+        assert has_version_table(engine)
+        assert get_org_version(engine) == 0
+
+    def test_reassignment_uses_supervisor_index(self, sqlite_client):
+        """Test that the subordinate reassignment UPDATE no longer scans the table"""
+        engine = sqlite_client.connection
+        statement = "UPDATE employee SET supervisor_id = 'a' WHERE supervisor_id = 'b'"
+        with engine.connect() as conn:
+            before = " ".join(row[-1] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement))
+        migrate(engine)
+        with engine.connect() as conn:
+            after = " ".join(row[-1] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement))
+        assert before.startswith("SCAN")
+        assert "ix_employee_supervisor_id" in after
+
+
+class TestRender:
+    """Test cases for statement rendering"""
+
+    def test_concurrently_only_for_online_postgres(self):
+        """Test the {concurrently} placeholder per dialect"""
+        online = Migration(99, "test", ("CREATE INDEX {concurrently} IF NOT EXISTS ix ON t (c)",), online=True)
+        offline = Migration(99, "test", online.statements)
+        assert _render(online.statements[0], online, "postgresql") == \
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix ON t (c)"
+        assert _render(online.statements[0], online, "sqlite") == "CREATE INDEX IF NOT EXISTS ix ON t (c)"
+        assert _render(offline.statements[0], offline, "postgresql") == "CREATE INDEX IF NOT EXISTS ix ON t (c)"
+
+    def test_versions_are_unique_and_ordered(self):
+        """Test the migration sequence itself"""
+        versions = [migration.version for migration in MIGRATIONS]
+        assert versions == sorted(set(versions))
+
+
+class FakeConnection:
+    """Engine connection that records statements and can fail on one of them"""
+
+    def __init__(self, executed, fail_on=None):
+        self.executed = executed
+        self.fail_on = fail_on
+        self.closed = False
+
+    def execution_options(self, **options):
+        return self
+
+    def execute(self, statement, parameters=None):
+        return self.exec_driver_sql(" ".join(str(statement).split()))
+
+    def exec_driver_sql(self, statement, parameters=None):
+        self.executed.append(statement)
+        if self.fail_on and statement.startswith(self.fail_on):
+            raise RuntimeError("canceling statement due to user request")
+        return self
+
+    def first(self):
+        return None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.closed = True
+
+
+class FakePostgresEngine:
+    dialect = type("Dialect", (), {"name": "postgresql"})
+
+    def __init__(self, fail_on=None):
+        self.executed = []
+        self.connections = []
+        self.fail_on = fail_on
+
+    def connect(self):
+        self.connections.append(FakeConnection(self.executed, self.fail_on))
+        return self.connections[-1]
+
+    begin = connect
+
+
+class TestPostgresMigrate:
+    """Test cases for the statements migrate issues on PostgreSQL"""
+
+    @pytest.fixture(autouse=True)
+    def only_first_migration(self, monkeypatch):
+        import utilities.migrations as migrations
+        monkeypatch.setattr(migrations, "pending_migrations", lambda engine, target: [MIGRATIONS[0]])
+
+    def test_timeouts_and_advisory_lock(self):
+        """Test that index builds run without the statement timeout, inside the advisory lock"""
+        engine = FakePostgresEngine()
+        migrate(engine, lock_timeout_ms=5000)
+
+        executed = [statement for statement in engine.executed if not statement.startswith("SELECT 1 FROM pg_index")]
+        assert executed[:3] == ["SET statement_timeout = 0", "SET lock_timeout = 0", "SELECT pg_advisory_lock(:key)"]
+        assert executed[3:5] == ["SET statement_timeout = 0", "SET lock_timeout = 5000"]
+        assert executed[5:8] == [_render(statement, MIGRATIONS[0], "postgresql")
+                                 for statement in MIGRATIONS[0].statements]
+        assert executed[8:10] == ["RESET statement_timeout", "RESET lock_timeout"]
+        assert executed[10].startswith("INSERT INTO schema_migrations")
+        assert executed[11:] == ["SELECT pg_advisory_unlock(:key)", "RESET statement_timeout", "RESET lock_timeout"]
+        assert all(conn.closed for conn in engine.connections)
+
+    def test_grants_to_application_role(self, monkeypatch):
+        """Test that a migration's privileges are granted in its transaction"""
+        import utilities.migrations as migrations
+        monkeypatch.setattr(migrations, "pending_migrations", lambda engine, target: [MIGRATIONS[3]])
+        engine = FakePostgresEngine()
+        migrate(engine, grant_to="app_user")
+        assert "GRANT SELECT, UPDATE ON org_version TO app_user" in engine.executed
+        assert engine.executed.index("SET LOCAL statement_timeout = 0") < \
+            engine.executed.index("GRANT SELECT, UPDATE ON org_version TO app_user")
+
+    def test_lock_connection_closed_on_failure(self):
+        """Test that the advisory-lock connection is returned when taking the lock fails"""
+        engine = FakePostgresEngine(fail_on="SELECT pg_advisory_lock")
+        with pytest.raises(RuntimeError):
+            migrate(engine)
+        assert len(engine.connections) == 1
+        assert engine.connections[0].closed
+        assert engine.executed[-2:] == ["RESET statement_timeout", "RESET lock_timeout"]
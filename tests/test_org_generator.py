@@ -0,0 +1,82 @@
+"""
+Unit tests for the synthetic org generator
+"""
+import pytest
+from models.orgchart import SQLExecutive, SQLManager, SQLEmployee
+from utilities.org_generator import generate_org, plan_org
+from utilities.bulk_loader import load_file, write_rows
+from utilities.validation import EmployeeValidator
+
+
+class TestPlanOrg:
+    """Test cases for plan_org"""
+
+    @pytest.mark.parametrize("size, fanout, depth", [(1000, 8, 1), (1000, 3, 3), (5, 10, 1), (123457, 12, 2)])
+    def test_levels_sum_to_size(self, size, fanout, depth):
+        """Test that level sizes add up to the requested head count"""
+        levels = plan_org(size, fanout, depth)
+        assert sum(levels) == size
+        assert len(levels) == depth + 2
+        assert all(count >= 1 for count in levels)
+
+    def test_fanout_respected(self):
+        """Test that each level is roughly fanout times the one above"""
+        levels = plan_org(10000, 10, 1)
+        assert levels[1] / levels[0] == pytest.approx(10, rel=0.1)
+        assert levels[2] / levels[1] == pytest.approx(10, rel=0.1)
+
+    @pytest.mark.parametrize("size, fanout, depth", [(2, 8, 1), (100, 0, 1), (100, 8, 0)])
+    def test_invalid_arguments(self, size, fanout, depth):
+        """Test that impossible shapes are refused"""
+        with pytest.raises(ValueError):
+            plan_org(size, fanout, depth)
+
+
+class TestGenerateOrg:
+    """Test cases for generate_org"""
+
+    def test_deterministic(self):
+        """Test that the same seed produces the same org"""
+        assert list(generate_org(500, seed=7)) == list(generate_org(500, seed=7))
+
+    def test_seed_changes_output(self):
+        """Test that different seeds produce different orgs"""
+        assert list(generate_org(500, seed=1)) != list(generate_org(500, seed=2))
+
+    def test_rows_in_fk_order_with_known_supervisors(self):
+        """Test that every supervisor appears before its reports, one tier up"""
+        rows = list(generate_org(2000, fanout=5, depth=3, seed=3))
+        tier_of = {}
+        for row in rows:
+            if row["supervisor_id"] is not None:
+                supervisor_tier = tier_of[row["supervisor_id"]]
+                if row["tier"] == "employee":
+                    assert supervisor_tier == "manager"
+                else:
+                    assert supervisor_tier == "executive"
+            tier_of[row["emp_id"]] = row["tier"]
+
+        assert len(tier_of) == 2000
+        assert [row["tier"] for row in rows] == sorted(
+            (row["tier"] for row in rows), key=["executive", "manager", "employee"].index
+        )
+
+    def test_rows_pass_validation(self):
+        """Test that generated names and positions are valid"""
+        for row in generate_org(300, seed=5):
+            is_valid, _ = EmployeeValidator.validate_employee_data(
+                row["first_name"], row["last_name"], row["position"]
+            )
+            assert is_valid
+
+    @pytest.mark.parametrize("file_name", ["org.csv", "org.jsonl.gz"])
+    def test_file_round_trip(self, sqlite_client, tmp_path, file_name):
+        """Test that generated files load back into the tier tables"""
+        path = tmp_path / file_name
+        assert write_rows(generate_org(400, fanout=6, seed=9), path) == 400
+
+        stats = load_file(sqlite_client.connection, path)
+        assert stats.total_rows == 400
+        assert stats.rejected == 0
+        total = sum(len(sqlite_client.fetchEmployee(t)) for t in (SQLExecutive, SQLManager, SQLEmployee))
+        assert total == 400
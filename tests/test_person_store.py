@@ -0,0 +1,199 @@
+"""
+Unit tests for the single-table person layout, run against in-memory SQLite
+"""
+import pytest
+from sqlalchemy import inspect, text
+from models.orgchart import Employee, SQLEmployee, SQLManager, SQLExecutive
+from utilities.migrations import migrate
+from utilities.person_store import convert_to_person_layout, uses_person_layout, path_ids
+
+
+def make_employee(emp_id, supervisor_id=None, first_name="Dunder"):
+    return Employee(emp_id=emp_id, first_name=first_name, last_name="Mifflin",
+                    position="Sales Representative", department="Sales", supervisor_id=supervisor_id)
+
+
+def paths(client) -> dict:
+    """Every person's path, decoded to dotted emp_ids"""
+    with client.connection.connect() as conn:
+        rows = conn.execute(text("SELECT emp_id, path FROM person")).all()
+    return {emp_id: ".".join(path_ids(path)) for emp_id, path in rows}
+
+
+@pytest.fixture
+def org_client(sqlite_client):
+    """The Scranton test org, migrated and converted to the person layout"""
+    rows = [
+        (SQLExecutive, "david", None), (SQLExecutive, "jan", "david"),
+        (SQLManager, "michael", "jan"), (SQLManager, "josh", "david"),
+        (SQLEmployee, "jim", "michael"), (SQLEmployee, "pam", "michael"), (SQLEmployee, "andy", "josh"),
+    ]
+    for table, emp_id, supervisor_id in rows:
+        sqlite_client.addEmployee(make_employee(emp_id, supervisor_id), table)
+    migrate(sqlite_client.connection)
+    convert_to_person_layout(sqlite_client.connection)
+    return sqlite_client
+
+
+class TestConversion:
+    """Test cases for convert_to_person_layout"""
+
+    def test_tables_become_views(self, org_client):
+        """Test that the tier tables are replaced by views and kept as legacy tables"""
+        inspector = inspect(org_client.connection)
+        assert {"executive", "manager", "employee"} <= set(inspector.get_view_names())
+        assert {"person", "executive_legacy", "manager_legacy", "employee_legacy"} <= set(inspector.get_table_names())
+        assert uses_person_layout(org_client.connection)
+
+    def test_paths_computed(self, org_client):
+        """Test the materialized paths of every tier"""
+        assert paths(org_client) == {
+            "david": "david", "jan": "david.jan", "josh": "david.josh", "michael": "david.jan.michael",
+            "jim": "david.jan.michael.jim", "pam": "david.jan.michael.pam", "andy": "david.josh.andy",
+        }
+
+    def test_tier_views_read_like_tables(self, org_client):
+        """Test that the per-tier reads see only their tier"""
+        assert [row.emp_id for row in org_client.fetchEmployee(SQLManager, ["emp_id"])] == ["josh", "michael"]
+        assert org_client.getEmployee(SQLEmployee, "jim").supervisor_id == "michael"
+        assert org_client.getEmployee(SQLEmployee, "michael") is None
+
+    def test_convert_twice_fails(self, org_client):
+        """Test that a converted database is not converted again"""
+        with pytest.raises(ValueError, match="already"):
+            convert_to_person_layout(org_client.connection)
+
+    def test_pending_migrations_block_conversion(self, sqlite_client):
+        """Test that index migrations must run while the tier tables are tables"""
+        with pytest.raises(ValueError, match="migrations"):
+            convert_to_person_layout(sqlite_client.connection)
+
+    def test_cycle_fails_and_keeps_tables(self, sqlite_client):
+        """Test that people in a supervisor cycle abort the conversion"""
+        sqlite_client.addEmployee(make_employee("a", "b"), SQLExecutive)
+        sqlite_client.addEmployee(make_employee("b", "a"), SQLExecutive)
+        migrate(sqlite_client.connection)
+        with pytest.raises(ValueError, match="cycle"):
+            convert_to_person_layout(sqlite_client.connection)
+        assert "executive" in inspect(sqlite_client.connection).get_table_names()
+        assert not uses_person_layout(sqlite_client.connection)
+
+
+class TestPathMaintenance:
+    """Test cases for the triggers that keep paths current"""
+
+    def test_add_under_supervisor(self, org_client):
+        """Test that a new person's path extends their supervisor's"""
+        assert org_client.addEmployee(make_employee("dwight", "michael"), SQLEmployee)
+        assert paths(org_client)["dwight"] == "david.jan.michael.dwight"
+
+    def test_add_before_supervisor(self, org_client):
+        """Test that a person added before their supervisor is moved under them"""
+        org_client.addEmployee(make_employee("ryan", "toby"), SQLEmployee)
+        assert paths(org_client)["ryan"] == "ryan"
+        org_client.addEmployee(make_employee("toby", "david"), SQLManager)
+        assert paths(org_client)["ryan"] == "david.toby.ryan"
+
+    def test_move_carries_subtree(self, org_client):
+        """Test that changing a supervisor rewrites the whole subtree"""
+        assert org_client.updateEmployee(make_employee("michael", "david"), SQLManager, "michael")
+        assert paths(org_client)["jim"] == "david.michael.jim"
+        assert org_client.reassignSupervisors({"jim": "josh"}, SQLEmployee)[0].status.value == "updated"
+        assert paths(org_client)["jim"] == "david.josh.jim"
+
+    def test_delete_with_reassign(self, org_client):
+        """Test that reassigned reports follow their new supervisor"""
+        assert org_client.deleteEmployee(SQLManager, "michael", reassign_to="josh")
+        current = paths(org_client)
+        assert "michael" not in current
+        assert current["pam"] == "david.josh.pam"
+
+    def test_delete_orphans_become_roots(self, org_client):
+        """Test ON DELETE SET NULL: reports of a deleted person start their own tree"""
+        assert org_client.deleteEmployee(SQLManager, "josh")
+        assert org_client.getEmployee(SQLEmployee, "andy").supervisor_id is None
+        assert paths(org_client)["andy"] == "andy"
+
+    def test_change_tier_updates_in_place(self, org_client):
+        """Test that a promotion changes the tier column and re-points reports under their new path"""
+        results = org_client.changeTier("michael", SQLManager, SQLExecutive, reassign_to="josh")
+        assert [result.status.value for result in results] == ["updated"]
+        assert org_client.getEmployee(SQLExecutive, "michael").supervisor_id == "jan"
+        assert org_client.getEmployee(SQLManager, "michael") is None
+        current = paths(org_client)
+        assert current["michael"] == "david.jan.michael"
+        assert current["jim"] == "david.josh.jim"
+
+    def test_cycle_rejected(self, org_client):
+        """Test that a move under one's own subtree fails and changes nothing"""
+        assert not org_client.updateEmployee(make_employee("jan", "michael"), SQLExecutive, "jan")
+        assert paths(org_client)["jan"] == "david.jan"
+
+
+class TestPathQueries:
+    """Test cases for the path-based hierarchy queries"""
+
+    def test_get_subtree(self, org_client):
+        """Test that the subtree matches the recursive query's rows"""
+        rows = org_client.getSubtree("jan")
+        assert [(r.emp_id, r.tier, r.depth) for r in rows] == [
+            ("jan", "executive", 0), ("michael", "manager", 1), ("jim", "employee", 2), ("pam", "employee", 2)
+        ]
+        assert {r.emp_id for r in org_client.getSubtree("david", max_depth=1)} == {"david", "jan", "josh"}
+        assert org_client.getSubtree("nobody") == []
+
+    def test_get_chain_to_root(self, org_client):
+        """Test the chain from a person to the top"""
+        rows = org_client.getChainToRoot("jim")
+        assert [(r.emp_id, r.tier, r.depth) for r in rows] == [
+            ("jim", "employee", 0), ("michael", "manager", 1), ("jan", "executive", 2), ("david", "executive", 3)
+        ]
+        assert org_client.getChainToRoot("nobody") == []
+
+    def test_subtree_uses_path_index(self, org_client):
+        """Test that the subtree query is a range scan on the path index"""
+        with org_client.connection.connect() as conn:
+            plan = " ".join(row[-1] for row in conn.exec_driver_sql(
+                "EXPLAIN QUERY PLAN SELECT emp_id FROM person "
+                "WHERE path = 'X.Y' OR (path > 'X.Y.' AND path < 'X.Y/')"))
+        assert "ix_person_path" in plan
+
+
+class TestPathLabels:
+    """Test cases for emp_ids that are not plain identifiers"""
+
+    @pytest.fixture
+    def odd_client(self, sqlite_client):
+        """An org whose emp_ids contain dots, dashes, spaces and accents"""
+        rows = [(SQLExecutive, "x", None), (SQLManager, "m.1", "x"), (SQLEmployee, "e-2", "m.1")]
+        for table, emp_id, supervisor_id in rows:
+            sqlite_client.addEmployee(make_employee(emp_id, supervisor_id), table)
+        migrate(sqlite_client.connection)
+        convert_to_person_layout(sqlite_client.connection)
+        return sqlite_client
+
+    def test_chain_and_subtree(self, odd_client):
+        """Test that a dot in an emp_id does not split its path label"""
+        odd_client.addEmployee(make_employee("e 3", "m.1"), SQLEmployee)
+        odd_client.addEmployee(make_employee("jos\u00e9", "e-2"), SQLEmployee)
+
+        chain = [(r.emp_id, r.depth) for r in odd_client.getChainToRoot("jos\u00e9")]
+        assert chain == [("jos\u00e9", 0), ("e-2", 1), ("m.1", 2), ("x", 3)]
+        subtree = [(r.emp_id, r.depth) for r in odd_client.getSubtree("x")]
+        assert subtree == [("x", 0), ("m.1", 1), ("e 3", 2), ("e-2", 2), ("jos\u00e9", 3)]
+        assert [r.emp_id for r in odd_client.getSubtree("m.1")] == ["m.1", "e 3", "e-2", "jos\u00e9"]
+
+    def test_move_under_dotted_id(self, odd_client):
+        """Test that moving a person re-labels their subtree under a dotted supervisor"""
+        odd_client.addEmployee(make_employee("m.2", "x"), SQLManager)
+        odd_client.reassignSupervisors({"e-2": "m.2"}, SQLEmployee)
+        assert [r.emp_id for r in odd_client.getChainToRoot("e-2")] == ["e-2", "m.2", "x"]
+
+    def test_empty_emp_id_rejected(self, sqlite_client):
+        """Test that the conversion refuses an emp_id that cannot be a path label"""
+        with sqlite_client.connection.begin() as conn:
+            conn.execute(text("INSERT INTO executive (emp_id, first_name, last_name) VALUES ('', 'No', 'Id')"))
+        migrate(sqlite_client.connection)
+        with pytest.raises(ValueError, match="path labels"):
+            convert_to_person_layout(sqlite_client.connection)
+        assert not uses_person_layout(sqlite_client.connection)
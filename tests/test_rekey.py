@@ -0,0 +1,83 @@
+"""
+Unit tests for migrating legacy MD5 employee IDs, run against in-memory SQLite
+"""
+import pytest
+from models.orgchart import Employee, SQLExecutive, SQLManager, SQLEmployee
+from utilities.id_generator import generate_employee_id, legacy_employee_id
+from utilities.migrations import migrate
+from utilities.org_version import get_org_version
+from utilities.person_store import convert_to_person_layout
+from utilities.rekey import rekey_legacy_ids
+
+
+def make_employee(first_name, last_name, emp_id, supervisor_id=None):
+    return Employee(emp_id=emp_id, first_name=first_name, last_name=last_name,
+                    position="Sales Representative", department="Sales", supervisor_id=supervisor_id)
+
+
+def people(client) -> dict:
+    return {(row.tier, row.first_name): (row.emp_id, row.supervisor_id) for row in client.getSubtree("top")}
+
+
+@pytest.fixture
+def legacy_client(sqlite_client):
+    """An org keyed by MD5 IDs, with one person added under their own explicit ID"""
+    jan, michael = legacy_employee_id("Jan", "Levinson"), legacy_employee_id("Michael", "Scott")
+    rows = [
+        (SQLExecutive, make_employee("David", "Wallace", "top")),
+        (SQLExecutive, make_employee("Jan", "Levinson", jan, "top")),
+        (SQLManager, make_employee("Michael", "Scott", michael, jan)),
+        (SQLEmployee, make_employee("Jim", "Halpert", legacy_employee_id("Jim", "Halpert"), michael)),
+        # same name in another tier, so the same MD5 ID
+        (SQLEmployee, make_employee("Jan", "Levinson", jan, michael)),
+    ]
+    for table, person in rows:
+        sqlite_client.addEmployee(person, table)
+    return sqlite_client
+
+
+class TestRekey:
+    """Test cases for rekey_legacy_ids"""
+
+    def test_dry_run_counts(self, legacy_client):
+        """Test that a dry run counts legacy rows and changes nothing"""
+        before = people(legacy_client)
+        assert rekey_legacy_ids(legacy_client.connection, dry_run=True) == 4
+        assert people(legacy_client) == before
+
+    def test_rekey_rewrites_ids_and_references(self, legacy_client):
+        """Test that every legacy row and supervisor reference moves to the new IDs"""
+        version = get_org_version(legacy_client.connection)
+        assert rekey_legacy_ids(legacy_client.connection) == 4
+
+        jan = generate_employee_id("Jan", "Levinson")
+        michael = generate_employee_id("Michael", "Scott")
+        assert people(legacy_client) == {
+            ("executive", "David"): ("top", None),
+            ("executive", "Jan"): (jan, "top"),
+            ("manager", "Michael"): (michael, jan),
+            ("employee", "Jim"): (generate_employee_id("Jim", "Halpert"), michael),
+            ("employee", "Jan"): (generate_employee_id("Jan", "Levinson", 1), michael),
+        }
+        assert get_org_version(legacy_client.connection) == version + 1
+        assert rekey_legacy_ids(legacy_client.connection) == 0
+
+    def test_rekey_person_layout(self, legacy_client):
+        """Test rekeying through the person layout's tier views, paths included"""
+        legacy_client.deleteEmployee(SQLEmployee, legacy_employee_id("Jan", "Levinson"))
+        migrate(legacy_client.connection)
+        convert_to_person_layout(legacy_client.connection)
+        assert rekey_legacy_ids(legacy_client.connection) == 3
+
+        jim = generate_employee_id("Jim", "Halpert")
+        chain = [row.emp_id for row in legacy_client.getChainToRoot(jim)]
+        assert chain == [jim, generate_employee_id("Michael", "Scott"), generate_employee_id("Jan", "Levinson"), "top"]
+
+    def test_existing_namesake_keeps_id(self, legacy_client):
+        """Test that a legacy row skips an ID already used by a namesake"""
+        namesake = generate_employee_id("Jim", "Halpert")
+        legacy_client.addEmployee(make_employee("Jim", "Halpert", namesake), SQLEmployee)
+        rekey_legacy_ids(legacy_client.connection)
+
+        ids = {row.emp_id for row in legacy_client.fetchEmployee(SQLEmployee) if row.first_name == "Jim"}
+        assert ids == {namesake, generate_employee_id("Jim", "Halpert", 1)}
@@ -0,0 +1,117 @@
+"""
+Unit tests for the in-memory NameSearchIndex
+"""
+import pytest
+from models.orgchart import Employee, SQLExecutive, SQLManager, SQLEmployee
+from utilities.search_index import NameSearchIndex, SearchResult, words
+from utilities.graph_builder import get_search_index, graph_cache
+
+ROWS = [
+    ("jan", "Jan", "Levinson", "VP of Sales", "Growth", "executive"),
+    ("michael", "Michael", "Scott", "Regional Manager", "Management", "manager"),
+    ("jim", "Jim", "Halpert", "Sales Representative", "Sales", "employee"),
+    ("pam", "Pam", "Beesly", "Receptionist", "Sales", "employee"),
+    ("dwight", "Dwight", "Schrute", "Assistant to the Regional Manager", "Sales", "employee"),
+    ("jimmy", "Jimmy", "Halpert", "Warehouse Associate", "Warehouse", "employee"),
+    ("zoe", "Zoë", "Mary-Beth", "Accountant", "Accounting", "employee"),
+]
+
+
+def ids(results):
+    return [result.emp_id for result in results]
+
+
+@pytest.fixture
+def index():
+    return NameSearchIndex(ROWS)
+
+
+class TestNameSearch:
+    """Test cases for prefix, fuzzy and filtered queries"""
+
+    def test_prefix_in_name_order(self, index):
+        """Test that prefix hits on first or last names come back ordered by last name"""
+        assert ids(index.search("ji", fuzzy=False)) == ["jim", "jimmy"]
+        assert ids(index.search("s", fuzzy=False)) == ["dwight", "michael"]
+
+    def test_multi_word_query(self, index):
+        """Test that every query word must prefix one of the name words"""
+        assert ids(index.search("jim hal", fuzzy=False)) == ["jim", "jimmy"]
+        assert ids(index.search("halpert jimm", fuzzy=False)) == ["jimmy"]
+        assert index.search("jim scott", fuzzy=False) == []
+
+    def test_case_accents_and_hyphens(self, index):
+        """Test that names match regardless of case, accents and hyphenation"""
+        assert ids(index.search("ZOE")) == ["zoe"]
+        assert ids(index.search("beth", fuzzy=False)) == ["zoe"]
+        assert words("Mary-Beth O'Neil") == ("mary", "beth", "o", "neil")
+
+    def test_fuzzy_fills_remaining_slots(self, index):
+        """Test that misspellings are found by trigram similarity"""
+        assert ids(index.search("dwigt")) == ["dwight"]
+        assert ids(index.search("shrute")) == ["dwight"]
+        assert index.search("dwigt", fuzzy=False) == []
+
+    def test_filters(self, index):
+        """Test position/department prefix filters and the tier filter"""
+        assert ids(index.search("", position="regional")) == ["michael"]
+        assert ids(index.search("jim", department="ware")) == ["jimmy"]
+        assert ids(index.search("", tier="executive")) == ["jan"]
+
+    def test_top_k(self, index):
+        """Test that at most k results are returned"""
+        assert len(index.search("", k=3)) == 3
+        assert index.search("", k=0) == []
+
+    def test_large_index_top_k(self):
+        """Test a query over many people sharing the same name"""
+        rows = [(f"id{i:05d}", "Jim", "Halpert", "Sales", "Sales", "employee") for i in range(20000)]
+        rows.append(("pam", "Pam", "Halpert", "Reception", "Sales", "employee"))
+        index = NameSearchIndex(rows)
+        assert ids(index.search("pam hal")) == ["pam"]
+        assert ids(index.search("jim", k=2)) == ["id00000", "id00001"]
+
+
+class TestIndexUpdates:
+    """Test cases for incremental updates"""
+
+    def test_add_update_remove(self, index):
+        """Test that changed names are searchable and old ones are not"""
+        index.add(SearchResult("andy", "Andy", "Bernard", "Sales", "Sales", "employee"))
+        assert ids(index.search("bern")) == ["andy"]
+
+        index.add(SearchResult("andy", "Andrew", "Baines", "Sales", "Sales", "employee"))
+        assert index.search("bern") == []
+        assert ids(index.search("andrew baines")) == ["andy"]
+
+        assert index.remove("andy") is True
+        assert index.remove("andy") is False
+        assert index.search("andrew") == []
+        assert len(index) == len(ROWS)
+
+    def test_patched_from_writes(self, sqlite_client):
+        """Test that the cached index follows committed writes without a rebuild"""
+        sqlite_client.addEmployee(Employee(emp_id="jan", first_name="Jan", last_name="Levinson",
+                                           position="VP of Sales", department="Growth"), SQLExecutive)
+        sqlite_client.addEmployee(Employee(emp_id="michael", first_name="Michael", last_name="Scott",
+                                           position="Regional Manager", department="Sales",
+                                           supervisor_id="jan"), SQLManager)
+        try:
+            index = get_search_index(sqlite_client)
+            assert ids(index.search("mich")) == ["michael"]
+
+            sqlite_client.addEmployee(Employee(emp_id="jim", first_name="Jim", last_name="Halpert",
+                                               position="Sales Representative", department="Sales",
+                                               supervisor_id="michael"), SQLEmployee)
+            sqlite_client.updateEmployee(Employee(first_name="Michael", last_name="Scarn",
+                                                  position="Regional Manager", department="Sales",
+                                                  supervisor_id="jan"), SQLManager, emp_id="michael")
+            sqlite_client.deleteEmployee(SQLExecutive, "jan")
+
+            assert get_search_index(sqlite_client) is index
+            assert index.get("jim").tier == "employee"
+            assert ids(index.search("scarn")) == ["michael"]
+            assert index.search("scott", fuzzy=False) == []
+            assert "jan" not in index
+        finally:
+            graph_cache.invalidate()
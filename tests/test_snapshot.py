@@ -0,0 +1,156 @@
+"""
+Unit tests for Parquet / Arrow IPC org snapshots
+"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+from handler.cursor import Connection
+from models.orgchart import Base, Employee, SQLManager, SQLEmployee
+from utilities.bulk_loader import load_rows
+from utilities.org_generator import generate_org, plan_org
+from utilities.org_version import get_org_version
+from utilities.graph_builder import build_org_graph, build_compact_org_graph
+
+pa = pytest.importorskip("pyarrow")
+from utilities.snapshot import (  # noqa: E402
+    write_snapshot, restore_snapshot, read_snapshot_batches, read_snapshot_table,
+    read_snapshot_frame, read_snapshot_graph, snapshot_schema,
+)
+
+SUFFIXES = [".parquet", ".arrow"]
+
+
+@pytest.fixture
+def org_client(sqlite_client):
+    """SQLite client holding a 400-person synthetic org"""
+    load_rows(sqlite_client.connection, generate_org(400, fanout=6, depth=2, seed=3))
+    return sqlite_client
+
+
+def empty_client() -> Connection:
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    return Connection(engine)
+
+
+class TestSnapshot:
+    """Test cases for writing and reading snapshots"""
+
+    @pytest.mark.parametrize("suffix", SUFFIXES)
+    def test_write_counts_and_metadata(self, org_client, tmp_path, suffix):
+        """Test per-tier counts and the recorded org version"""
+        path = tmp_path / f"org{suffix}"
+        stats = write_snapshot(org_client.connection, path, batch_size=64)
+        assert stats.total_rows == 400
+        assert set(stats.rows_by_table) == {"executive", "manager", "employee"}
+
+        table = read_snapshot_table(path)
+        assert table.num_rows == 400
+        assert table.schema.metadata[b"org_version"] == str(get_org_version(org_client.connection)).encode()
+        assert table.column("tier").to_pylist()[0] == "executive"
+
+    @pytest.mark.parametrize("suffix", SUFFIXES)
+    def test_batches_are_streamed(self, org_client, tmp_path, suffix):
+        """Test that snapshots are written and read back in several batches"""
+        path = tmp_path / f"org{suffix}"
+        write_snapshot(org_client.connection, path, batch_size=64)
+        batches = list(read_snapshot_batches(path, batch_size=64, columns=["emp_id"]))
+        assert len(batches) > 1
+        assert sum(batch.num_rows for batch in batches) == 400
+        assert batches[0].schema.names == ["emp_id"]
+
+    def test_consistent_during_writes(self, tmp_path, monkeypatch):
+        """Test that writes committed mid-snapshot appear neither in the rows nor in the version"""
+        import utilities.snapshot as snapshot
+
+        engine = create_engine(f"sqlite:///{tmp_path / 'org.db'}")
+        with engine.connect() as conn:
+            # WAL lets the writer commit while the snapshot's read transaction is open
+            conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+        Base.metadata.create_all(engine)
+        load_rows(engine, generate_org(400, fanout=6, depth=2, seed=3))
+        client = Connection(engine)
+        version = get_org_version(engine)
+        manager = client.fetchEmployee(SQLManager, ["emp_id"], limit=1)[0].emp_id
+
+        iter_batches = snapshot._iter_batches
+
+        def write_midway(conn, batch_size):
+            batches = iter_batches(conn, batch_size)
+            yield next(batches)
+            client.addEmployee(Employee(emp_id="pam", first_name="Pam", last_name="Beesly", position="Receptionist",
+                                        department="Sales", supervisor_id=manager), SQLEmployee)
+            client.deleteEmployee(SQLManager, manager)
+            yield from batches
+        monkeypatch.setattr(snapshot, "_iter_batches", write_midway)
+
+        path = tmp_path / "org.parquet"
+        assert write_snapshot(engine, path, batch_size=64).total_rows == 400
+        assert get_org_version(engine) == version + 2
+
+        table = read_snapshot_table(path)
+        assert table.schema.metadata[b"org_version"] == str(version).encode()
+        assert "pam" not in table.column("emp_id").to_pylist()
+        assert manager in table.column("emp_id").to_pylist()
+        engine.dispose()
+
+    @pytest.mark.parametrize("suffix", SUFFIXES)
+    def test_restore_round_trip(self, org_client, tmp_path, suffix):
+        """Test that restoring into an empty database reproduces the org"""
+        path = tmp_path / f"org{suffix}"
+        write_snapshot(org_client.connection, path, batch_size=50)
+
+        target = empty_client()
+        stats = restore_snapshot(target.connection, path, batch_size=50)
+        assert stats.total_rows == 400
+        assert get_org_version(target.connection) == 1
+
+        expected = build_org_graph(db_client=org_client)
+        restored = build_org_graph(db_client=target)
+        assert dict(restored.nodes(data=True)) == dict(expected.nodes(data=True))
+        assert set(restored.edges()) == set(expected.edges())
+
+    def test_restore_rejects_wrong_order(self, tmp_path):
+        """Test that employee rows ahead of their managers are rejected"""
+        import pyarrow.parquet as pq
+
+        schema = snapshot_schema()
+        rows = [
+            {"tier": "employee", "emp_id": "jim", "first_name": "Jim", "last_name": "Halpert",
+             "position": "Sales", "department": "Sales", "supervisor_id": None},
+            {"tier": "manager", "emp_id": "michael", "first_name": "Michael", "last_name": "Scott",
+             "position": "Regional Manager", "department": "Management", "supervisor_id": None},
+        ]
+        path = tmp_path / "bad.parquet"
+        with pq.ParquetWriter(path, schema) as writer:
+            for row in rows:
+                writer.write_table(pa.Table.from_pylist([row], schema=schema))
+
+        with pytest.raises(ValueError):
+            restore_snapshot(empty_client().connection, path, batch_size=1)
+
+
+class TestSnapshotLoaders:
+    """Test cases for loading snapshots into analysis structures"""
+
+    @pytest.mark.parametrize("suffix", SUFFIXES)
+    def test_compact_graph(self, org_client, tmp_path, suffix):
+        """Test that the snapshot graph matches the one built from the database"""
+        path = tmp_path / f"org{suffix}"
+        write_snapshot(org_client.connection, path)
+        expected = build_compact_org_graph(db_client=org_client).to_networkx()
+        graph = read_snapshot_graph(path).to_networkx()
+        assert dict(graph.nodes(data=True)) == dict(expected.nodes(data=True))
+        assert set(graph.edges()) == set(expected.edges())
+
+    def test_frame(self, org_client, tmp_path):
+        """Test that the frame is Arrow-backed and complete"""
+        import pandas as pd
+
+        path = tmp_path / "org.parquet"
+        write_snapshot(org_client.connection, path)
+        frame = read_snapshot_frame(path, columns=["emp_id", "supervisor_id"])
+        assert len(frame) == 400
+        assert isinstance(frame.dtypes["emp_id"], pd.ArrowDtype)
+        assert frame["emp_id"].is_unique
+        assert frame["supervisor_id"].isna().sum() == plan_org(400, fanout=6, depth=2)[0]  # top executives
@@ -0,0 +1,204 @@
+"""
+Unit tests for the SQL statement profiler, run against in-memory SQLite
+"""
+import logging
+import pytest
+from sqlalchemy import text
+from models.orgchart import Employee, SQLEmployee
+from utilities.sql_profiler import (
+    normalize_sql, explain_prefix, enable_profiling, disable_profiling, get_profiler, profile_from_env, SQLProfiler
+)
+
+
+def make_employee(first_name, last_name):
+    return Employee(first_name=first_name, last_name=last_name,
+                    position="Sales Representative", department="Sales")
+
+
+@pytest.fixture
+def profiled_client(sqlite_client):
+    """Connection whose engine is profiled, with every statement counted as slow"""
+    profiler = enable_profiling(sqlite_client.connection, slow_ms=0)
+    yield sqlite_client, profiler
+    disable_profiling(sqlite_client.connection)
+
+
+class TestNormalizeSql:
+    """Test cases for normalize_sql"""
+
+    def test_literals_and_placeholders_collapse(self):
+        """Test that values do not split statements into separate groups"""
+        assert normalize_sql("SELECT * FROM t WHERE a = 'x''y' AND b = 42 AND c = :c") == \
+            "SELECT * FROM t WHERE a = ? AND b = ? AND c = ?"
+        assert normalize_sql("SELECT * FROM t WHERE a = %(a_1)s::VARCHAR AND b = $2") == \
+            "SELECT * FROM t WHERE a = ?::VARCHAR AND b = ?"
+
+    def test_lists_of_any_length_collapse(self):
+        """Test IN lists and multi-row VALUES"""
+        assert normalize_sql("SELECT 1 FROM t WHERE id IN (?, ?)") == normalize_sql(
+            "SELECT 1 FROM t WHERE id IN (?, ?, ?, ?)")
+        assert normalize_sql("INSERT INTO t (a, b) VALUES (?, ?), (?, ?), (?, ?)") == \
+            "INSERT INTO t (a, b) VALUES (?, ...), ..."
+
+    def test_identifiers_and_whitespace(self):
+        """Test that names containing digits survive and whitespace is squeezed"""
+        assert normalize_sql("SELECT t1.col2  \n FROM t1 -- note\n WHERE x = 3") == \
+            "SELECT t1.col2 FROM t1 WHERE x = ?"
+
+
+class FakeCursor:
+    """DBAPI cursor that records statements and fails EXPLAIN like a statement_timeout"""
+
+    def __init__(self, executed):
+        self.executed = executed
+
+    def execute(self, statement, parameters=None):
+        self.executed.append(statement)
+        if statement.startswith("EXPLAIN"):
+            raise RuntimeError("canceling statement due to statement timeout")
+
+    def fetchall(self):
+        return []
+
+    def close(self):
+        pass
+
+
+class FakeDBAPIConnection:
+    autocommit = False
+
+    def __init__(self):
+        self.executed = []
+
+    def cursor(self):
+        return FakeCursor(self.executed)
+
+
+class TestExplain:
+    """Test cases for how slow statements are planned"""
+
+    def test_analyze_is_opt_in(self):
+        """Test that only opted-in, side-effect-free reads are run again"""
+        assert explain_prefix("postgresql", "SELECT * FROM person") == "EXPLAIN "
+        assert explain_prefix("postgresql", "SELECT * FROM person", analyze=True) == "EXPLAIN (ANALYZE, BUFFERS) "
+        assert explain_prefix("sqlite", "SELECT 1", analyze=True) == "EXPLAIN QUERY PLAN "
+        assert explain_prefix("mysql", "SELECT 1") is None
+
+    @pytest.mark.parametrize("statement", [
+        "UPDATE person SET tier = 'manager'",
+        "SELECT * FROM person WHERE emp_id = %(id)s FOR UPDATE",
+        "SELECT * FROM person FOR NO KEY UPDATE SKIP LOCKED",
+        "SELECT nextval('person_seq')",
+        "SELECT pg_advisory_lock(1)",
+        "WITH moved AS (DELETE FROM person RETURNING *) SELECT count(*) FROM moved",
+    ])
+    def test_unsafe_statements_not_analyzed(self, statement):
+        """Test that writes, row locks and side-effecting functions get a plain EXPLAIN"""
+        assert explain_prefix("postgresql", statement, analyze=True) == "EXPLAIN "
+
+    def test_failed_explain_rolls_back_to_savepoint(self, sqlite_client):
+        """Test that a failing Postgres EXPLAIN is undone so the caller's transaction stays usable"""
+        class PostgresConnection:
+            dialect = type("Dialect", (), {"name": "postgresql"})
+
+        dbapi_conn = FakeDBAPIConnection()
+        cursor = type("Cursor", (), {"connection": dbapi_conn})
+        profiler = SQLProfiler(sqlite_client.connection, analyze=True)
+
+        assert profiler._explain(PostgresConnection, cursor, "SELECT * FROM person", {}) is None
+        assert dbapi_conn.executed == [
+            "SAVEPOINT sql_profiler_explain",
+            "EXPLAIN (ANALYZE, BUFFERS) SELECT * FROM person",
+            "ROLLBACK TO SAVEPOINT sql_profiler_explain",
+            "RELEASE SAVEPOINT sql_profiler_explain",
+        ]
+
+
+class TestSQLProfiler:
+    """Test cases for SQLProfiler on a live engine"""
+
+    def test_statements_grouped_and_timed(self, profiled_client):
+        """Test that repeated operations land in one group each"""
+        client, profiler = profiled_client
+        for name in ("Jim", "Pam", "Dwight"):
+            client.addEmployee(make_employee(name, "Test"), SQLEmployee)
+        client.fetchEmployee(SQLEmployee)
+
+        rows = profiler.summary()
+        inserts = [row for row in rows if row["sql"].startswith("INSERT INTO employee ")]
+        assert len(inserts) == 1
+        assert inserts[0]["calls"] == 3
+        assert inserts[0]["total_ms"] >= inserts[0]["max_ms"] > 0
+        select = next(row for row in rows if row["sql"].startswith("SELECT") and "ORDER BY" in row["sql"])
+        assert select["calls"] == 1
+        assert rows == sorted(rows, key=lambda row: row["total_ms"], reverse=True)
+
+    def test_slow_statements_logged_with_plan(self, profiled_client, caplog):
+        """Test that statements over the threshold are logged with EXPLAIN QUERY PLAN output"""
+        client, profiler = profiled_client
+        with caplog.at_level(logging.WARNING, logger="utilities.sql_profiler"):
+            client.fetchEmployee(SQLEmployee, columns=["emp_id"], after="a", limit=5)
+
+        select = next(row for row in profiler.summary() if "LIMIT" in row["sql"])
+        assert select["slow"] == 1
+        assert "SEARCH" in select["plan"] or "SCAN" in select["plan"]
+        assert any("Slow statement" in record.message and select["plan"] in record.message
+                   for record in caplog.records)
+
+    def test_plan_captured_once_per_statement(self, profiled_client):
+        """Test that repeated slow executions reuse the first plan"""
+        client, profiler = profiled_client
+        with client.connection.connect() as conn:
+            for _ in range(3):
+                conn.execute(text("SELECT count(*) FROM employee WHERE emp_id > :after"), {"after": "x"})
+        row = next(row for row in profiler.summary() if "count(*)" in row["sql"])
+        assert row["slow"] == 3
+        assert row["plan"]
+
+    def test_errors_counted(self, profiled_client):
+        """Test that failing statements are counted without leaking start times"""
+        client, profiler = profiled_client
+        with client.connection.connect() as conn:
+            with pytest.raises(Exception):
+                conn.execute(text("SELECT * FROM missing_table"))
+            assert not conn.info.get("profiler_start")
+        row = next(row for row in profiler.summary() if "missing_table" in row["sql"])
+        assert row["errors"] == 1
+        assert row["calls"] == 0
+
+    def test_report_and_reset(self, profiled_client):
+        """Test the text report and clearing it"""
+        client, profiler = profiled_client
+        client.fetchEmployee(SQLEmployee)
+        report = profiler.report()
+        assert "SQL profile for sqlite://" in report
+        assert "SELECT employee.emp_id" in report
+        profiler.reset()
+        assert profiler.summary() == []
+
+    def test_disable_stops_recording(self, sqlite_client):
+        """Test that disabling removes the engine listeners"""
+        engine = sqlite_client.connection
+        profiler = enable_profiling(engine)
+        assert enable_profiling(engine) is profiler
+        assert get_profiler(engine) is profiler
+        disable_profiling(engine)
+        sqlite_client.fetchEmployee(SQLEmployee)
+        assert get_profiler(engine) is None
+        assert profiler.summary() == []
+
+    def test_profile_from_env(self, sqlite_client, monkeypatch):
+        """Test the DB_PROFILE_SQL switch"""
+        engine = sqlite_client.connection
+        monkeypatch.delenv("DB_PROFILE_SQL", raising=False)
+        assert profile_from_env(engine) is None
+
+        monkeypatch.setenv("DB_PROFILE_SQL", "1")
+        monkeypatch.setenv("DB_PROFILE_SLOW_MS", "250")
+        profiler = profile_from_env(engine)
+        try:
+            assert profiler.slow_ms == 250
+            assert profiler.enabled
+            assert not profiler.analyze
+        finally:
+            disable_profiling(engine)
@@ -83,3 +83,50 @@ class TestUIHelper:
         mock_st.success.assert_called_once_with(success_message)
         mock_time.sleep.assert_called_once_with(1)
         mock_st.rerun.assert_called_once()
+
+
+def make_people(count):
+    return [
+        Employee(emp_id=str(i), first_name=f"Name{i}", last_name="Person", position="Sales", department="Sales")
+        for i in range(count)
+    ]
+
+
+class TestEmployeeSearchSelector:
+    """Test cases for the paginated search selector's option building"""
+
+    def test_page_options_detects_next_page(self):
+        """Test that the extra result only signals another page"""
+        from ui.components import EmployeeSearchSelector
+
+        options, has_more = EmployeeSearchSelector.page_options(make_people(4), page_size=3)
+        assert list(options) == ["0", "1", "2"]
+        assert has_more is True
+
+        options, has_more = EmployeeSearchSelector.page_options(make_people(3), page_size=3)
+        assert has_more is False
+
+    def test_page_options_keeps_current_and_excludes(self):
+        """Test that the current selection stays available and the excluded ID is dropped"""
+        from ui.components import EmployeeSearchSelector
+
+        people = make_people(5)
+        options, _ = EmployeeSearchSelector.page_options(people[:3], page_size=3, current=people[4],
+                                                          exclude_emp_id="1")
+        assert list(options) == ["4", "0", "2"]
+
+    @patch('ui.components.st')
+    def test_render_fetches_one_page(self, mock_st):
+        """Test that render asks the search for one page plus one row at the current offset"""
+        from ui.components import EmployeeSearchSelector
+
+        mock_st.session_state = {"people_page": 2}
+        mock_st.text_input.return_value = "nam"
+        mock_st.selectbox.return_value = "41"
+        mock_st.columns.return_value = (MagicMock(), MagicMock(), MagicMock())
+        search = Mock(return_value=make_people(50)[40:46])
+
+        selected = EmployeeSearchSelector.render(search, key="people", page_size=5)
+
+        search.assert_called_once_with("nam", 6, 10)
+        assert selected.emp_id == "41"
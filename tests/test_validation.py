@@ -2,8 +2,20 @@
 Unit tests for employee validation utilities
 """
 import pytest
+import regex
+from utilities import validation
 from utilities.validation import EmployeeValidator
 
+ROWS = [
+    ("Michael", "Scott", "Regional Manager"),
+    ("Kevin9", "Malone", "Accountant"),
+    ("Pam", "Beesly", ""),
+    ("Zoë", "Müller", "Sales Rep 2"),
+    ("Oscar", "Martinez", "Accountant #1"),
+    ("   ", "", "Temp"),
+    ("Darryl", "Philbin", "Warehouse\u00a0Manager"),
+]
+
 
 class TestEmployeeValidator:
     """Test cases for EmployeeValidator"""
@@ -108,4 +120,39 @@ class TestEmployeeValidator:
             ""
         )
         assert is_valid is False
-        assert "Position" in error
\ No newline at end of file
+        assert "Position" in error
+
+class TestValidateBatch:
+    """Test cases for EmployeeValidator.validate_batch"""
+
+    def test_matches_per_row_validation(self):
+        """Test that every row gets the error validate_employee_data reports"""
+        first_names, last_names, positions = map(list, zip(*ROWS))
+        errors = EmployeeValidator.validate_batch(first_names, last_names, positions)
+        assert errors == [EmployeeValidator.validate_employee_data(*row)[1] for row in ROWS]
+        assert [bool(error) for error in errors] == [False, True, True, True, True, True, False]
+
+    def test_clean_columns(self):
+        """Test the whole-column fast path"""
+        errors = EmployeeValidator.validate_batch(["Jim", "Mary-Beth"], ["Halpert", "O Connor"],
+                                                  ["Sales", "R&D, Floor 2"])
+        assert errors == ["", ""]
+
+    def test_ascii_fast_path_matches_regex(self):
+        """Test that the precomputed character sets agree with the patterns for every ASCII character"""
+        for char in map(chr, range(128)):
+            assert (char in EmployeeValidator.NAME_CHARS) == (not regex.search(EmployeeValidator.NAME_PATTERN, char))
+            assert (char in EmployeeValidator.POSITION_CHARS) == \
+                (not regex.search(EmployeeValidator.POSITION_PATTERN, char))
+
+    def test_mismatched_columns(self):
+        """Test that columns of different lengths are refused"""
+        with pytest.raises(ValueError):
+            EmployeeValidator.validate_batch(["Jim"], [], ["Sales"])
+
+    def test_process_pool(self, monkeypatch):
+        """Test that splitting across worker processes keeps row order"""
+        monkeypatch.setattr(validation, "POOL_CHUNK_SIZE", 3)
+        first_names, last_names, positions = map(list, zip(*ROWS))
+        assert EmployeeValidator.validate_batch(first_names, last_names, positions, processes=2) == \
+            EmployeeValidator.validate_batch(first_names, last_names, positions)
@@ -5,8 +5,9 @@ Eliminates UI pattern duplication across pages.
 
 import streamlit as st
 import time
-from typing import List, Optional
+from typing import Callable, List, Optional
 from models.orgchart import Employee
+from handler.cursor import SEARCH_PAGE_SIZE
 
 
 class UIHelper:
@@ -130,3 +131,139 @@ class SupervisorSelector:
 
         selected_name = st.selectbox(label, options=options.keys(), index=index)
         return options.get(selected_name)
+
+    @staticmethod
+    def render_search(
+        search: Callable[[str, int, int], List[Employee]],
+        label: str = "Select Supervisor",
+        current_supervisor: Optional[Employee] = None,
+        exclude_emp_id: Optional[str] = None,
+        key: str = "supervisor"
+    ) -> Optional[str]:
+        """
+        Render a searchable supervisor dropdown and return the supervisor ID.
+
+        :param search: Called as search(query, limit, offset) for one page of matches
+        :type search: Callable[[str, int, int], List[Employee]]
+        :param label: Dropdown label
+        :type label: str
+        :param current_supervisor: Current supervisor (for updates), kept selectable on every page
+        :type current_supervisor: Optional[Employee]
+        :param exclude_emp_id: Employee ID to exclude from options (for delete reassignment)
+        :type exclude_emp_id: Optional[str]
+        :param key: Unique key prefix for the Streamlit widgets
+        :type key: str
+        :return: Selected supervisor ID or None
+        :rtype: Optional[str]
+        """
+        supervisor = EmployeeSearchSelector.render(
+            search, label, key=key, current=current_supervisor, exclude_emp_id=exclude_emp_id
+        )
+        return supervisor.emp_id if supervisor else None
+
+
+class EmployeeSearchSelector:
+    """Searchable, paginated employee selection backed by a server-side name search"""
+
+    @staticmethod
+    def page_options(
+        results: List[Employee],
+        page_size: int = SEARCH_PAGE_SIZE,
+        current: Optional[Employee] = None,
+        exclude_emp_id: Optional[str] = None
+    ) -> tuple[dict, bool]:
+        """
+        Turn one page of search results into selectbox options.
+
+        :param results: Up to page_size + 1 results; the extra one only signals another page
+        :type results: List[Employee]
+        :param page_size: Results shown per page
+        :type page_size: int
+        :param current: Person to keep selectable even when not on this page
+        :type current: Optional[Employee]
+        :param exclude_emp_id: Employee ID to leave out
+        :type exclude_emp_id: Optional[str]
+        :return: Options keyed by emp_id, and whether there is a next page
+        :rtype: tuple[dict, bool]
+        """
+        has_more = len(results) > page_size
+        options = {emp.emp_id: emp for emp in results[:page_size] if emp.emp_id != exclude_emp_id}
+        if current and current.emp_id != exclude_emp_id and current.emp_id not in options:
+            options = {current.emp_id: current, **options}
+        return options, has_more
+
+    @staticmethod
+    def _set_page(page_key: str, page: int):
+        st.session_state[page_key] = max(0, page)
+
+    @staticmethod
+    def render(
+        search: Callable[[str, int, int], List[Employee]],
+        label: str = "Select Employee",
+        placeholder: str = "Choose employee...",
+        key: str = "employee",
+        current: Optional[Employee] = None,
+        exclude_emp_id: Optional[str] = None,
+        page_size: int = SEARCH_PAGE_SIZE
+    ) -> Optional[Employee]:
+        """
+        Render a name search box plus a dropdown of one page of matches.
+
+        Only page_size + 1 rows are fetched per render, so the widget stays
+        responsive however large the tier is. Must be rendered outside st.form,
+        since the paging buttons rerun the page.
+
+        :param search: Called as search(query, limit, offset) for one page of matches
+        :type search: Callable[[str, int, int], List[Employee]]
+        :param label: Dropdown label
+        :type label: str
+        :param placeholder: Placeholder text
+        :type placeholder: str
+        :param key: Unique key prefix for the Streamlit widgets
+        :type key: str
+        :param current: Person to preselect (for updates)
+        :type current: Optional[Employee]
+        :param exclude_emp_id: Employee ID to exclude from options
+        :type exclude_emp_id: Optional[str]
+        :param page_size: Results shown per page
+        :type page_size: int
+        :return: Selected employee or None
+        :rtype: Optional[Employee]
+        """
+        page_key = f"{key}_page"
+        query = st.text_input(
+            f"Search {label.lower()}",
+            placeholder="Type a name...",
+            key=f"{key}_query",
+            on_change=EmployeeSearchSelector._set_page,
+            args=(page_key, 0)
+        )
+        page = st.session_state.get(page_key, 0)
+
+        results = search(query, page_size + 1, page * page_size)
+        options, has_more = EmployeeSearchSelector.page_options(results, page_size, current, exclude_emp_id)
+        if not options and page == 0:
+            st.info("No matching employees found" if query else "No employees found")
+            return None
+
+        ids = list(options)
+        index = ids.index(current.emp_id) if current and current.emp_id in options else 0
+        selected_id = st.selectbox(
+            label,
+            options=ids,
+            index=index if ids else None,
+            format_func=lambda emp_id: f"{options[emp_id].first_name} {options[emp_id].last_name} "
+                                       f"({options[emp_id].position})",
+            placeholder=placeholder,
+            key=f"{key}_select"
+        )
+
+        if page > 0 or has_more:
+            prev_col, page_col, next_col = st.columns([1, 2, 1])
+            prev_col.button("Previous", key=f"{key}_prev", disabled=page == 0,
+                            on_click=EmployeeSearchSelector._set_page, args=(page_key, page - 1))
+            page_col.caption(f"Page {page + 1}")
+            next_col.button("Next", key=f"{key}_next", disabled=not has_more,
+                            on_click=EmployeeSearchSelector._set_page, args=(page_key, page + 1))
+
+        return options.get(selected_id) if selected_id else None
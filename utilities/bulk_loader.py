@@ -0,0 +1,306 @@
+"""
+Streaming bulk loader for the three employee tier tables.
+Writes with COPY FROM STDIN on psycopg2 and falls back to executemany elsewhere.
+"""
+
+import io
+import csv
+import gzip
+import json
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional, Type
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine, Connection as EngineConnection
+from config.employee_types import EMPLOYEE_TYPES
+from utilities.validation import EmployeeValidator
+from utilities.id_generator import generate_employee_ids, existing_employee_ids
+from utilities.org_version import bump_org_version
+
+# Columns written for every tier, in COPY column order
+LOAD_COLUMNS = ("emp_id", "first_name", "last_name", "position", "department", "supervisor_id")
+
+# Columns written by write_rows, readable back by read_rows
+FILE_COLUMNS = ("tier",) + LOAD_COLUMNS
+
+# Rows buffered per COPY / executemany call
+COPY_CHUNK_SIZE = 10000
+
+# Tables in foreign-key order: executive, manager, employee
+TIER_ORDER = [config.table_class for config in EMPLOYEE_TYPES.values()]
+
+SUPERVISOR_TABLES = {config.supervisor_table for config in EMPLOYEE_TYPES.values() if config.supervisor_table}
+
+
+@dataclass
+class LoadStats:
+    """Row counts and timing for a bulk load"""
+    rows_by_table: dict = field(default_factory=dict)
+    rejected: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def total_rows(self) -> int:
+        return sum(self.rows_by_table.values())
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.total_rows / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def resolve_tier(value: str) -> Optional[Type]:
+    """
+    Resolve a tier name to its table class.
+
+    Accepts table names (e.g., 'manager') and display names (e.g., 'Regular Employee').
+
+    :param value: Tier name from the input file
+    :type value: str
+    :return: Table class or None if the tier is unknown
+    :rtype: Optional[Type]
+    """
+    value = (value or "").strip().lower()
+    for config in EMPLOYEE_TYPES.values():
+        if value in (config.table_class.__tablename__, config.display_name.lower()):
+            return config.table_class
+    return None
+
+
+def _file_format(path: Path) -> tuple[Callable, str]:
+    suffixes = [s.lower() for s in path.suffixes]
+    opener = open
+    if suffixes and suffixes[-1] == ".gz":
+        opener = gzip.open
+        suffixes = suffixes[:-1]
+    file_format = suffixes[-1] if suffixes else ""
+
+    if file_format not in (".csv", ".jsonl", ".ndjson"):
+        raise ValueError(f"Unsupported file format: {path.name}")
+    return opener, file_format
+
+
+def read_rows(path: str | Path) -> Iterator[dict]:
+    """
+    Stream rows from a CSV or JSONL file (optionally gzip-compressed).
+
+    :param path: Input file path (.csv, .jsonl, .ndjson, optionally with .gz)
+    :type path: str | Path
+    :yield: One dict per input row
+    :rtype: Iterator[dict]
+    """
+    path = Path(path)
+    opener, file_format = _file_format(path)
+
+    with opener(path, "rt", newline="", encoding="utf-8") as f:
+        if file_format == ".csv":
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def write_rows(rows: Iterable[dict], path: str | Path) -> int:
+    """
+    Stream rows to a CSV or JSONL file (optionally gzip-compressed).
+
+    :param rows: Rows with FILE_COLUMNS keys
+    :type rows: Iterable[dict]
+    :param path: Output file path (.csv, .jsonl, .ndjson, optionally with .gz)
+    :type path: str | Path
+    :return: Number of rows written
+    :rtype: int
+    """
+    path = Path(path)
+    opener, file_format = _file_format(path)
+    count = 0
+
+    with opener(path, "wt", newline="", encoding="utf-8") as f:
+        if file_format == ".csv":
+            writer = csv.DictWriter(f, fieldnames=FILE_COLUMNS, extrasaction="ignore")
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        else:
+            for row in rows:
+                f.write(json.dumps({column: row.get(column) for column in FILE_COLUMNS}) + "\n")
+                count += 1
+    return count
+
+
+def iter_file_in_fk_order(path: str | Path) -> Iterator[dict]:
+    """
+    Stream a file once per tier so rows come out in foreign-key order.
+
+    Rows with an unknown tier are passed through on the first pass so the
+    loader can count them as rejected.
+
+    :param path: Input file path
+    :type path: str | Path
+    :yield: Rows ordered executive, manager, employee
+    :rtype: Iterator[dict]
+    """
+    for table in TIER_ORDER:
+        for row in read_rows(path):
+            tier = resolve_tier(row.get("tier"))
+            if tier is table or (tier is None and table is TIER_ORDER[0]):
+                yield row
+
+
+def _to_record(row: dict) -> dict:
+    # validated, given an emp_id and resolved to supervisor IDs when the chunk is flushed
+    return {
+        "emp_id": row.get("emp_id") or None,
+        "first_name": row.get("first_name") or "",
+        "last_name": row.get("last_name") or "",
+        "position": row.get("position") or "",
+        "department": row.get("department") or None,
+        "supervisor_id": row.get("supervisor_id") or row.get("supervisor") or None,
+    }
+
+
+def _assign_ids(conn: EngineConnection, records: list[dict], keys: list[Optional[str]], id_map: dict):
+    """
+    Give records without an emp_id a generated one, then resolve supervisor keys.
+
+    Generated IDs are checked against every tier in the load's own
+    transaction, so namesakes in earlier chunks or earlier loads are skipped.
+    """
+    unnamed = [record for record in records if not record["emp_id"]]
+    if unnamed:
+        ids = generate_employee_ids([(record["first_name"], record["last_name"]) for record in unnamed],
+                                    taken=lambda ids: existing_employee_ids(conn, ids))
+        for record, emp_id in zip(unnamed, ids):
+            record["emp_id"] = emp_id
+    for record, key in zip(records, keys):
+        if key:
+            id_map[key] = record["emp_id"]
+    for record in records:
+        record["supervisor_id"] = id_map.get(record["supervisor_id"], record["supervisor_id"])
+
+
+def _copy_chunk(conn: EngineConnection, table: Type, records: list[dict]):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for record in records:
+        writer.writerow([record[column] for column in LOAD_COLUMNS])
+    buffer.seek(0)
+
+    cursor = conn.connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table.__tablename__} ({', '.join(LOAD_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+    finally:
+        cursor.close()
+
+
+def _executemany_chunk(conn: EngineConnection, table: Type, records: list[dict]):
+    conn.execute(insert(table), records)
+
+
+def get_chunk_writer(conn: EngineConnection) -> Callable[[EngineConnection, Type, list[dict]], None]:
+    """
+    Pick the fastest write path for the connection's driver.
+
+    :param conn: Open SQLAlchemy connection
+    :type conn: Connection
+    :return: COPY writer for psycopg2, executemany writer otherwise
+    :rtype: Callable
+    """
+    if conn.dialect.driver == "psycopg2":
+        return _copy_chunk
+    return _executemany_chunk
+
+
+def load_rows(engine: Engine, rows: Iterable[dict], chunk_size: int = COPY_CHUNK_SIZE) -> LoadStats:
+    """
+    Load rows into the tier tables in a single transaction.
+
+    Rows must arrive in foreign-key order (all executives, then managers, then
+    employees). An optional 'key' column names each row so later rows can use it
+    as their 'supervisor_id'; only supervisor-tier keys are kept in memory.
+
+    :param engine: SQLAlchemy engine
+    :type engine: Engine
+    :param rows: Rows with tier, first_name, last_name, position, department,
+        supervisor_id and optional emp_id/key columns
+    :type rows: Iterable[dict]
+    :param chunk_size: Rows per COPY / executemany call
+    :type chunk_size: int
+    :return: Row counts and timing
+    :rtype: LoadStats
+
+    Example:
+        stats = load_rows(client.connection, iter_file_in_fk_order("org.csv"))
+        print(f"{stats.rows_per_sec:,.0f} rows/sec")
+    """
+    stats = LoadStats()
+    start = time.perf_counter()
+    id_map = {}
+    current_table = None
+    buffer = []
+    keys = []
+
+    with engine.begin() as conn:
+        write_chunk = get_chunk_writer(conn)
+
+        def flush():
+            errors = EmployeeValidator.validate_batch([record["first_name"] for record in buffer],
+                                                      [record["last_name"] for record in buffer],
+                                                      [record["position"] for record in buffer])
+            records = [record for record, error in zip(buffer, errors) if not error]
+            record_keys = [key for key, error in zip(keys, errors) if not error]
+            stats.rejected += len(buffer) - len(records)
+            buffer.clear()
+            keys.clear()
+            if records:
+                _assign_ids(conn, records, record_keys, id_map)
+                write_chunk(conn, current_table, records)
+                stats.rows_by_table[current_table.__tablename__] = (
+                    stats.rows_by_table.get(current_table.__tablename__, 0) + len(records)
+                )
+
+        for row in rows:
+            table = resolve_tier(row.get("tier"))
+            if table is None:
+                stats.rejected += 1
+                continue
+
+            if table is not current_table:
+                if current_table is not None and TIER_ORDER.index(table) < TIER_ORDER.index(current_table):
+                    raise ValueError(f"Rows must be in foreign-key order: {table.__tablename__} "
+                                     f"row after {current_table.__tablename__} rows")
+                flush()
+                current_table = table
+
+            buffer.append(_to_record(row))
+            keys.append(row.get("key") if table in SUPERVISOR_TABLES else None)
+            if len(buffer) >= chunk_size:
+                flush()
+
+        flush()
+        if stats.total_rows:
+            bump_org_version(conn)
+
+    stats.elapsed = time.perf_counter() - start
+    return stats
+
+
+def load_file(engine: Engine, path: str | Path, chunk_size: int = COPY_CHUNK_SIZE) -> LoadStats:
+    """
+    Stream a CSV/JSONL file into the tier tables in foreign-key order.
+
+    :param engine: SQLAlchemy engine
+    :type engine: Engine
+    :param path: Input file path
+    :type path: str | Path
+    :param chunk_size: Rows per COPY / executemany call
+    :type chunk_size: int
+    :return: Row counts and timing
+    :rtype: LoadStats
+    """
+    return load_rows(engine, iter_file_in_fk_order(path), chunk_size)
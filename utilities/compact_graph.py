@@ -0,0 +1,285 @@
+"""
+Compact, array-backed representation of the org hierarchy.
+Uses a few bytes per person where a networkx DiGraph uses hundreds.
+"""
+
+import sys
+from typing import Iterable, Iterator, Optional
+import numpy as np
+import networkx as nx
+
+
+class CompactOrgGraph:
+    """
+    Org hierarchy stored in NumPy arrays.
+
+    Nodes are numbered 0..n-1 in sorted emp_id order, so an emp_id is found by
+    binary search over a fixed-width byte array instead of a dict. Each node
+    has a parent index (-1 for roots) and its children are stored in CSR form.
+    Labels are kept as one UTF-8 buffer plus offsets, and positions as
+    dictionary-encoded codes.
+    """
+
+    __slots__ = ("emp_ids", "parent", "child_offsets", "child_index",
+                 "label_data", "label_offsets", "position_codes", "positions")
+
+    def __init__(self, emp_ids: np.ndarray, parent: np.ndarray, label_data: np.ndarray,
+                 label_offsets: np.ndarray, position_codes: np.ndarray, positions: list[str]):
+        self.emp_ids = emp_ids
+        self.parent = parent
+        self.label_data = label_data
+        self.label_offsets = label_offsets
+        self.position_codes = position_codes
+        self.positions = positions
+        self.child_offsets, self.child_index = self._build_children(parent)
+
+    @staticmethod
+    def _build_children(parent: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        n = len(parent)
+        has_parent = parent >= 0
+        counts = np.bincount(parent[has_parent], minlength=n)
+        child_offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(counts, out=child_offsets[1:])
+        children = np.flatnonzero(has_parent)
+        child_index = children[np.argsort(parent[children], kind="stable")].astype(np.int32)
+        return child_offsets, child_index
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple], chunk_size: int = 50000) -> "CompactOrgGraph":
+        """
+        Build from (emp_id, first_name, last_name, position, supervisor_id) rows.
+
+        Rows are converted to arrays chunk by chunk, so Python objects are only
+        ever held for one chunk at a time.
+
+        :param rows: Rows in the shape returned by the build_org_graph query
+        :type rows: Iterable[tuple]
+        :param chunk_size: Rows converted per chunk
+        :type chunk_size: int
+        :return: Compact graph
+        :rtype: CompactOrgGraph
+        """
+        return cls.from_row_chunks(_chunks(rows, chunk_size))
+
+    @classmethod
+    def from_row_chunks(cls, chunks: Iterable[list]) -> "CompactOrgGraph":
+        """
+        Build from an iterable of row chunks (e.g., Result.partitions()).
+
+        :param chunks: Lists of (emp_id, first_name, last_name, position, supervisor_id) rows
+        :type chunks: Iterable[list]
+        :return: Compact graph
+        :rtype: CompactOrgGraph
+        """
+        id_parts, supervisor_parts, length_parts, data_parts, code_parts = [], [], [], [], []
+        position_lookup = {}
+
+        for chunk in chunks:
+            if not len(chunk):
+                continue
+            id_parts.append(np.array([row[0].encode("utf-8") for row in chunk], dtype=np.bytes_))
+            supervisor_parts.append(np.array([(row[4] or "").encode("utf-8") for row in chunk], dtype=np.bytes_))
+
+            encoded = [full_name(row[1], row[2]).encode("utf-8") for row in chunk]
+            length_parts.append(np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)))
+            data_parts.append(np.frombuffer(b"".join(encoded), dtype=np.uint8))
+
+            code_parts.append(np.fromiter(
+                (position_lookup.setdefault(row[3], len(position_lookup)) for row in chunk),
+                dtype=np.int32, count=len(chunk)
+            ))
+
+        if not id_parts:
+            return cls.from_arrays(np.array([], dtype="S1"), np.array([], dtype="S1"),
+                                   np.array([], dtype=np.uint8), np.array([], dtype=np.int64),
+                                   np.array([], dtype=np.int32), [])
+
+        positions = [None] * len(position_lookup)
+        for position, code in position_lookup.items():
+            positions[code] = position
+        return cls.from_arrays(np.concatenate(id_parts), np.concatenate(supervisor_parts),
+                               np.concatenate(data_parts), np.concatenate(length_parts),
+                               np.concatenate(code_parts), positions)
+
+    @classmethod
+    def from_arrays(cls, emp_ids: np.ndarray, supervisor_ids: np.ndarray, label_data: np.ndarray,
+                    label_lengths: np.ndarray, position_codes: np.ndarray, positions: list[str]) -> "CompactOrgGraph":
+        """
+        Build from column arrays in any row order.
+
+        :param emp_ids: Fixed-width byte IDs
+        :type emp_ids: np.ndarray
+        :param supervisor_ids: Fixed-width byte supervisor IDs (b"" for none)
+        :type supervisor_ids: np.ndarray
+        :param label_data: UTF-8 labels laid end to end
+        :type label_data: np.ndarray
+        :param label_lengths: Byte length of each row's label
+        :type label_lengths: np.ndarray
+        :param position_codes: Index into positions for each row
+        :type position_codes: np.ndarray
+        :param positions: Distinct position names
+        :type positions: list[str]
+        :return: Compact graph
+        :rtype: CompactOrgGraph
+        """
+        # number nodes in sorted emp_id order so lookups are a binary search
+        order = np.argsort(emp_ids, kind="stable")
+        emp_ids = emp_ids[order]
+        supervisor_ids = supervisor_ids[order]
+        position_codes = np.asarray(position_codes, dtype=np.int32)[order]
+        label_data, label_offsets = _reorder_segments(label_data, np.asarray(label_lengths, dtype=np.int64), order)
+
+        parent = _lookup(emp_ids, supervisor_ids)
+        return cls(emp_ids, parent, label_data, label_offsets, position_codes, list(positions))
+
+    def __len__(self) -> int:
+        return len(self.emp_ids)
+
+    def __contains__(self, emp_id: str) -> bool:
+        return self.index_of(emp_id) is not None
+
+    def index_of(self, emp_id: str) -> Optional[int]:
+        """
+        Get the integer node index for an emp_id.
+
+        :param emp_id: Employee ID
+        :type emp_id: str
+        :return: Node index or None if not present
+        :rtype: Optional[int]
+        """
+        key = emp_id.encode("utf-8")
+        index = int(self.emp_ids.searchsorted(key))
+        if index < len(self.emp_ids) and self.emp_ids[index] == key:
+            return index
+        return None
+
+    def emp_id(self, index: int) -> str:
+        return self.emp_ids[index].decode("utf-8")
+
+    def label(self, index: int) -> str:
+        start, end = self.label_offsets[index], self.label_offsets[index + 1]
+        return self.label_data[start:end].tobytes().decode("utf-8")
+
+    def position(self, index: int) -> str:
+        return self.positions[self.position_codes[index]]
+
+    def parent_of(self, emp_id: str) -> Optional[str]:
+        """
+        Get an employee's supervisor ID.
+
+        :param emp_id: Employee ID
+        :type emp_id: str
+        :return: Supervisor ID, or None for roots and unknown IDs
+        :rtype: Optional[str]
+        """
+        index = self.index_of(emp_id)
+        if index is None or self.parent[index] < 0:
+            return None
+        return self.emp_id(self.parent[index])
+
+    def children_of(self, emp_id: str) -> list[str]:
+        """
+        Get an employee's direct reports.
+
+        :param emp_id: Employee ID
+        :type emp_id: str
+        :return: Direct report IDs
+        :rtype: list[str]
+        """
+        index = self.index_of(emp_id)
+        if index is None:
+            return []
+        start, end = self.child_offsets[index], self.child_offsets[index + 1]
+        return [self.emp_id(child) for child in self.child_index[start:end]]
+
+    def nbytes(self) -> int:
+        """
+        Memory held by the arrays and the position dictionary.
+
+        :return: Size in bytes
+        :rtype: int
+        """
+        arrays = (self.emp_ids, self.parent, self.child_offsets, self.child_index,
+                  self.label_data, self.label_offsets, self.position_codes)
+        return (sum(array.nbytes for array in arrays)
+                + sys.getsizeof(self.positions) + sum(sys.getsizeof(p) for p in self.positions))
+
+    def to_networkx(self) -> nx.DiGraph:
+        """
+        Convert to the DiGraph that build_org_graph would return.
+
+        :return: Directed graph with label/position node attributes and
+            employee -> supervisor edges
+        :rtype: nx.DiGraph
+        """
+        G = nx.DiGraph()
+        G.add_nodes_from(
+            (self.emp_id(i), {"label": self.label(i), "position": self.position(i)})
+            for i in range(len(self))
+        )
+        children = np.flatnonzero(self.parent >= 0)
+        G.add_edges_from((self.emp_id(i), self.emp_id(self.parent[i])) for i in children)
+        return G
+
+
+def full_name(first_name: Optional[str], last_name: Optional[str]) -> str:
+    """Display name in the same form build_org_graph uses for node labels"""
+    return f"{(first_name or '').strip()} {(last_name or '').strip()}".strip()
+
+
+def estimate_networkx_bytes(G: nx.DiGraph) -> int:
+    """
+    Estimate the memory held by a DiGraph's node, adjacency and attribute dicts.
+
+    :param G: Graph to measure
+    :type G: nx.DiGraph
+    :return: Approximate size in bytes
+    :rtype: int
+    """
+    seen = set()
+
+    def sizeof(obj) -> int:
+        if id(obj) in seen:
+            return 0
+        seen.add(id(obj))
+        size = sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            size += sum(sizeof(k) + sizeof(v) for k, v in obj.items())
+        return size
+
+    return sizeof(G._node) + sizeof(G._succ) + sizeof(G._pred)
+
+
+def _chunks(rows: Iterable, size: int) -> Iterator[list]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _lookup(sorted_ids: np.ndarray, keys: np.ndarray) -> np.ndarray:
+    """Vectorized binary search; -1 where a key is absent"""
+    if not len(sorted_ids):
+        return np.full(len(keys), -1, dtype=np.int32)
+    index = np.searchsorted(sorted_ids, keys)
+    clipped = np.minimum(index, len(sorted_ids) - 1)
+    found = (sorted_ids[clipped] == keys) & (keys != b"")
+    return np.where(found, clipped, -1).astype(np.int32)
+
+
+def _reorder_segments(data: np.ndarray, lengths: np.ndarray, order: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Reorder variable-length byte segments; returns new data and offsets"""
+    starts = np.zeros(len(lengths), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=starts[1:])
+
+    new_lengths = lengths[order]
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(new_lengths, out=offsets[1:])
+
+    # for each output byte: its segment's source start minus its destination start
+    shift = np.repeat(starts[order] - offsets[:-1], new_lengths)
+    return data[np.arange(offsets[-1]) + shift], offsets
@@ -1,8 +1,79 @@
+import logging
 import streamlit as st
-from handler.cursor import Connection
+from typing import Type
+from handler.cursor import Connection, SEARCH_PAGE_SIZE
+from models.orgchart import Employee
+from config.employee_types import EMPLOYEE_TYPES
+from utilities.org_version import get_org_version
 
+logger = logging.getLogger(__name__)
+
+# Seconds a cached search result is reused
+SEARCH_CACHE_TTL = 60
+
+_TABLES = {config.table_class.__tablename__: config.table_class for config in EMPLOYEE_TYPES.values()}
+
+
+@st.cache_resource
 def get_db_connection() -> Connection:
-    """Get or create database connection in session state"""
-    if "my_client" not in st.session_state:
-        st.session_state.my_client = Connection()
-    return st.session_state.my_client
+    """Get the database connection shared by every browser session in this process"""
+    return Connection()
+
+
+@st.cache_data(ttl=SEARCH_CACHE_TTL, max_entries=2048, show_spinner=False)
+def _cached_search(table_name: str, query: str, limit: int, offset: int, version: int) -> list[Employee]:
+    # version is only part of the cache key, so a write makes every cached page stale;
+    # errors raise so the empty fallback is never cached
+    return get_db_connection()._search_employees(_TABLES[table_name], query, limit, offset)
+
+
+@st.cache_data(ttl=SEARCH_CACHE_TTL, max_entries=2048, show_spinner=False)
+def _cached_employee(table_name: str, emp_id: str, version: int) -> Employee | None:
+    return get_db_connection().getEmployee(_TABLES[table_name], emp_id)
+
+
+def search_employees(table: Type, query: str = "", limit: int = SEARCH_PAGE_SIZE, offset: int = 0) -> list[Employee]:
+    """
+    Search one tier by name, with results cached across sessions.
+
+    Results are keyed by the org version, so they are reused until a write
+    changes the data or the TTL expires.
+
+    :param table: Tier table to search
+    :type table: Type
+    :param query: Name or name fragment
+    :type query: str
+    :param limit: Maximum number of results
+    :type limit: int
+    :param offset: Number of results to skip
+    :type offset: int
+    :return: Matching people (empty, and not cached, if the search fails)
+    :rtype: list[Employee]
+    """
+    try:
+        version = get_org_version(get_db_connection().connection)
+        return _cached_search(table.__tablename__, (query or "").strip(), limit, offset, version)
+    except Exception as e:
+        logger.error(f"Error in search employees: {repr(e)}")
+        return []
+
+
+def get_employee(table: Type, emp_id: str | None) -> Employee | None:
+    """
+    Fetch one person by ID, with results cached like search_employees.
+
+    :param table: Tier table to read
+    :type table: Type
+    :param emp_id: Employee ID
+    :type emp_id: str | None
+    :return: The person, or None if not found or the lookup fails
+    :rtype: Employee | None
+    """
+    if not emp_id:
+        return None
+    try:
+        version = get_org_version(get_db_connection().connection)
+        return _cached_employee(table.__tablename__, emp_id, version)
+    except Exception as e:
+        logger.error(f"Error in get employee: {repr(e)}")
+        return None
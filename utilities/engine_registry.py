@@ -0,0 +1,324 @@
+import os
+import atexit
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+from sqlalchemy import create_engine, URL, make_url
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+from utilities.sql_profiler import profile_from_env
+
+logger = logging.getLogger(__name__)
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_int(name: str, default: Optional[int]) -> Optional[int]:
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    return int(value)
+
+
+@dataclass
+class PoolSettings:
+    """Connection pool configuration shared by every engine in the registry"""
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: int = 30
+    pool_pre_ping: bool = True
+    pool_recycle: int = 1800
+    statement_timeout_ms: Optional[int] = None
+
+    @classmethod
+    def from_env(cls) -> "PoolSettings":
+        """
+        Build pool settings from DB_POOL_* environment variables.
+
+        :return: Pool settings with defaults for unset variables
+        :rtype: PoolSettings
+        """
+        defaults = cls()
+        return cls(
+            pool_size=_env_int("DB_POOL_SIZE", defaults.pool_size),
+            max_overflow=_env_int("DB_MAX_OVERFLOW", defaults.max_overflow),
+            pool_timeout=_env_int("DB_POOL_TIMEOUT", defaults.pool_timeout),
+            pool_pre_ping=_env_bool("DB_POOL_PRE_PING", defaults.pool_pre_ping),
+            pool_recycle=_env_int("DB_POOL_RECYCLE", defaults.pool_recycle),
+            statement_timeout_ms=_env_int("DB_STATEMENT_TIMEOUT_MS", defaults.statement_timeout_ms),
+        )
+
+
+class PoolWaitStats:
+    """Thread-safe summary of how long callers waited to check out a connection"""
+
+    BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.bucket_counts = [0] * (len(self.BUCKETS_MS) + 1)
+
+    def record(self, seconds: float):
+        """
+        Record a single checkout wait.
+
+        :param seconds: Time spent waiting for a pooled connection
+        :type seconds: float
+        """
+        elapsed_ms = seconds * 1000
+        index = len(self.BUCKETS_MS)
+        for i, bound in enumerate(self.BUCKETS_MS):
+            if elapsed_ms <= bound:
+                index = i
+                break
+        with self._lock:
+            self.count += 1
+            self.total_seconds += seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+            self.bucket_counts[index] += 1
+
+    def snapshot(self) -> dict:
+        """
+        Get a point-in-time copy of the wait statistics.
+
+        :return: Count, mean/max wait in milliseconds and bucket counts
+        :rtype: dict
+        """
+        with self._lock:
+            labels = [f"<={bound}ms" for bound in self.BUCKETS_MS] + [f">{self.BUCKETS_MS[-1]}ms"]
+            return {
+                "checkouts": self.count,
+                "mean_wait_ms": (self.total_seconds / self.count * 1000) if self.count else 0.0,
+                "max_wait_ms": self.max_seconds * 1000,
+                "buckets": dict(zip(labels, self.bucket_counts)),
+            }
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection"""
+
+    wait_stats: Optional[PoolWaitStats] = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            if self.wait_stats is not None:
+                self.wait_stats.record(time.perf_counter() - start)
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep reporting into the same stats
+        pool = super().recreate()
+        pool.wait_stats = self.wait_stats
+        return pool
+
+
+_engines: dict[str, Engine] = {}
+_async_engines: dict = {}
+_wait_stats: dict[str, PoolWaitStats] = {}
+_lock = threading.Lock()
+
+
+def build_db_url(drivername: str = "postgresql+psycopg2", admin: bool = False) -> URL:
+    """
+    Build the application database URL from environment variables.
+
+    :param drivername: SQLAlchemy dialect+driver (postgresql+asyncpg for async engines)
+    :type drivername: str
+    :param admin: Connect as the table owner (PG_USER) instead of the application
+        role, e.g. to run migrations
+    :type admin: bool
+    :return: SQLAlchemy URL for the application role
+    :rtype: URL
+    """
+    return URL.create(drivername=drivername,
+                      host=os.getenv("DB_HOST"),
+                      database=os.getenv("PG_DATABASE"),
+                      port=os.getenv("PG_PORT"),
+                      username=os.getenv("PG_USER" if admin else "DB_USER"),
+                      password=os.getenv("PG_PASSWORD" if admin else "DB_USER_PW"))
+
+
+def _is_memory_sqlite(url: URL) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def _create_engine(url: URL, settings: PoolSettings, stats: PoolWaitStats) -> Engine:
+    if _is_memory_sqlite(url):
+        # in-memory SQLite needs its single-connection pool to keep the database alive
+        return create_engine(url)
+
+    engine_kwargs = {
+        "poolclass": TimedQueuePool,
+        "pool_size": settings.pool_size,
+        "max_overflow": settings.max_overflow,
+        "pool_timeout": settings.pool_timeout,
+        "pool_pre_ping": settings.pool_pre_ping,
+        "pool_recycle": settings.pool_recycle,
+    }
+    if settings.statement_timeout_ms and url.get_backend_name() == "postgresql":
+        engine_kwargs["connect_args"] = {"options": f"-c statement_timeout={settings.statement_timeout_ms}"}
+
+    engine = create_engine(url, **engine_kwargs)
+    engine.pool.wait_stats = stats
+    return engine
+
+
+def get_engine(url: URL | str | None = None, settings: Optional[PoolSettings] = None) -> Engine:
+    """
+    Get the process-wide engine for a database URL, creating it on first use.
+
+    Every Connection, the graph builder and build.py share the engine (and so
+    the pool) for the same URL. Settings only apply when the engine is created.
+
+    :param url: Database URL (defaults to the URL built from environment variables)
+    :type url: URL | str | None
+    :param settings: Pool settings (defaults to PoolSettings.from_env())
+    :type settings: Optional[PoolSettings]
+    :return: Shared SQLAlchemy engine
+    :rtype: Engine
+
+    Example:
+        engine = get_engine()
+        with get_session(engine) as session:
+            ...
+    """
+    url = make_url(url) if url is not None else build_db_url()
+    key = url.render_as_string(hide_password=False)
+
+    engine = _engines.get(key)
+    if engine is not None:
+        return engine
+
+    with _lock:
+        engine = _engines.get(key)
+        if engine is None:
+            stats = PoolWaitStats()
+            engine = _create_engine(url, settings or PoolSettings.from_env(), stats)
+            profile_from_env(engine)
+            _engines[key] = engine
+            _wait_stats[key] = stats
+    return engine
+
+
+def get_async_engine(url: URL | str | None = None, settings: Optional[PoolSettings] = None):
+    """
+    Get the process-wide async engine for a database URL, creating it on first use.
+
+    Needs the async extra (asyncpg and greenlet). The engine uses SQLAlchemy's
+    asyncio-adapted queue pool with the same PoolSettings as get_engine(), but
+    does not record checkout waits.
+
+    :param url: Async database URL (defaults to the environment URL with the asyncpg driver)
+    :type url: URL | str | None
+    :param settings: Pool settings (defaults to PoolSettings.from_env())
+    :type settings: Optional[PoolSettings]
+    :return: Shared SQLAlchemy async engine
+    :rtype: AsyncEngine
+
+    Example:
+        client = AsyncConnection(get_async_engine())
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    url = make_url(url) if url is not None else build_db_url("postgresql+asyncpg")
+    key = url.render_as_string(hide_password=False)
+
+    engine = _async_engines.get(key)
+    if engine is not None:
+        return engine
+
+    with _lock:
+        engine = _async_engines.get(key)
+        if engine is None:
+            if _is_memory_sqlite(url):
+                engine = create_async_engine(url)
+            else:
+                settings = settings or PoolSettings.from_env()
+                engine_kwargs = {
+                    "pool_size": settings.pool_size,
+                    "max_overflow": settings.max_overflow,
+                    "pool_timeout": settings.pool_timeout,
+                    "pool_pre_ping": settings.pool_pre_ping,
+                    "pool_recycle": settings.pool_recycle,
+                }
+                if settings.statement_timeout_ms and url.get_backend_name() == "postgresql":
+                    engine_kwargs["connect_args"] = {
+                        "server_settings": {"statement_timeout": str(settings.statement_timeout_ms)}
+                    }
+                engine = create_async_engine(url, **engine_kwargs)
+            profile_from_env(engine.sync_engine)
+            _async_engines[key] = engine
+    return engine
+
+
+def get_pool_stats(engine: Optional[Engine] = None) -> dict:
+    """
+    Report pool occupancy and checkout wait times for a registered engine.
+
+    :param engine: Engine to report on (defaults to the environment engine)
+    :type engine: Optional[Engine]
+    :return: Pool status plus checkout wait statistics
+    :rtype: dict
+    """
+    engine = engine or get_engine()
+    key = engine.url.render_as_string(hide_password=False)
+    pool = engine.pool
+    stats = {"url": engine.url.render_as_string(hide_password=True), "status": pool.status()}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+        })
+    if key in _wait_stats:
+        stats["wait"] = _wait_stats[key].snapshot()
+    return stats
+
+
+def registered_engines() -> list[Engine]:
+    """
+    Get every engine created by the registry in this process.
+
+    :return: Registered engines
+    :rtype: list[Engine]
+    """
+    with _lock:
+        return list(_engines.values())
+
+
+def dispose_engines():
+    """Dispose every registered engine and clear the registry"""
+    with _lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
+        _wait_stats.clear()
+
+
+async def dispose_async_engines():
+    """Dispose every registered async engine and clear the async registry"""
+    with _lock:
+        engines = list(_async_engines.values())
+        _async_engines.clear()
+    for engine in engines:
+        await engine.dispose()
+
+
+@atexit.register
+def _log_pool_stats():
+    for engine in registered_engines():
+        stats = get_pool_stats(engine)
+        if "wait" in stats:
+            logger.info(f"Pool stats for {stats['url']}: {stats['wait']}")
@@ -1,6 +1,8 @@
 import logging
+import time
 from functools import wraps
 from typing import TypeVar, Callable
+from utilities.metrics import metrics, result_size
 
 T = TypeVar('T')
 
@@ -13,7 +15,8 @@ def handle_db_errors(operation_name: str, default_return=None):
     Decorator for consistent database error handling.
 
     Wraps a function to catch exceptions, log them properly, and return
-    a default value if specified.
+    a default value if specified. Every call's latency, result size and any
+    error are recorded in the metrics registry under the operation name.
 
     :param operation_name: Description of the operation (e.g., "add employee")
     :type operation_name: str
@@ -31,13 +34,20 @@ def handle_db_errors(operation_name: str, default_return=None):
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
         @wraps(func)
         def wrapper(*args, **kwargs):
+            start = time.perf_counter()
             try:
-                return func(*args, **kwargs)
+                result = func(*args, **kwargs)
             except Exception as e:
+                metrics.observe("db_operation_seconds", time.perf_counter() - start, operation=operation_name)
+                metrics.increment("db_operation_errors_total", operation=operation_name)
                 logger.error(f"Error in {operation_name}: {repr(e)}")
-                print(f"Error in {operation_name}: {repr(e)}")  
                 if default_return is not None:
                     return default_return
                 raise
+            metrics.observe("db_operation_seconds", time.perf_counter() - start, operation=operation_name)
+            size = result_size(result)
+            if size is not None:
+                metrics.increment("db_operation_rows_total", size, operation=operation_name)
+            return result
         return wrapper
     return decorator
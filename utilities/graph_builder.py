@@ -1,22 +1,26 @@
+import logging
+import threading
+import weakref
 import networkx as nx
-import streamlit as st
+from typing import Any, Callable
 from models.orgchart import SQLEmployee, SQLManager, SQLExecutive
-from utilities.connection_helper import get_db_connection
+from handler.cursor import Connection, ALL_EMPLOYEES_SQL
 from sqlalchemy import text
 from utilities.session_helper import get_readonly_session
 from utilities.errors import handle_db_errors
+from utilities.org_version import get_org_version
+from utilities.org_events import ChangeKind, OrgChange, OrgChangeSet, subscribe
+from utilities.compact_graph import CompactOrgGraph, full_name
+from utilities.ancestry import AncestryIndex
+from utilities.search_index import NameSearchIndex
 
-client = get_db_connection()
+logger = logging.getLogger(__name__)
 
-@handle_db_errors("build organizational graph", default_return=nx.DiGraph())
-def build_org_graph(emp_table: SQLEmployee = None, mgr_table: SQLManager = None, exec_table: SQLExecutive = None) -> nx.DiGraph:
-    """
-    Builds a networkx DiGraph from the three employee SQL tables using a single SQL query.
-    Parameters are kept for compatibility but not used in SQL approach.
-    """
+# shares the process-wide engine with the Streamlit sessions and build.py
+client = Connection()
 
-    # Single SQL query to get all employees and their supervisor relationships
-    query = """
+# Single SQL query to get all employees and their supervisor relationships
+ORG_QUERY = """
     SELECT emp_id, first_name, last_name, position, supervisor_id
     FROM (
         SELECT emp_id, first_name, last_name, position, supervisor_id FROM executive
@@ -28,11 +32,64 @@ def build_org_graph(emp_table: SQLEmployee = None, mgr_table: SQLManager = None,
     ORDER BY emp_id
     """
 
-    G = nx.DiGraph()
+# Every person with the fields the name search index covers
+SEARCH_QUERY = f"""
+    SELECT emp_id, first_name, last_name, position, department, tier
+    FROM {ALL_EMPLOYEES_SQL} AS all_employees
+    """
+
+class OrgGraph(nx.DiGraph):
+    """
+    Org DiGraph that the graph cache patches in place under its own lock.
+
+    Patches hold ``lock`` while they run and touch only the people changed.
+    A reader that iterates while writes may happen holds the lock for the
+    walk, or takes a private copy with snapshot() and iterates that.
+
+    Example:
+        G = get_org_graph().snapshot()
+        for emp_id, attrs in G.nodes(data=True):
+            ...
+    """
+
+    def __init__(self, incoming_graph_data=None, **attr):
+        super().__init__(incoming_graph_data, **attr)
+        self.lock = threading.RLock()
+
+    def snapshot(self) -> nx.DiGraph:
+        """
+        Copy the graph while no patch is running.
+
+        :return: A private copy that later writes do not change
+        :rtype: nx.DiGraph
+        """
+        with self.lock:
+            return nx.DiGraph(self)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.RLock()
+
+
+@handle_db_errors("build organizational graph", default_return=OrgGraph())
+def build_org_graph(emp_table: SQLEmployee = None, mgr_table: SQLManager = None, exec_table: SQLExecutive = None,
+                    db_client: Connection | None = None) -> nx.DiGraph:
+    """
+    Builds a networkx DiGraph from the three employee SQL tables using a single SQL query.
+    Table parameters are kept for compatibility but not used in SQL approach.
+    db_client defaults to the shared module-level Connection.
+    """
+
+    G = OrgGraph()
 
     # execute the query
-    with get_readonly_session(client.connection) as session:
-        result = session.execute(text(query))
+    with get_readonly_session((db_client or client).connection) as session:
+        result = session.execute(text(ORG_QUERY))
         all_employees = result.fetchall()
 
     # add all nodes first
@@ -47,4 +104,272 @@ def build_org_graph(emp_table: SQLEmployee = None, mgr_table: SQLManager = None,
         if supervisor_id and supervisor_id in G.nodes:
             G.add_edge(emp_id, supervisor_id)
 
-    return G
\ No newline at end of file
+    return G
+
+
+@handle_db_errors("build compact organizational graph")
+def build_compact_org_graph(db_client: Connection | None = None, chunk_size: int = 50000) -> CompactOrgGraph:
+    """
+    Builds an array-backed CompactOrgGraph from the same query as build_org_graph.
+
+    Rows are streamed from the server in chunks, so the full result set is
+    never held as Python objects.
+
+    :param db_client: Connection to read from (defaults to the shared module-level Connection)
+    :type db_client: Connection | None
+    :param chunk_size: Rows fetched and converted per chunk
+    :type chunk_size: int
+    :return: Compact organizational graph
+    :rtype: CompactOrgGraph
+    """
+    with get_readonly_session((db_client or client).connection) as session:
+        result = session.execute(text(ORG_QUERY), execution_options={"yield_per": chunk_size})
+        return CompactOrgGraph.from_row_chunks(result.partitions())
+
+
+@handle_db_errors("build name search index")
+def build_search_index(db_client: Connection | None = None, chunk_size: int = 50000) -> NameSearchIndex:
+    """
+    Builds a NameSearchIndex over every person in the three tier tables.
+
+    :param db_client: Connection to read from (defaults to the shared module-level Connection)
+    :type db_client: Connection | None
+    :param chunk_size: Rows fetched per round trip
+    :type chunk_size: int
+    :return: Name search index
+    :rtype: NameSearchIndex
+    """
+    with get_readonly_session((db_client or client).connection) as session:
+        result = session.execute(text(SEARCH_QUERY), execution_options={"yield_per": chunk_size})
+        return NameSearchIndex(tuple(row) for row in result)
+
+
+def _full_name(attrs: dict) -> str:
+    return full_name(attrs.get("first_name"), attrs.get("last_name"))
+
+
+def apply_org_changes(G: nx.DiGraph, changes: list[OrgChange]) -> nx.DiGraph:
+    """
+    Patch an org graph in place so it matches the data after the given changes.
+
+    Work is proportional to the people touched, not to the size of the org.
+    The caller must keep readers out while it runs (see patch_org_graph).
+
+    :param G: Graph built by build_org_graph
+    :type G: nx.DiGraph
+    :param changes: Committed changes, in commit order
+    :type changes: list[OrgChange]
+    :return: The same graph, patched
+    :rtype: nx.DiGraph
+    """
+    for change in changes:
+        emp_id = change.emp_id
+        if change.kind is ChangeKind.ADD:
+            G.add_node(emp_id, label=_full_name(change.attrs), position=change.attrs.get("position"))
+            supervisor_id = change.attrs.get("supervisor_id")
+            if supervisor_id and supervisor_id in G.nodes:
+                G.add_edge(emp_id, supervisor_id)
+
+        elif change.kind is ChangeKind.UPDATE:
+            if emp_id not in G.nodes:
+                continue
+            G.nodes[emp_id].update(label=_full_name(change.attrs), position=change.attrs.get("position"))
+            # move the reporting edge
+            G.remove_edges_from(list(G.out_edges(emp_id)))
+            supervisor_id = change.attrs.get("supervisor_id")
+            if supervisor_id and supervisor_id in G.nodes:
+                G.add_edge(emp_id, supervisor_id)
+
+        elif change.kind is ChangeKind.DELETE:
+            if change.reassign_to and change.reassign_to in G.nodes:
+                G.add_edges_from((subordinate, change.reassign_to)
+                                 for subordinate in change.reassigned if subordinate in G.nodes)
+            # remaining subordinates lose their edge, as ON DELETE SET NULL does
+            if emp_id in G.nodes:
+                G.remove_node(emp_id)
+    return G
+
+
+def patch_org_graph(G: OrgGraph, changes: list[OrgChange]) -> OrgGraph:
+    """
+    Patch the cached graph in place under its lock.
+
+    The write that published the changes pays only for the people it touched;
+    readers needing a stable view lock the graph or take a snapshot().
+
+    :param G: Cached graph
+    :type G: OrgGraph
+    :param changes: Committed changes, in commit order
+    :type changes: list[OrgChange]
+    :return: The same graph, patched
+    :rtype: OrgGraph
+    """
+    with G.lock:
+        return apply_org_changes(G, changes)
+
+
+class OrgGraphCache:
+    """
+    Process-wide cache of org artifacts keyed by the org data version.
+
+    Every browser session shares the cached values, which are rebuilt only after
+    a write has bumped the version. Entries with a registered patcher are updated
+    from change events instead: the patcher returns the new value, which replaces
+    the entry under the lock. Patchers run in the writer's call path, so they
+    update the value in place at a cost proportional to the change, guarded by
+    the value's own lock. Cached values must be treated as read-only.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._build_locks = {}
+        self._patchers = {}
+        # engine -> {name: (version, value)}
+        self._entries = weakref.WeakKeyDictionary()
+
+    def register_patcher(self, name: str, patcher: Callable[[Any, list[OrgChange]], Any]):
+        """
+        Register an updater for an entry.
+
+        :param name: Cache entry name
+        :type name: str
+        :param patcher: Applies committed changes to the cached value and returns
+            the value to cache; it must lock out the value's readers while it runs
+        :type patcher: Callable[[Any, list[OrgChange]], Any]
+        """
+        self._patchers[name] = patcher
+
+    def apply_changes(self, change_set: OrgChangeSet):
+        """
+        Patch cached values that were current right before the change set.
+
+        Entries that are further behind (e.g., after a write from another
+        process) are left alone and rebuilt on next access.
+
+        :param change_set: Committed changes and the version they produced
+        :type change_set: OrgChangeSet
+        """
+        with self._lock:
+            entries = self._entries.get(change_set.engine)
+            if not entries:
+                return
+            for name, (version, value) in list(entries.items()):
+                patcher = self._patchers.get(name)
+                if patcher is None or version != change_set.version - 1:
+                    continue
+                try:
+                    entries[name] = (change_set.version, patcher(value, change_set.changes))
+                except Exception as e:
+                    logger.error(f"Error patching cached {name}: {repr(e)}")
+                    del entries[name]
+
+    def get(self, db_client: Connection, name: str, builder: Callable[[Connection], Any]) -> Any:
+        """
+        Get a cached value, rebuilding it if the org version has moved on.
+
+        :param db_client: Connection whose data the value is built from
+        :type db_client: Connection
+        :param name: Cache entry name (e.g., 'graph')
+        :type name: str
+        :param builder: Builds the value from a Connection
+        :type builder: Callable[[Connection], Any]
+        :return: Cached or freshly built value
+        :rtype: Any
+        """
+        engine = db_client.connection
+        version = get_org_version(engine)
+
+        entry = self._entries.get(engine, {}).get(name)
+        if entry and entry[0] == version:
+            return entry[1]
+
+        # one rebuild per entry at a time; other sessions wait and reuse it
+        with self._lock:
+            build_lock = self._build_locks.setdefault((id(engine), name), threading.Lock())
+        with build_lock:
+            entry = self._entries.get(engine, {}).get(name)
+            if entry and entry[0] == version:
+                return entry[1]
+            value = builder(db_client)
+            with self._lock:
+                self._entries.setdefault(engine, {})[name] = (version, value)
+            return value
+
+    def invalidate(self):
+        """Drop every cached value"""
+        with self._lock:
+            self._entries.clear()
+
+
+graph_cache = OrgGraphCache()
+# both lock their own readers out while they are patched in place
+graph_cache.register_patcher("graph", patch_org_graph)
+graph_cache.register_patcher("search", NameSearchIndex.apply_changes)
+subscribe(graph_cache.apply_changes)
+
+
+@handle_db_errors("get organizational graph", default_return=OrgGraph())
+def get_org_graph(db_client: Connection | None = None) -> nx.DiGraph:
+    """
+    Get the org graph shared by every session, rebuilding it only after the data changes.
+
+    :param db_client: Connection to read from (defaults to the shared module-level Connection)
+    :type db_client: Connection | None
+    :return: Cached organizational graph (read-only; patched in place by later
+        writes, so lock it or take a snapshot() before iterating)
+    :rtype: nx.DiGraph
+    """
+    # call the undecorated builder so a failed build raises instead of caching an empty graph
+    return graph_cache.get(db_client or client, "graph",
+                           lambda c: build_org_graph.__wrapped__(db_client=c))
+
+
+@handle_db_errors("get compact organizational graph")
+def get_compact_org_graph(db_client: Connection | None = None) -> CompactOrgGraph:
+    """
+    Get the shared CompactOrgGraph, rebuilding it only after the data changes.
+
+    :param db_client: Connection to read from (defaults to the shared module-level Connection)
+    :type db_client: Connection | None
+    :return: Cached compact organizational graph (read-only)
+    :rtype: CompactOrgGraph
+    """
+    return graph_cache.get(db_client or client, "compact",
+                           lambda c: build_compact_org_graph.__wrapped__(db_client=c))
+
+
+@handle_db_errors("get ancestry index")
+def get_ancestry_index(db_client: Connection | None = None) -> AncestryIndex:
+    """
+    Get the shared AncestryIndex over the compact org graph.
+
+    Rebuilt together with the compact graph whenever the org version changes.
+
+    :param db_client: Connection to read from (defaults to the shared module-level Connection)
+    :type db_client: Connection | None
+    :return: Cached ancestry index (read-only)
+    :rtype: AncestryIndex
+
+    Example:
+        if get_ancestry_index().reports_to(jim_id, david_id):
+            ...
+    """
+    return graph_cache.get(db_client or client, "ancestry",
+                           lambda c: AncestryIndex(get_compact_org_graph.__wrapped__(db_client=c)))
+
+
+@handle_db_errors("get name search index")
+def get_search_index(db_client: Connection | None = None) -> NameSearchIndex:
+    """
+    Get the shared NameSearchIndex, patched in place as writes are committed.
+
+    :param db_client: Connection to read from (defaults to the shared module-level Connection)
+    :type db_client: Connection | None
+    :return: Cached name search index
+    :rtype: NameSearchIndex
+
+    Example:
+        hits = get_search_index().search("dwi", k=5, tier="manager")
+    """
+    return graph_cache.get(db_client or client, "search",
+                           lambda c: build_search_index.__wrapped__(db_client=c))
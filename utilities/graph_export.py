@@ -0,0 +1,351 @@
+"""
+Streaming export of the org graph to Cytoscape JSON, GraphML and GEXF.
+Output is produced in chunks straight from the graph or the query rows, so the
+whole document is never held in memory as one string.
+"""
+
+import json
+import zlib
+import tempfile
+from itertools import islice
+from typing import IO, Iterator, Optional
+from xml.sax.saxutils import escape, quoteattr
+import networkx as nx
+from sqlalchemy import text
+from handler.cursor import Connection
+from utilities.session_helper import get_readonly_session
+from utilities.compact_graph import CompactOrgGraph, full_name
+
+# format -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    "cytoscape": (".json", "application/json"),
+    "graphml": (".graphml", "application/xml"),
+    "gexf": (".gexf", "application/xml"),
+}
+
+# Node attributes written to GraphML/GEXF
+NODE_ATTRIBUTES = ("label", "position")
+
+# Characters buffered before a chunk is encoded (and compressed) and yielded
+EXPORT_BUFFER_SIZE = 1 << 16
+
+# Exports larger than this spill from memory to a temporary file
+SPOOL_MAX_MEMORY = 8 << 20
+
+
+def iter_org_rows(db_client: Connection | None = None, chunk_size: int = 50000) -> Iterator[tuple]:
+    """
+    Stream the org query rows from the server in chunks.
+
+    :param db_client: Connection to read from (defaults to the shared graph_builder Connection)
+    :type db_client: Connection | None
+    :param chunk_size: Rows fetched per round trip
+    :type chunk_size: int
+    :yield: (emp_id, first_name, last_name, position, supervisor_id) rows, ordered by emp_id
+    :rtype: Iterator[tuple]
+    """
+    from utilities.graph_builder import ORG_QUERY, client
+
+    with get_readonly_session((db_client or client).connection) as session:
+        result = session.execute(text(ORG_QUERY), execution_options={"yield_per": chunk_size})
+        for row in result:
+            yield tuple(row)
+
+
+def _elements(source) -> Iterator[tuple]:
+    """
+    Walk a graph source as ("node", emp_id, attrs) items followed by
+    ("edge", emp_id, supervisor_id) items.
+
+    Accepts a networkx graph, a CompactOrgGraph, or query rows. Rows are read
+    once; only the IDs and supervisor pairs are kept until the edges are written.
+    """
+    if isinstance(source, nx.Graph):
+        for node, attrs in source.nodes(data=True):
+            yield "node", node, attrs
+        for u, v in source.edges():
+            yield "edge", u, v
+
+    elif isinstance(source, CompactOrgGraph):
+        for i in range(len(source)):
+            yield "node", source.emp_id(i), {"label": source.label(i), "position": source.position(i)}
+        for i in range(len(source)):
+            if source.parent[i] >= 0:
+                yield "edge", source.emp_id(i), source.emp_id(source.parent[i])
+
+    else:
+        seen, pending = set(), []
+        for emp_id, first_name, last_name, position, supervisor_id in source:
+            seen.add(emp_id)
+            if supervisor_id:
+                pending.append((emp_id, supervisor_id))
+            yield "node", emp_id, {"label": full_name(first_name, last_name), "position": position}
+        for emp_id, supervisor_id in pending:
+            # same rule as build_org_graph: no edge to an unknown supervisor
+            if supervisor_id in seen:
+                yield "edge", emp_id, supervisor_id
+
+
+def _cytoscape_node(node, attrs: dict) -> dict:
+    # same shape nx.cytoscape_data produces
+    data = dict(attrs)
+    data["id"] = attrs.get("id") or str(node)
+    data["value"] = node
+    data["name"] = attrs.get("name") or str(node)
+    return {"data": data}
+
+
+def _cytoscape_edge(source, target) -> dict:
+    return {"data": {"source": source, "target": target}}
+
+
+def iter_cytoscape(source) -> Iterator[str]:
+    """
+    Serialize a graph source as Cytoscape JSON, one element at a time.
+
+    The result parses to the same document as nx.cytoscape_data(G).
+
+    :param source: networkx graph, CompactOrgGraph or org query rows
+    :yield: JSON text fragments
+    :rtype: Iterator[str]
+    """
+    graph_data = list(source.graph.items()) if isinstance(source, nx.Graph) else []
+    yield (f'{{"data": {json.dumps(graph_data)}, "directed": true, "multigraph": false, '
+           f'"elements": {{"nodes": [')
+
+    in_nodes, first = True, True
+    for kind, a, b in _elements(source):
+        if kind == "edge" and in_nodes:
+            yield '], "edges": ['
+            in_nodes, first = False, True
+        element = _cytoscape_node(a, b) if kind == "node" else _cytoscape_edge(a, b)
+        yield json.dumps(element) if first else ", " + json.dumps(element)
+        first = False
+
+    if in_nodes:
+        yield '], "edges": ['
+    yield "]}}"
+
+
+def _xml_data(attrs: dict) -> Iterator[tuple[str, str]]:
+    for name in NODE_ATTRIBUTES:
+        value = attrs.get(name)
+        if value is not None:
+            yield name, str(value)
+
+
+def iter_graphml(source) -> Iterator[str]:
+    """
+    Serialize a graph source as GraphML, one element at a time.
+
+    Nodes carry the label and position attributes; nx.read_graphml reads the
+    result back into the same graph.
+
+    :param source: networkx graph, CompactOrgGraph or org query rows
+    :yield: XML text fragments
+    :rtype: Iterator[str]
+    """
+    yield ("<?xml version='1.0' encoding='utf-8'?>\n"
+           '<graphml xmlns="http://graphml.graphdrawing.org/xmlns" '
+           'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+           'xsi:schemaLocation="http://graphml.graphdrawing.org/xmlns '
+           'http://graphml.graphdrawing.org/xmlns/1.0/graphml.xsd">\n')
+    for name in NODE_ATTRIBUTES:
+        yield f'  <key id="{name}" for="node" attr.name="{name}" attr.type="string" />\n'
+    yield '  <graph edgedefault="directed">\n'
+
+    for kind, a, b in _elements(source):
+        if kind == "node":
+            data = "".join(f'<data key="{name}">{escape(value)}</data>' for name, value in _xml_data(b))
+            yield f"    <node id={quoteattr(str(a))}>{data}</node>\n"
+        else:
+            yield f"    <edge source={quoteattr(str(a))} target={quoteattr(str(b))} />\n"
+
+    yield "  </graph>\n</graphml>\n"
+
+
+def iter_gexf(source) -> Iterator[str]:
+    """
+    Serialize a graph source as GEXF 1.2, one element at a time.
+
+    The label becomes the GEXF node label and position a node attribute;
+    nx.read_gexf reads the result back into the same graph.
+
+    :param source: networkx graph, CompactOrgGraph or org query rows
+    :yield: XML text fragments
+    :rtype: Iterator[str]
+    """
+    yield ("<?xml version='1.0' encoding='utf-8'?>\n"
+           '<gexf xmlns="http://www.gexf.net/1.2draft" version="1.2">\n'
+           '  <graph defaultedgetype="directed" mode="static" name="">\n'
+           '    <attributes class="node" mode="static">\n'
+           '      <attribute id="0" title="position" type="string" />\n'
+           '    </attributes>\n'
+           '    <nodes>\n')
+
+    in_nodes, edge_id = True, 0
+    for kind, a, b in _elements(source):
+        if kind == "node":
+            label = b.get("label")
+            label = quoteattr(str(label if label is not None else a))
+            position = b.get("position")
+            values = ("" if position is None else
+                      f'<attvalues><attvalue for="0" value={quoteattr(str(position))} /></attvalues>')
+            yield f"      <node id={quoteattr(str(a))} label={label}>{values}</node>\n"
+        else:
+            if in_nodes:
+                yield "    </nodes>\n    <edges>\n"
+                in_nodes = False
+            yield f'      <edge id="{edge_id}" source={quoteattr(str(a))} target={quoteattr(str(b))} />\n'
+            edge_id += 1
+
+    if in_nodes:
+        yield "    </nodes>\n    <edges>\n"
+    yield "    </edges>\n  </graph>\n</gexf>\n"
+
+
+_SERIALIZERS = {
+    "cytoscape": iter_cytoscape,
+    "graphml": iter_graphml,
+    "gexf": iter_gexf,
+}
+
+
+def iter_export(source, fmt: str = "cytoscape", compress: bool = False,
+                buffer_size: int = EXPORT_BUFFER_SIZE) -> Iterator[bytes]:
+    """
+    Serialize a graph source to UTF-8 bytes in chunks of roughly buffer_size.
+
+    :param source: networkx graph, CompactOrgGraph or org query rows
+    :param fmt: One of EXPORT_FORMATS
+    :type fmt: str
+    :param compress: Gzip the output
+    :type compress: bool
+    :param buffer_size: Characters buffered per chunk
+    :type buffer_size: int
+    :yield: Encoded (and optionally gzip-compressed) chunks
+    :rtype: Iterator[bytes]
+
+    Example:
+        for chunk in iter_export(iter_org_rows(), "graphml", compress=True):
+            out.write(chunk)
+    """
+    if fmt not in _SERIALIZERS:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+    # wbits=31 writes a gzip header and trailer
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    pending, size = [], 0
+
+    def drain() -> bytes:
+        data = "".join(pending).encode("utf-8")
+        pending.clear()
+        return compressor.compress(data) if compressor else data
+
+    for fragment in _SERIALIZERS[fmt](source):
+        pending.append(fragment)
+        size += len(fragment)
+        if size >= buffer_size:
+            chunk = drain()
+            size = 0
+            if chunk:
+                yield chunk
+
+    chunk = drain()
+    if compressor:
+        chunk += compressor.flush()
+    if chunk:
+        yield chunk
+
+
+def write_export(source, out: IO[bytes], fmt: str = "cytoscape", compress: bool = False) -> int:
+    """
+    Stream an export into a binary file object.
+
+    :param source: networkx graph, CompactOrgGraph or org query rows
+    :param out: Binary file object to write to
+    :type out: IO[bytes]
+    :param fmt: One of EXPORT_FORMATS
+    :type fmt: str
+    :param compress: Gzip the output
+    :type compress: bool
+    :return: Number of bytes written
+    :rtype: int
+    """
+    written = 0
+    for chunk in iter_export(source, fmt, compress):
+        out.write(chunk)
+        written += len(chunk)
+    return written
+
+
+def export_to_file(source, fmt: str = "cytoscape", compress: bool = False,
+                   max_memory: int = SPOOL_MAX_MEMORY) -> IO[bytes]:
+    """
+    Stream an export into a temporary file, rewound and ready to read.
+
+    Small exports stay in memory; larger ones spill to disk.
+
+    :param source: networkx graph, CompactOrgGraph or org query rows
+    :param fmt: One of EXPORT_FORMATS
+    :type fmt: str
+    :param compress: Gzip the output
+    :type compress: bool
+    :param max_memory: Bytes kept in memory before spilling to disk
+    :type max_memory: int
+    :return: Temporary binary file positioned at the start
+    :rtype: IO[bytes]
+    """
+    out = tempfile.SpooledTemporaryFile(max_size=max_memory, mode="w+b")
+    write_export(source, out, fmt, compress)
+    out.seek(0)
+    return out
+
+
+def export_file_name(stem: str, fmt: str, compress: bool = False) -> str:
+    """File name with the extension for a format, plus .gz when compressed"""
+    return stem + EXPORT_FORMATS[fmt][0] + (".gz" if compress else "")
+
+
+def export_mime_type(fmt: str, compress: bool = False) -> str:
+    """MIME type for a format, or application/gzip when compressed"""
+    return "application/gzip" if compress else EXPORT_FORMATS[fmt][1]
+
+
+def cytoscape_preview(source, limit: int = 20, indent: Optional[int] = 2) -> str:
+    """
+    Cytoscape JSON for the first few nodes and the edges between them.
+
+    Only the first limit nodes are read, so previewing a large graph costs the
+    same as previewing a small one. Row iterators are consumed up to limit rows.
+
+    :param source: networkx graph, CompactOrgGraph or org query rows
+    :param limit: Maximum number of nodes (and edges) to include
+    :type limit: int
+    :param indent: JSON indentation
+    :type indent: Optional[int]
+    :return: Pretty-printed JSON preview
+    :rtype: str
+    """
+    if isinstance(source, (nx.Graph, CompactOrgGraph)):
+        nodes = [(node, attrs) for kind, node, attrs in islice(_elements(source), limit) if kind == "node"]
+        ids = {node for node, _ in nodes}
+        if isinstance(source, nx.Graph):
+            edges = [(u, v) for u, _ in nodes for v in source.successors(u) if v in ids]
+        else:
+            edges = [(u, source.parent_of(u)) for u, _ in nodes if source.parent_of(u) in ids]
+    else:
+        elements = list(_elements(list(islice(source, limit))))
+        nodes = [(node, attrs) for kind, node, attrs in elements if kind == "node"]
+        edges = [(u, v) for kind, u, v in elements if kind == "edge"]
+
+    preview = {
+        "data": [],
+        "directed": True,
+        "multigraph": False,
+        "elements": {
+            "nodes": [_cytoscape_node(node, attrs) for node, attrs in nodes],
+            "edges": [_cytoscape_edge(u, v) for u, v in edges[:limit]],
+        },
+    }
+    return json.dumps(preview, indent=indent)
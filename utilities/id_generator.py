@@ -1,16 +1,184 @@
+"""
+Employee ID generation.
+
+IDs are 32 hex characters, the width of the MD5 IDs they replace. Two schemes:
+
+- blake2 (default): a keyed BLAKE2b digest of the name, so rebuilding the
+  same roster gives everyone the same ID. The first name is length-prefixed,
+  so "Jim Halpert" and "JimH Alpert" no longer collide. The n-th person with
+  the same name hashes in n, so namesakes get distinct IDs.
+- uuid7: a random, time-ordered UUIDv7 (RFC 9562). New rows land at the
+  right-hand edge of the emp_id index instead of on random pages.
+
+EMP_ID_SCHEME picks the scheme and EMP_ID_KEY keys the hash. Changing the key
+changes every generated ID; existing MD5 IDs are migrated with
+`uv run python build.py rekey` (see utilities/rekey.py).
+"""
+
+import os
+import time
 import hashlib
+from typing import Callable, Iterable, Optional
+from sqlalchemy import select, union_all
+from config.employee_types import EMPLOYEE_TYPES
+
+ID_SCHEMES = ("blake2", "uuid7")
+
+ID_SCHEME = os.getenv("EMP_ID_SCHEME") or "blake2"
+
+# BLAKE2b keys are at most 64 bytes
+ID_KEY = (os.getenv("EMP_ID_KEY") or "the-office-orgchart").encode("utf-8")[:64]
+
+# IDs per existence query; each is bound once per tier, which keeps SQLite under its parameter limit
+EXISTS_CHECK_CHUNK = 5000
+
+# Attempts per ID before collision resolution gives up
+MAX_COLLISION_RETRIES = 100
+
+# keying BLAKE2b costs more than hashing a name, so key once and copy per ID
+_keyed_hash = hashlib.blake2b(digest_size=16, key=ID_KEY)
+
+
+def legacy_employee_id(first_name: str, last_name: str) -> str:
+    """
+    The original MD5 ID of a name, used to find rows that still need rekeying.
+
+    :param first_name: Employee first name
+    :type first_name: str
+    :param last_name: Employee last name
+    :type last_name: str
+    :return: MD5 hash of the concatenated name
+    :rtype: str
+    """
+    return hashlib.md5((first_name + last_name).encode("utf-8")).hexdigest()
+
+
+def uuid7_employee_id() -> str:
+    """
+    Generate a time-ordered UUIDv7 as 32 hex characters.
+
+    :return: 48-bit millisecond timestamp followed by version, variant and 74 random bits
+    :rtype: str
+    """
+    millis = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), "big")
+    value = (millis << 80) | (0x7 << 76) | ((rand >> 62) & 0xFFF) << 64 | (0b10 << 62) | (rand & (2**62 - 1))
+    return f"{value:032x}"
 
 
-def generate_employee_id(first_name: str, last_name: str) -> str:
+def generate_employee_id(first_name: str, last_name: str, occurrence: int = 0,
+                         scheme: Optional[str] = None) -> str:
     """
-    Generate unique employee ID from name using MD5 hash.
+    Generate an employee ID from a name.
 
     :param first_name: Employee first name
     :type first_name: str
     :param last_name: Employee last name
     :type last_name: str
-    :return: MD5 hash of the combined name
+    :param occurrence: Number of earlier people with the same name (blake2 only)
+    :type occurrence: int
+    :param scheme: 'blake2' or 'uuid7' (defaults to EMP_ID_SCHEME)
+    :type scheme: Optional[str]
+    :return: 32-character hex ID
     :rtype: str
     """
-    data = first_name + last_name
-    return hashlib.md5(data.encode("utf-8")).hexdigest()
+    scheme = scheme or ID_SCHEME
+    if scheme == "uuid7":
+        return uuid7_employee_id()
+    if scheme != "blake2":
+        raise ValueError(f"Unknown ID scheme {scheme!r}; expected one of {ID_SCHEMES}")
+
+    data = f"{len(first_name)}:{first_name}{last_name}"
+    if occurrence:
+        data += f"#{occurrence}"
+    digest = _keyed_hash.copy()
+    digest.update(data.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def generate_employee_ids(names: Iterable[tuple[str, str]], scheme: Optional[str] = None,
+                          taken: Optional[Callable[[set[str]], set[str]]] = None) -> list[str]:
+    """
+    Generate IDs for a batch of names, unique within the batch and, given
+    taken, against IDs already stored.
+
+    Namesakes in the batch are numbered in order. IDs reported as taken are
+    regenerated with the next occurrence number (or a fresh UUID), checking
+    every retry round in one call.
+
+    :param names: (first_name, last_name) pairs
+    :type names: Iterable[tuple[str, str]]
+    :param scheme: 'blake2' or 'uuid7' (defaults to EMP_ID_SCHEME)
+    :type scheme: Optional[str]
+    :param taken: Returns the subset of the given IDs that already exist,
+        e.g. lambda ids: existing_employee_ids(session, ids)
+    :type taken: Optional[Callable[[set[str]], set[str]]]
+    :return: One ID per name, in input order
+    :rtype: list[str]
+    :raises RuntimeError: If an ID is still taken after MAX_COLLISION_RETRIES rounds
+
+    Example:
+        ids = generate_employee_ids([("Jim", "Halpert"), ("Jim", "Halpert")])
+    """
+    names = list(names)
+    next_occurrence = {}
+    ids = []
+    for name in names:
+        occurrence = next_occurrence.get(name, 0)
+        next_occurrence[name] = occurrence + 1
+        ids.append(generate_employee_id(*name, occurrence, scheme))
+
+    # a repeat within the batch needs a hash collision, or a name that spells
+    # another name plus its occurrence suffix; either way, retry it
+    assigned = set()
+    pending = []
+    for position, emp_id in enumerate(ids):
+        if emp_id in assigned:
+            pending.append(position)
+        else:
+            assigned.add(emp_id)
+
+    unchecked = set(assigned)
+    for _ in range(MAX_COLLISION_RETRIES):
+        clashes = taken(unchecked) if taken is not None and unchecked else set()
+        if clashes:
+            assigned -= clashes
+            pending += [position for position, emp_id in enumerate(ids)
+                        if emp_id in clashes and position not in pending]
+        if not pending:
+            return ids
+
+        unchecked = set()
+        retry = []
+        for position in pending:
+            name = names[position]
+            occurrence = next_occurrence[name]
+            next_occurrence[name] = occurrence + 1
+            ids[position] = generate_employee_id(*name, occurrence, scheme)
+            if ids[position] in assigned:
+                retry.append(position)
+            else:
+                assigned.add(ids[position])
+                unchecked.add(ids[position])
+        pending = retry
+    raise RuntimeError(f"Could not generate a free ID for {len(pending)} name(s)")
+
+
+def existing_employee_ids(session, emp_ids: Iterable[str]) -> set[str]:
+    """
+    The given IDs that are already used in any tier.
+
+    :param session: Session or connection to check in
+    :param emp_ids: Candidate IDs
+    :type emp_ids: Iterable[str]
+    :return: IDs found in the executive, manager or employee table
+    :rtype: set[str]
+    """
+    emp_ids = list(emp_ids)
+    tables = [config.table_class for config in EMPLOYEE_TYPES.values()]
+    found = set()
+    for start in range(0, len(emp_ids), EXISTS_CHECK_CHUNK):
+        chunk = emp_ids[start:start + EXISTS_CHECK_CHUNK]
+        found.update(session.scalars(union_all(*[select(table.emp_id).where(table.emp_id.in_(chunk))
+                                                 for table in tables])))
+    return found
@@ -0,0 +1,317 @@
+"""
+In-process metrics registry for database operations and sessions.
+
+handle_db_errors and the session helpers record latencies, row counts and
+errors into the shared `metrics` registry, which renders as summary rows for
+the Diagnostics page or as Prometheus text for scraping.
+
+The registry is per process. The HTTP service serves its own at /metrics;
+the Streamlit app serves its own from a background thread when METRICS_PORT
+is set (see start_metrics_server).
+"""
+
+import os
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from bisect import bisect_left
+from typing import Any, Optional, Sized
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# name -> (Prometheus type, help text)
+METRICS = {
+    "db_operation_seconds": ("histogram", "Latency of decorated database operations"),
+    "db_operation_errors_total": ("counter", "Database operations that raised an exception"),
+    "db_operation_rows_total": ("counter", "Rows (or items) returned by database operations"),
+    "db_session_seconds": ("histogram", "Time sessions were held open, by kind"),
+    "db_session_commit_seconds": ("histogram", "Time spent committing write sessions"),
+    "db_session_rollbacks_total": ("counter", "Write sessions rolled back after an error"),
+}
+
+
+class Histogram:
+    """Bucketed histogram of observed values with count, sum and max"""
+
+    __slots__ = ("bounds", "bucket_counts", "count", "total", "max")
+
+    def __init__(self, bounds: tuple[float, ...] = LATENCY_BUCKETS):
+        self.bounds = bounds
+        # one count per bound plus the +Inf bucket; not cumulative
+        self.bucket_counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.bucket_counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile by interpolating inside its bucket, as Prometheus'
+        histogram_quantile() does.
+
+        :param q: Quantile between 0 and 1
+        :type q: float
+        :return: Estimated value (0.0 with no observations)
+        :rtype: float
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.bucket_counts):
+            if seen + bucket_count >= rank and bucket_count:
+                if i == len(self.bounds):
+                    return self.max
+                lower = self.bounds[i - 1] if i else 0.0
+                upper = min(self.bounds[i], self.max)
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.max
+
+    def copy(self) -> "Histogram":
+        histogram = Histogram(self.bounds)
+        histogram.bucket_counts = list(self.bucket_counts)
+        histogram.count, histogram.total, histogram.max = self.count, self.total, self.max
+        return histogram
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(labels: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class MetricsRegistry:
+    """
+    Thread-safe store of counters and histograms keyed by name and labels.
+
+    Example:
+        metrics.observe("db_operation_seconds", 0.012, operation="add employee")
+        metrics.increment("db_operation_errors_total", operation="add employee")
+        text = metrics.to_prometheus()
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: dict[tuple[str, tuple], float] = {}
+        self._histograms: dict[tuple[str, tuple], Histogram] = {}
+
+    def observe(self, name: str, value: float, **labels: str):
+        """
+        Add an observation to a histogram.
+
+        :param name: Metric name
+        :type name: str
+        :param value: Observed value (seconds for latencies)
+        :type value: float
+        :param labels: Label values, e.g. operation="add employee"
+        :type labels: str
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def increment(self, name: str, amount: float = 1, **labels: str):
+        """
+        Add to a counter.
+
+        :param name: Metric name
+        :type name: str
+        :param amount: Amount to add
+        :type amount: float
+        :param labels: Label values
+        :type labels: str
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def counter(self, name: str, **labels: str) -> float:
+        """Current value of a counter (0 if never incremented)"""
+        with self._lock:
+            return self._counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    def histogram(self, name: str, **labels: str) -> Optional[Histogram]:
+        """Copy of a histogram, or None if nothing was observed"""
+        with self._lock:
+            histogram = self._histograms.get((name, tuple(sorted(labels.items()))))
+            return histogram.copy() if histogram is not None else None
+
+    def reset(self):
+        """Drop every recorded value"""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def _copy(self) -> tuple[dict, dict]:
+        with self._lock:
+            return dict(self._counters), {key: h.copy() for key, h in self._histograms.items()}
+
+    def summary(self, name: str, label: str, counters: dict[str, str] | None = None) -> list[dict]:
+        """
+        One row per label value of a latency histogram, for display.
+
+        :param name: Histogram name, e.g. db_operation_seconds
+        :type name: str
+        :param label: Label to group by, e.g. operation
+        :type label: str
+        :param counters: Extra columns: column name -> counter with the same label
+        :type counters: dict[str, str] | None
+        :return: Rows with calls, mean/p50/p95/p99/max in milliseconds and the
+            extra counters, slowest total time first
+        :rtype: list[dict]
+        """
+        counter_values, histograms = self._copy()
+        rows = []
+        for (metric, labels), histogram in histograms.items():
+            if metric != name:
+                continue
+            value = dict(labels).get(label, "")
+            row = {label: value, "calls": histogram.count,
+                   "total_ms": histogram.total * 1000,
+                   "mean_ms": histogram.total / histogram.count * 1000 if histogram.count else 0.0}
+            for q in (0.5, 0.95, 0.99):
+                row[f"p{int(q * 100)}_ms"] = histogram.quantile(q) * 1000
+            row["max_ms"] = histogram.max * 1000
+            for column, counter_name in (counters or {}).items():
+                row[column] = counter_values.get((counter_name, labels), 0)
+            rows.append(row)
+        return sorted(rows, key=lambda row: row["total_ms"], reverse=True)
+
+    def to_prometheus(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format (0.0.4).
+
+        :return: Exposition text
+        :rtype: str
+        """
+        counters, histograms = self._copy()
+        names = sorted({name for name, _ in counters} | {name for name, _ in histograms})
+        lines = []
+        for name in names:
+            kind, help_text = METRICS.get(name, ("untyped", name))
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f"{name}{_labels(labels)} {value:g}")
+            for (metric, labels), histogram in sorted(histograms.items(), key=lambda item: item[0]):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, bucket_count in zip(histogram.bounds + (float("inf"),), histogram.bucket_counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    bucket_labels = _labels(labels, 'le="' + le + '"')
+                    lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {histogram.total:.9g}")
+                lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+def result_size(result: Any) -> Optional[int]:
+    """
+    Number of rows or items in an operation's result, if it is a collection.
+
+    :param result: Return value of a database operation
+    :type result: Any
+    :return: len(result) for lists, tuples of rows, graphs and indexes; None otherwise
+    :rtype: Optional[int]
+    """
+    if isinstance(result, (str, bytes, dict)) or not isinstance(result, Sized):
+        return None
+    # a single result Row is a tuple of columns, not a collection of rows
+    if isinstance(result, tuple) and hasattr(result, "_mapping"):
+        return 1
+    return len(result)
+
+
+metrics = MetricsRegistry()
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_lock = threading.Lock()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Serves the shared registry at /metrics"""
+
+    def do_GET(self):
+        if self.path.split("?")[0].rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        body = metrics.to_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    do_HEAD = do_GET
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """
+    Serve this process's registry at /metrics from a daemon thread, once per process.
+
+    For processes other than the HTTP service, such as the Streamlit app,
+    whose script runs again on every rerun.
+
+    :param port: Port to listen on (0 picks a free one)
+    :type port: int
+    :param host: Address to bind
+    :type host: str
+    :return: The running server; later calls return the same one
+    :rtype: ThreadingHTTPServer
+
+    Example:
+        server = start_metrics_server(9100)
+        # curl http://localhost:9100/metrics
+    """
+    global _server
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+            logger.info(f"Serving metrics on port {_server.server_address[1]}")
+        return _server
+
+
+def stop_metrics_server():
+    """Stop the server started by start_metrics_server, if any"""
+    global _server
+    with _server_lock:
+        if _server is not None:
+            _server.shutdown()
+            _server.server_close()
+            _server = None
+
+
+def metrics_server_from_env() -> Optional[ThreadingHTTPServer]:
+    """
+    Start the metrics server when METRICS_PORT is set.
+
+    :return: The server, or None when METRICS_PORT is unset
+    :rtype: Optional[ThreadingHTTPServer]
+    """
+    port = os.getenv("METRICS_PORT", "").strip()
+    return start_metrics_server(int(port), os.getenv("METRICS_HOST") or "0.0.0.0") if port else None
@@ -0,0 +1,236 @@
+"""
+Versioned schema migrations.
+
+Migrations are applied in version order and recorded in schema_migrations.
+Online migrations build their indexes with CREATE INDEX CONCURRENTLY on
+PostgreSQL, which cannot run inside a transaction, so each statement runs in
+autocommit and an invalid index left by an interrupted build is dropped and
+rebuilt on the next run. Statements are idempotent (IF NOT EXISTS), so a
+migration that stopped halfway can simply be run again.
+
+The engine's statement_timeout (DB_STATEMENT_TIMEOUT_MS) is lifted for the
+migration connections so a long index build is not cancelled; lock_timeout
+is set instead, so DDL gives up rather than holding application writes
+queued behind it.
+
+Migrations run as the table owner, not the application role:
+
+    uv run python build.py migrate
+"""
+
+import re
+import time
+import logging
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
+from typing import Optional
+from sqlalchemy import text, select
+from sqlalchemy.engine import Engine, Row
+from models.orgchart import SQLSchemaMigration
+
+logger = logging.getLogger(__name__)
+
+# Key for pg_advisory_lock so concurrent `migrate` runs apply migrations one at a time
+MIGRATION_LOCK_KEY = 20_240_601
+# How long a migration statement may wait for a table lock before failing
+MIGRATION_LOCK_TIMEOUT_MS = 30_000
+
+_INDEX_NAME = re.compile(r"CREATE\s+(?:UNIQUE\s+)?INDEX\s+\{concurrently\}\s*IF\s+NOT\s+EXISTS\s+(\w+)", re.I)
+
+
+@dataclass(frozen=True)
+class Migration:
+    """
+    One schema change.
+
+    :param version: Position in the migration sequence; never reused
+    :param name: Short description
+    :param statements: SQL statements; {concurrently} becomes CONCURRENTLY on
+        PostgreSQL when the migration is online
+    :param online: Run each statement in autocommit so indexes build without
+        blocking writes
+    :param dialects: Dialects the statements apply to; elsewhere the migration
+        is recorded without running anything
+    :param grants: Privileges granted to the application role on PostgreSQL,
+        e.g. "SELECT ON person"
+    """
+    version: int
+    name: str
+    statements: tuple[str, ...]
+    online: bool = False
+    dialects: tuple[str, ...] = ("postgresql", "sqlite")
+    grants: tuple[str, ...] = ()
+
+
+MIGRATIONS = (
+    Migration(1, "supervisor_id indexes", (
+        # FK lookups for ON DELETE SET NULL, subordinate reassignment and direct-report queries
+        "CREATE INDEX {concurrently} IF NOT EXISTS ix_executive_supervisor_id ON executive (supervisor_id)",
+        "CREATE INDEX {concurrently} IF NOT EXISTS ix_manager_supervisor_id ON manager (supervisor_id)",
+        "CREATE INDEX {concurrently} IF NOT EXISTS ix_employee_supervisor_id ON employee (supervisor_id)",
+    ), online=True),
+    Migration(2, "department indexes", (
+        "CREATE INDEX {concurrently} IF NOT EXISTS ix_executive_department ON executive (department)",
+        "CREATE INDEX {concurrently} IF NOT EXISTS ix_manager_department ON manager (department)",
+        "CREATE INDEX {concurrently} IF NOT EXISTS ix_employee_department ON employee (department)",
+    ), online=True),
+    Migration(3, "trigram name search indexes", (
+        # serves the full-name ILIKE '%query%' filter in Connection.searchEmployees
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        "CREATE INDEX {concurrently} IF NOT EXISTS ix_executive_full_name_trgm "
+        "ON executive USING gin ((first_name || ' ' || last_name) gin_trgm_ops)",
+        "CREATE INDEX {concurrently} IF NOT EXISTS ix_manager_full_name_trgm "
+        "ON manager USING gin ((first_name || ' ' || last_name) gin_trgm_ops)",
+        "CREATE INDEX {concurrently} IF NOT EXISTS ix_employee_full_name_trgm "
+        "ON employee USING gin ((first_name || ' ' || last_name) gin_trgm_ops)",
+    ), online=True, dialects=("postgresql",)),
+    Migration(4, "org version counter", (
+        # databases created before config/00_init.sql added it fall back to a per-process counter
+        "CREATE TABLE IF NOT EXISTS org_version (id INTEGER PRIMARY KEY, version BIGINT NOT NULL DEFAULT 0)",
+        "INSERT INTO org_version (id, version) VALUES (1, 0) ON CONFLICT (id) DO NOTHING",
+    ), grants=("SELECT, UPDATE ON org_version",)),
+)
+
+
+@dataclass
+class MigrationResult:
+    """Outcome of applying one migration"""
+    version: int
+    name: str
+    elapsed: float
+    skipped: bool = False
+
+
+def _render(statement: str, migration: Migration, dialect: str) -> str:
+    concurrently = "CONCURRENTLY" if migration.online and dialect == "postgresql" else ""
+    return " ".join(statement.format(concurrently=concurrently).split())
+
+
+def applied_migrations(engine: Engine) -> dict[int, Row]:
+    """
+    Migrations recorded in schema_migrations, creating the table if needed.
+
+    :param engine: Engine connected as the table owner
+    :type engine: Engine
+    :return: version -> schema_migrations row (version, name, applied_at, duration_ms)
+    :rtype: dict[int, Row]
+    """
+    SQLSchemaMigration.__table__.create(engine, checkfirst=True)
+    with engine.connect() as conn:
+        rows = conn.execute(select(SQLSchemaMigration.__table__)).all()
+    return {row.version: row for row in rows}
+
+
+def pending_migrations(engine: Engine, target: Optional[int] = None) -> list[Migration]:
+    """
+    Migrations not yet applied, in order.
+
+    :param engine: Engine connected as the table owner
+    :type engine: Engine
+    :param target: Highest version to include (defaults to the latest)
+    :type target: Optional[int]
+    :return: Migrations to apply
+    :rtype: list[Migration]
+    """
+    applied = applied_migrations(engine)
+    return [migration for migration in MIGRATIONS
+            if migration.version not in applied and (target is None or migration.version <= target)]
+
+
+def _drop_invalid_index(conn, name: str):
+    """Drop an index left INVALID by an interrupted CREATE INDEX CONCURRENTLY"""
+    invalid = conn.execute(text(
+        "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE c.relname = :name AND NOT i.indisvalid"), {"name": name}).first()
+    if invalid:
+        logger.warning(f"Rebuilding invalid index {name}")
+        conn.exec_driver_sql(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+def _timeouts(dialect: str, lock_timeout_ms: int, scope: str = "SET") -> list[str]:
+    """Statements lifting the statement_timeout and setting lock_timeout on PostgreSQL"""
+    if dialect != "postgresql":
+        return []
+    return [f"{scope} statement_timeout = 0", f"{scope} lock_timeout = {int(lock_timeout_ms)}"]
+
+
+@contextmanager
+def _autocommit_connection(engine: Engine, lock_timeout_ms: int):
+    """Autocommit connection with the migration timeouts, reset before it goes back to the pool"""
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        settings = _timeouts(engine.dialect.name, lock_timeout_ms)
+        for statement in settings:
+            conn.exec_driver_sql(statement)
+        try:
+            yield conn
+        finally:
+            if settings:
+                conn.exec_driver_sql("RESET statement_timeout")
+                conn.exec_driver_sql("RESET lock_timeout")
+
+
+def _apply(engine: Engine, migration: Migration, lock_timeout_ms: int, grant_to: Optional[str]) -> MigrationResult:
+    dialect = engine.dialect.name
+    start = time.perf_counter()
+    record = SQLSchemaMigration.__table__.insert()
+    skipped = dialect not in migration.dialects
+    statements = [] if skipped else [_render(statement, migration, dialect) for statement in migration.statements]
+    grants = [f"GRANT {grant} TO {grant_to}" for grant in migration.grants
+              if grant_to and not skipped and dialect == "postgresql"]
+
+    if migration.online and statements:
+        with _autocommit_connection(engine, lock_timeout_ms) as conn:
+            for statement, raw in zip(statements, migration.statements):
+                match = _INDEX_NAME.search(raw)
+                if match and dialect == "postgresql":
+                    _drop_invalid_index(conn, match.group(1))
+                conn.exec_driver_sql(statement)
+        statements = []
+
+    statements += grants
+    with engine.begin() as conn:
+        if statements:
+            statements = _timeouts(dialect, lock_timeout_ms, scope="SET LOCAL") + statements
+        for statement in statements:
+            conn.exec_driver_sql(statement)
+        elapsed = time.perf_counter() - start
+        conn.execute(record, {"version": migration.version, "name": migration.name,
+                              "duration_ms": int(elapsed * 1000)})
+    return MigrationResult(migration.version, migration.name, elapsed, skipped)
+
+
+def migrate(engine: Engine, target: Optional[int] = None, lock_timeout_ms: int = MIGRATION_LOCK_TIMEOUT_MS,
+            grant_to: Optional[str] = None) -> list[MigrationResult]:
+    """
+    Apply pending migrations in order.
+
+    On PostgreSQL an advisory lock keeps concurrent runs from applying the
+    same migration twice.
+
+    :param engine: Engine connected as the table owner
+    :type engine: Engine
+    :param target: Highest version to apply (defaults to the latest)
+    :type target: Optional[int]
+    :param lock_timeout_ms: PostgreSQL lock_timeout for migration statements
+    :type lock_timeout_ms: int
+    :param grant_to: Application role to grant each migration's privileges to
+    :type grant_to: Optional[str]
+    :return: One result per applied migration
+    :rtype: list[MigrationResult]
+
+    Example:
+        for result in migrate(get_engine(build_db_url(admin=True))):
+            print(result.version, result.name, result.elapsed)
+    """
+    with ExitStack() as stack:
+        if engine.dialect.name == "postgresql":
+            # waits for another run as long as it takes
+            lock = stack.enter_context(_autocommit_connection(engine, lock_timeout_ms=0))
+            lock.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            stack.callback(lock.execute, text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+
+        results = []
+        for migration in pending_migrations(engine, target):
+            logger.info(f"Applying migration {migration.version}: {migration.name}")
+            results.append(_apply(engine, migration, lock_timeout_ms, grant_to))
+        return results
@@ -0,0 +1,98 @@
+"""
+In-process change events published by Connection after each committed write.
+Caches subscribe to patch themselves instead of rebuilding from scratch.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Callable, Optional, Type
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+
+class ChangeKind(Enum):
+    """Kind of change made to one person"""
+    ADD = "add"
+    UPDATE = "update"
+    DELETE = "delete"
+
+
+@dataclass
+class OrgChange:
+    """
+    A single committed change to one person.
+
+    attrs holds the person's new field values for ADD and UPDATE. For DELETE,
+    reassign_to and reassigned list where the person's subordinates were moved.
+    """
+    kind: ChangeKind
+    emp_id: str
+    table: Optional[Type] = None
+    attrs: dict = field(default_factory=dict)
+    reassign_to: Optional[str] = None
+    reassigned: list[str] = field(default_factory=list)
+
+
+@dataclass
+class OrgChangeSet:
+    """All changes committed by one transaction, and the org version it produced"""
+    engine: Engine
+    version: int
+    changes: list[OrgChange]
+
+
+_listeners: list[Callable[[OrgChangeSet], None]] = []
+_lock = threading.Lock()
+
+
+def subscribe(listener: Callable[[OrgChangeSet], None]):
+    """
+    Register a listener for committed change sets.
+
+    :param listener: Called with each OrgChangeSet after its transaction commits
+    :type listener: Callable[[OrgChangeSet], None]
+    """
+    with _lock:
+        if listener not in _listeners:
+            _listeners.append(listener)
+
+
+def unsubscribe(listener: Callable[[OrgChangeSet], None]):
+    """
+    Remove a previously registered listener.
+
+    :param listener: Listener passed to subscribe()
+    :type listener: Callable[[OrgChangeSet], None]
+    """
+    with _lock:
+        if listener in _listeners:
+            _listeners.remove(listener)
+
+
+def publish(engine: Engine, version: int, changes: list[OrgChange]):
+    """
+    Notify listeners of a committed transaction.
+
+    Listener errors are logged and never reach the writer, whose data is
+    already committed.
+
+    :param engine: Engine the changes were written through
+    :type engine: Engine
+    :param version: Org version produced by the transaction
+    :type version: int
+    :param changes: Changes made by the transaction
+    :type changes: list[OrgChange]
+    """
+    if not changes:
+        return
+    change_set = OrgChangeSet(engine, version, changes)
+    with _lock:
+        listeners = list(_listeners)
+    for listener in listeners:
+        try:
+            listener(change_set)
+        except Exception as e:
+            logger.error(f"Error in org change listener {listener!r}: {repr(e)}")
@@ -0,0 +1,131 @@
+"""
+Seeded synthetic org generator for scale testing.
+Produces rows in foreign-key order so they can stream straight into the bulk loader.
+"""
+
+import math
+import random
+import hashlib
+from typing import Iterator
+from models.orgchart import DepartmentType
+
+FIRST_NAMES = [
+    "Michael", "Dwight", "Jim", "Pam", "Ryan", "Andy", "Angela", "Kevin", "Oscar", "Stanley",
+    "Phyllis", "Meredith", "Creed", "Kelly", "Toby", "Darryl", "Erin", "Gabe", "Holly", "Jan",
+    "David", "Karen", "Roy", "Robert", "Nellie", "Clark", "Pete", "Todd", "Jo", "Deangelo",
+]
+
+LAST_NAMES = [
+    "Scott", "Schrute", "Halpert", "Beesly", "Howard", "Bernard", "Martin", "Malone", "Martinez",
+    "Hudson", "Vance", "Palmer", "Bratton", "Kapoor", "Flenderson", "Philbin", "Hannon", "Lewis",
+    "Flax", "Levinson", "Wallace", "Filippelli", "Anderson", "California", "Bertram", "Green",
+    "Miller", "Packer", "Bennett", "Vickers",
+]
+
+POSITIONS = {
+    "executive": ["CFO", "VP of Sales", "VP of Operations", "Regional Director", "Chief of Staff"],
+    "manager": ["Regional Manager", "Assistant Regional Manager", "Sales Manager", "Office Manager"],
+    "employee": ["Sales Representative", "Accountant", "Receptionist", "Customer Service Rep",
+                 "Warehouse Associate", "Quality Assurance", "Supplier Relations"],
+}
+
+DEPARTMENTS = [d.value for d in DepartmentType]
+
+
+def plan_org(size: int, fanout: int = 8, depth: int = 1) -> list[int]:
+    """
+    Split a head count into level sizes, top to bottom.
+
+    The last two levels are managers and employees; the levels above them are
+    executive levels (executives may report to executives, managers to the
+    bottom executive level and employees to managers).
+
+    :param size: Total number of people
+    :type size: int
+    :param fanout: Average direct reports per supervisor
+    :type fanout: int
+    :param depth: Number of executive levels
+    :type depth: int
+    :return: People per level, e.g. [executives..., managers, employees]
+    :rtype: list[int]
+    """
+    if fanout < 1 or depth < 1:
+        raise ValueError("fanout and depth must be at least 1")
+    if size < depth + 2:
+        raise ValueError(f"size must be at least {depth + 2} for depth {depth}")
+
+    # size ~= employees * (1 + 1/f + 1/f^2 + ...), one term per level
+    ratio = 1 / fanout
+    employees = int(size / sum(ratio ** k for k in range(depth + 2)))
+
+    levels = [employees]
+    for _ in range(depth + 1):
+        levels.append(max(1, math.ceil(levels[-1] / fanout)))
+    levels.reverse()
+
+    # give any rounding remainder to the employee level
+    levels[-1] = size - sum(levels[:-1])
+    if levels[-1] < 1:
+        raise ValueError(f"size {size} is too small for fanout {fanout} and depth {depth}")
+    return levels
+
+
+def synthetic_employee_id(seed: int, index: int) -> str:
+    """
+    Deterministic, unique ID for the index-th generated person.
+
+    :param seed: Generator seed
+    :type seed: int
+    :param index: Position of the person in generation order
+    :type index: int
+    :return: 32-character hex ID
+    :rtype: str
+    """
+    return hashlib.md5(f"org-{seed}-{index}".encode("utf-8")).hexdigest()
+
+
+def generate_org(size: int, fanout: int = 8, depth: int = 1, seed: int = 0) -> Iterator[dict]:
+    """
+    Generate a synthetic org in foreign-key order.
+
+    Output depends only on the arguments, and rows are produced on the fly so
+    memory stays constant whatever the size.
+
+    :param size: Total number of people
+    :type size: int
+    :param fanout: Average direct reports per supervisor
+    :type fanout: int
+    :param depth: Number of executive levels
+    :type depth: int
+    :param seed: Random seed
+    :type seed: int
+    :yield: Rows accepted by utilities.bulk_loader.load_rows
+    :rtype: Iterator[dict]
+
+    Example:
+        stats = load_rows(client.connection, generate_org(100_000, fanout=10, seed=42))
+    """
+    levels = plan_org(size, fanout, depth)
+    tiers = ["executive"] * depth + ["manager", "employee"]
+    rng = random.Random(seed)
+
+    offset = 0
+    parent_offset, parent_count = 0, 0
+    for tier, count in zip(tiers, levels):
+        for i in range(count):
+            supervisor_id = None
+            if parent_count:
+                # spread children evenly over the level above
+                supervisor_id = synthetic_employee_id(seed, parent_offset + i * parent_count // count)
+
+            yield {
+                "tier": tier,
+                "emp_id": synthetic_employee_id(seed, offset + i),
+                "first_name": rng.choice(FIRST_NAMES),
+                "last_name": rng.choice(LAST_NAMES),
+                "position": rng.choice(POSITIONS[tier]),
+                "department": rng.choice(DEPARTMENTS),
+                "supervisor_id": supervisor_id,
+            }
+        parent_offset, parent_count = offset, count
+        offset += count
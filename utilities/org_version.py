@@ -0,0 +1,112 @@
+"""
+Org data version counter used to invalidate cached graphs.
+Every application write bumps the counter inside its own transaction.
+"""
+
+import time
+import threading
+import weakref
+from sqlalchemy import inspect, insert, select, update
+from sqlalchemy.engine import Engine, Connection as EngineConnection
+from sqlalchemy.orm import Session
+from models.orgchart import SQLOrgVersion
+
+VERSION_ROW_ID = 1
+# Seconds before a database found without the org_version table is checked again
+VERSION_TABLE_RECHECK_SECONDS = 30.0
+
+_lock = threading.Lock()
+# engine -> True, or the time.monotonic() of the last check that found no table
+_has_table = weakref.WeakKeyDictionary()
+# fallback counters for databases without the org_version table
+_local_versions = weakref.WeakKeyDictionary()
+
+
+def _engine_of(conn: Session | EngineConnection) -> Engine:
+    return conn.get_bind() if isinstance(conn, Session) else conn.engine
+
+
+def has_version_table(engine: Engine, bind: EngineConnection | None = None) -> bool:
+    """
+    Check whether the database has the org_version table.
+
+    A table once found is assumed to stay; a missing one is looked for again
+    every VERSION_TABLE_RECHECK_SECONDS, so running the migration that adds it
+    takes effect without a restart.
+
+    :param engine: SQLAlchemy engine
+    :type engine: Engine
+    :param bind: Open connection to inspect with, so a caller's transaction is left alone
+    :type bind: Connection | None
+    :return: True if the shared counter table exists
+    :rtype: bool
+    """
+    checked = _has_table.get(engine)
+    if checked is True:
+        return True
+    now = time.monotonic()
+    if checked is not None and now - checked < VERSION_TABLE_RECHECK_SECONDS:
+        return False
+    found = inspect(bind if bind is not None else engine).has_table(SQLOrgVersion.__tablename__)
+    _has_table[engine] = True if found else now
+    return found
+
+
+def bump_org_version(conn: Session | EngineConnection) -> int:
+    """
+    Increment the org version as part of the caller's write transaction.
+
+    Falls back to an in-process counter when the org_version table is missing,
+    which only invalidates caches in the current process.
+
+    :param conn: Session or connection running the write
+    :type conn: Session | Connection
+    :return: The new version
+    :rtype: int
+
+    Example:
+        with get_session(self.connection) as session:
+            session.execute(insert_stmt)
+            bump_org_version(session)
+    """
+    engine = _engine_of(conn)
+    bind = conn.connection() if isinstance(conn, Session) else conn
+    if not has_version_table(engine, bind):
+        with _lock:
+            version = _local_versions.get(engine, 0) + 1
+            _local_versions[engine] = version
+        return version
+
+    version = conn.execute(
+        update(SQLOrgVersion)
+        .where(SQLOrgVersion.id == VERSION_ROW_ID)
+        .values(version=SQLOrgVersion.version + 1)
+        .returning(SQLOrgVersion.version)
+    ).scalar()
+
+    if version is None:
+        version = 1
+        conn.execute(insert(SQLOrgVersion).values(id=VERSION_ROW_ID, version=version))
+    return version
+
+
+def get_org_version(engine: Engine, bind: EngineConnection | None = None) -> int:
+    """
+    Read the current org version.
+
+    :param engine: SQLAlchemy engine
+    :type engine: Engine
+    :param bind: Open connection to read with, so the version comes from the caller's transaction
+    :type bind: Connection | None
+    :return: Current version (0 before the first write)
+    :rtype: int
+    """
+    if not has_version_table(engine, bind):
+        return _local_versions.get(engine, 0)
+
+    statement = select(SQLOrgVersion.version).where(SQLOrgVersion.id == VERSION_ROW_ID)
+    if bind is not None:
+        return bind.execute(statement).scalar() or 0
+    with engine.connect() as conn:
+        version = conn.execute(statement).scalar()
+    return version or 0
@@ -0,0 +1,348 @@
+"""
+Optional single-table storage layout.
+
+convert_to_person_layout() moves everyone from the executive, manager and
+employee tables into one `person` table with a tier column and a
+materialized path of emp_ids from the top of the org (ltree on PostgreSQL,
+dotted text on SQLite). Each path label is the hex encoding of the emp_id's
+UTF-8 bytes, so IDs containing dots, dashes or spaces cannot split a label
+or be rejected by ltree. The tier tables are renamed to <tier>_legacy and
+replaced by views of the same name with INSTEAD OF triggers, so
+config.employee_types, the ORM classes and every Connection method keep
+working unchanged. Triggers on person keep paths current when people are
+added, moved or deleted.
+
+With the person layout, Connection.getSubtree and getChainToRoot read paths
+instead of walking a recursive UNION ALL: a subtree is one range scan on
+the path index, and a chain is a primary key lookup of the IDs in one path.
+
+The conversion is one-way; take a snapshot first (build.py snapshot).
+"""
+
+import logging
+import weakref
+from typing import Optional
+from sqlalchemy import inspect, select, func, text, or_, and_, literal
+from sqlalchemy.engine import Engine
+from models.orgchart import SQLPerson
+from config.employee_types import EMPLOYEE_TYPES
+from utilities.migrations import pending_migrations
+
+logger = logging.getLogger(__name__)
+
+# ltree labels are at most 256 characters before PostgreSQL 16, two hex digits per byte
+MAX_PATH_ID_BYTES = 128
+
+# tier tables in hierarchy order; their names are the person.tier values
+TIERS = tuple(config.table_class.__tablename__ for config in EMPLOYEE_TYPES.values())
+
+PERSON_COLUMNS = ("emp_id", "first_name", "last_name", "position", "department", "supervisor_id")
+
+_columns = ", ".join(PERSON_COLUMNS)
+_new_columns = ", ".join(f"NEW.{name}" for name in PERSON_COLUMNS)
+_set_columns = ", ".join(f"{name} = NEW.{name}" for name in PERSON_COLUMNS)
+
+# Copies every tier into person, computing paths top-down; rows reachable from
+# no root (supervisor cycles) are left out and make the conversion fail
+POPULATE_SQL = """
+    WITH RECURSIVE everyone AS (
+        {everyone}
+    ),
+    tree AS (
+        SELECT e.*, {label} AS path, 0 AS depth FROM everyone e
+        WHERE e.supervisor_id IS NULL OR e.supervisor_id NOT IN (SELECT emp_id FROM everyone)
+        UNION ALL
+        SELECT e.*, t.path || '.' || {label}, t.depth + 1 FROM everyone e
+        JOIN tree t ON e.supervisor_id = t.emp_id
+        WHERE t.depth < :max_depth
+    )
+    INSERT INTO person ({columns}, tier, path)
+    SELECT {columns}, tier, {path} FROM tree
+"""
+
+
+def path_label(emp_id: str, dialect: str) -> str:
+    """SQL expression for the path label of an emp_id expression"""
+    if dialect == "postgresql":
+        return f"encode(convert_to({emp_id}, 'UTF8'), 'hex')"
+    return f"hex({emp_id})"
+
+
+def path_ids(path) -> list[str]:
+    """emp_ids in a stored path, from the top of the org down"""
+    return [bytes.fromhex(label).decode("utf-8") for label in str(path).split(".")]
+
+
+# ---- SQLite: path maintenance and tier views ----
+
+def _sqlite_subtree(path: str, root: str) -> str:
+    """SQL condition: path is root or below it (index range on the dotted text path)"""
+    return f"({path} = {root} OR ({path} > {root} || '.' AND {path} < {root} || '/'))"
+
+
+SQLITE_TRIGGERS = (
+    f"""CREATE TRIGGER person_path_insert AFTER INSERT ON person
+    BEGIN
+        SELECT RAISE(ABORT, 'emp_id must not be empty') WHERE NEW.emp_id = '';
+        SELECT RAISE(ABORT, 'person cannot supervise themselves') WHERE NEW.supervisor_id = NEW.emp_id;
+        UPDATE person SET path = COALESCE((SELECT p.path || '.' FROM person p WHERE p.emp_id = NEW.supervisor_id), '')
+                                 || hex(NEW.emp_id)
+        WHERE emp_id = NEW.emp_id;
+        -- people inserted before their supervisor were stored as roots; hang them under the new row
+        UPDATE person SET path = (SELECT p.path FROM person p WHERE p.emp_id = NEW.emp_id) || '.' || path
+        WHERE EXISTS (SELECT 1 FROM person c
+                      WHERE c.supervisor_id = NEW.emp_id AND c.path = hex(c.emp_id) AND c.emp_id <> NEW.emp_id
+                      AND {_sqlite_subtree("person.path", "c.path")});
+    END""",
+    f"""CREATE TRIGGER person_path_move AFTER UPDATE OF supervisor_id, emp_id ON person
+    WHEN NEW.supervisor_id IS NOT OLD.supervisor_id OR NEW.emp_id IS NOT OLD.emp_id
+    BEGIN
+        SELECT RAISE(ABORT, 'emp_id must not be empty') WHERE NEW.emp_id = '';
+        SELECT RAISE(ABORT, 'supervisor change would create a cycle')
+        WHERE EXISTS (SELECT 1 FROM person p WHERE p.emp_id = NEW.supervisor_id
+                      AND {_sqlite_subtree("p.path", "OLD.path")});
+        UPDATE person SET path = COALESCE((SELECT p.path || '.' FROM person p WHERE p.emp_id = NEW.supervisor_id), '')
+                                 || hex(NEW.emp_id) || substr(path, length(OLD.path) + 1)
+        WHERE {_sqlite_subtree("path", "OLD.path")};
+    END""",
+    # SQLite does not enforce foreign keys by default, so mirror ON DELETE SET NULL
+    """CREATE TRIGGER person_delete AFTER DELETE ON person
+    BEGIN
+        UPDATE person SET supervisor_id = NULL WHERE supervisor_id = OLD.emp_id;
+    END""",
+)
+
+
+def _sqlite_view_ddl(tier: str) -> tuple[str, ...]:
+    return (
+        f"CREATE VIEW {tier} AS SELECT {_columns} FROM person WHERE tier = '{tier}'",
+        f"""CREATE TRIGGER {tier}_insert INSTEAD OF INSERT ON {tier}
+        BEGIN
+            INSERT INTO person ({_columns}, tier) VALUES ({_new_columns}, '{tier}');
+        END""",
+        f"""CREATE TRIGGER {tier}_update INSTEAD OF UPDATE ON {tier}
+        BEGIN
+            UPDATE person SET {_set_columns} WHERE emp_id = OLD.emp_id;
+        END""",
+        f"""CREATE TRIGGER {tier}_delete INSTEAD OF DELETE ON {tier}
+        BEGIN
+            DELETE FROM person WHERE emp_id = OLD.emp_id;
+        END""",
+    )
+
+
+# ---- PostgreSQL: path maintenance and tier views ----
+
+# person counterpart of the tier tables' name search index (migration 3)
+POSTGRES_TRGM_INDEX = ("CREATE INDEX IF NOT EXISTS ix_person_full_name_trgm "
+                       "ON person USING gin ((first_name || ' ' || last_name) gin_trgm_ops)")
+
+POSTGRES_FUNCTIONS = (
+    f"""CREATE OR REPLACE FUNCTION person_set_path() RETURNS trigger AS $$
+    DECLARE
+        parent_path ltree;
+    BEGIN
+        IF TG_OP = 'UPDATE' AND NEW.supervisor_id IS NOT DISTINCT FROM OLD.supervisor_id
+           AND NEW.emp_id = OLD.emp_id THEN
+            RETURN NEW;
+        END IF;
+        IF NEW.emp_id = '' OR octet_length(NEW.emp_id) > {MAX_PATH_ID_BYTES} THEN
+            RAISE EXCEPTION 'emp_id % must be 1 to {MAX_PATH_ID_BYTES} bytes long in the person layout', NEW.emp_id;
+        END IF;
+        SELECT path INTO parent_path FROM person WHERE emp_id = NEW.supervisor_id;
+        IF TG_OP = 'UPDATE' AND parent_path <@ OLD.path THEN
+            RAISE EXCEPTION 'supervisor change would create a cycle';
+        END IF;
+        NEW.path := COALESCE(parent_path, ''::ltree) || text2ltree({path_label("NEW.emp_id", "postgresql")});
+        RETURN NEW;
+    END $$ LANGUAGE plpgsql""",
+    """CREATE OR REPLACE FUNCTION person_move_subtree() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'UPDATE' AND NEW.path IS DISTINCT FROM OLD.path THEN
+            UPDATE person SET path = NEW.path || subpath(path, nlevel(OLD.path))
+            WHERE path <@ OLD.path AND emp_id <> NEW.emp_id;
+        ELSIF TG_OP = 'INSERT' THEN
+            -- people inserted before their supervisor were stored as roots
+            UPDATE person SET path = NEW.path || path
+            WHERE path <@ ANY (ARRAY(SELECT c.path FROM person c
+                                     WHERE c.supervisor_id = NEW.emp_id AND nlevel(c.path) = 1));
+        END IF;
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql""",
+    f"""CREATE OR REPLACE FUNCTION person_view_write() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            INSERT INTO person ({_columns}, tier) VALUES ({_new_columns}, TG_TABLE_NAME);
+            RETURN NEW;
+        ELSIF TG_OP = 'UPDATE' THEN
+            UPDATE person SET {_set_columns} WHERE emp_id = OLD.emp_id;
+            RETURN CASE WHEN FOUND THEN NEW END;
+        ELSE
+            DELETE FROM person WHERE emp_id = OLD.emp_id;
+            RETURN CASE WHEN FOUND THEN OLD END;
+        END IF;
+    END $$ LANGUAGE plpgsql""",
+)
+
+POSTGRES_TRIGGERS = (
+    "CREATE TRIGGER person_set_path BEFORE INSERT OR UPDATE OF supervisor_id, emp_id ON person "
+    "FOR EACH ROW EXECUTE FUNCTION person_set_path()",
+    "CREATE TRIGGER person_move_subtree AFTER INSERT OR UPDATE OF supervisor_id, emp_id ON person "
+    "FOR EACH ROW EXECUTE FUNCTION person_move_subtree()",
+)
+
+
+def _postgres_view_ddl(tier: str) -> tuple[str, ...]:
+    return (
+        f"CREATE VIEW {tier} AS SELECT {_columns} FROM person WHERE tier = '{tier}'",
+        f"CREATE TRIGGER {tier}_write INSTEAD OF INSERT OR UPDATE OR DELETE ON {tier} "
+        f"FOR EACH ROW EXECUTE FUNCTION person_view_write()",
+    )
+
+
+_layouts = weakref.WeakKeyDictionary()
+
+
+def uses_person_layout(engine: Engine) -> bool:
+    """
+    Whether the tier tables are views over the person table.
+
+    The answer is cached per engine; convert_to_person_layout() updates it.
+
+    :param engine: Database engine
+    :type engine: Engine
+    :return: True after convert_to_person_layout()
+    :rtype: bool
+    """
+    layout = _layouts.get(engine)
+    if layout is None:
+        layout = _layouts[engine] = TIERS[-1] in inspect(engine).get_view_names()
+    return layout
+
+
+def convert_to_person_layout(engine: Engine, max_depth: int = 64, grant_to: Optional[str] = None) -> int:
+    """
+    Move every tier into the person table and replace the tier tables with views.
+
+    Runs in one transaction (DDL is transactional on both PostgreSQL and
+    SQLite), so a failure leaves the three-table layout untouched. On
+    PostgreSQL this needs the table owner (build_db_url(admin=True)) and the
+    ltree extension.
+
+    :param engine: Engine connected as the table owner
+    :type engine: Engine
+    :param max_depth: Deepest reporting chain to follow when computing paths
+    :type max_depth: int
+    :param grant_to: PostgreSQL role to grant read/write access to person and
+        the views (the application role; its grants stay on the legacy tables)
+    :type grant_to: Optional[str]
+    :return: Number of people moved into person
+    :rtype: int
+    :raises ValueError: If the layout is already converted, migrations are
+        pending, an emp_id cannot be a path label (empty, or longer than
+        MAX_PATH_ID_BYTES on PostgreSQL), or some people sit in a supervisor
+        cycle and so have no path
+
+    Example:
+        convert_to_person_layout(get_engine(build_db_url(admin=True)), grant_to=os.getenv("DB_USER"))
+    """
+    if uses_person_layout(engine):
+        raise ValueError("The database already uses the person layout")
+    # index migrations target the tier tables, which become views
+    if pending_migrations(engine):
+        raise ValueError("Apply pending migrations (build.py migrate) before converting")
+
+    postgres = engine.dialect.name == "postgresql"
+    everyone = "\n        UNION ALL\n        ".join(f"SELECT {_columns}, '{tier}' AS tier FROM {tier}" for tier in TIERS)
+    populate = POPULATE_SQL.format(everyone=everyone, columns=_columns,
+                                   label=path_label("e.emp_id", engine.dialect.name),
+                                   path="text2ltree(path)" if postgres else "path")
+    # the triggers reject these too, but only after the conversion has done most of its work
+    invalid = f"emp_id = '' OR octet_length(emp_id) > {MAX_PATH_ID_BYTES}" if postgres else "emp_id = ''"
+
+    with engine.begin() as conn:
+        if postgres:
+            conn.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS ltree")
+        SQLPerson.__table__.create(conn, checkfirst=True)
+        if conn.scalar(select(func.count()).select_from(SQLPerson)):
+            raise ValueError("The person table is not empty")
+
+        for tier in TIERS:
+            bad = conn.scalars(text(f"SELECT emp_id FROM {tier} WHERE {invalid} LIMIT 5")).all()
+            if bad:
+                raise ValueError(f"{tier} has emp_ids that cannot be path labels (must be 1 to "
+                                 f"{MAX_PATH_ID_BYTES} bytes): {bad}")
+
+        expected = sum(conn.scalar(text(f"SELECT count(*) FROM {tier}")) for tier in TIERS)
+        conn.execute(text(populate), {"max_depth": max_depth})
+        # rowcount is not reported for INSERT statements that start with WITH on every driver
+        moved = conn.scalar(select(func.count()).select_from(SQLPerson))
+        if moved != expected:
+            raise ValueError(f"{expected - moved} people are in a supervisor cycle or deeper than "
+                             f"{max_depth} levels; fix their supervisor_id first")
+
+        for tier in TIERS:
+            conn.exec_driver_sql(f"ALTER TABLE {tier} RENAME TO {tier}_legacy")
+        statements = (POSTGRES_TRGM_INDEX,) + POSTGRES_FUNCTIONS + POSTGRES_TRIGGERS if postgres else SQLITE_TRIGGERS
+        for tier in TIERS:
+            statements += _postgres_view_ddl(tier) if postgres else _sqlite_view_ddl(tier)
+        for statement in statements:
+            conn.exec_driver_sql(statement)
+        if postgres and grant_to:
+            role = conn.dialect.identifier_preparer.quote(grant_to)
+            conn.exec_driver_sql(f"GRANT SELECT, INSERT, UPDATE, DELETE ON person, {', '.join(TIERS)} TO {role}")
+
+    _layouts[engine] = True
+    logger.info(f"Moved {moved} people into the person table")
+    return moved
+
+
+def _levels(path, dialect: str):
+    """Number of labels in a path expression"""
+    if dialect == "postgresql":
+        return func.nlevel(path)
+    return func.length(path) - func.length(func.replace(path, ".", "")) + 1
+
+
+def _descendants(path, root, dialect: str):
+    """Rows whose path is root's path or below it"""
+    if dialect == "postgresql":
+        return path.op("<@")(root)
+    return or_(path == root, and_(path > root + literal("."), path < root + literal("/")))
+
+
+def subtree_statement(dialect: str):
+    """
+    Subtree of :emp_id down to :max_depth levels, as one range scan on the path index.
+
+    :param dialect: Dialect name
+    :type dialect: str
+    :return: SELECT with the same columns and order as Connection.getSubtree
+    """
+    root = SQLPerson.__table__.alias("root")
+    person = SQLPerson.__table__
+    depth = (_levels(person.c.path, dialect) - _levels(root.c.path, dialect)).label("depth")
+    return (select(*[person.c[name] for name in PERSON_COLUMNS], person.c.tier, depth)
+            .join_from(root, person, _descendants(person.c.path, root.c.path, dialect))
+            .where(root.c.emp_id == text(":emp_id"))
+            .where(depth <= text(":max_depth"))
+            .order_by(depth, person.c.emp_id))
+
+
+def get_subtree(session, emp_id: str, max_depth: int) -> list:
+    """Rows of Connection.getSubtree, read from person paths"""
+    statement = subtree_statement(session.get_bind().dialect.name)
+    return session.execute(statement, {"emp_id": emp_id, "max_depth": max_depth}).all()
+
+
+def get_chain_to_root(session, emp_id: str) -> list:
+    """Rows of Connection.getChainToRoot: the IDs in one path, looked up by primary key"""
+    path = session.scalar(select(SQLPerson.path).where(SQLPerson.emp_id == emp_id))
+    if path is None:
+        return []
+    ids = path_ids(path)
+    person = SQLPerson.__table__
+    depth = (len(ids) - _levels(person.c.path, session.get_bind().dialect.name)).label("depth")
+    return session.execute(select(*[person.c[name] for name in PERSON_COLUMNS], person.c.tier, depth)
+                           .where(person.c.emp_id.in_(ids))
+                           .order_by(depth)).all()
@@ -0,0 +1,117 @@
+"""
+Migration of name-derived MD5 employee IDs to the current ID scheme.
+
+Rows whose emp_id is still the MD5 of their name get a new ID from
+generate_employee_ids, and every supervisor_id pointing at them follows, in
+one transaction. Rows with any other emp_id (given explicitly or generated
+by the synthetic org generator) are left alone. Runs on both the three-table
+and the person layout:
+
+    uv run python build.py rekey
+"""
+
+import time
+import logging
+from typing import Optional
+from sqlalchemy import MetaData, Table, Column, VARCHAR, select, insert, update, delete
+from sqlalchemy.engine import Engine
+from config.employee_types import EMPLOYEE_TYPES
+from utilities.id_generator import generate_employee_ids, existing_employee_ids, legacy_employee_id
+from utilities.org_version import bump_org_version
+
+logger = logging.getLogger(__name__)
+
+# Rows per insert into the ID map
+REKEY_CHUNK_SIZE = 10000
+
+_map = Table(
+    "emp_id_rekey", MetaData(),
+    Column("tier", VARCHAR, primary_key=True),
+    Column("old_id", VARCHAR, primary_key=True),
+    Column("new_id", VARCHAR, nullable=False),
+    prefixes=["TEMPORARY"],
+)
+
+
+def find_legacy_ids(conn) -> list[tuple[str, str, str, str]]:
+    """
+    Rows whose emp_id is the MD5 of their name, in tier then emp_id order.
+
+    :param conn: Open connection
+    :return: (tier, emp_id, first_name, last_name) per legacy row
+    :rtype: list[tuple[str, str, str, str]]
+    """
+    legacy = []
+    for config in EMPLOYEE_TYPES.values():
+        table = config.table_class
+        rows = conn.execute(select(table.emp_id, table.first_name, table.last_name).order_by(table.emp_id))
+        for emp_id, first_name, last_name in rows:
+            if emp_id == legacy_employee_id(first_name or "", last_name or ""):
+                legacy.append((table.__tablename__, emp_id, first_name or "", last_name or ""))
+    return legacy
+
+
+def rekey_legacy_ids(engine: Engine, scheme: Optional[str] = None, dry_run: bool = False) -> int:
+    """
+    Replace MD5 employee IDs with IDs from the current scheme.
+
+    Each tier gets copies of its legacy rows under their new IDs, then every
+    supervisor_id is remapped and the old rows are deleted in reverse
+    foreign-key order, so no reference is ever left dangling. A legacy row's
+    namesakes already using the new scheme keep their IDs; the legacy row
+    takes the next free one. Cached graphs rebuild on the version bump.
+
+    :param engine: SQLAlchemy engine
+    :type engine: Engine
+    :param scheme: 'blake2' or 'uuid7' (defaults to EMP_ID_SCHEME)
+    :type scheme: Optional[str]
+    :param dry_run: Only count the rows that would be rekeyed
+    :type dry_run: bool
+    :return: Number of rows rekeyed
+    :rtype: int
+    """
+    start = time.perf_counter()
+    with engine.begin() as conn:
+        legacy = find_legacy_ids(conn)
+        if dry_run or not legacy:
+            return len(legacy)
+
+        new_ids = generate_employee_ids([(first, last) for _, _, first, last in legacy], scheme,
+                                        taken=lambda ids: existing_employee_ids(conn, ids))
+        # created and dropped inside the transaction, so a failure rolls it back with everything else
+        _map.create(conn)
+        for offset in range(0, len(legacy), REKEY_CHUNK_SIZE):
+            conn.execute(insert(_map), [
+                {"tier": tier, "old_id": old_id, "new_id": new_id}
+                for (tier, old_id, _, _), new_id in zip(legacy[offset:offset + REKEY_CHUNK_SIZE],
+                                                        new_ids[offset:offset + REKEY_CHUNK_SIZE])
+            ])
+
+        for config in EMPLOYEE_TYPES.values():
+            table = config.table_class
+            tier = table.__tablename__
+            # executives report to executives, whose copies are inserted just before
+            supervisor_tier = (config.supervisor_table or table).__tablename__
+            fields = [column.name for column in table.__table__.columns if column.name != "emp_id"]
+            copies = select(_map.c.new_id, *[getattr(table, name) for name in fields]) \
+                .join(_map, (_map.c.old_id == table.emp_id) & (_map.c.tier == tier))
+            conn.execute(insert(table).from_select(["emp_id"] + fields, copies))
+
+            supervisor_map = select(_map.c.new_id).where(_map.c.tier == supervisor_tier,
+                                                         _map.c.old_id == table.supervisor_id)
+            conn.execute(
+                update(table)
+                .where(table.supervisor_id.in_(select(_map.c.old_id).where(_map.c.tier == supervisor_tier)))
+                .values(supervisor_id=supervisor_map.scalar_subquery())
+            )
+
+        for config in reversed(EMPLOYEE_TYPES.values()):
+            table = config.table_class
+            conn.execute(delete(table).where(
+                table.emp_id.in_(select(_map.c.old_id).where(_map.c.tier == table.__tablename__))
+            ))
+        _map.drop(conn)
+        bump_org_version(conn)
+
+    logger.info(f"Rekeyed {len(legacy)} legacy employee IDs in {time.perf_counter() - start:.2f}s")
+    return len(legacy)
@@ -0,0 +1,367 @@
+"""
+In-process name search over the whole org.
+Prefix lookups use sorted per-token postings; fuzzy lookups use trigrams over
+the distinct name tokens, so query cost depends on k rather than on org size.
+"""
+
+import re
+import heapq
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from collections import Counter
+from functools import lru_cache
+from itertools import islice
+from typing import Iterable, Iterator, NamedTuple, Optional
+from utilities.org_events import ChangeKind, OrgChange
+
+# Minimum trigram similarity for a fuzzy token match (same default as pg_trgm)
+FUZZY_THRESHOLD = 0.3
+
+# Results returned when no k is given
+DEFAULT_TOP_K = 10
+
+_WORD_SPLIT = re.compile(r"[\s\-'.,]+")
+
+
+class SearchResult(NamedTuple):
+    """One person as returned by NameSearchIndex.search"""
+    emp_id: str
+    first_name: str
+    last_name: str
+    position: Optional[str]
+    department: Optional[str]
+    tier: Optional[str]
+
+
+@lru_cache(maxsize=1 << 16)
+def normalize(text: Optional[str]) -> str:
+    """Case- and accent-insensitive form used for indexing and queries"""
+    text = (text or "").casefold()
+    if text.isascii():
+        return text
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+@lru_cache(maxsize=1 << 16)
+def words(text: Optional[str]) -> tuple[str, ...]:
+    """Normalized words of a name or query"""
+    return tuple(word for word in _WORD_SPLIT.split(normalize(text)) if word)
+
+
+def trigrams(token: str) -> set[str]:
+    """Trigrams of a token, padded the way pg_trgm pads words"""
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameSearchIndex:
+    """
+    Name search with prefix, fuzzy (trigram) and filtered queries.
+
+    Every distinct name word ("token") has a postings list of the people whose
+    first or last name contains it, kept sorted by (last name, first name,
+    emp_id). The distinct tokens are kept in a sorted list for prefix ranges
+    and in trigram postings for fuzzy matching. A query walks the postings of
+    its most selective word lazily and stops after k hits, so a top-k query
+    touches only a little more than k people.
+
+    Position and department filters match by case-insensitive prefix; tier
+    filters match exactly. The index is safe to read while it is being patched.
+    """
+
+    def __init__(self, rows: Iterable[tuple] = ()):
+        """
+        :param rows: (emp_id, first_name, last_name, position, department, tier) rows
+        :type rows: Iterable[tuple]
+        """
+        self._lock = threading.RLock()
+        # emp_id -> (result, tokens, sort key)
+        self._people: dict[str, tuple[SearchResult, tuple[str, ...], str]] = {}
+        self._postings: dict[str, list[str]] = {}
+        self._tokens: list[str] = []
+        self._grams: dict[str, set[str]] = {}
+        self._gram_counts: dict[str, int] = {}
+        self._ordered: list[str] = []
+
+        for row in rows:
+            result = SearchResult(*row)
+            self._people[result.emp_id] = self._entry(result)
+
+        # bulk build: sort once instead of inserting one by one
+        self._ordered = [emp_id for _, emp_id in
+                         sorted((entry[2], emp_id) for emp_id, entry in self._people.items())]
+        for emp_id in self._ordered:
+            for token in self._people[emp_id][1]:
+                self._postings.setdefault(token, []).append(emp_id)
+        self._tokens = sorted(self._postings)
+        for token in self._tokens:
+            self._index_token(token)
+
+    @staticmethod
+    def _entry(result: SearchResult) -> tuple:
+        tokens = tuple(dict.fromkeys(words(result.first_name) + words(result.last_name)))
+        # one string compares much faster than a (last, first, emp_id) tuple
+        sort_key = f"{normalize(result.last_name)}\0{normalize(result.first_name)}\0{result.emp_id}"
+        return result, tokens, sort_key
+
+    def _sort_key(self, emp_id: str) -> str:
+        return self._people[emp_id][2]
+
+    def _index_token(self, token: str):
+        grams = trigrams(token)
+        self._gram_counts[token] = len(grams)
+        for gram in grams:
+            self._grams.setdefault(gram, set()).add(token)
+
+    def _unindex_token(self, token: str):
+        for gram in trigrams(token):
+            tokens = self._grams.get(gram)
+            if tokens is not None:
+                tokens.discard(token)
+                if not tokens:
+                    del self._grams[gram]
+        del self._gram_counts[token]
+
+    def __len__(self) -> int:
+        return len(self._people)
+
+    def __contains__(self, emp_id: str) -> bool:
+        return emp_id in self._people
+
+    def get(self, emp_id: str) -> Optional[SearchResult]:
+        entry = self._people.get(emp_id)
+        return entry[0] if entry else None
+
+    # ---- updates ----
+
+    def add(self, result: SearchResult):
+        """
+        Add a person, replacing any existing entry with the same emp_id.
+
+        :param result: Person to index
+        :type result: SearchResult
+        """
+        with self._lock:
+            if result.emp_id in self._people:
+                self.remove(result.emp_id)
+            entry = self._entry(result)
+            self._people[result.emp_id] = entry
+            insort(self._ordered, result.emp_id, key=self._sort_key)
+            for token in entry[1]:
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = []
+                    insort(self._tokens, token)
+                    self._index_token(token)
+                insort(postings, result.emp_id, key=self._sort_key)
+
+    def remove(self, emp_id: str) -> bool:
+        """
+        Remove a person.
+
+        :param emp_id: Employee ID
+        :type emp_id: str
+        :return: True if the person was indexed
+        :rtype: bool
+        """
+        with self._lock:
+            entry = self._people.get(emp_id)
+            if entry is None:
+                return False
+            _remove_sorted(self._ordered, emp_id, entry[2], self._sort_key)
+            for token in entry[1]:
+                postings = self._postings[token]
+                _remove_sorted(postings, emp_id, entry[2], self._sort_key)
+                if not postings:
+                    del self._postings[token]
+                    del self._tokens[bisect_left(self._tokens, token)]
+                    self._unindex_token(token)
+            del self._people[emp_id]
+            return True
+
+    def apply_changes(self, changes: list[OrgChange]) -> "NameSearchIndex":
+        """
+        Patch the index so it matches the data after the given changes.
+
+        :param changes: Committed changes, in commit order
+        :type changes: list[OrgChange]
+        :return: The same index, patched
+        :rtype: NameSearchIndex
+        """
+        with self._lock:
+            for change in changes:
+                if change.kind is ChangeKind.DELETE:
+                    self.remove(change.emp_id)
+                    continue
+                if change.kind is ChangeKind.UPDATE and change.emp_id not in self._people:
+                    continue
+                previous = self.get(change.emp_id)
+                tier = change.table.__tablename__ if change.table is not None else (previous and previous.tier)
+                attrs = change.attrs
+                self.add(SearchResult(change.emp_id, attrs.get("first_name"), attrs.get("last_name"),
+                                      attrs.get("position"), attrs.get("department"), tier))
+        return self
+
+    # ---- queries ----
+
+    def search(self, query: str = "", k: int = DEFAULT_TOP_K, position: Optional[str] = None,
+               department: Optional[str] = None, tier: Optional[str] = None,
+               fuzzy: bool = True) -> list[SearchResult]:
+        """
+        Find the top k people matching a name query and filters.
+
+        Every query word must match the start of one of the person's name
+        words. If that yields fewer than k people and fuzzy is set, people whose
+        name words are trigram-similar to the query words fill the rest.
+        Prefix hits are ordered by name, fuzzy hits by similarity.
+
+        :param query: Name or name fragments, e.g. "jim hal"; empty matches everyone
+        :type query: str
+        :param k: Maximum number of results
+        :type k: int
+        :param position: Position prefix filter, e.g. "sales"
+        :type position: Optional[str]
+        :param department: Department prefix filter
+        :type department: Optional[str]
+        :param tier: Tier filter ('executive', 'manager' or 'employee')
+        :type tier: Optional[str]
+        :param fuzzy: Fill remaining slots with misspelling-tolerant matches
+        :type fuzzy: bool
+        :return: Up to k matching people
+        :rtype: list[SearchResult]
+
+        Example:
+            index.search("dwigt", k=5, department="sales")
+        """
+        if k <= 0:
+            return []
+        terms = list(words(query))
+        accept = self._filter(position, department, tier)
+
+        with self._lock:
+            results = list(islice(self._prefix_matches(terms, accept), k))
+            if fuzzy and terms and len(results) < k:
+                seen = {result.emp_id for result in results}
+                for result in self._fuzzy_matches(terms, accept):
+                    if result.emp_id not in seen:
+                        results.append(result)
+                        seen.add(result.emp_id)
+                        if len(results) >= k:
+                            break
+        return results
+
+    @staticmethod
+    def _filter(position: Optional[str], department: Optional[str], tier: Optional[str]):
+        position, department = normalize(position), normalize(department)
+        if not (position or department or tier):
+            return None
+
+        def accept(result: SearchResult) -> bool:
+            return ((not position or normalize(result.position).startswith(position))
+                    and (not department or normalize(result.department).startswith(department))
+                    and (not tier or result.tier == tier))
+        return accept
+
+    def _token_range(self, prefix: str) -> list[str]:
+        start = bisect_left(self._tokens, prefix)
+        end = bisect_left(self._tokens, prefix + "\uffff", lo=start)
+        return self._tokens[start:end]
+
+    def _stream(self, tokens: list[str]) -> Iterator[str]:
+        """People holding any of the tokens, in name order, without duplicates"""
+        if len(tokens) == 1:
+            yield from self._postings[tokens[0]]
+            return
+        previous = None
+        for emp_id in heapq.merge(*(self._postings[token] for token in tokens), key=self._sort_key):
+            if emp_id != previous:
+                yield emp_id
+            previous = emp_id
+
+    def _prefix_matches(self, terms: list[str], accept) -> Iterator[SearchResult]:
+        if not terms:
+            candidates = iter(self._ordered)
+        elif len(terms) == 1:
+            candidates = self._stream(self._token_range(terms[0]))
+        else:
+            candidates = self._intersect([self._token_range(term) for term in terms])
+
+        for emp_id in candidates:
+            result = self._people[emp_id][0]
+            if accept is None or accept(result):
+                yield result
+
+    def _intersect(self, token_groups: list[list[str]]) -> Iterator[str]:
+        """
+        People holding a token from every group, in name order.
+
+        A leapfrog join: each group seeks (by binary search) to the largest
+        key seen so far until all groups agree, so "jim hal" jumps straight to
+        the Jim Halperts instead of scanning every Halpert.
+        """
+        cursors = [[[self._postings[token], 0] for token in group] for group in token_groups]
+        if not all(cursors):
+            return
+        target, agreed, i = "", 0, 0
+        while True:
+            found = _seek(cursors[i], target, self._sort_key)
+            if found is None:
+                return
+            if found[0] == target:
+                agreed += 1
+            else:
+                target, agreed = found[0], 1
+            if agreed == len(cursors):
+                yield found[1]
+                # smallest key after this one
+                target, agreed = target + "\0", 0
+            i = (i + 1) % len(cursors)
+
+    def _similar_tokens(self, term: str) -> list[tuple[float, str]]:
+        """Tokens trigram-similar to a term, best first"""
+        grams = trigrams(term)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._grams.get(gram, ()))
+        scored = []
+        for token, count in shared.items():
+            score = count / (len(grams) + self._gram_counts[token] - count)
+            if score >= FUZZY_THRESHOLD:
+                scored.append((score, token))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return scored
+
+    def _fuzzy_matches(self, terms: list[str], accept) -> Iterator[SearchResult]:
+        driver, others = terms[0], terms[1:]
+        other_matches = [{token for _, token in self._similar_tokens(term)} for term in others]
+        for _, token in self._similar_tokens(driver):
+            for emp_id in self._postings[token]:
+                result, tokens, _ = self._people[emp_id]
+                if any(not any(t in matches or t.startswith(term) for t in tokens)
+                       for term, matches in zip(others, other_matches)):
+                    continue
+                if accept is None or accept(result):
+                    yield result
+
+
+def _seek(cursors: list[list], target: str, key) -> Optional[tuple[str, str]]:
+    """Advance each [postings, position] cursor to target; return the smallest (key, emp_id) reached"""
+    best = None
+    for cursor in cursors:
+        items, position = cursor
+        position = cursor[1] = bisect_left(items, target, lo=position, key=key)
+        if position < len(items):
+            found = key(items[position])
+            if best is None or found < best[0]:
+                best = (found, items[position])
+    return best
+
+
+def _remove_sorted(items: list[str], emp_id: str, sort_key: str, key) -> None:
+    index = bisect_left(items, sort_key, key=key)
+    if index < len(items) and items[index] == emp_id:
+        del items[index]
+    else:
+        items.remove(emp_id)
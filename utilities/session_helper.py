@@ -1,6 +1,8 @@
+import time
 from contextlib import contextmanager
 from sqlalchemy.orm import Session
 from sqlalchemy.engine import Engine
+from utilities.metrics import metrics
 
 
 @contextmanager
@@ -9,7 +11,8 @@ def get_session(engine: Engine):
     Reusable session context manager for write operations.
 
     Automatically commits on success and rolls back on error.
-    Always closes the session.
+    Always closes the session. The time the session is open, the commit time
+    and rollbacks are recorded in the metrics registry.
 
     :param engine: SQLAlchemy engine instance
     :type engine: Engine
@@ -22,15 +25,20 @@ def get_session(engine: Engine):
             # Auto-commits if no error occurs
             # Auto-rollbacks if error occurs
     """
+    start = time.perf_counter()
     session = Session(engine)
     try:
         yield session
+        commit_start = time.perf_counter()
         session.commit()  # Auto-commit on success
+        metrics.observe("db_session_commit_seconds", time.perf_counter() - commit_start)
     except Exception:
         session.rollback()  # Auto-rollback on error
+        metrics.increment("db_session_rollbacks_total", kind="write")
         raise
     finally:
         session.close()  # Always close
+        metrics.observe("db_session_seconds", time.perf_counter() - start, kind="write")
 
 
 @contextmanager
@@ -39,7 +47,7 @@ def get_readonly_session(engine: Engine):
     Read-only session (no commit needed).
 
     Use this for SELECT queries where no data modification occurs.
-    Always closes the session.
+    Always closes the session and records how long it was open.
 
     :param engine: SQLAlchemy engine instance
     :type engine: Engine
@@ -50,8 +58,10 @@ def get_readonly_session(engine: Engine):
         with get_readonly_session(self.connection) as session:
             result = session.query(table).all()
     """
+    start = time.perf_counter()
     session = Session(engine)
     try:
         yield session
     finally:
         session.close()
+        metrics.observe("db_session_seconds", time.perf_counter() - start, kind="readonly")
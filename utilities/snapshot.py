@@ -0,0 +1,352 @@
+"""
+Columnar snapshots of the org in Parquet or Arrow IPC format.
+Tables are streamed in record batches both ways, and snapshots load straight
+into a CompactOrgGraph or a pandas DataFrame without going through Python rows.
+"""
+
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.engine import Engine, Connection
+from utilities.bulk_loader import LOAD_COLUMNS, FILE_COLUMNS, TIER_ORDER, LoadStats, get_chunk_writer
+from utilities.compact_graph import CompactOrgGraph
+from utilities.org_version import bump_org_version, get_org_version
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pc = pq = None
+
+# Rows per record batch (and per Parquet row group)
+SNAPSHOT_BATCH_SIZE = 65536
+
+# File suffixes written as Arrow IPC instead of Parquet
+ARROW_SUFFIXES = (".arrow", ".feather", ".ipc")
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("Snapshots need pyarrow; install it with `uv sync --extra snapshot`")
+
+
+def snapshot_schema(version: Optional[int] = None) -> "pa.Schema":
+    """
+    Arrow schema of a snapshot: the tier plus every tier-table column.
+
+    :param version: Org version recorded in the schema metadata
+    :type version: Optional[int]
+    :return: Snapshot schema
+    :rtype: pa.Schema
+    """
+    _require_pyarrow()
+    fields = [pa.field("tier", pa.dictionary(pa.int8(), pa.string()), nullable=False)]
+    fields += [pa.field(column, pa.string(), nullable=column != "emp_id") for column in LOAD_COLUMNS]
+    metadata = {"org_version": str(version)} if version is not None else None
+    return pa.schema(fields, metadata=metadata)
+
+
+def _is_arrow(path: Path) -> bool:
+    return path.suffix.lower() in ARROW_SUFFIXES
+
+
+@contextmanager
+def snapshot_connection(engine: Engine) -> Iterator[Connection]:
+    """
+    One connection whose reads all see the same committed state.
+
+    On PostgreSQL (and MySQL) this is a REPEATABLE READ transaction, read-only
+    on PostgreSQL. The SQLite driver only begins a transaction before a write,
+    so one is begun explicitly; its first read fixes what the rest see. The
+    transaction is rolled back at the end.
+
+    :param engine: SQLAlchemy engine
+    :type engine: Engine
+    :yield: Connection inside the snapshot transaction
+    :rtype: Iterator[Connection]
+    """
+    with engine.connect() as conn:
+        if engine.dialect.name == "sqlite":
+            conn.exec_driver_sql("BEGIN")
+        else:
+            options = {"isolation_level": "REPEATABLE READ"}
+            if engine.dialect.name == "postgresql":
+                options["postgresql_readonly"] = True
+            conn.execution_options(**options)
+        try:
+            yield conn
+        finally:
+            conn.rollback()
+
+
+def _iter_batches(conn: Connection, batch_size: int) -> Iterator["pa.RecordBatch"]:
+    schema = snapshot_schema()
+    tiers = pa.array([table.__tablename__ for table in TIER_ORDER], pa.string())
+
+    for code, table in enumerate(TIER_ORDER):
+        columns = [getattr(table, column) for column in LOAD_COLUMNS]
+        result = conn.execute(select(*columns).order_by(table.emp_id), execution_options={"yield_per": batch_size})
+        for rows in result.partitions():
+            values = list(zip(*rows))
+            tier = pa.DictionaryArray.from_arrays(pa.array(np.full(len(rows), code, dtype=np.int8)), tiers)
+            yield pa.RecordBatch.from_arrays(
+                [tier] + [pa.array(column, pa.string()) for column in values], schema=schema
+            )
+
+
+def iter_snapshot_batches(engine: Engine, batch_size: int = SNAPSHOT_BATCH_SIZE) -> Iterator["pa.RecordBatch"]:
+    """
+    Stream the tier tables as record batches in foreign-key order.
+
+    All three tables are read in one snapshot transaction, so every
+    supervisor_id refers to a row in the same stream even while others write.
+
+    :param engine: SQLAlchemy engine
+    :type engine: Engine
+    :param batch_size: Rows per batch
+    :type batch_size: int
+    :yield: Record batches with the snapshot schema
+    :rtype: Iterator[pa.RecordBatch]
+    """
+    _require_pyarrow()
+    with snapshot_connection(engine) as conn:
+        yield from _iter_batches(conn, batch_size)
+
+
+def write_snapshot(engine: Engine, path: str | Path, batch_size: int = SNAPSHOT_BATCH_SIZE) -> LoadStats:
+    """
+    Write all three tier tables to a Parquet (or .arrow IPC) snapshot.
+
+    The rows and the recorded org version are read in one snapshot
+    transaction (see snapshot_connection), so the file is consistent even when
+    taken during writes.
+
+    :param engine: SQLAlchemy engine
+    :type engine: Engine
+    :param path: Output file; .arrow/.feather/.ipc writes Arrow IPC, anything else Parquet
+    :type path: str | Path
+    :param batch_size: Rows per record batch
+    :type batch_size: int
+    :return: Row counts and timing
+    :rtype: LoadStats
+
+    Example:
+        stats = write_snapshot(client.connection, "org.parquet")
+    """
+    _require_pyarrow()
+    path = Path(path)
+    stats = LoadStats()
+    start = time.perf_counter()
+
+    with snapshot_connection(engine) as conn:
+        schema = snapshot_schema(get_org_version(engine, bind=conn))
+        if _is_arrow(path):
+            writer = pa.ipc.new_file(path, schema)
+        else:
+            writer = pq.ParquetWriter(path, schema, compression="zstd")
+
+        with writer:
+            for batch in _iter_batches(conn, batch_size):
+                writer.write_batch(batch.replace_schema_metadata(schema.metadata))
+                tier = batch.column(0)
+                table_name = tier.dictionary[tier.indices[0].as_py()].as_py()
+                stats.rows_by_table[table_name] = stats.rows_by_table.get(table_name, 0) + batch.num_rows
+
+    stats.elapsed = time.perf_counter() - start
+    return stats
+
+
+def read_snapshot_batches(path: str | Path, batch_size: int = SNAPSHOT_BATCH_SIZE,
+                          columns: Optional[list[str]] = None) -> Iterator["pa.RecordBatch"]:
+    """
+    Stream record batches from a snapshot.
+
+    Arrow IPC files are memory-mapped, so their batches reference the file
+    pages directly instead of being copied.
+
+    :param path: Snapshot file
+    :type path: str | Path
+    :param batch_size: Rows per batch (Parquet only; IPC batches keep their written size)
+    :type batch_size: int
+    :param columns: Columns to read (defaults to all)
+    :type columns: Optional[list[str]]
+    :yield: Record batches
+    :rtype: Iterator[pa.RecordBatch]
+    """
+    _require_pyarrow()
+    path = Path(path)
+    if _is_arrow(path):
+        with pa.memory_map(str(path)) as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+                yield batch.select(columns) if columns else batch
+    else:
+        yield from pq.ParquetFile(path).iter_batches(batch_size=batch_size, columns=columns)
+
+
+def read_snapshot_table(path: str | Path, columns: Optional[list[str]] = None) -> "pa.Table":
+    """
+    Read a whole snapshot as an Arrow table.
+
+    :param path: Snapshot file
+    :type path: str | Path
+    :param columns: Columns to read (defaults to all)
+    :type columns: Optional[list[str]]
+    :return: Snapshot table
+    :rtype: pa.Table
+    """
+    _require_pyarrow()
+    path = Path(path)
+    if _is_arrow(path):
+        with pa.memory_map(str(path)) as source:
+            table = pa.ipc.open_file(source).read_all()
+        return table.select(columns) if columns else table
+    return pq.read_table(path, columns=columns)
+
+
+def read_snapshot_frame(path: str | Path, columns: Optional[list[str]] = None):
+    """
+    Read a snapshot into a pandas DataFrame backed by the Arrow buffers.
+
+    Columns use pd.ArrowDtype, so the frame shares memory with the Arrow table
+    instead of converting every value into a Python object.
+
+    :param path: Snapshot file
+    :type path: str | Path
+    :param columns: Columns to read (defaults to all)
+    :type columns: Optional[list[str]]
+    :return: One row per person
+    :rtype: pd.DataFrame
+    """
+    import pandas as pd
+
+    return read_snapshot_table(path, columns).to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def _fixed_width_bytes(array: "pa.Array") -> np.ndarray:
+    """Pack a string array into a fixed-width NumPy bytes array (nulls become b"")"""
+    array = pc.fill_null(array, "").cast(pa.large_string())
+    _, offsets, data = array.buffers()
+    offsets = np.frombuffer(offsets, dtype=np.int64)[array.offset:array.offset + len(array) + 1]
+    data = np.frombuffer(data, dtype=np.uint8) if data is not None else np.zeros(0, dtype=np.uint8)
+
+    lengths = np.diff(offsets)
+    width = max(1, int(lengths.max())) if len(lengths) else 1
+    packed = np.zeros((len(array), width), dtype=np.uint8)
+    present = lengths > 0
+    if np.all(lengths[present] == width):
+        # fixed-length IDs (the common case): the data buffer is already the packed rows
+        packed[present] = data[offsets[0]:offsets[-1]].reshape(-1, width)
+        return packed.view(f"S{width}").ravel()
+
+    rows = np.repeat(np.arange(len(array)), lengths)
+    cols = np.arange(offsets[-1] - offsets[0]) - np.repeat(offsets[:-1] - offsets[0], lengths)
+    packed[rows, cols] = data[offsets[0]:offsets[-1]]
+    return packed.view(f"S{width}").ravel()
+
+
+def compact_graph_from_table(table: "pa.Table") -> CompactOrgGraph:
+    """
+    Build a CompactOrgGraph from snapshot columns with vectorized Arrow kernels.
+
+    Labels are formed from the column buffers and positions are dictionary
+    encoded by Arrow, so no per-person Python objects are created.
+
+    :param table: Table with emp_id, first_name, last_name, position and supervisor_id columns
+    :type table: pa.Table
+    :return: Compact graph
+    :rtype: CompactOrgGraph
+    """
+    _require_pyarrow()
+    def trimmed(column: str) -> "pa.Array":
+        return pc.utf8_trim_whitespace(pc.fill_null(table.column(column).combine_chunks(), ""))
+
+    labels = pc.utf8_trim_whitespace(pc.binary_join_element_wise(trimmed("first_name"), trimmed("last_name"), " "))
+    labels = labels.cast(pa.large_string())
+    _, label_offsets, label_data = labels.buffers()
+    label_offsets = np.frombuffer(label_offsets, dtype=np.int64)[labels.offset:labels.offset + len(labels) + 1]
+    label_data = (np.frombuffer(label_data, dtype=np.uint8)[label_offsets[0]:label_offsets[-1]]
+                  if label_data is not None else np.zeros(0, dtype=np.uint8))
+
+    positions = pc.dictionary_encode(table.column("position").combine_chunks())
+    position_codes = positions.indices.to_numpy(zero_copy_only=False).astype(np.int32)
+
+    return CompactOrgGraph.from_arrays(
+        _fixed_width_bytes(table.column("emp_id").combine_chunks()),
+        _fixed_width_bytes(table.column("supervisor_id").combine_chunks()),
+        label_data,
+        np.diff(label_offsets),
+        position_codes,
+        positions.dictionary.to_pylist(),
+    )
+
+
+def read_snapshot_graph(path: str | Path) -> CompactOrgGraph:
+    """
+    Load a snapshot straight into a CompactOrgGraph.
+
+    :param path: Snapshot file
+    :type path: str | Path
+    :return: Compact graph of the snapshotted org
+    :rtype: CompactOrgGraph
+    """
+    columns = ["emp_id", "first_name", "last_name", "position", "supervisor_id"]
+    return compact_graph_from_table(read_snapshot_table(path, columns))
+
+
+def restore_snapshot(engine: Engine, path: str | Path, batch_size: int = SNAPSHOT_BATCH_SIZE) -> LoadStats:
+    """
+    Load a snapshot into the tier tables in a single transaction.
+
+    Batches are written with the bulk loader's COPY / executemany writers.
+    Snapshot rows were read out of the database, so they are not re-validated;
+    the tier tables should be empty (see build.py restore --replace).
+
+    :param engine: SQLAlchemy engine
+    :type engine: Engine
+    :param path: Snapshot file
+    :type path: str | Path
+    :param batch_size: Rows per write
+    :type batch_size: int
+    :return: Row counts and timing
+    :rtype: LoadStats
+    """
+    _require_pyarrow()
+    stats = LoadStats()
+    start = time.perf_counter()
+    tables = {table.__tablename__: table for table in TIER_ORDER}
+    current = -1
+
+    with engine.begin() as conn:
+        write_chunk = get_chunk_writer(conn)
+        for batch in read_snapshot_batches(path, batch_size, list(FILE_COLUMNS)):
+            tier = batch.column(0)
+            names = tier.dictionary.to_pylist()
+            codes = np.unique(tier.indices.to_numpy(zero_copy_only=False))
+            # a batch can straddle two tiers; write them in foreign-key order
+            for code in sorted(codes, key=lambda c: TIER_ORDER.index(tables[names[c]]) if names[c] in tables else -1):
+                table = tables.get(names[code])
+                if table is None:
+                    raise ValueError(f"Unknown tier in snapshot: {names[code]}")
+                order = TIER_ORDER.index(table)
+                if order < current:
+                    raise ValueError(f"Snapshot rows must be in foreign-key order: {table.__tablename__} "
+                                     f"rows after {TIER_ORDER[current].__tablename__} rows")
+                current = order
+
+                rows = batch.filter(pc.equal(tier.indices, code)).select(list(LOAD_COLUMNS))
+                write_chunk(conn, table, rows.to_pylist())
+                stats.rows_by_table[table.__tablename__] = (
+                    stats.rows_by_table.get(table.__tablename__, 0) + rows.num_rows
+                )
+
+        if stats.total_rows:
+            bump_org_version(conn)
+
+    stats.elapsed = time.perf_counter() - start
+    return stats
@@ -0,0 +1,377 @@
+"""
+Opt-in SQL statement profiler built on SQLAlchemy engine events.
+
+Every statement run through a profiled engine is timed and grouped by its
+normalized SQL (literals, placeholders and IN/VALUES lists collapsed). Slow
+statements are logged together with their query plan, and a summary report
+is available on demand and logged at shutdown.
+
+Enable it for every registry engine with DB_PROFILE_SQL=1 (threshold in
+DB_PROFILE_SLOW_MS), or for one engine with enable_profiling(engine).
+Plans are plain EXPLAINs by default; DB_PROFILE_ANALYZE=1 switches to
+EXPLAIN ANALYZE, which runs each captured statement a second time.
+"""
+
+import os
+import re
+import atexit
+import logging
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from utilities.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+# Statements slower than this are logged with their plan
+DEFAULT_SLOW_MS = 100.0
+
+# Longest SQL text kept in reports and log lines
+MAX_SQL_LENGTH = 2000
+
+_COMMENTS = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_PLACEHOLDERS = re.compile(r"%\(\w+\)s|%s|\$\d+|(?<![:\w]):\w+\b")
+_NUMBERS = re.compile(r"(?<![\w.])\d+(?:\.\d+)?\b")
+_VALUE = r"\?(?:::\w+)?"
+_LISTS = re.compile(rf"\(\s*{_VALUE}(?:\s*,\s*{_VALUE})+\s*\)")
+_ROWS = re.compile(r"(\([^()]*\))(?:\s*,\s*\1)+")
+_SPACES = re.compile(r"\s+")
+# statements EXPLAIN ANALYZE may run again without side effects
+_READ_ONLY = re.compile(r"^\s*(SELECT|WITH\b(?![\s\S]*\b(INSERT|UPDATE|DELETE)\b))", re.I)
+# row locks and functions with side effects make a read-only statement unsafe to run twice
+_SIDE_EFFECTS = re.compile(r"\bFOR\s+(NO\s+KEY\s+)?(UPDATE|SHARE|KEY\s+SHARE)\b"
+                           r"|\b(nextval|setval|pg_advisory\w*|pg_notify|pg_sleep\w*|dblink\w*)\s*\(", re.I)
+# rolled back after every EXPLAIN, so a failed plan never aborts the caller's transaction
+_SAVEPOINT = "sql_profiler_explain"
+
+
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def explain_prefix(dialect: str, statement: str, analyze: bool = False) -> Optional[str]:
+    """
+    The EXPLAIN form used to plan a slow statement, or None if the dialect has none.
+
+    :param dialect: Dialect name
+    :type dialect: str
+    :param statement: SQL as sent to the driver
+    :type statement: str
+    :param analyze: Use EXPLAIN (ANALYZE, BUFFERS) on PostgreSQL where running
+        the statement again is safe: reads without row locks or side-effecting functions
+    :type analyze: bool
+    :return: Prefix to put in front of the statement
+    :rtype: Optional[str]
+    """
+    if dialect == "postgresql":
+        if analyze and _READ_ONLY.match(statement) and not _SIDE_EFFECTS.search(statement):
+            return "EXPLAIN (ANALYZE, BUFFERS) "
+        return "EXPLAIN "
+    if dialect == "sqlite":
+        return "EXPLAIN QUERY PLAN "
+    return None
+
+
+def normalize_sql(statement: str) -> str:
+    """
+    Reduce a statement to its shape, so executions differing only in values group together.
+
+    :param statement: SQL as sent to the driver
+    :type statement: str
+    :return: Statement with literals and placeholders as ?, lists as (?, ...)
+        and repeated VALUES rows as a single row
+    :rtype: str
+
+    Example:
+        normalize_sql("SELECT * FROM t WHERE id IN (?, ?, ?) AND n = 5")
+        # 'SELECT * FROM t WHERE id IN (?, ...) AND n = ?'
+    """
+    sql = _COMMENTS.sub(" ", statement)
+    sql = _STRINGS.sub("?", sql)
+    sql = _PLACEHOLDERS.sub("?", sql)
+    sql = _NUMBERS.sub("?", sql)
+    sql = _SPACES.sub(" ", sql).strip()
+    sql = _LISTS.sub("(?, ...)", sql)
+    sql = _ROWS.sub(r"\1, ...", sql)
+    return sql
+
+
+@dataclass
+class StatementStats:
+    """Timings for one normalized statement"""
+    sql: str
+    timings: Histogram = field(default_factory=Histogram)
+    rows: int = 0
+    errors: int = 0
+    slow: int = 0
+    plan: Optional[str] = None
+
+
+class SQLProfiler:
+    """
+    Times every statement an engine executes.
+
+    :param engine: Engine to profile (the sync_engine of an AsyncEngine works too)
+    :type engine: Engine
+    :param slow_ms: Statements slower than this are logged with their plan
+    :type slow_ms: float
+    :param explain: Capture a plan for the first slow execution of each statement
+    :type explain: bool
+    :param analyze: Capture EXPLAIN ANALYZE plans on PostgreSQL, which runs
+        the slow statement again (see explain_prefix)
+    :type analyze: bool
+
+    Example:
+        profiler = enable_profiling(client.connection, slow_ms=50)
+        ...
+        print(profiler.report())
+    """
+
+    def __init__(self, engine: Engine, slow_ms: float = DEFAULT_SLOW_MS, explain: bool = True,
+                 analyze: bool = False):
+        self.engine = engine
+        self.slow_ms = slow_ms
+        self.explain = explain
+        self.analyze = analyze
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._stats: dict[str, StatementStats] = {}
+        self._enabled = False
+
+    # ---- engine events ----
+
+    def enable(self):
+        if not self._enabled:
+            event.listen(self.engine, "before_cursor_execute", self._before)
+            event.listen(self.engine, "after_cursor_execute", self._after)
+            event.listen(self.engine, "handle_error", self._error)
+            self._enabled = True
+
+    def disable(self):
+        if self._enabled:
+            event.remove(self.engine, "before_cursor_execute", self._before)
+            event.remove(self.engine, "after_cursor_execute", self._after)
+            event.remove(self.engine, "handle_error", self._error)
+            self._enabled = False
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("profiler_start", []).append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("profiler_start")
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        stats = self._record(statement, elapsed, max(cursor.rowcount, 0))
+        if elapsed * 1000 >= self.slow_ms:
+            self._slow(conn, cursor, statement, parameters, executemany, elapsed, stats)
+
+    def _error(self, context):
+        starts = context.connection.info.get("profiler_start") if context.connection is not None else None
+        if starts:
+            starts.pop()
+        if context.statement:
+            with self._lock:
+                self._entry(context.statement).errors += 1
+
+    def _entry(self, statement: str) -> StatementStats:
+        key = normalize_sql(statement)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = StatementStats(key)
+        return stats
+
+    def _record(self, statement: str, elapsed: float, rows: int) -> StatementStats:
+        with self._lock:
+            stats = self._entry(statement)
+            stats.timings.observe(elapsed)
+            stats.rows += rows
+            return stats
+
+    def _slow(self, conn, cursor, statement, parameters, executemany, elapsed, stats: StatementStats):
+        with self._lock:
+            stats.slow += 1
+            capture = self.explain and stats.plan is None and not executemany
+        plan = self._explain(conn, cursor, statement, parameters) if capture else None
+        if plan is not None:
+            with self._lock:
+                stats.plan = plan
+        message = f"Slow statement ({elapsed * 1000:.1f} ms): {stats.sql[:MAX_SQL_LENGTH]}"
+        if plan:
+            message += "\n" + plan
+        logger.warning(message)
+
+    def _explain(self, conn, cursor, statement, parameters) -> Optional[str]:
+        """
+        Plan a statement on the same DBAPI connection, bypassing engine events.
+
+        The plan comes from explain_prefix. On Postgres it runs inside a
+        savepoint that is always rolled back, so a failing EXPLAIN (e.g. a
+        statement_timeout) leaves the caller's transaction usable.
+        """
+        dialect = conn.dialect.name
+        prefix = explain_prefix(dialect, statement, self.analyze)
+        if prefix is None:
+            return None
+        dbapi_conn = cursor.connection
+        savepoint = dialect == "postgresql" and not getattr(dbapi_conn, "autocommit", False)
+        try:
+            explain_cursor = dbapi_conn.cursor()
+            try:
+                if savepoint:
+                    explain_cursor.execute(f"SAVEPOINT {_SAVEPOINT}")
+                try:
+                    explain_cursor.execute(prefix + statement, parameters)
+                    rows = explain_cursor.fetchall()
+                finally:
+                    if savepoint:
+                        explain_cursor.execute(f"ROLLBACK TO SAVEPOINT {_SAVEPOINT}")
+                        explain_cursor.execute(f"RELEASE SAVEPOINT {_SAVEPOINT}")
+            finally:
+                explain_cursor.close()
+        except Exception as e:
+            logger.info(f"Could not explain statement: {repr(e)}")
+            return None
+        if dialect == "sqlite":
+            # (id, parent, notused, detail)
+            return "\n".join(str(row[-1]) for row in rows)
+        return "\n".join(str(row[0]) for row in rows)
+
+    # ---- reporting ----
+
+    def reset(self):
+        """Drop every recorded timing"""
+        with self._lock:
+            self._stats.clear()
+            self.started = time.time()
+
+    def summary(self) -> list[dict]:
+        """
+        One row per normalized statement, most total time first.
+
+        :return: Rows with calls, total/mean/p95/max in milliseconds, rows,
+            errors, slow executions, the SQL and its captured plan
+        :rtype: list[dict]
+        """
+        with self._lock:
+            stats = list(self._stats.values())
+            rows = [{
+                "calls": s.timings.count,
+                "total_ms": s.timings.total * 1000,
+                "mean_ms": s.timings.total / s.timings.count * 1000 if s.timings.count else 0.0,
+                "p95_ms": s.timings.quantile(0.95) * 1000,
+                "max_ms": s.timings.max * 1000,
+                "rows": s.rows,
+                "errors": s.errors,
+                "slow": s.slow,
+                "sql": s.sql[:MAX_SQL_LENGTH],
+                "plan": s.plan,
+            } for s in stats]
+        return sorted(rows, key=lambda row: row["total_ms"], reverse=True)
+
+    def report(self, top: int = 20) -> str:
+        """
+        Render the slowest statements by total time as a text table.
+
+        :param top: Number of statements to include
+        :type top: int
+        :return: Report text
+        :rtype: str
+        """
+        rows = self.summary()
+        total_ms = sum(row["total_ms"] for row in rows)
+        lines = [f"SQL profile for {self.engine.url.render_as_string(hide_password=True)}: "
+                 f"{sum(row['calls'] for row in rows)} statements, {total_ms:.1f} ms total, "
+                 f"{len(rows)} distinct, since {time.strftime('%H:%M:%S', time.localtime(self.started))}",
+                 f"{'calls':>8} {'total ms':>10} {'mean ms':>9} {'p95 ms':>9} {'max ms':>9} {'rows':>9} "
+                 f"{'slow':>5} {'err':>4}  sql"]
+        for row in rows[:top]:
+            sql = row["sql"] if len(row["sql"]) <= 120 else row["sql"][:117] + "..."
+            lines.append(f"{row['calls']:>8} {row['total_ms']:>10.1f} {row['mean_ms']:>9.2f} {row['p95_ms']:>9.2f} "
+                         f"{row['max_ms']:>9.2f} {row['rows']:>9} {row['slow']:>5} {row['errors']:>4}  {sql}")
+        return "\n".join(lines)
+
+
+_profilers = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def enable_profiling(engine: Engine, slow_ms: float = DEFAULT_SLOW_MS, explain: bool = True,
+                     analyze: bool = False) -> SQLProfiler:
+    """
+    Start profiling an engine, or return its running profiler.
+
+    :param engine: Engine to profile
+    :type engine: Engine
+    :param slow_ms: Slow-statement threshold in milliseconds
+    :type slow_ms: float
+    :param explain: Capture plans for slow statements
+    :type explain: bool
+    :param analyze: Capture EXPLAIN ANALYZE plans, re-running safe reads once
+    :type analyze: bool
+    :return: The engine's profiler
+    :rtype: SQLProfiler
+    """
+    with _lock:
+        profiler = _profilers.get(engine)
+        if profiler is None:
+            profiler = _profilers[engine] = SQLProfiler(engine, slow_ms, explain, analyze)
+        profiler.enable()
+        return profiler
+
+
+def disable_profiling(engine: Engine):
+    """
+    Stop profiling an engine and forget its timings.
+
+    :param engine: Profiled engine
+    :type engine: Engine
+    """
+    with _lock:
+        profiler = _profilers.pop(engine, None)
+    if profiler is not None:
+        profiler.disable()
+
+
+def get_profiler(engine: Engine) -> Optional[SQLProfiler]:
+    """
+    Get the running profiler of an engine.
+
+    :param engine: Engine
+    :type engine: Engine
+    :return: Its profiler, or None if the engine is not profiled
+    :rtype: Optional[SQLProfiler]
+    """
+    return _profilers.get(engine)
+
+
+def profile_from_env(engine: Engine) -> Optional[SQLProfiler]:
+    """
+    Enable profiling when DB_PROFILE_SQL is set (threshold from DB_PROFILE_SLOW_MS,
+    EXPLAIN ANALYZE plans with DB_PROFILE_ANALYZE).
+
+    :param engine: Newly created engine
+    :type engine: Engine
+    :return: The profiler, or None when profiling is off
+    :rtype: Optional[SQLProfiler]
+    """
+    if not _env_flag("DB_PROFILE_SQL"):
+        return None
+    slow_ms = float(os.getenv("DB_PROFILE_SLOW_MS") or DEFAULT_SLOW_MS)
+    return enable_profiling(engine, slow_ms, analyze=_env_flag("DB_PROFILE_ANALYZE"))
+
+
+@atexit.register
+def _log_reports():
+    for profiler in list(_profilers.values()):
+        if profiler.enabled and profiler.summary():
+            logger.info(profiler.report())
@@ -1,5 +1,47 @@
 import regex as re
-from typing import Tuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Sequence, Tuple
+
+# Rows per worker task when validate_batch runs in a process pool
+POOL_CHUNK_SIZE = 100000
+
+
+def _ascii_allowed(pattern) -> frozenset:
+    """ASCII characters the pattern accepts, derived from it so the fast path cannot drift from the regex"""
+    return frozenset(char for char in map(chr, range(128)) if not pattern.search(char))
+
+
+def _has_invalid(value: str, allowed: frozenset, pattern) -> bool:
+    # a set check covers ASCII; the regex decides Unicode whitespace and digits
+    if value.isascii():
+        return not allowed.issuperset(value)
+    return pattern.search(value) is not None
+
+
+def _column_is_clean(values: list[str], allowed: frozenset) -> bool:
+    """Whether every value is non-blank ASCII made of allowed characters, in one pass over the joined column"""
+    joined = "".join(values)
+    return joined.isascii() and allowed.issuperset(joined) and all(map(str.strip, values))
+
+
+def _validate_columns(first_names: Sequence[str], last_names: Sequence[str], positions: Sequence[str]) -> list[str]:
+    names = [(first or "") + (last or "") for first, last in zip(first_names, last_names)]
+    positions = [position or "" for position in positions]
+    errors = [""] * len(names)
+
+    if not _column_is_clean(names, EmployeeValidator.NAME_CHARS):
+        for row, name in enumerate(names):
+            is_valid, error = EmployeeValidator.validate_name(name)
+            if not is_valid:
+                errors[row] = f"Name: {error}"
+    if not _column_is_clean(positions, EmployeeValidator.POSITION_CHARS):
+        for row, position in enumerate(positions):
+            if errors[row]:
+                continue
+            is_valid, error = EmployeeValidator.validate_position(position)
+            if not is_valid:
+                errors[row] = f"Position: {error}"
+    return errors
 
 
 class EmployeeValidator:
@@ -8,6 +50,12 @@ class EmployeeValidator:
     NAME_PATTERN = r"[^A-Za-z,\s-]"
     POSITION_PATTERN = r"[^A-Za-z\d\s,&-]"
 
+    # compiled once: regex.search with a pattern string spends most of its time in the module's cache lookup
+    NAME_REGEX = re.compile(NAME_PATTERN)
+    POSITION_REGEX = re.compile(POSITION_PATTERN)
+    NAME_CHARS = _ascii_allowed(NAME_REGEX)
+    POSITION_CHARS = _ascii_allowed(POSITION_REGEX)
+
     @staticmethod
     def validate_name(value: str) -> Tuple[bool, str]:
         """
@@ -20,7 +68,7 @@ class EmployeeValidator:
         """
         if not value or not value.strip():
             return False, "Name cannot be empty"
-        if re.search(EmployeeValidator.NAME_PATTERN, value):
+        if _has_invalid(value, EmployeeValidator.NAME_CHARS, EmployeeValidator.NAME_REGEX):
             return False, "Name contains invalid characters"
         return True, ""
 
@@ -36,7 +84,7 @@ class EmployeeValidator:
         """
         if not value or not value.strip():
             return False, "Position cannot be empty"
-        if re.search(EmployeeValidator.POSITION_PATTERN, value):
+        if _has_invalid(value, EmployeeValidator.POSITION_CHARS, EmployeeValidator.POSITION_REGEX):
             return False, "Position contains invalid characters"
         return True, ""
 
@@ -63,3 +111,42 @@ class EmployeeValidator:
             return False, f"Position: {error}"
 
         return True, ""
+
+    @staticmethod
+    def validate_batch(first_names: Sequence[str], last_names: Sequence[str], positions: Sequence[str],
+                       processes: int = 1) -> list[str]:
+        """
+        Validate columns of employee fields at once.
+
+        A column of clean ASCII values is accepted with one set check over the
+        joined column; otherwise rows are checked one by one. With processes > 1,
+        columns longer than POOL_CHUNK_SIZE are split across a process pool.
+
+        :param first_names: First name per row
+        :type first_names: Sequence[str]
+        :param last_names: Last name per row
+        :type last_names: Sequence[str]
+        :param positions: Position per row
+        :type positions: Sequence[str]
+        :param processes: Worker processes for very large columns
+        :type processes: int
+        :return: Error per row, as validate_employee_data would report it ("" if valid)
+        :rtype: list[str]
+
+        Example:
+            errors = EmployeeValidator.validate_batch(df["first_name"], df["last_name"], df["position"])
+            valid = [row for row, error in zip(rows, errors) if not error]
+        """
+        count = len(first_names)
+        if len(last_names) != count or len(positions) != count:
+            raise ValueError("Columns must have the same length")
+
+        if processes > 1 and count > POOL_CHUNK_SIZE:
+            starts = range(0, count, POOL_CHUNK_SIZE)
+            with ProcessPoolExecutor(processes) as pool:
+                chunks = pool.map(_validate_columns,
+                                  [list(first_names[start:start + POOL_CHUNK_SIZE]) for start in starts],
+                                  [list(last_names[start:start + POOL_CHUNK_SIZE]) for start in starts],
+                                  [list(positions[start:start + POOL_CHUNK_SIZE]) for start in starts])
+                return [error for chunk in chunks for error in chunk]
+        return _validate_columns(first_names, last_names, positions)